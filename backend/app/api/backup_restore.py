@@ -3,18 +3,23 @@ Database Backup and Restore API Endpoints
 Allows administrators to backup and restore the database
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.orm import Session
 from fastapi.responses import FileResponse, JSONResponse
 from datetime import datetime
 import os
-import json
 from pathlib import Path
 from typing import Optional
 
-from app.core.database import get_db, engine
+from app.core.database import get_db
 from app.core.security import get_current_user
 from app.models.user import User
+from app.services.background_job_service import create_job, get_job, job_to_dict
+from app.services.backup_service import BACKUP_JOB_TYPE, backup_directory, backup_job
+from app.services.restore_service import RESTORE_JOB_TYPE, restore_job
+
+# Legacy single-file JSON backups and streamed ZIP archives
+BACKUP_EXTENSIONS = ('.json', '.zip')
 
 router = APIRouter(prefix="/api/v1/backup-restore", tags=["backup-restore"])
 
@@ -32,13 +37,13 @@ def get_backup_status(
             detail="Only administrators can access backup/restore features"
         )
     
-    backup_dir = Path("backups")
-    backup_dir.mkdir(exist_ok=True)
+    backup_dir = Path(backup_directory())
     
     # Get list of backup files
     backup_files = []
     if backup_dir.exists():
-        for file_path in sorted(backup_dir.glob("*.json"), key=lambda x: x.stat().st_mtime, reverse=True):
+        paths = [p for p in backup_dir.iterdir() if p.suffix in BACKUP_EXTENSIONS]
+        for file_path in sorted(paths, key=lambda x: x.stat().st_mtime, reverse=True):
             stat = file_path.stat()
             backup_files.append({
                 "filename": file_path.name,
@@ -56,108 +61,54 @@ def get_backup_status(
 
 @router.post("/backup")
 def create_backup(
+    background_tasks: BackgroundTasks,
+    incremental: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Create a backup of critical database tables"""
+    """
+    Back up every table of the database in the background
+
+    With incremental=true only rows added or updated since the previous
+    backup are written (a full backup is made when there is none).
+    Poll /backup/{job_id} for progress and the archive's file name.
+    """
     # Check if user is admin
     if current_user.role not in ['admin', 'super_admin', 'temple_manager']:
         raise HTTPException(
             status_code=403,
             detail="Only administrators can create backups"
         )
-    
-    try:
-        from sqlalchemy import text, inspect
-        
-        backup_dir = Path("backups")
-        backup_dir.mkdir(exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_file = backup_dir / f"backup_{timestamp}.json"
-        
-        # Tables to backup (excluding system tables)
-        tables_to_backup = [
-            'temples', 'users', 'devotees', 'donation_categories', 'donations',
-            'sevas', 'seva_bookings', 'accounts', 'journal_entries', 'journal_lines',
-            'bank_accounts', 'donation_categories'
-        ]
-        
-        backup_data = {
-            "backup_timestamp": datetime.now().isoformat(),
-            "backed_up_by": current_user.email,
-            "tables": {}
-        }
-        
-        # Backup each table
-        for table_name in tables_to_backup:
-            try:
-                # Check if table exists
-                inspector = inspect(engine)
-                if table_name not in inspector.get_table_names():
-                    continue
-                
-                # Get all rows from table
-                result = db.execute(text(f"SELECT * FROM {table_name}"))
-                rows = []
-                columns = list(result.keys())
-                
-                for row in result:
-                    row_dict = {}
-                    # Handle both Row objects and tuples
-                    if hasattr(row, '_mapping'):
-                        # SQLAlchemy Row object
-                        for col in columns:
-                            value = row[col]
-                            # Convert datetime/date to string
-                            if hasattr(value, 'isoformat'):
-                                row_dict[col] = value.isoformat()
-                            else:
-                                row_dict[col] = value
-                    else:
-                        # Tuple row
-                        for i, col in enumerate(columns):
-                            value = row[i]
-                            if hasattr(value, 'isoformat'):
-                                row_dict[col] = value.isoformat()
-                            else:
-                                row_dict[col] = value
-                    rows.append(row_dict)
-                
-                backup_data["tables"][table_name] = {
-                    "columns": list(columns),
-                    "rows": rows,
-                    "count": len(rows)
-                }
-                
-            except Exception as e:
-                # Skip tables that don't exist or can't be accessed
-                print(f"Warning: Could not backup table {table_name}: {e}")
-                continue
-        
-        # Save backup file
-        with open(backup_file, 'w', encoding='utf-8') as f:
-            json.dump(backup_data, f, indent=2, ensure_ascii=False, default=str)
-        
-        file_size = backup_file.stat().st_size
-        
-        return {
-            "status": "success",
-            "message": "Backup created successfully",
-            "backup_file": backup_file.name,
-            "file_size": file_size,
-            "file_size_mb": round(file_size / (1024 * 1024), 2),
-            "tables_backed_up": list(backup_data["tables"].keys()),
-            "total_records": sum(t["count"] for t in backup_data["tables"].values()),
-            "created_at": backup_data["backup_timestamp"]
-        }
-        
-    except Exception as e:
+
+    job = create_job(
+        db,
+        BACKUP_JOB_TYPE,
+        temple_id=current_user.temple_id,
+        created_by=current_user.id,
+        params={"incremental": incremental},
+    )
+    background_tasks.add_task(backup_job, job.id, incremental, current_user.email)
+    return {"status": "queued", "job_id": job.id}
+
+
+@router.get("/backup/{job_id}")
+def get_backup_job_status(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Status, progress and result of a backup"""
+    if current_user.role not in ['admin', 'super_admin', 'temple_manager']:
         raise HTTPException(
-            status_code=500,
-            detail=f"Failed to create backup: {str(e)}"
+            status_code=403,
+            detail="Only administrators can access backup/restore features"
         )
 
+    job = get_job(db, job_id)
+    if not job or job.job_type != BACKUP_JOB_TYPE:
+        raise HTTPException(status_code=404, detail="Backup job not found")
+    return job_to_dict(job)
+
 
 @router.get("/download/{filename}")
 def download_backup(
@@ -172,11 +123,11 @@ def download_backup(
             detail="Only administrators can download backups"
         )
     
-    backup_dir = Path("backups")
+    backup_dir = Path(backup_directory())
     backup_file = backup_dir / filename
     
-    # Security: Only allow JSON files from backup directory
-    if not filename.endswith('.json') or not backup_file.exists():
+    # Security: Only allow backup files from backup directory
+    if not filename.endswith(BACKUP_EXTENSIONS) or not backup_file.exists():
         raise HTTPException(
             status_code=404,
             detail="Backup file not found"
@@ -194,7 +145,7 @@ def download_backup(
     return FileResponse(
         path=str(backup_file),
         filename=filename,
-        media_type='application/json'
+        media_type='application/zip' if filename.endswith('.zip') else 'application/json'
     )
 
 
@@ -211,11 +162,11 @@ def delete_backup(
             detail="Only administrators can delete backups"
         )
     
-    backup_dir = Path("backups")
+    backup_dir = Path(backup_directory())
     backup_file = backup_dir / filename
     
     # Security checks
-    if not filename.endswith('.json') or not backup_file.exists():
+    if not filename.endswith(BACKUP_EXTENSIONS) or not backup_file.exists():
         raise HTTPException(
             status_code=404,
             detail="Backup file not found"
@@ -243,14 +194,23 @@ def delete_backup(
 
 
 @router.post("/restore")
-def restore_backup(
-    file: UploadFile = File(...),
+async def restore_backup(
+    background_tasks: BackgroundTasks,
+    file: Optional[UploadFile] = File(None),
+    filename: Optional[str] = None,
+    dry_run: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Restore database from backup file
-    
+    Restore database from a backup archive (or a legacy JSON backup) in the background
+
+    Upload the file, or give the filename of a backup in the backup
+    directory. Rows are upserted by primary key, so incremental backups are
+    restored by restoring each archive of the chain in order. With
+    dry_run=true the archive's checksums are only verified.
+    Poll /restore/{job_id} for progress and the result.
+
     WARNING: This will overwrite existing data. Use with extreme caution!
     """
     # Check if user is admin
@@ -259,90 +219,60 @@ def restore_backup(
             status_code=403,
             detail="Only super administrators can restore backups"
         )
-    
-    # Only allow JSON files
-    if not file.filename.endswith('.json'):
-        raise HTTPException(
-            status_code=400,
-            detail="Only JSON backup files are supported"
-        )
-    
-    try:
-        from sqlalchemy import text
-        
-        # Read backup file
-        content = file.file.read()
-        backup_data = json.loads(content.decode('utf-8'))
-        
-        if "tables" not in backup_data:
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid backup file format"
-            )
-        
-        restored_tables = []
-        restored_records = 0
-        
-        # Restore each table
-        for table_name, table_data in backup_data["tables"].items():
-            try:
-                # Delete existing data (optional - you might want to merge instead)
-                # db.execute(text(f"DELETE FROM {table_name}"))
-                
-                # Insert restored data
-                if table_data["rows"]:
-                    columns = table_data["columns"]
-                    rows = table_data["rows"]
-                    
-                    # Build INSERT statement (using ON CONFLICT for PostgreSQL, or simple INSERT for others)
-                    columns_str = ", ".join(columns)
-                    placeholders = ", ".join([f":{col}" for col in columns])
-                    
-                    # Check database type
-                    db_url = str(engine.url)
-                    if 'postgresql' in db_url.lower():
-                        insert_stmt = text(f"""
-                            INSERT INTO {table_name} ({columns_str})
-                            VALUES ({placeholders})
-                            ON CONFLICT DO NOTHING
-                        """)
-                    else:
-                        # For SQLite, use INSERT OR IGNORE
-                        insert_stmt = text(f"""
-                            INSERT OR IGNORE INTO {table_name} ({columns_str})
-                            VALUES ({placeholders})
-                        """)
-                    
-                    for row in rows:
-                        db.execute(insert_stmt, row)
-                    
-                    restored_tables.append(table_name)
-                    restored_records += len(rows)
-                
-            except Exception as e:
-                print(f"Warning: Could not restore table {table_name}: {e}")
-                continue
-        
-        db.commit()
-        
-        return {
-            "status": "success",
-            "message": "Backup restored successfully",
-            "restored_tables": restored_tables,
-            "restored_records": restored_records,
-            "restored_at": datetime.now().isoformat(),
-            "restored_by": current_user.email
-        }
-        
-    except json.JSONDecodeError:
+
+    if file is None and not filename:
+        raise HTTPException(status_code=400, detail="Upload a backup file or give its filename")
+
+    name = file.filename if file is not None else filename
+    if not name.endswith(BACKUP_EXTENSIONS):
         raise HTTPException(
             status_code=400,
-            detail="Invalid JSON file format"
+            detail="Only .zip backup archives and .json backup files are supported"
         )
-    except Exception as e:
-        db.rollback()
+
+    backup_dir = Path(backup_directory())
+    if file is None:
+        path = backup_dir / filename
+        try:
+            path.resolve().relative_to(backup_dir.resolve())
+        except ValueError:
+            raise HTTPException(status_code=403, detail="Invalid backup file path")
+        if not path.exists():
+            raise HTTPException(status_code=404, detail="Backup file not found")
+
+    job = create_job(
+        db,
+        RESTORE_JOB_TYPE,
+        temple_id=current_user.temple_id,
+        created_by=current_user.id,
+        params={"filename": name, "dry_run": dry_run},
+    )
+
+    if file is not None:
+        # Stream the upload to disk - the job reads it back table by table
+        path = backup_dir / f"restore_upload_{job.id}{Path(name).suffix}"
+        with open(path, "wb") as out:
+            while chunk := await file.read(1024 * 1024):
+                out.write(chunk)
+
+    background_tasks.add_task(restore_job, job.id, str(path), dry_run, file is not None)
+    return {"status": "queued", "job_id": job.id}
+
+
+@router.get("/restore/{job_id}")
+def get_restore_job_status(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Status, progress and result of a restore"""
+    if current_user.role not in ['admin', 'super_admin']:
         raise HTTPException(
-            status_code=500,
-            detail=f"Failed to restore backup: {str(e)}"
+            status_code=403,
+            detail="Only super administrators can restore backups"
         )
 
+    job = get_job(db, job_id)
+    if not job or job.job_type != RESTORE_JOB_TYPE:
+        raise HTTPException(status_code=404, detail="Restore job not found")
+    return job_to_dict(job)
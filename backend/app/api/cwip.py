@@ -20,6 +20,7 @@ from app.models.accounting import (
     JournalEntryStatus,
     TransactionType,
 )
+from app.services.numbering_service import next_journal_entry_number
 from app.models.vendor import Vendor
 from .asset import AssetResponse
 
@@ -259,23 +260,7 @@ def add_cwip_expense(
 
     # Create journal entry
     year = expense_data.expense_date.year
-    prefix = f"JE/{year}/"
-    last_entry = (
-        db.query(JournalEntry)
-        .filter(JournalEntry.temple_id == temple_id, JournalEntry.entry_number.like(f"{prefix}%"))
-        .order_by(JournalEntry.id.desc())
-        .first()
-    )
-
-    new_num = 1
-    if last_entry:
-        try:
-            last_num = int(last_entry.entry_number.split("/")[-1])
-            new_num = last_num + 1
-        except:
-            pass
-
-    entry_number = f"{prefix}{new_num:04d}"
+    entry_number = next_journal_entry_number(db, temple_id, year)
     entry_date = datetime.combine(expense_data.expense_date, datetime.min.time())
 
     journal_entry = JournalEntry(
@@ -451,23 +436,7 @@ def capitalize_cwip(
 
     # Create journal entry for capitalization
     year = capitalize_request.capitalization_date.year
-    prefix = f"JE/{year}/"
-    last_entry = (
-        db.query(JournalEntry)
-        .filter(JournalEntry.temple_id == temple_id, JournalEntry.entry_number.like(f"{prefix}%"))
-        .order_by(JournalEntry.id.desc())
-        .first()
-    )
-
-    new_num = 1
-    if last_entry:
-        try:
-            last_num = int(last_entry.entry_number.split("/")[-1])
-            new_num = last_num + 1
-        except:
-            pass
-
-    entry_number = f"{prefix}{new_num:04d}"
+    entry_number = next_journal_entry_number(db, temple_id, year)
     entry_date = datetime.combine(capitalize_request.capitalization_date, datetime.min.time())
 
     journal_entry = JournalEntry(
@@ -2,12 +2,21 @@
 Devotee API Endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    status,
+    Query,
+    UploadFile,
+    File,
+)
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func, and_, or_
 from typing import List, Optional
-from datetime import datetime, date, timedelta
+from datetime import datetime, date
 import json
 import csv
 import io
@@ -20,6 +29,17 @@ from app.models.devotee import Devotee
 from app.models.user import User
 from app.models.donation import Donation
 from app.models.seva import SevaBooking
+from app.models.devotee_duplicate import DevoteeDuplicateGroup, DuplicateGroupStatus
+from app.services.birthday_service import upcoming_birthdays_query
+from app.services.devotee_stats_service import devotee_list_stats
+from app.services.devotee_search_service import VIP_TAGS, apply_search, apply_tag_filter
+from app.services.background_job_service import create_job, get_job, job_to_dict
+from app.services.devotee_dedup_service import (
+    DEDUP_JOB_TYPE,
+    devotee_dedup_job,
+    find_duplicate_groups,
+    release_merged_devotees,
+)
 from pydantic import BaseModel, EmailStr
 
 router = APIRouter(prefix="/api/v1/devotees", tags=["devotees"])
@@ -96,9 +116,13 @@ class DevoteeResponse(DevoteeBase):
         from_attributes = True
 
     @classmethod
-    def from_orm_with_masking(cls, devotee: Devotee, user: User, db: Session = None):
+    def from_orm_with_masking(
+        cls, devotee: Devotee, user: User, db: Session = None, stats: Optional[dict] = None
+    ):
         """
         Create response with data masking based on user permissions
+
+        stats: This devotee's entry of devotee_list_stats (fetched from db when not given)
         """
         # Parse tags from JSON string
         tags = []
@@ -108,37 +132,10 @@ class DevoteeResponse(DevoteeBase):
             except:
                 tags = []
 
-        # Get family info
-        family_head_name = None
-        if devotee.family_head_id:
-            family_head = (
-                db.query(Devotee).filter(Devotee.id == devotee.family_head_id).first()
-                if db
-                else None
-            )
-            family_head_name = family_head.name if family_head else None
-
-        # Count family members
-        family_members_count = 0
-        if db:
-            family_members_count = (
-                db.query(Devotee).filter(Devotee.family_head_id == devotee.id).count()
-            )
-
-        # Get donation stats
-        total_donations = 0.0
-        donation_count = 0
-        if db:
-            donations = db.query(Donation).filter(Donation.devotee_id == devotee.id).all()
-            donation_count = len(donations)
-            total_donations = sum(d.amount for d in donations)
-
-        # Get booking count
-        booking_count = 0
-        if db:
-            booking_count = (
-                db.query(SevaBooking).filter(SevaBooking.devotee_id == devotee.id).count()
-            )
+        # Family, donation and booking figures
+        if stats is None and db:
+            stats = devotee_list_stats(db, [devotee])[devotee.id]
+        stats = stats or {}
 
         # Check if VIP (has VIP tag)
         is_vip = "VIP" in tags or "Patron" in tags if tags else False
@@ -178,14 +175,22 @@ class DevoteeResponse(DevoteeBase):
             full_name=devotee.full_name,
             created_at=devotee.created_at,
             updated_at=devotee.updated_at,
-            family_head_name=family_head_name,
-            family_members_count=family_members_count,
-            total_donations=total_donations,
-            donation_count=donation_count,
-            booking_count=booking_count,
+            family_head_name=stats.get("family_head_name"),
+            family_members_count=stats.get("family_members_count", 0),
+            total_donations=stats.get("total_donations", 0.0),
+            donation_count=stats.get("donation_count", 0),
+            booking_count=stats.get("booking_count", 0),
+            last_visit_date=stats.get("last_visit_date"),
             is_vip=is_vip,
         )
 
+    @classmethod
+    def list_with_masking(cls, devotees: List[Devotee], user: User, db: Session):
+        """Responses for a list of devotees, with their figures fetched in a few grouped queries"""
+        devotees = list(devotees)
+        stats = devotee_list_stats(db, devotees)
+        return [cls.from_orm_with_masking(d, user, db, stats[d.id]) for d in devotees]
+
 
 @router.get("/", response_model=List[DevoteeResponse])
 def get_devotees(
@@ -204,31 +209,22 @@ def get_devotees(
     if current_user.temple_id:
         query = query.filter(Devotee.temple_id == current_user.temple_id)
 
-    # Search filter
+    # Search filter (name words, phonetic name, Kannada name, phone digits, email)
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                Devotee.name.ilike(search_term),
-                Devotee.phone.ilike(search_term),
-                Devotee.email.ilike(search_term),
-            )
-        )
+        query = apply_search(query, db, search, current_user.temple_id)
 
     # Tag filter
     if tag:
-        query = query.filter(Devotee.tags.contains(f'"{tag}"'))
+        query = apply_tag_filter(query, [tag], current_user.temple_id)
 
     # VIP filter
     if is_vip is not None:
         if is_vip:
-            query = query.filter(
-                or_(Devotee.tags.contains('"VIP"'), Devotee.tags.contains('"Patron"'))
-            )
+            query = apply_tag_filter(query, VIP_TAGS, current_user.temple_id)
 
     devotees = query.offset(skip).limit(limit).all()
     # Apply data masking
-    return [DevoteeResponse.from_orm_with_masking(d, current_user, db) for d in devotees]
+    return DevoteeResponse.list_with_masking(devotees, current_user, db)
 
 
 @router.get("/search/by-mobile/{mobile}", response_model=List[DevoteeResponse])
@@ -354,7 +350,7 @@ def search_devotee_by_mobile(
         # Sort: exact country code match first (if country code was provided)
         if country_code:
             devotees.sort(key=lambda d: 0 if d.country_code == country_code else 1)
-        return [DevoteeResponse.from_orm_with_masking(dev, current_user, db) for dev in devotees]
+        return DevoteeResponse.list_with_masking(devotees, current_user, db)
 
     # Debug: Log search parameters if no results found
     # Also check what phones exist in DB for this temple
@@ -392,9 +388,7 @@ def get_devotee_analytics(
     active_devotees = query.filter(Devotee.is_active == True).count()
 
     # VIP count
-    vip_count = query.filter(
-        or_(Devotee.tags.contains('"VIP"'), Devotee.tags.contains('"Patron"'))
-    ).count()
+    vip_count = apply_tag_filter(query, VIP_TAGS, current_user.temple_id).count()
 
     # Devotees with donations
     devotees_with_donations = (
@@ -508,110 +502,166 @@ def export_template(current_user: User = Depends(get_current_user)):
 
 @router.get("/duplicates", response_model=List[dict])
 def find_duplicate_devotees(
-    threshold: float = Query(0.8, description="Similarity threshold (0-1)"),
+    threshold: float = Query(0.8, ge=0, le=1, description="Similarity threshold (0-1)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Find potential duplicate devotees based on phone, name, or email similarity
-    """
-    query = db.query(Devotee)
-    if current_user.temple_id:
-        query = query.filter(Devotee.temple_id == current_user.temple_id)
-
-    all_devotees = query.all()
-    duplicates = []
-    processed = set()
 
-    for i, devotee1 in enumerate(all_devotees):
-        if devotee1.id in processed:
+    Only devotees sharing a normalized phone, email or city + first name are
+    compared; pairs scoring at least `threshold` are grouped. For large
+    temples use POST /duplicates/scan, which stores the groups incrementally.
+    """
+    groups = find_duplicate_groups(db, current_user.temple_id, threshold)
+    return _duplicate_groups_response(db, groups)
+
+
+def _duplicate_groups_response(db: Session, groups: List[dict]) -> List[dict]:
+    """Attach id/name/phone/email/city of the members to each group"""
+    member_ids = [devotee_id for group in groups for devotee_id in group["devotee_ids"]]
+    members = {}
+    for start in range(0, len(member_ids), 500):
+        for devotee in db.query(
+            Devotee.id, Devotee.name, Devotee.phone, Devotee.email, Devotee.city
+        ).filter(Devotee.id.in_(member_ids[start : start + 500])):
+            members[devotee.id] = {
+                "id": devotee.id,
+                "name": devotee.name,
+                "phone": devotee.phone,
+                "email": devotee.email,
+                "city": devotee.city,
+            }
+
+    response = []
+    for group in groups:
+        group_members = [members[i] for i in group["devotee_ids"] if i in members]
+        if len(group_members) < 2:
             continue
-
-        group = [devotee1]
-
-        for devotee2 in all_devotees[i + 1 :]:
-            if devotee2.id in processed:
-                continue
-
-            # Check for duplicates
-            is_duplicate = False
-
-            # Same phone (exact match)
-            if devotee1.phone == devotee2.phone:
-                is_duplicate = True
-
-            # Similar name and same city
-            elif devotee1.name.lower() == devotee2.name.lower() and devotee1.city == devotee2.city:
-                is_duplicate = True
-
-            # Same email
-            elif devotee1.email and devotee2.email and devotee1.email == devotee2.email:
-                is_duplicate = True
-
-            if is_duplicate:
-                group.append(devotee2)
-                processed.add(devotee2.id)
-
-        if len(group) > 1:
-            duplicates.append(
-                {
-                    "group": [
-                        {
-                            "id": d.id,
-                            "name": d.name,
-                            "phone": d.phone,
-                            "email": d.email,
-                            "city": d.city,
-                        }
-                        for d in group
-                    ],
-                    "count": len(group),
-                }
-            )
-            processed.add(devotee1.id)
-
-    return duplicates
+        entry = {
+            "group": group_members,
+            "count": len(group_members),
+            "score": group["score"],
+            "reasons": group["reasons"],
+        }
+        if "id" in group:
+            entry["group_id"] = group["id"]
+            entry["status"] = group["status"]
+        response.append(entry)
+    return response
+
+
+@router.post("/duplicates/scan")
+def scan_duplicate_devotees(
+    background_tasks: BackgroundTasks,
+    threshold: float = Query(0.8, ge=0, le=1, description="Similarity threshold (0-1)"),
+    full: bool = Query(False, description="Rescan every devotee, not only changed ones"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Refresh the stored duplicate groups in the background
+    Poll /duplicates/scan/{job_id}; results are listed by /duplicates/groups
+    """
+    if current_user.role not in ["admin", "temple_manager"] and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Only admins can scan for duplicates")
+
+    job = create_job(
+        db,
+        DEDUP_JOB_TYPE,
+        temple_id=current_user.temple_id,
+        created_by=current_user.id,
+        params={"threshold": threshold, "full": full},
+    )
+    background_tasks.add_task(devotee_dedup_job, job.id, current_user.temple_id, threshold, full)
+    return {"status": "queued", "job_id": job.id}
 
 
-@router.get("/birthdays", response_model=List[DevoteeResponse])
-def get_upcoming_birthdays(
-    days: int = Query(30, description="Number of days to look ahead"),
+@router.get("/duplicates/scan/{job_id}")
+def get_duplicate_scan_status(
+    job_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Get devotees with birthdays in the next N days"""
-    today = date.today()
-    end_date = today + timedelta(days=days)
+    """Status and progress of a duplicate scan job"""
+    job = get_job(db, job_id, None if current_user.is_superuser else current_user.temple_id)
+    if not job or job.job_type != DEDUP_JOB_TYPE:
+        raise HTTPException(status_code=404, detail="Duplicate scan job not found")
+    return job_to_dict(job)
 
-    query = db.query(Devotee).filter(Devotee.date_of_birth.isnot(None))
 
-    if current_user.temple_id:
-        query = query.filter(Devotee.temple_id == current_user.temple_id)
+@router.get("/duplicates/groups", response_model=List[dict])
+def list_duplicate_groups(
+    group_status: DuplicateGroupStatus = Query(DuplicateGroupStatus.OPEN, alias="status"),
+    skip: int = 0,
+    limit: int = Query(100, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Duplicate groups stored by the last scan, best matches first"""
+    groups = (
+        db.query(DevoteeDuplicateGroup)
+        .filter(
+            DevoteeDuplicateGroup.temple_id == (current_user.temple_id or 0),
+            DevoteeDuplicateGroup.status == group_status,
+        )
+        .order_by(DevoteeDuplicateGroup.score.desc(), DevoteeDuplicateGroup.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return _duplicate_groups_response(
+        db,
+        [
+            {
+                "id": group.id,
+                "status": group.status.value,
+                "devotee_ids": group.devotee_ids,
+                "score": group.score,
+                "reasons": group.reasons or [],
+            }
+            for group in groups
+        ],
+    )
 
-    all_devotees = query.all()
-    upcoming_birthdays = []
 
-    for devotee in all_devotees:
-        if not devotee.date_of_birth:
-            continue
+@router.put("/duplicates/groups/{group_id}/dismiss", response_model=dict)
+def dismiss_duplicate_group(
+    group_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Mark a group as not duplicates; later scans will not raise it again"""
+    group = (
+        db.query(DevoteeDuplicateGroup)
+        .filter(
+            DevoteeDuplicateGroup.id == group_id,
+            DevoteeDuplicateGroup.temple_id == (current_user.temple_id or 0),
+        )
+        .first()
+    )
+    if not group:
+        raise HTTPException(status_code=404, detail="Duplicate group not found")
 
-        # Calculate this year's birthday
-        this_year_birthday = devotee.date_of_birth.replace(year=today.year)
-        if this_year_birthday < today:
-            # Birthday already passed this year, check next year
-            this_year_birthday = devotee.date_of_birth.replace(year=today.year + 1)
+    group.status = DuplicateGroupStatus.DISMISSED
+    db.commit()
+    return {"group_id": group.id, "status": group.status.value}
 
-        if today <= this_year_birthday <= end_date:
-            upcoming_birthdays.append(devotee)
 
-    # Sort by birthday date
-    upcoming_birthdays.sort(
-        key=lambda d: d.date_of_birth.replace(year=today.year)
-        if d.date_of_birth.replace(year=today.year) >= today
-        else d.date_of_birth.replace(year=today.year + 1)
-    )
+@router.get("/birthdays", response_model=List[DevoteeResponse])
+def get_upcoming_birthdays(
+    days: int = Query(30, ge=0, le=366, description="Number of days to look ahead"),
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Page size (default: all)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Get devotees with birthdays in the next N days, soonest first"""
+    query = upcoming_birthdays_query(db, current_user.temple_id, days).offset(skip)
+    if limit:
+        query = query.limit(limit)
 
-    return [DevoteeResponse.from_orm_with_masking(d, current_user, db) for d in upcoming_birthdays]
+    return DevoteeResponse.list_with_masking(query, current_user, db)
 
 
 @router.get("/{devotee_id}", response_model=DevoteeResponse)
@@ -840,6 +890,9 @@ def merge_devotees(
     if len(duplicates) != len(duplicate_ids):
         raise HTTPException(status_code=404, detail="Some duplicate devotees not found")
 
+    # Close review groups and match keys of the devotees being merged away
+    release_merged_devotees(db, primary.id, duplicate_ids)
+
     # Merge data: keep non-null values from duplicates
     for dup in duplicates:
         if not primary.email and dup.email:
@@ -955,7 +1008,7 @@ def get_family_members(
         .all()
     )
 
-    return [DevoteeResponse.from_orm_with_masking(d, current_user, db) for d in family_members]
+    return DevoteeResponse.list_with_masking(family_members, current_user, db)
 
 
 @router.post("/bulk-import")
@@ -2,27 +2,23 @@
 Donation API Endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, File, UploadFile
-from fastapi.responses import StreamingResponse, Response
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    status,
+    Query,
+    File,
+    UploadFile,
+)
+from fastapi.responses import FileResponse, StreamingResponse, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, text
+from sqlalchemy import func, text
 from typing import List, Optional
 from datetime import datetime, date, timedelta
 import io
-import csv
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
-from openpyxl.drawing.image import Image as ExcelImage
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 import os
-import requests
-from urllib.parse import urlparse
 
 from app.core.database import get_db
 from app.core.security import get_current_user
@@ -40,6 +36,38 @@ from app.models.accounting import (
     TransactionType,
 )
 from app.services.printer import get_print_queue
+from app.services.background_job_service import create_job, get_job, job_to_dict
+from app.services.certificate_80g_service import (
+    CERTIFICATE_JOB_TYPE,
+    bulk_certificate_job,
+    certificate_file_path,
+    eligible_donation_ids,
+)
+from app.services.donation_import_service import (
+    IMPORT_JOB_TYPE,
+    donation_import_job,
+    error_report_path,
+    import_file_path,
+)
+from app.services.donation_query_service import donation_query, iter_donations, keyset_page
+from app.services.export_service import (
+    ExportColumn,
+    ExportReport,
+    ExportSection,
+    export_response,
+    register_export,
+)
+from app.services.journal_posting_service import get_account_by_code
+from app.services.receipt_pdf_service import (
+    donation_receipt_data,
+    fetch_logo,
+    get_receipt_template,
+    render_donation_receipt,
+)
+from app.services.numbering_service import (
+    next_donation_receipt_number,
+    next_journal_entry_number,
+)
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/api/v1/donations", tags=["donations"])
@@ -116,11 +144,7 @@ def post_donation_to_accounting(db: Session, donation: Donation, temple_id: int)
                 debit_account_code = "14003"  # Default to Pooja Materials Inventory
 
             # Get debit account
-            debit_account = (
-                db.query(Account)
-                .filter(Account.temple_id == temple_id, Account.account_code == debit_account_code)
-                .first()
-            )
+            debit_account = get_account_by_code(db, temple_id, debit_account_code)
 
             if not debit_account:
                 # Try to find by account_subtype
@@ -187,14 +211,7 @@ def post_donation_to_accounting(db: Session, donation: Donation, temple_id: int)
                     debit_account = get_cash_account_for_payment(db, temple_id, "CASH", hundi=False)
                     if not debit_account:
                         debit_account_code = "11001"  # Cash in Hand - Counter (no leading zero)
-                        debit_account = (
-                            db.query(Account)
-                            .filter(
-                                Account.temple_id == temple_id,
-                                Account.account_code == debit_account_code,
-                            )
-                            .first()
-                        )
+                        debit_account = get_account_by_code(db, temple_id, debit_account_code)
                 elif donation.payment_mode and donation.payment_mode.upper() in [
                     "UPI",
                     "ONLINE",
@@ -219,14 +236,7 @@ def post_donation_to_accounting(db: Session, donation: Donation, temple_id: int)
                         )
                     elif fallback_code:
                         # Use the account code from the bank account if found
-                        debit_account = (
-                            db.query(Account)
-                            .filter(
-                                Account.temple_id == temple_id,
-                                Account.account_code == fallback_code,
-                            )
-                            .first()
-                        )
+                        debit_account = get_account_by_code(db, temple_id, fallback_code)
                     if not debit_account:
                         print(
                             f"  WARNING: No bank account found for payment mode {donation.payment_mode}. Please create a bank account in Bank Account Management."
@@ -241,14 +251,7 @@ def post_donation_to_accounting(db: Session, donation: Donation, temple_id: int)
                         debit_account_code = (
                             "11002"  # Cash in Hand - Hundi (fallback, no leading zero)
                         )
-                        debit_account = (
-                            db.query(Account)
-                            .filter(
-                                Account.temple_id == temple_id,
-                                Account.account_code == debit_account_code,
-                            )
-                            .first()
-                        )
+                        debit_account = get_account_by_code(db, temple_id, debit_account_code)
                 else:
                     from app.core.bank_account_helper import get_cash_account_for_payment
 
@@ -262,14 +265,7 @@ def post_donation_to_accounting(db: Session, donation: Donation, temple_id: int)
                         debit_account_code = (
                             "11001"  # Cash in Hand - Counter (fallback, no leading zero)
                         )
-                        debit_account = (
-                            db.query(Account)
-                            .filter(
-                                Account.temple_id == temple_id,
-                                Account.account_code == debit_account_code,
-                            )
-                            .first()
-                        )
+                        debit_account = get_account_by_code(db, temple_id, debit_account_code)
 
         # Determine credit account - PRIORITY: Category-linked account
         credit_account = None
@@ -292,11 +288,7 @@ def post_donation_to_accounting(db: Session, donation: Donation, temple_id: int)
         # Use 44001 - General Donations as default when category is not linked.
         if not credit_account:
             credit_account_code = "44001"  # General Donations
-            credit_account = (
-                db.query(Account)
-                .filter(Account.temple_id == temple_id, Account.account_code == credit_account_code)
-                .first()
-            )
+            credit_account = get_account_by_code(db, temple_id, credit_account_code)
 
             if credit_account:
                 print(
@@ -347,33 +339,7 @@ def post_donation_to_accounting(db: Session, donation: Donation, temple_id: int)
 
         # Generate entry number first
         year = donation.donation_date.year
-        prefix = f"JE/{year}/"
-
-        # Get last entry number for this year
-        # Use load_only to avoid integrity_hash column if it doesn't exist
-        from sqlalchemy.orm import load_only
-
-        last_entry = (
-            db.query(JournalEntry)
-            .options(load_only(JournalEntry.id, JournalEntry.entry_number, JournalEntry.temple_id))
-            .filter(
-                JournalEntry.temple_id == temple_id, JournalEntry.entry_number.like(f"{prefix}%")
-            )
-            .order_by(JournalEntry.id.desc())
-            .first()
-        )
-
-        if last_entry:
-            # Extract number and increment
-            try:
-                last_num = int(last_entry.entry_number.split("/")[-1])
-                new_num = last_num + 1
-            except:
-                new_num = 1
-        else:
-            new_num = 1
-
-        entry_number = f"{prefix}{new_num:04d}"
+        entry_number = next_journal_entry_number(db, temple_id, year)
 
         # Entry date should be receipt date (when money was received)
         # For donations, donation_date is the receipt date (when money was received)
@@ -738,29 +704,9 @@ def create_donation(
         db.add(category)
         db.flush()
 
-    # Generate receipt number
+    # Generate receipt number from the shared per-year receipt counter
     year = datetime.now().year
-    # Query using date range for database-agnostic compatibility
-    # Filter donations from Jan 1 to Dec 31 of current year
-    year_start = date(year, 1, 1)
-    year_end = date(year, 12, 31)
-    last_donation = (
-        db.query(Donation)
-        .filter(and_(Donation.donation_date >= year_start, Donation.donation_date <= year_end))
-        .order_by(Donation.id.desc())
-        .first()
-    )
-
-    result = (last_donation.receipt_number,) if last_donation else None
-
-    seq = 1
-    if result and result[0]:
-        try:
-            seq = int(result[0].split("-")[-1]) + 1
-        except:
-            seq = 1
-
-    receipt_number = f"TMP001-{year}-{str(seq).zfill(5)}"
+    receipt_number = next_donation_receipt_number(db, year)
 
     # Validate in-kind donation fields if donation_type is IN_KIND
     if donation.donation_type == DonationType.IN_KIND:
@@ -1334,269 +1280,8 @@ def _generate_receipt_pdf(donation: Donation, db: Session):
     """
     Helper function to generate PDF receipt buffer for a donation
     """
-    print(f"[RECEIPT PDF] Starting PDF generation for donation {donation.id}")
-    try:
-        from reportlab.lib.pagesizes import A4
-        from reportlab.platypus import (
-            SimpleDocTemplate,
-            Table,
-            TableStyle,
-            Paragraph,
-            Spacer,
-            Image,
-        )
-        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-        from reportlab.lib.units import inch
-        from reportlab.lib import colors
-        from reportlab.lib.enums import TA_CENTER, TA_LEFT
-        import requests
-        import os
-        from datetime import datetime
-
-        print(f"[RECEIPT PDF] All imports successful")
-
-        # Get temple info
-        temple = None
-        temple_logo_path = None
-        if donation.temple_id:
-            temple = db.query(Temple).filter(Temple.id == donation.temple_id).first()
-            if temple and temple.logo_url:
-                try:
-                    if temple.logo_url.startswith("http"):
-                        response = requests.get(temple.logo_url, timeout=5)
-                        if response.status_code == 200:
-                            temple_logo_path = io.BytesIO(response.content)
-                    elif os.path.exists(temple.logo_url):
-                        temple_logo_path = temple.logo_url
-                except:
-                    temple_logo_path = None
-
-        # Get devotee info (safely handle None relationships)
-        devotee = donation.devotee if hasattr(donation, "devotee") else None
-        category = donation.category if hasattr(donation, "category") else None
-
-        # Create PDF
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5 * inch, bottomMargin=0.5 * inch)
-        elements = []
-
-        styles = getSampleStyleSheet()
-
-        # Title style
-        title_style = ParagraphStyle(
-            "ReceiptTitle",
-            parent=styles["Heading1"],
-            fontSize=20,
-            textColor=colors.HexColor("#FF9933"),
-            spaceAfter=12,
-            alignment=TA_CENTER,
-            fontName="Helvetica-Bold",
-        )
-
-        # Header style
-        header_style = ParagraphStyle(
-            "ReceiptHeader",
-            parent=styles["Normal"],
-            fontSize=14,
-            textColor=colors.black,
-            alignment=TA_CENTER,
-            spaceAfter=6,
-        )
-
-        # Temple header
-        if temple:
-            if temple_logo_path:
-                try:
-                    logo = Image(temple_logo_path, width=1.2 * inch, height=1.2 * inch)
-                    logo.hAlign = "CENTER"
-                    elements.append(logo)
-                    elements.append(Spacer(1, 0.1 * inch))
-                except:
-                    pass
-
-            if temple.name:
-                elements.append(Paragraph(temple.name, title_style))
-
-            if temple.address:
-                elements.append(Paragraph(temple.address, header_style))
-
-            if temple.phone:
-                elements.append(Paragraph(f"Phone: {temple.phone}", styles["Normal"]))
-
-            if temple.email:
-                elements.append(Paragraph(f"Email: {temple.email}", styles["Normal"]))
-
-            elements.append(Spacer(1, 0.2 * inch))
-            elements.append(Paragraph("_" * 80, styles["Normal"]))
-            elements.append(Spacer(1, 0.2 * inch))
-
-        # Receipt title
-        elements.append(Paragraph("DONATION RECEIPT", title_style))
-        elements.append(Spacer(1, 0.2 * inch))
-
-        # Receipt details table - safely access all fields
-        receipt_number = (
-            donation.receipt_number
-            if hasattr(donation, "receipt_number") and donation.receipt_number
-            else "N/A"
-        )
-        donation_date_str = ""
-        if hasattr(donation, "donation_date") and donation.donation_date:
-            try:
-                if hasattr(donation.donation_date, "strftime"):
-                    donation_date_str = donation.donation_date.strftime("%d-%m-%Y")
-                else:
-                    donation_date_str = str(donation.donation_date)
-            except:
-                donation_date_str = str(donation.donation_date) if donation.donation_date else ""
-
-        receipt_data = [
-            ["Receipt Number:", receipt_number],
-            ["Date:", donation_date_str],
-            [
-                "Devotee Name:",
-                devotee.name if devotee and hasattr(devotee, "name") else "Anonymous",
-            ],
-            ["Phone:", devotee.phone if devotee and hasattr(devotee, "phone") else "N/A"],
-            [
-                "Address:",
-                devotee.address
-                if devotee and hasattr(devotee, "address") and devotee.address
-                else "N/A",
-            ],
-            ["Category:", category.name if category and hasattr(category, "name") else "N/A"],
-        ]
-
-        # Add donation type specific information
-        # Handle both enum and string comparison for donation_type
-        donation_type_value = donation.donation_type
-        print(
-            f"[RECEIPT PDF] donation_type_value: {donation_type_value}, type: {type(donation_type_value)}"
-        )
-
-        if isinstance(donation_type_value, str):
-            is_in_kind = donation_type_value.lower() == "in_kind"
-            print(f"[RECEIPT PDF] Detected as string, is_in_kind: {is_in_kind}")
-        elif isinstance(donation_type_value, DonationType):
-            is_in_kind = donation_type_value == DonationType.IN_KIND
-            print(f"[RECEIPT PDF] Detected as enum, is_in_kind: {is_in_kind}")
-        else:
-            # Fallback: check if it's not cash
-            is_in_kind = str(donation_type_value).lower() == "in_kind"
-            print(f"[RECEIPT PDF] Using fallback comparison, is_in_kind: {is_in_kind}")
-
-        if is_in_kind:
-            receipt_data.append(["Donation Type:", "In-Kind Donation"])
-            # Safely access in-kind donation fields
-            if hasattr(donation, "item_name") and donation.item_name:
-                receipt_data.append(["Item Name:", str(donation.item_name)])
-            if hasattr(donation, "item_description") and donation.item_description:
-                receipt_data.append(["Item Description:", str(donation.item_description)])
-            if (
-                hasattr(donation, "quantity")
-                and hasattr(donation, "unit")
-                and donation.quantity
-                and donation.unit
-            ):
-                receipt_data.append(["Quantity:", f"{donation.quantity} {donation.unit}"])
-            if hasattr(donation, "purity") and donation.purity:
-                receipt_data.append(["Purity:", str(donation.purity)])
-            if hasattr(donation, "weight_gross") and donation.weight_gross:
-                receipt_data.append(["Weight (Gross):", f"{donation.weight_gross} grams"])
-            if hasattr(donation, "weight_net") and donation.weight_net:
-                receipt_data.append(["Weight (Net):", f"{donation.weight_net} grams"])
-            receipt_data.append(["Assessed Value:", f"₹ {donation.amount:,.2f}"])
-        else:
-            # Cash donation
-            payment_mode_display = (
-                donation.payment_mode.upper() if donation.payment_mode else "Cash"
-            )
-            receipt_data.append(["Payment Mode:", payment_mode_display])
-            receipt_data.append(["Amount:", f"₹ {donation.amount:,.2f}"])
-
-        # Add 80G information if applicable
-        if category and category.is_80g_eligible and temple and temple.certificate_80g_number:
-            receipt_data.append(["80G Certificate:", f"Yes - {temple.certificate_80g_number}"])
-            receipt_data.append(["80G Valid From:", temple.certificate_80g_valid_from or "N/A"])
-            receipt_data.append(["80G Valid To:", temple.certificate_80g_valid_to or "N/A"])
-
-        receipt_table = Table(receipt_data, colWidths=[2.5 * inch, 4 * inch])
-        receipt_table.setStyle(
-            TableStyle(
-                [
-                    ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                    ("FONTNAME", (1, 0), (1, -1), "Helvetica"),
-                    ("FONTSIZE", (0, 0), (-1, -1), 11),
-                    ("ALIGN", (0, 0), (0, -1), "LEFT"),
-                    ("ALIGN", (1, 0), (1, -1), "LEFT"),
-                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                    ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-                    ("TOPPADDING", (0, 0), (-1, -1), 8),
-                    ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                ]
-            )
-        )
-
-        elements.append(receipt_table)
-        elements.append(Spacer(1, 0.3 * inch))
-
-        # Amount in words (simple conversion)
-        try:
-            amount_int = int(donation.amount) if donation.amount else 0
-            amount_words = f"Rupees {_number_to_words(amount_int)} Only"
-            elements.append(Paragraph(f"<b>Amount in Words:</b> {amount_words}", styles["Normal"]))
-        except (ValueError, TypeError) as e:
-            # Fallback if amount conversion fails
-            elements.append(Paragraph(f"<b>Amount:</b> ₹ {donation.amount:,.2f}", styles["Normal"]))
-        elements.append(Spacer(1, 0.3 * inch))
-
-        # Footer
-        footer_style = ParagraphStyle(
-            "ReceiptFooter",
-            parent=styles["Normal"],
-            fontSize=9,
-            textColor=colors.grey,
-            alignment=TA_CENTER,
-        )
-
-        elements.append(Spacer(1, 0.5 * inch))
-        elements.append(Paragraph("_" * 80, styles["Normal"]))
-        elements.append(Spacer(1, 0.1 * inch))
-
-        if temple and temple.authorized_signatory_name:
-            elements.append(
-                Paragraph(
-                    f"Authorized Signatory: {temple.authorized_signatory_name}", styles["Normal"]
-                )
-            )
-            if temple.authorized_signatory_designation:
-                elements.append(
-                    Paragraph(temple.authorized_signatory_designation, styles["Normal"])
-                )
-
-        elements.append(Spacer(1, 0.2 * inch))
-        elements.append(
-            Paragraph(f"Generated on {datetime.now().strftime('%d-%m-%Y %H:%M:%S')}", footer_style)
-        )
-        elements.append(Paragraph("MandirMitra Temple Management System", footer_style))
-
-        # Build PDF
-        print(f"[RECEIPT PDF] Building PDF document with {len(elements)} elements...")
-        doc.build(elements)
-        buffer.seek(0)
-        print(f"[RECEIPT PDF] PDF built successfully, buffer size: {len(buffer.getvalue())} bytes")
-
-        return buffer
-    except Exception as e:
-        import traceback
-
-        error_details = traceback.format_exc()
-        print(f"[RECEIPT PDF] ===== CRITICAL ERROR IN PDF GENERATION =====")
-        print(f"[RECEIPT PDF] Error type: {type(e).__name__}")
-        print(f"[RECEIPT PDF] Error message: {str(e)}")
-        print(f"[RECEIPT PDF] Full traceback:\n{error_details}")
-        print(f"[RECEIPT PDF] ===== END ERROR =====")
-        raise  # Re-raise to be caught by endpoint handler
+    template = get_receipt_template(db, donation.temple_id)
+    return io.BytesIO(render_donation_receipt(template, donation_receipt_data(donation)))
 
 
 @router.get("/{donation_id}/receipt/pdf-base64")
@@ -1780,57 +1465,6 @@ def get_80g_certificate(
     )
 
 
-def _number_to_words(n):
-    """Convert number to words (simple implementation)"""
-    ones = ["", "One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine"]
-    tens = ["", "", "Twenty", "Thirty", "Forty", "Fifty", "Sixty", "Seventy", "Eighty", "Ninety"]
-    teens = [
-        "Ten",
-        "Eleven",
-        "Twelve",
-        "Thirteen",
-        "Fourteen",
-        "Fifteen",
-        "Sixteen",
-        "Seventeen",
-        "Eighteen",
-        "Nineteen",
-    ]
-
-    if n == 0:
-        return "Zero"
-
-    def convert_hundreds(num):
-        result = ""
-        if num >= 100:
-            result += ones[num // 100] + " Hundred "
-            num %= 100
-        if num >= 20:
-            result += tens[num // 10] + " "
-            num %= 10
-        elif num >= 10:
-            result += teens[num - 10] + " "
-            return result
-        if num > 0:
-            result += ones[num] + " "
-        return result
-
-    result = ""
-    if n >= 10000000:  # Crores
-        result += convert_hundreds(n // 10000000) + "Crore "
-        n %= 10000000
-    if n >= 100000:  # Lakhs
-        result += convert_hundreds(n // 100000) + "Lakh "
-        n %= 100000
-    if n >= 1000:  # Thousands
-        result += convert_hundreds(n // 1000) + "Thousand "
-        n %= 1000
-    if n > 0:
-        result += convert_hundreds(n)
-
-    return result.strip()
-
-
 @router.get("/bank-accounts")
 def get_bank_accounts_for_donations(
     db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
@@ -1872,25 +1506,29 @@ def get_bank_accounts_for_donations(
 
 @router.get("/", response_model=List[DonationResponse])
 def get_donations(
+    response: Response,
     skip: int = 0,
-    limit: int = 100,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(
+        None, description="X-Next-Cursor header of the previous page (instead of skip)"
+    ),
     date: Optional[str] = None,
     date_from: Optional[str] = None,
     date_to: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Get list of donations"""
-    query = db.query(Donation)
-
-    if date:
-        query = query.filter(Donation.donation_date == date)
-    elif date_from and date_to:
-        query = query.filter(
-            and_(Donation.donation_date >= date_from, Donation.donation_date <= date_to)
-        )
-
-    donations = query.order_by(Donation.donation_date.desc()).offset(skip).limit(limit).all()
+    """
+    Get list of donations, newest first
+    The next page's cursor is returned in the X-Next-Cursor header
+    """
+    try:
+        query = donation_query(db, current_user.temple_id, date_from, date_to, on_date=date)
+        donations, next_cursor = keyset_page(query, limit, cursor, offset=0 if cursor else skip)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date or cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
     # Format response
     result = []
@@ -2242,18 +1880,12 @@ def get_detailed_donation_report(
     """
     from datetime import date as date_class
 
-    query = db.query(Donation).filter(
-        Donation.temple_id == current_user.temple_id, Donation.is_cancelled == False
-    )
-
-    # Apply date filters
-    if date_from:
-        start_date = datetime.strptime(date_from, "%Y-%m-%d").date()
-        query = query.filter(Donation.donation_date >= start_date)
-
-    if date_to:
-        end_date = datetime.strptime(date_to, "%Y-%m-%d").date()
-        query = query.filter(Donation.donation_date <= end_date)
+    try:
+        query = donation_query(
+            db, current_user.temple_id, date_from, date_to, include_cancelled=False
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
 
     # Apply category filter
     if category:
@@ -2292,167 +1924,93 @@ def get_detailed_donation_report(
     }
 
 
-@router.get("/export/pdf")
-def export_donations_pdf(
-    date_from: Optional[str] = None,
-    date_to: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
-    """Export donations to PDF format"""
-    # Get temple info
+@register_export("donations")
+def build_donations_export(
+    db: Session, current_user: User, date_from: Optional[str] = None, date_to: Optional[str] = None
+) -> ExportReport:
+    """Donations of a period as an export report (ValueError on a malformed date)"""
+    query = donation_query(db, current_user.temple_id, date_from, date_to)
     temple = None
-    temple_logo_path = None
-    if current_user and current_user.temple_id:
+    if current_user.temple_id:
         temple = db.query(Temple).filter(Temple.id == current_user.temple_id).first()
-        if temple and temple.logo_url:
-            # Try to download logo if it's a URL, or use local path
-            try:
-                if temple.logo_url.startswith("http"):
-                    # Download logo
-                    response = requests.get(temple.logo_url, timeout=5)
-                    if response.status_code == 200:
-                        logo_data = io.BytesIO(response.content)
-                        temple_logo_path = logo_data
-                else:
-                    # Local file path
-                    if os.path.exists(temple.logo_url):
-                        temple_logo_path = temple.logo_url
-            except:
-                temple_logo_path = None
-
-    query = db.query(Donation)
 
-    if date_from and date_to:
-        query = query.filter(
-            and_(Donation.donation_date >= date_from, Donation.donation_date <= date_to)
-        )
-
-    donations = query.order_by(Donation.donation_date.desc()).all()
-
-    # Create PDF
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5 * inch, bottomMargin=0.5 * inch)
-    elements = []
-
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        "CustomTitle",
-        parent=styles["Heading1"],
-        fontSize=18,
-        textColor=colors.HexColor("#FF9933"),
-        spaceAfter=12,
-        alignment=TA_CENTER,
-    )
-
-    # Temple header
+    header_lines = []
     if temple:
-        if temple_logo_path:
-            try:
-                logo = Image(temple_logo_path, width=1 * inch, height=1 * inch)
-                logo.hAlign = "CENTER"
-                elements.append(logo)
-                elements.append(Spacer(1, 0.1 * inch))
-            except:
-                pass
-
-        if temple.name:
-            elements.append(Paragraph(temple.name, title_style))
-
-        if temple.address:
-            elements.append(Paragraph(temple.address, styles["Normal"]))
-            elements.append(Spacer(1, 0.1 * inch))
-
-        if temple.phone:
-            elements.append(Paragraph(f"Phone: {temple.phone}", styles["Normal"]))
-            elements.append(Spacer(1, 0.2 * inch))
-
-    # Report title
-    report_title = "DONATION REPORT"
+        header_lines += [
+            line for line in (temple.address, temple.phone and f"Phone: {temple.phone}") if line
+        ]
     if date_from and date_to:
-        report_title += f"<br/><font size=10>Period: {date_from} to {date_to}</font>"
-    elements.append(Paragraph(report_title, title_style))
-    elements.append(Spacer(1, 0.2 * inch))
+        header_lines.append(f"Period: {date_from} to {date_to}")
 
-    # Table data
-    table_data = [["Receipt", "Date", "Devotee", "Phone", "Amount (₹)", "Category", "Payment"]]
+    # Totals accumulate while the donations stream past
+    summary = {"total": 0.0, "count": 0}
 
-    total_amount = 0
-    for d in donations:
-        table_data.append(
-            [
+    def rows():
+        for d in iter_donations(query):
+            summary["total"] += d.amount
+            summary["count"] += 1
+            yield [
                 d.receipt_number or "",
-                d.donation_date.strftime("%d-%m-%Y") if d.donation_date else "",
+                d.donation_date,
                 d.devotee.name if d.devotee else "",
                 d.devotee.phone if d.devotee else "",
-                f"{d.amount:,.0f}",
+                d.amount,
                 d.category.name if d.category else "",
                 d.payment_mode or "",
             ]
-        )
-        total_amount += d.amount
 
-    # Total row
-    table_data.append(
-        ["TOTAL", "", "", "", f"<b>{total_amount:,.0f}</b>", f"{len(donations)} donations", ""]
-    )
-
-    # Create table
-    table = Table(
-        table_data,
-        colWidths=[
-            1.2 * inch,
-            0.9 * inch,
-            1.2 * inch,
-            1 * inch,
-            0.9 * inch,
-            1.2 * inch,
-            0.8 * inch,
+    return ExportReport(
+        title=(temple.name if temple and temple.name else "DONATION REPORT"),
+        filename=f"donations_{date_from or 'all'}_{date_to or date.today()}",
+        sheet_title="Donations Report",
+        header_lines=header_lines,
+        logo=fetch_logo(temple.logo_url) if temple else None,
+        sections=[
+            ExportSection(
+                [
+                    ExportColumn("Receipt Number", 16),
+                    ExportColumn("Date", 12, "date"),
+                    ExportColumn("Devotee Name", 22),
+                    ExportColumn("Phone", 14),
+                    ExportColumn("Amount (₹)", 13, "amount"),
+                    ExportColumn("Category", 16),
+                    ExportColumn("Payment Mode", 13),
+                ],
+                rows(),
+                totals=lambda: [
+                    "TOTAL",
+                    "",
+                    "",
+                    "",
+                    summary["total"],
+                    f"{summary['count']} donations",
+                    "",
+                ],
+            )
+        ],
+        footer_lines=lambda: [
+            f"Generated on {datetime.now().strftime('%d-%m-%Y %H:%M:%S')} | MandirMitra Temple Management System"
         ],
-    )
-    table.setStyle(
-        TableStyle(
-            [
-                # Header row
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#FF9933")),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("FONTSIZE", (0, 0), (-1, 0), 10),
-                ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                ("TOPPADDING", (0, 0), (-1, 0), 12),
-                # Data rows
-                ("BACKGROUND", (0, 1), (-1, -2), colors.beige),
-                ("TEXTCOLOR", (0, 1), (-1, -2), colors.black),
-                ("FONTNAME", (0, 1), (-1, -2), "Helvetica"),
-                ("FONTSIZE", (0, 1), (-1, -2), 9),
-                ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                # Total row
-                ("BACKGROUND", (0, -1), (-1, -1), colors.lightgrey),
-                ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
-                ("FONTSIZE", (0, -1), (-1, -1), 10),
-            ]
-        )
     )
 
-    elements.append(table)
-    elements.append(Spacer(1, 0.3 * inch))
-
-    # Footer
-    footer_text = f"Generated on {datetime.now().strftime('%d-%m-%Y %H:%M:%S')} | MandirMitra Temple Management System"
-    elements.append(Paragraph(footer_text, styles["Normal"]))
 
-    # Build PDF
-    doc.build(elements)
-    buffer.seek(0)
+def _donations_export_response(db, current_user, date_from, date_to, output_format):
+    try:
+        report = build_donations_export(db, current_user, date_from, date_to)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    return export_response(report, output_format)
 
-    filename = f"donations_{date_from or 'all'}_{date_to or date.today()}.pdf"
 
-    return StreamingResponse(
-        buffer,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
-    )
+@router.get("/export/pdf")
+def export_donations_pdf(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Export donations to PDF format"""
+    return _donations_export_response(db, current_user, date_from, date_to, "pdf")
 
 
 @router.get("/export/excel")
@@ -2463,481 +2021,156 @@ def export_donations_excel(
     current_user: User = Depends(get_current_user),
 ):
     """Export donations to Excel format"""
-    # Get temple info
-    temple = None
-    temple_logo_path = None
-    if current_user and current_user.temple_id:
-        temple = db.query(Temple).filter(Temple.id == current_user.temple_id).first()
-        if temple and temple.logo_url:
-            # Try to download logo if it's a URL, or use local path
-            try:
-                if temple.logo_url.startswith("http"):
-                    # Download logo
-                    response = requests.get(temple.logo_url, timeout=5)
-                    if response.status_code == 200:
-                        logo_data = io.BytesIO(response.content)
-                        temple_logo_path = logo_data
-                else:
-                    # Local file path
-                    if os.path.exists(temple.logo_url):
-                        temple_logo_path = temple.logo_url
-            except:
-                temple_logo_path = None
-
-    query = db.query(Donation)
-
-    if date_from and date_to:
-        query = query.filter(
-            and_(Donation.donation_date >= date_from, Donation.donation_date <= date_to)
-        )
-
-    donations = query.order_by(Donation.donation_date.desc()).all()
-
-    # Create Excel workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Donations Report"
-
-    # Styles
-    header_fill = PatternFill(start_color="FF9933", end_color="FF9933", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=12)
-    title_font = Font(bold=True, size=16, color="FF9933")
-    border = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin"),
-    )
-
-    row = 1
-
-    # Temple header with logo
-    if temple:
-        # Add logo if available
-        if temple_logo_path:
-            try:
-                logo = ExcelImage(temple_logo_path)
-                logo.width = 100
-                logo.height = 100
-                ws.add_image(logo, "A1")
-                row = 4  # Start after logo
-            except Exception as e:
-                # Logo failed, continue without it
-                row = 1
-
-        ws.merge_cells(f"A{row}:G{row}")
-        cell = ws.cell(row=row, column=1)
-        cell.value = temple.name or "Temple Donations Report"
-        cell.font = title_font
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        row += 1
-
-        if temple.address:
-            ws.merge_cells(f"A{row}:G{row}")
-            cell = ws.cell(row=row, column=1)
-            cell.value = temple.address
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-            row += 1
-
-        if temple.phone:
-            ws.merge_cells(f"A{row}:G{row}")
-            cell = ws.cell(row=row, column=1)
-            cell.value = f"Phone: {temple.phone}"
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-            row += 1
-
-    # Report period
-    if date_from and date_to:
-        ws.merge_cells(f"A{row}:G{row}")
-        cell = ws.cell(row=row, column=1)
-        cell.value = f"Period: {date_from} to {date_to}"
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.font = Font(bold=True)
-        row += 1
-
-    row += 1  # Empty row
-
-    # Headers
-    headers = [
-        "Receipt Number",
-        "Date",
-        "Devotee Name",
-        "Phone",
-        "Amount (₹)",
-        "Category",
-        "Payment Mode",
-    ]
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=row, column=col)
-        cell.value = header
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.border = border
-
-    row += 1
-
-    # Data rows
-    total_amount = 0
-    for d in donations:
-        ws.cell(row=row, column=1, value=d.receipt_number).border = border
-        ws.cell(
-            row=row, column=2, value=d.donation_date.strftime("%Y-%m-%d") if d.donation_date else ""
-        ).border = border
-        ws.cell(row=row, column=3, value=d.devotee.name if d.devotee else "").border = border
-        ws.cell(row=row, column=4, value=d.devotee.phone if d.devotee else "").border = border
-        ws.cell(row=row, column=5, value=d.amount).border = border
-        ws.cell(row=row, column=6, value=d.category.name if d.category else "").border = border
-        ws.cell(row=row, column=7, value=d.payment_mode).border = border
-        total_amount += d.amount
-        row += 1
-
-    # Total row
-    row += 1
-    ws.merge_cells(f"A{row}:D{row}")
-    cell = ws.cell(row=row, column=1)
-    cell.value = "TOTAL"
-    cell.font = Font(bold=True, size=12)
-    cell.alignment = Alignment(horizontal="right", vertical="center")
-    cell.border = border
-
-    ws.cell(row=row, column=5, value=total_amount).font = Font(bold=True, size=12)
-    ws.cell(row=row, column=5).border = border
-    ws.cell(row=row, column=6, value=f"{len(donations)} donations").border = border
-    ws.cell(row=row, column=7).border = border
-
-    # Auto-adjust column widths
-    for col in range(1, 8):
-        ws.column_dimensions[get_column_letter(col)].width = 15
-
-    # Save to BytesIO
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
-
-    filename = f"donations_{date_from or 'all'}_{date_to or date.today()}.xlsx"
-
-    return StreamingResponse(
-        output,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
-    )
+    return _donations_export_response(db, current_user, date_from, date_to, "excel")
 
 
 @router.post("/bulk-import", response_model=dict)
 async def bulk_import_donations(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-    request: Request = None,
 ):
     """
-    Bulk import donations from CSV/Excel file
+    Bulk import donations from CSV/Excel file in the background
     Expected format:
     - CSV: devotee_name, devotee_phone, amount, category, payment_mode, address, city, state, pincode, notes
+      (optional donation_date as YYYY-MM-DD, defaults to today)
     - Excel: Same columns
-    """
-    temple_id = current_user.temple_id if current_user else None
-
-    # Read file
-    contents = await file.read()
 
-    # Determine file type
+    Poll /bulk-import/{job_id}; rows that were not imported are listed by
+    /bulk-import/{job_id}/errors
+    """
     file_extension = file.filename.split(".")[-1].lower() if file.filename else "csv"
+    if file_extension not in ["csv", "xlsx", "xls"]:
+        raise HTTPException(status_code=400, detail="Upload a .csv or .xlsx file")
 
-    donations_data = []
-    errors = []
-    success_count = 0
-
-    try:
-        if file_extension in ["xlsx", "xls"]:
-            # Read Excel
-            from openpyxl import load_workbook
-
-            wb = load_workbook(io.BytesIO(contents))
-            ws = wb.active
-
-            # Read header row
-            headers = [cell.value for cell in ws[1]]
-
-            # Read data rows
-            for row_idx, row in enumerate(ws.iter_rows(min_row=2, values_only=True), start=2):
-                if not any(row):  # Skip empty rows
-                    continue
-
-                row_dict = dict(zip(headers, row))
-                donations_data.append({"row": row_idx, "data": row_dict})
-        else:
-            # Read CSV
-            csv_data = io.StringIO(contents.decode("utf-8"))
-            reader = csv.DictReader(csv_data)
-
-            for row_idx, row in enumerate(reader, start=2):
-                donations_data.append({"row": row_idx, "data": row})
-
-        # Process each donation
-        for item in donations_data:
-            row_num = item["row"]
-            row_data = item["data"]
-
-            try:
-                # Validate required fields
-                if (
-                    not row_data.get("devotee_name")
-                    or not row_data.get("devotee_phone")
-                    or not row_data.get("amount")
-                ):
-                    errors.append(
-                        f"Row {row_num}: Missing required fields (devotee_name, devotee_phone, amount)"
-                    )
-                    continue
-
-                # Create donation using existing create_donation logic
-                donation_create = DonationBase(
-                    devotee_name=str(row_data.get("devotee_name", "")).strip(),
-                    devotee_phone=str(row_data.get("devotee_phone", "")).strip(),
-                    amount=float(row_data.get("amount", 0)),
-                    category=str(row_data.get("category", "General Donation")).strip(),
-                    payment_mode=str(row_data.get("payment_mode", "Cash")).strip(),
-                    address=str(row_data.get("address", "")).strip()
-                    if row_data.get("address")
-                    else None,
-                    city=str(row_data.get("city", "")).strip() if row_data.get("city") else None,
-                    state=str(row_data.get("state", "")).strip() if row_data.get("state") else None,
-                    pincode=str(row_data.get("pincode", "")).strip()
-                    if row_data.get("pincode")
-                    else None,
-                    country=str(row_data.get("country", "India")).strip()
-                    if row_data.get("country")
-                    else "India",
-                    notes=str(row_data.get("notes", "")).strip() if row_data.get("notes") else None,
-                )
-
-                # Call create_donation endpoint logic (inline)
-                # Find or create devotee
-                devotee = (
-                    db.query(Devotee).filter(Devotee.phone == donation_create.devotee_phone).first()
-                )
-                if not devotee:
-                    devotee = Devotee(
-                        name=donation_create.devotee_name,
-                        full_name=donation_create.devotee_name,
-                        phone=donation_create.devotee_phone,
-                        address=donation_create.address,
-                        pincode=donation_create.pincode,
-                        city=donation_create.city,
-                        state=donation_create.state,
-                        country=donation_create.country or "India",
-                        temple_id=temple_id,
-                    )
-                    db.add(devotee)
-                    db.flush()
-
-                # Find or create category
-                category = (
-                    db.query(DonationCategory)
-                    .filter(DonationCategory.name == donation_create.category)
-                    .first()
-                )
-                if not category:
-                    category = DonationCategory(
-                        name=donation_create.category, is_80g_eligible=True, temple_id=temple_id
-                    )
-                    db.add(category)
-                    db.flush()
-
-                # Generate receipt number
-                year = datetime.now().year
-                last_donation = (
-                    db.query(Donation)
-                    .filter(func.extract("year", Donation.donation_date) == year)
-                    .order_by(Donation.id.desc())
-                    .first()
-                )
-
-                seq = 1
-                if last_donation and last_donation.receipt_number:
-                    try:
-                        seq = int(last_donation.receipt_number.split("-")[-1]) + 1
-                    except:
-                        seq = 1
-
-                receipt_number = f"TMP001-{year}-{str(seq).zfill(5)}"
-
-                # Duplicate check
-                duplicate_check = (
-                    db.query(Donation)
-                    .filter(
-                        Donation.devotee_id == devotee.id,
-                        Donation.amount == donation_create.amount,
-                        Donation.donation_date == date.today(),
-                        Donation.is_cancelled == False,
-                    )
-                    .first()
-                )
+    temple_id = current_user.temple_id if current_user else None
+    job = create_job(
+        db,
+        IMPORT_JOB_TYPE,
+        temple_id=temple_id,
+        created_by=current_user.id,
+        params={"filename": file.filename},
+    )
 
-                if duplicate_check:
-                    errors.append(
-                        f"Row {row_num}: Possible duplicate - Similar donation exists (Receipt: {duplicate_check.receipt_number})"
-                    )
-                    continue
-
-                # Create donation
-                db_donation = Donation(
-                    temple_id=temple_id,
-                    devotee_id=devotee.id,
-                    category_id=category.id,
-                    receipt_number=receipt_number,
-                    donation_type=DonationType.CASH,
-                    amount=donation_create.amount,
-                    payment_mode=donation_create.payment_mode,
-                    donation_date=date.today(),
-                    financial_year=f"{year}-{str(year+1)[-2:]}",
-                    notes=donation_create.notes,
-                    created_by=current_user.id if current_user else None,
-                )
-                db.add(db_donation)
-                db.flush()
+    # Stream the upload to disk - the job reads it back row by row
+    path = import_file_path(job.id, file_extension)
+    with open(path, "wb") as out:
+        while chunk := await file.read(1024 * 1024):
+            out.write(chunk)
 
-                # Post to accounting
-                journal_entry = post_donation_to_accounting(db, db_donation, temple_id)
-                if journal_entry:
-                    db.commit()
+    background_tasks.add_task(donation_import_job, job.id, path, temple_id, current_user.id)
+    return {"status": "queued", "job_id": job.id}
 
-                success_count += 1
 
-            except Exception as e:
-                errors.append(f"Row {row_num}: {str(e)}")
-                db.rollback()
+@router.get("/bulk-import/{job_id}", response_model=dict)
+def get_bulk_import_status(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Status, progress and result of a bulk donation import"""
+    job = get_job(db, job_id, None if current_user.is_superuser else current_user.temple_id)
+    if not job or job.job_type != IMPORT_JOB_TYPE:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job_to_dict(job)
 
-        return {
-            "success": True,
-            "total_rows": len(donations_data),
-            "success_count": success_count,
-            "error_count": len(errors),
-            "errors": errors[:50],  # Limit to first 50 errors
-        }
 
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to process file: {str(e)}")
+@router.get("/bulk-import/{job_id}/errors")
+def download_bulk_import_errors(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """CSV of every row of an import that was not imported, with the reason"""
+    job = get_job(db, job_id, None if current_user.is_superuser else current_user.temple_id)
+    if not job or job.job_type != IMPORT_JOB_TYPE:
+        raise HTTPException(status_code=404, detail="Import job not found")
+
+    extension = (job.params or {}).get("filename", "").split(".")[-1].lower() or "csv"
+    report = error_report_path(import_file_path(job.id, extension))
+    if not os.path.exists(report):
+        raise HTTPException(status_code=404, detail="No error report for this import")
+    return FileResponse(
+        report, media_type="text/csv", filename=f"donation_import_{job.id}_errors.csv"
+    )
 
 
 @router.post("/bulk-80g-certificates", response_model=dict)
 def generate_bulk_80g_certificates(
-    donation_ids: List[int] = Query(...),
+    background_tasks: BackgroundTasks,
+    donation_ids: Optional[List[int]] = Query(None),
     financial_year: Optional[str] = Query(None),
+    output_format: str = Query("zip", pattern="^(zip|pdf)$"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
-    Generate 80G certificates for multiple donations in batch
-    Returns PDF with all certificates
-    """
-    temple_id = current_user.temple_id if current_user else None
-
-    # Get donations
-    donations = db.query(Donation).filter(
-        Donation.id.in_(donation_ids), Donation.is_cancelled == False
-    )
-    if temple_id:
-        donations = donations.filter(Donation.temple_id == temple_id)
-
-    donations = donations.all()
+    Generate 80G certificates for multiple donations in the background
 
-    if not donations:
-        raise HTTPException(status_code=404, detail="No donations found")
+    Certificates are generated for the given donations, or for every 80G
+    eligible donation of financial_year (e.g. '2024-25') when no ids are
+    given. output_format "zip" gives one PDF per certificate, "pdf" one
+    merged PDF.
 
-    # Filter 80G eligible
-    eligible_donations = [d for d in donations if d.category and d.category.is_80g_eligible]
+    Poll /bulk-80g-certificates/{job_id}; download the file from
+    /bulk-80g-certificates/{job_id}/download
+    """
+    if not donation_ids and not financial_year:
+        raise HTTPException(status_code=400, detail="Give donation_ids or a financial_year")
 
-    if not eligible_donations:
+    temple_id = current_user.temple_id if current_user else None
+    ids = eligible_donation_ids(db, temple_id, donation_ids, financial_year)
+    if not ids:
         raise HTTPException(status_code=400, detail="No 80G eligible donations found")
 
-    # Get temple info
-    temple = None
-    if temple_id:
-        temple = db.query(Temple).filter(Temple.id == temple_id).first()
-
-    # Create PDF with all certificates
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    elements = []
-    styles = getSampleStyleSheet()
-
-    # Title
-    title_style = ParagraphStyle(
-        "CustomTitle",
-        parent=styles["Heading1"],
-        fontSize=18,
-        textColor=colors.HexColor("#FF9933"),
-        spaceAfter=30,
-        alignment=TA_CENTER,
+    job = create_job(
+        db,
+        CERTIFICATE_JOB_TYPE,
+        temple_id=temple_id,
+        created_by=current_user.id,
+        params={
+            "financial_year": financial_year,
+            "format": output_format,
+            "donation_count": len(ids),
+        },
     )
-    elements.append(Paragraph("80G Tax Exemption Certificates", title_style))
-    elements.append(Spacer(1, 0.2 * inch))
-
-    # Generate certificate for each donation
-    for donation in eligible_donations:
-        devotee = db.query(Devotee).filter(Devotee.id == donation.devotee_id).first()
-
-        # Certificate content
-        cert_data = [
-            ["Certificate of Donation - Section 80G"],
-            [""],
-            ["Temple Name:", temple.name if temple else "Temple"],
-            ["Address:", temple.address if temple else ""],
-            ["PAN:", temple.pan_number if temple else ""],
-            ["80G Registration:", temple.certificate_80g_number if temple else ""],
-            [""],
-            ["Donor Details:"],
-            ["Name:", devotee.name if devotee else "Anonymous"],
-            ["Address:", devotee.address if devotee else ""],
-            [""],
-            ["Donation Details:"],
-            ["Receipt Number:", donation.receipt_number],
-            [
-                "Date:",
-                donation.donation_date.strftime("%d-%m-%Y")
-                if hasattr(donation.donation_date, "strftime")
-                else str(donation.donation_date),
-            ],
-            ["Amount:", f"₹{donation.amount:,.2f}"],
-            ["Category:", donation.category.name if donation.category else ""],
-            [""],
-            [
-                "This donation is eligible for tax deduction under Section 80G of the Income Tax Act, 1961."
-            ],
-            [""],
-        ]
-
-        table = Table(cert_data, colWidths=[2 * inch, 4 * inch])
-        table.setStyle(
-            TableStyle(
-                [
-                    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#FF9933")),
-                    ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                    ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                    ("FONTSIZE", (0, 0), (-1, 0), 14),
-                    ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                    ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
-                    ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                    ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ]
-            )
-        )
+    background_tasks.add_task(bulk_certificate_job, job.id, ids, temple_id, output_format)
+    return {"status": "queued", "job_id": job.id, "donation_count": len(ids)}
 
-        elements.append(table)
-        elements.append(Spacer(1, 0.3 * inch))
 
-    # Build PDF
-    doc.build(elements)
-    buffer.seek(0)
+@router.get("/bulk-80g-certificates/{job_id}", response_model=dict)
+def get_bulk_80g_certificates_status(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Status and progress of a bulk 80G certificate job"""
+    job = get_job(db, job_id, None if current_user.is_superuser else current_user.temple_id)
+    if not job or job.job_type != CERTIFICATE_JOB_TYPE:
+        raise HTTPException(status_code=404, detail="Certificate job not found")
+    return job_to_dict(job)
 
-    filename = f"80g_certificates_{financial_year or datetime.now().year}.pdf"
 
-    return StreamingResponse(
-        buffer,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
+@router.get("/bulk-80g-certificates/{job_id}/download")
+def download_bulk_80g_certificates(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """ZIP or merged PDF written by a completed bulk 80G certificate job"""
+    job = get_job(db, job_id, None if current_user.is_superuser else current_user.temple_id)
+    if not job or job.job_type != CERTIFICATE_JOB_TYPE:
+        raise HTTPException(status_code=404, detail="Certificate job not found")
+
+    output_format = (job.params or {}).get("format", "zip")
+    path = certificate_file_path(job.id, output_format)
+    if job_to_dict(job)["status"] != "completed" or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Certificates are not ready")
+
+    year = (job.params or {}).get("financial_year") or datetime.now().year
+    media_type = "application/zip" if output_format == "zip" else "application/pdf"
+    return FileResponse(
+        path, media_type=media_type, filename=f"80g_certificates_{year}.{output_format}"
     )
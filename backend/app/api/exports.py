@@ -0,0 +1,118 @@
+"""
+Report Export API Endpoints
+Background exports of large reports, downloaded when the job completes
+"""
+
+import os
+from typing import Any, Dict
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.security import get_current_user
+from app.models.user import User
+from app.services.background_job_service import create_job, get_job, job_to_dict
+from app.services.export_service import (
+    EXPORT_FORMATS,
+    EXPORT_JOB_TYPE,
+    check_export_params,
+    export_builder,
+    export_file_path,
+    export_job,
+    export_names,
+)
+
+router = APIRouter(prefix="/api/v1/exports", tags=["exports"])
+
+
+class ExportRequest(BaseModel):
+    format: str = "excel"
+    params: Dict[str, Any] = {}
+
+
+@router.get("/", response_model=dict)
+def list_exports(current_user: User = Depends(get_current_user)):
+    """Reports and formats available for background export"""
+    return {"reports": export_names(), "formats": list(EXPORT_FORMATS)}
+
+
+@router.post("/{report_name}", response_model=dict)
+def queue_export(
+    report_name: str,
+    request: ExportRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Queue a report export (e.g. a full-year cash book) in the background
+
+    params are the query parameters of the report's export endpoint, with
+    dates as YYYY-MM-DD. Poll /exports/{job_id}; the completed job's result
+    carries the download_url.
+    """
+    if not export_builder(report_name):
+        raise HTTPException(status_code=404, detail=f"Unknown report: {report_name}")
+    if request.format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Format must be one of: {', '.join(EXPORT_FORMATS)}",
+        )
+    try:
+        check_export_params(report_name, request.params)
+    except TypeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid parameters: {str(e)}")
+
+    job = create_job(
+        db,
+        EXPORT_JOB_TYPE,
+        temple_id=current_user.temple_id,
+        created_by=current_user.id,
+        params={"report": report_name, "format": request.format, **request.params},
+    )
+    background_tasks.add_task(
+        export_job, job.id, report_name, request.format, request.params, current_user.id
+    )
+    return {"status": "queued", "job_id": job.id}
+
+
+def _export_job_or_404(db: Session, job_id: int, current_user: User):
+    job = get_job(db, job_id, None if current_user.is_superuser else current_user.temple_id)
+    if not job or job.job_type != EXPORT_JOB_TYPE:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job
+
+
+@router.get("/{job_id}", response_model=dict)
+def get_export_status(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Status and progress of an export job"""
+    return job_to_dict(_export_job_or_404(db, job_id, current_user))
+
+
+@router.get("/{job_id}/download")
+def download_export(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """File written by a completed export job"""
+    job = _export_job_or_404(db, job_id, current_user)
+    details = job_to_dict(job)
+    output_format = (job.params or {}).get("format", "excel")
+    path = export_file_path(job.id, output_format)
+    if details["status"] != "completed" or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Export is not ready")
+
+    result = details.get("result") or {}
+    return FileResponse(
+        path,
+        media_type=EXPORT_FORMATS[output_format][1],
+        filename=result.get("filename") or os.path.basename(path),
+    )
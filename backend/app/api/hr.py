@@ -41,6 +41,7 @@ from app.models.accounting import (
     JournalEntryStatus,
     TransactionType,
 )
+from app.services.numbering_service import next_journal_entry_number
 from app.schemas.hr import (
     DepartmentCreate,
     DepartmentUpdate,
@@ -1224,27 +1225,7 @@ def post_salary_to_accounting(db: Session, payroll: Payroll, temple_id: int, cur
 
         # Generate entry number
         year = payroll.payroll_year
-        prefix = f"JE/{year}/"
-
-        last_entry = (
-            db.query(JournalEntry)
-            .filter(
-                JournalEntry.temple_id == temple_id, JournalEntry.entry_number.like(f"{prefix}%")
-            )
-            .order_by(JournalEntry.id.desc())
-            .first()
-        )
-
-        if last_entry:
-            try:
-                last_num = int(last_entry.entry_number.split("/")[-1])
-                new_num = last_num + 1
-            except:
-                new_num = 1
-        else:
-            new_num = 1
-
-        entry_number = f"{prefix}{new_num:04d}"
+        entry_number = next_journal_entry_number(db, temple_id, year)
 
         # Create journal entry
         narration = f"Salary payment - {payroll.employee.full_name} - {payroll.payroll_month}/{payroll.payroll_year}"
@@ -22,6 +22,8 @@ from app.models.accounting import (
     AccountSubType,
     TransactionType,
 )
+from app.services.hundi_report_service import hundi_report
+from app.services.numbering_service import next_hundi_opening_number
 from app.schemas.hundi import (
     HundiMasterCreate,
     HundiMasterUpdate,
@@ -150,34 +152,7 @@ def generate_hundi_opening_number(
     db: Session, temple_id: int, hundi_code: str, opening_date: date
 ) -> str:
     """Generate unique hundi opening number"""
-    year = opening_date.year
-    prefix = f"HUNDI/{hundi_code}/{year}/"
-
-    last_opening = (
-        db.query(HundiOpening)
-        .filter(
-            HundiOpening.temple_id == temple_id,
-            HundiOpening.hundi_code == hundi_code,
-            HundiOpening.scheduled_date >= date(year, 1, 1),
-            HundiOpening.scheduled_date < date(year + 1, 1, 1),
-        )
-        .order_by(HundiOpening.id.desc())
-        .first()
-    )
-
-    if last_opening:
-        # Extract number from last opening
-        try:
-            last_num = (
-                int(last_opening.hundi_code.split("/")[-1]) if "/" in last_opening.hundi_code else 0
-            )
-        except:
-            last_num = 0
-        new_num = last_num + 1
-    else:
-        new_num = 1
-
-    return f"{prefix}{new_num:04d}"
+    return next_hundi_opening_number(db, temple_id, hundi_code, opening_date.year)
 
 
 @router.post("/openings", response_model=HundiOpeningResponse, status_code=201)
@@ -776,77 +751,5 @@ def get_hundi_report(
     current_user: User = Depends(get_current_user),
 ):
     """Generate hundi report"""
-    temple_id = current_user.temple_id
-
-    query = db.query(HundiOpening).filter(
-        HundiOpening.temple_id == temple_id,
-        HundiOpening.scheduled_date >= from_date,
-        HundiOpening.scheduled_date <= to_date,
-    )
-
-    if hundi_code:
-        query = query.filter(HundiOpening.hundi_code == hundi_code)
-
-    openings = query.all()
-
-    total_openings = len(openings)
-    total_amount = sum(op.total_amount for op in openings)
-    total_deposited = sum(op.bank_deposit_amount or 0 for op in openings if op.bank_deposit_amount)
-    total_pending = total_amount - total_deposited
-
-    # Hundi-wise breakdown
-    hundi_wise = {}
-    for op in openings:
-        if op.hundi_code not in hundi_wise:
-            hundi_wise[op.hundi_code] = {"count": 0, "amount": 0.0, "deposited": 0.0}
-        hundi_wise[op.hundi_code]["count"] += 1
-        hundi_wise[op.hundi_code]["amount"] += op.total_amount
-        if op.bank_deposit_amount:
-            hundi_wise[op.hundi_code]["deposited"] += op.bank_deposit_amount
-
-    hundi_wise_breakdown = [{"hundi_code": code, **data} for code, data in hundi_wise.items()]
-
-    # Daily breakdown
-    daily_breakdown = {}
-    for op in openings:
-        day_key = op.scheduled_date.isoformat()
-        if day_key not in daily_breakdown:
-            daily_breakdown[day_key] = {"date": day_key, "count": 0, "amount": 0.0}
-        daily_breakdown[day_key]["count"] += 1
-        daily_breakdown[day_key]["amount"] += op.total_amount
-
-    daily_breakdown_list = list(daily_breakdown.values())
-
-    # Denomination-wise summary
-    denomination_summary = {}
-    for op in openings:
-        counts = (
-            db.query(HundiDenominationCount)
-            .filter(HundiDenominationCount.hundi_opening_id == op.id)
-            .all()
-        )
-        for count in counts:
-            key = f"{count.denomination_value}_{count.denomination_type}"
-            if key not in denomination_summary:
-                denomination_summary[key] = {
-                    "denomination_value": count.denomination_value,
-                    "denomination_type": count.denomination_type,
-                    "total_quantity": 0,
-                    "total_amount": 0.0,
-                }
-            denomination_summary[key]["total_quantity"] += count.quantity
-            denomination_summary[key]["total_amount"] += count.total_amount
-
-    denomination_wise_summary = list(denomination_summary.values())
-
-    return HundiReportResponse(
-        from_date=from_date,
-        to_date=to_date,
-        total_openings=total_openings,
-        total_amount=total_amount,
-        total_deposited=total_deposited,
-        total_pending=total_pending,
-        hundi_wise_breakdown=hundi_wise_breakdown,
-        daily_breakdown=daily_breakdown_list,
-        denomination_wise_summary=denomination_wise_summary,
-    )
+    report = hundi_report(db, current_user.temple_id, from_date, to_date, hundi_code)
+    return HundiReportResponse(**report)
@@ -30,6 +30,7 @@ from app.models.accounting import (
     JournalEntryStatus,
     TransactionType,
 )
+from app.services.numbering_service import next_journal_entry_number
 from app.models.vendor import Vendor
 
 router = APIRouter(prefix="/api/v1/inventory", tags=["inventory"])
@@ -277,25 +278,7 @@ def post_inventory_purchase_to_accounting(db: Session, movement: StockMovement,
 
         # Generate entry number
         year = movement.movement_date.year
-        prefix = f"JE/{year}/"
-        last_entry = (
-            db.query(JournalEntry)
-            .filter(
-                JournalEntry.temple_id == temple_id, JournalEntry.entry_number.like(f"{prefix}%")
-            )
-            .order_by(JournalEntry.id.desc())
-            .first()
-        )
-
-        new_num = 1
-        if last_entry:
-            try:
-                last_num = int(last_entry.entry_number.split("/")[-1])
-                new_num = last_num + 1
-            except:
-                pass
-
-        entry_number = f"{prefix}{new_num:04d}"
+        entry_number = next_journal_entry_number(db, temple_id, year)
         entry_date = datetime.combine(movement.movement_date, datetime.min.time())
 
         # Create journal entry
@@ -466,25 +449,7 @@ def post_inventory_issue_to_accounting(db: Session, movement: StockMovement, tem
 
         # Generate entry number
         year = movement.movement_date.year
-        prefix = f"JE/{year}/"
-        last_entry = (
-            db.query(JournalEntry)
-            .filter(
-                JournalEntry.temple_id == temple_id, JournalEntry.entry_number.like(f"{prefix}%")
-            )
-            .order_by(JournalEntry.id.desc())
-            .first()
-        )
-
-        new_num = 1
-        if last_entry:
-            try:
-                last_num = int(last_entry.entry_number.split("/")[-1])
-                new_num = last_num + 1
-            except:
-                pass
-
-        entry_number = f"{prefix}{new_num:04d}"
+        entry_number = next_journal_entry_number(db, temple_id, year)
         entry_date = datetime.combine(movement.movement_date, datetime.min.time())
 
         # Create journal entry
@@ -28,6 +28,7 @@ from app.models.accounting import (
     JournalEntryStatus,
     TransactionType,
 )
+from app.services.numbering_service import next_journal_entry_number
 
 # Import from main inventory router
 from app.api.inventory import StockMovementCreate, StockMovementResponse
@@ -149,26 +150,7 @@ def create_adjustment(
 
         if inventory_account:
             year = movement_data.movement_date.year
-            prefix = f"JE/{year}/"
-            last_entry = (
-                db.query(JournalEntry)
-                .filter(
-                    JournalEntry.temple_id == current_user.temple_id,
-                    JournalEntry.entry_number.like(f"{prefix}%"),
-                )
-                .order_by(JournalEntry.id.desc())
-                .first()
-            )
-
-            new_num = 1
-            if last_entry:
-                try:
-                    last_num = int(last_entry.entry_number.split("/")[-1])
-                    new_num = last_num + 1
-                except:
-                    pass
-
-            entry_number = f"{prefix}{new_num:04d}"
+            entry_number = next_journal_entry_number(db, current_user.temple_id, year)
             entry_date = datetime.combine(movement_data.movement_date, datetime.min.time())
 
             journal_entry = JournalEntry(
@@ -3,27 +3,44 @@ Journal Entry API Endpoints
 Manage double-entry bookkeeping transactions
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import StreamingResponse
-import io
-import csv
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
+import re
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func, and_, or_, exists
 from typing import List, Optional
 from datetime import datetime, date
 
 from app.core.database import get_db
+from app.core.db_utils import as_day
 from app.core.security import get_current_user
-from app.core.integrity_check import calculate_integrity_hash
+from app.core.integrity_check import (
+    INTEGRITY_JOB_TYPE,
+    calculate_integrity_hash,
+    integrity_verification_job,
+)
 from app.core.audit_log import write_to_audit_log
+from app.services.account_balance_service import (
+    decode_ledger_cursor,
+    encode_ledger_cursor,
+    get_account_balances,
+    get_balance_before,
+    get_balance_through,
+    get_ledger_balance_through_key,
+    get_period_balances,
+    iter_journal_lines,
+    iter_ledger_lines,
+)
+from app.services.background_job_service import create_job, get_job, job_to_dict
+from app.services.export_service import (
+    ExportColumn,
+    ExportReport,
+    ExportSection,
+    date_param,
+    export_response,
+    register_export,
+)
+from app.services.journal_posting_service import post_journal_batch
+from app.services.numbering_service import next_journal_entry_number
 from app.models.user import User
 from app.models.accounting import (
     Account,
@@ -39,6 +56,8 @@ from app.schemas.accounting import (
     JournalEntryResponse,
     JournalEntryPost,
     JournalEntryCancel,
+    JournalBatchCreate,
+    JournalBatchResponse,
     TrialBalanceResponse,
     TrialBalanceItem,
     AccountLedgerResponse,
@@ -75,31 +94,7 @@ def generate_entry_number(db: Session, temple_id: Optional[int]) -> str:
     Format: JE/YYYY/0001
     For standalone mode (temple_id=None), use 0 as default
     """
-    year = datetime.now().year
-    prefix = f"JE/{year}/"
-
-    # For standalone mode, use 0 as default temple_id
-    effective_temple_id = temple_id if temple_id is not None else 0
-
-    # Get last entry number for this year
-    last_entry = (
-        db.query(JournalEntry)
-        .filter(
-            JournalEntry.temple_id == effective_temple_id,
-            JournalEntry.entry_number.like(f"{prefix}%"),
-        )
-        .order_by(JournalEntry.id.desc())
-        .first()
-    )
-
-    if last_entry:
-        # Extract number and increment
-        last_num = int(last_entry.entry_number.split("/")[-1])
-        new_num = last_num + 1
-    else:
-        new_num = 1
-
-    return f"{prefix}{new_num:04d}"
+    return next_journal_entry_number(db, temple_id, datetime.now().year)
 
 
 def validate_journal_entry(journal_lines: List, db: Session, temple_id: Optional[int]):
@@ -378,6 +373,43 @@ def create_journal_entry(
     return entry
 
 
+@router.post("/batch", response_model=JournalBatchResponse)
+def create_journal_entry_batch(
+    batch: JournalBatchCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Post a batch of receipts (counter, hundi, token seva, UPI) at once
+
+    Entries are posted directly. Lines may name accounts by code. With
+    consolidate_counter_receipts, entries that carry a payment_mode are
+    merged into one summary voucher per day and payment mode.
+    """
+    temple_id = current_user.temple_id if current_user.temple_id is not None else 0
+    postings = [
+        {
+            "temple_id": temple_id,
+            "entry_date": entry.entry_date,
+            "narration": entry.narration,
+            "reference_type": entry.reference_type,
+            "reference_id": entry.reference_id,
+            "payment_mode": entry.payment_mode,
+            "created_by": current_user.id,
+            "lines": [line.model_dump() for line in entry.journal_lines],
+        }
+        for entry in batch.entries
+    ]
+    try:
+        entry_ids = post_journal_batch(db, postings, consolidate=batch.consolidate_counter_receipts)
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+
+    return {"entry_ids": entry_ids, "entries_created": len(set(entry_ids))}
+
+
 @router.put("/{entry_id}", response_model=JournalEntryResponse)
 def update_journal_entry(
     entry_id: int,
@@ -669,6 +701,45 @@ def cancel_journal_entry(
     return entry
 
 
+# ===== INTEGRITY =====
+
+
+@router.post("/integrity/verify", response_model=dict)
+def verify_journal_integrity(
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Re-verify the whole journal entry hash chain in the background
+
+    Startup only verifies entries added since the last checkpoint; this
+    checks every entry again. Poll /integrity/verify/{job_id}.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admin users can verify journal integrity",
+        )
+
+    job = create_job(db, INTEGRITY_JOB_TYPE, created_by=current_user.id)
+    background_tasks.add_task(integrity_verification_job, job.id)
+    return {"status": "queued", "job_id": job.id}
+
+
+@router.get("/integrity/verify/{job_id}", response_model=dict)
+def get_journal_integrity_verification(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Status, progress and result of a full integrity verification"""
+    job = get_job(db, job_id)
+    if not job or job.job_type != INTEGRITY_JOB_TYPE:
+        raise HTTPException(status_code=404, detail="Verification job not found")
+    return job_to_dict(job)
+
+
 # ===== REPORTS =====
 
 
@@ -701,32 +772,16 @@ def get_trial_balance(
     # Build account map for quick lookup
     account_map = {acc.id: acc for acc in all_accounts}
 
-    # Calculate balances for all accounts
+    # Posted totals for every account in one grouped read over the daily snapshots
+    # (CANCELLED entries are excluded from snapshots; their reversals are included)
+    posted_totals = get_account_balances(db, temple_id, as_of_date)
+
     account_balances = {}
     for account in all_accounts:
-        balance_filter = [
-            JournalLine.account_id == account.id,
-            JournalEntry.status
-            == JournalEntryStatus.POSTED,  # Only POSTED entries (CANCELLED are automatically excluded)
-            func.date(JournalEntry.entry_date) <= as_of_date,
-        ]
-        if temple_id is not None:
-            balance_filter.append(JournalEntry.temple_id == temple_id)
-
-        # Exclude entries that have been cancelled (their reversals are included)
-        # This ensures cancelled entries don't appear in trial balance
-        balance_query = (
-            db.query(
-                func.sum(JournalLine.debit_amount).label("total_debit"),
-                func.sum(JournalLine.credit_amount).label("total_credit"),
-            )
-            .join(JournalLine.journal_entry)
-            .filter(*balance_filter)
-            .first()
-        )
+        total_debit, total_credit = posted_totals.get(account.id, (0.0, 0.0))
 
-        debit = float(balance_query.total_debit or 0) + account.opening_balance_debit
-        credit = float(balance_query.total_credit or 0) + account.opening_balance_credit
+        debit = total_debit + (account.opening_balance_debit or 0)
+        credit = total_credit + (account.opening_balance_credit or 0)
 
         net_balance = debit - credit
 
@@ -876,12 +931,20 @@ def get_account_ledger(
     account_id: int,
     from_date: date = Query(...),
     to_date: date = Query(...),
+    limit: Optional[int] = Query(
+        None, ge=1, le=5000, description="Page size (omit to return the whole range)"
+    ),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
     Generate Account Ledger (Statement of Account)
     Shows all transactions for a specific account
+
+    Opening and closing balances come from the daily balance snapshots.
+    Lines are read in keyset order (entry date, entry, line); pass `limit`
+    to page through busy accounts and follow `next_cursor`.
     """
     # For standalone mode, handle temple_id = None
     temple_id = current_user.temple_id
@@ -895,64 +958,57 @@ def get_account_ledger(
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
 
-    # Calculate opening balance (as of from_date)
-    opening_filter = [
-        JournalLine.account_id == account_id,
-        JournalEntry.status == JournalEntryStatus.POSTED,
-        func.date(JournalEntry.entry_date) < from_date,
-    ]
-    if temple_id is not None:
-        opening_filter.append(JournalEntry.temple_id == temple_id)
-
-    opening_query = (
-        db.query(
-            func.sum(JournalLine.debit_amount).label("debit"),
-            func.sum(JournalLine.credit_amount).label("credit"),
-        )
-        .join(JournalLine.journal_entry)
-        .filter(*opening_filter)
-        .first()
-    )
+    account_opening = (account.opening_balance_debit or 0) - (account.opening_balance_credit or 0)
 
-    opening_debit = float(opening_query.debit or 0) + account.opening_balance_debit
-    opening_credit = float(opening_query.credit or 0) + account.opening_balance_credit
-    opening_balance = opening_debit - opening_credit
+    # Opening balance (as of from_date) and closing balance (as of to_date)
+    opening_debit, opening_credit = get_balance_before(db, account_id, from_date)
+    opening_balance = account_opening + opening_debit - opening_credit
 
-    # Get all transactions in date range
-    lines_filter = [
-        JournalLine.account_id == account_id,
-        JournalEntry.status == JournalEntryStatus.POSTED,
-        func.date(JournalEntry.entry_date) >= from_date,
-        func.date(JournalEntry.entry_date) <= to_date,
-    ]
-    if temple_id is not None:
-        lines_filter.append(JournalEntry.temple_id == temple_id)
+    closing_debit, closing_credit = get_balance_through(db, account_id, to_date)
+    closing_balance = account_opening + closing_debit - closing_credit
 
-    lines = (
-        db.query(JournalLine)
-        .join(JournalLine.journal_entry)
-        .filter(*lines_filter)
-        .order_by(JournalEntry.entry_date)
-        .all()
-    )
+    # Running balance starts at the opening balance, or just after the cursor row
+    after = None
+    running_balance = opening_balance
+    if cursor:
+        try:
+            after = decode_ledger_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid ledger cursor")
+        through_debit, through_credit = get_ledger_balance_through_key(
+            db, account_id, temple_id, after
+        )
+        running_balance = account_opening + through_debit - through_credit
 
     # Build ledger entries
     ledger_entries = []
-    running_balance = opening_balance
+    next_cursor = None
+    last_key = None
+    batch_size = limit + 1 if limit is not None else 500
+    rows = iter_ledger_lines(
+        db, account_id, temple_id, from_date, to_date, after=after, batch_size=batch_size
+    )
 
-    for line in lines:
-        running_balance += line.debit_amount - line.credit_amount
+    for row in rows:
+        if limit is not None and len(ledger_entries) == limit:
+            next_cursor = encode_ledger_cursor(*last_key)
+            break
+
+        debit_amount = row.debit_amount or 0.0
+        credit_amount = row.credit_amount or 0.0
+        running_balance += debit_amount - credit_amount
+        last_key = (row.entry_date, row.entry_id, row.line_id)
 
         ledger_entries.append(
             LedgerEntry(
-                entry_date=line.journal_entry.entry_date,
-                entry_number=line.journal_entry.entry_number,
-                narration=line.journal_entry.narration,
-                debit_amount=line.debit_amount,
-                credit_amount=line.credit_amount,
+                entry_date=row.entry_date,
+                entry_number=row.entry_number,
+                narration=row.narration,
+                debit_amount=debit_amount,
+                credit_amount=credit_amount,
                 running_balance=running_balance,
-                reference_type=line.journal_entry.reference_type,
-                reference_id=line.journal_entry.reference_id,
+                reference_type=row.reference_type,
+                reference_id=row.reference_id,
             )
         )
 
@@ -964,8 +1020,9 @@ def get_account_ledger(
         from_date=from_date,
         to_date=to_date,
         opening_balance=opening_balance,
-        closing_balance=running_balance,
+        closing_balance=closing_balance,
         entries=ledger_entries,
+        next_cursor=next_cursor,
     )
 
 
@@ -1460,33 +1517,22 @@ def get_balance_sheet(
         # Approximate: 1 year before
         previous_year_date = date(as_of_date.year - 1, as_of_date.month, as_of_date.day)
 
+    # Posted totals per as-of date, one grouped snapshot read per date
+    posted_totals = {}
+
     # Helper function to calculate account balance
     def get_account_balance(account_id: int, as_of: date) -> float:
         """Calculate account balance as of date"""
-        balance_filter = [
-            JournalLine.account_id == account_id,
-            JournalEntry.status == JournalEntryStatus.POSTED,
-            func.date(JournalEntry.entry_date) <= as_of,
-        ]
-        if temple_id is not None:
-            balance_filter.append(JournalEntry.temple_id == temple_id)
-
-        balance_query = (
-            db.query(
-                func.sum(JournalLine.debit_amount).label("total_debit"),
-                func.sum(JournalLine.credit_amount).label("total_credit"),
-            )
-            .join(JournalLine.journal_entry)
-            .filter(*balance_filter)
-            .first()
-        )
+        if as_of not in posted_totals:
+            posted_totals[as_of] = get_account_balances(db, temple_id, as_of)
+        total_debit, total_credit = posted_totals[as_of].get(account_id, (0.0, 0.0))
 
         account = db.query(Account).filter(Account.id == account_id).first()
         if not account:
             return 0.0
 
-        debit = float(balance_query.total_debit or 0) + account.opening_balance_debit
-        credit = float(balance_query.total_credit or 0) + account.opening_balance_credit
+        debit = total_debit + (account.opening_balance_debit or 0)
+        credit = total_credit + (account.opening_balance_credit or 0)
 
         # For assets: debit balance is positive, credit balance is negative
         # For liabilities: credit balance is positive, debit balance is negative
@@ -1776,6 +1822,116 @@ def get_balance_sheet(
     )
 
 
+# ===== DAY, CASH AND BANK BOOK HELPERS =====
+# The report endpoints and their exports share these; both read journal lines
+# through iter_journal_lines and take balances from the snapshots
+
+
+def _day_book_accounts(db: Session, temple_id: Optional[int]) -> List[Account]:
+    """Active cash/bank and current asset accounts - the Day Book's opening balance"""
+    query = db.query(Account).filter(
+        Account.account_type == AccountType.ASSET,
+        Account.account_subtype.in_([AccountSubType.CASH_BANK, AccountSubType.CURRENT_ASSET]),
+        Account.is_active == True,
+    )
+    if temple_id is not None:
+        query = query.filter(Account.temple_id == temple_id)
+    return query.all()
+
+
+def _cash_book_accounts(
+    db: Session, temple_id: Optional[int], counter_id: Optional[int]
+) -> List[Account]:
+    """Active cash accounts, only the counter's when counter_id is given"""
+    cash_account_filter = [
+        Account.account_type == AccountType.ASSET,
+        Account.account_subtype == AccountSubType.CASH_BANK,
+        Account.is_active == True,
+    ]
+    if temple_id is not None:
+        cash_account_filter.append(Account.temple_id == temple_id)
+    if counter_id:
+        # If counter-specific, filter by account code pattern
+        cash_account_filter.append(Account.account_code.like(f"110{counter_id}%"))
+    return db.query(Account).filter(*cash_account_filter).all()
+
+
+def _bank_book_account(db: Session, temple_id: Optional[int], account_id: int) -> Account:
+    """The bank account of a Bank Book (HTTPException if missing or not a bank account)"""
+    account_filter = [Account.id == account_id]
+    if temple_id is not None:
+        account_filter.append(Account.temple_id == temple_id)
+
+    account = db.query(Account).filter(*account_filter).first()
+
+    if not account:
+        raise HTTPException(status_code=404, detail="Bank account not found")
+
+    if account.account_subtype != AccountSubType.CASH_BANK:
+        raise HTTPException(status_code=400, detail="Account is not a bank account")
+    return account
+
+
+def _bank_details(account: Account):
+    """(bank name, account number) from an account name like "Bank - SBI Current Account" """
+    bank_name = None
+    account_number = None
+    if " - " in account.account_name:
+        parts = account.account_name.split(" - ")
+        if len(parts) >= 2:
+            bank_name = parts[0].replace("Bank", "").strip()
+            account_number = parts[1] if len(parts) > 1 else None
+    return bank_name, account_number
+
+
+def _line_narration(line) -> str:
+    return line.narration or line.description or ""
+
+
+def _voucher_type(reference_type) -> str:
+    return reference_type.value if reference_type else "Manual"
+
+
+def _day_book_side(line):
+    """
+    (is_receipt, debit, credit) of a journal line in the Day Book, or None if it
+    isn't shown - cash/bank debits and income credits are receipts, cash/bank
+    credits and expense debits are payments
+    """
+    is_cash_bank = line.account_subtype in [AccountSubType.CASH_BANK, AccountSubType.CURRENT_ASSET]
+    if is_cash_bank and line.debit_amount > 0:
+        # Money received (cash/bank debited)
+        return True, line.debit_amount, 0.0
+    if is_cash_bank and line.credit_amount > 0:
+        # Money paid (cash/bank credited)
+        return False, 0.0, line.credit_amount
+    if line.account_type == AccountType.INCOME and line.credit_amount > 0:
+        # Income recognized (receipt)
+        return True, 0.0, line.credit_amount
+    if line.account_type == AccountType.EXPENSE and line.debit_amount > 0:
+        # Expense incurred (payment)
+        return False, line.debit_amount, 0.0
+    return None
+
+
+def _book_movement(line):
+    """(money in, money out) of a cash or bank account line"""
+    if line.debit_amount > 0:
+        return line.debit_amount, 0.0
+    if line.credit_amount > 0:
+        return 0.0, line.credit_amount
+    return 0.0, 0.0
+
+
+def _cheque_number(narration: str) -> Optional[str]:
+    """Cheque number mentioned in a narration (simple pattern matching)"""
+    if "cheque" in narration.lower() or "chq" in narration.lower():
+        chq_match = re.search(r"ch[eq]*\s*[#:]?\s*(\d+)", narration, re.IGNORECASE)
+        if chq_match:
+            return chq_match.group(1)
+    return None
+
+
 @router.get("/reports/day-book", response_model=DayBookResponse)
 def get_day_book(
     date: date = Query(default_factory=date.today, description="Date for day book"),
@@ -1788,57 +1944,9 @@ def get_day_book(
     """
     temple_id = current_user.temple_id
 
-    # Get all journal entries for the day
-    entry_filter = [
-        func.date(JournalEntry.entry_date) == date,
-        JournalEntry.status == JournalEntryStatus.POSTED,
-    ]
-    if temple_id is not None:
-        entry_filter.append(JournalEntry.temple_id == temple_id)
-
-    entries = db.query(JournalEntry).filter(*entry_filter).order_by(JournalEntry.entry_date).all()
-
-    # Calculate opening balance (balance before this date)
-    opening_filter = [
-        func.date(JournalEntry.entry_date) < date,
-        JournalEntry.status == JournalEntryStatus.POSTED,
-    ]
-    if temple_id is not None:
-        opening_filter.append(JournalEntry.temple_id == temple_id)
-
-    # Get cash and bank accounts for opening balance
-    cash_accounts = db.query(Account).filter(
-        Account.account_type == AccountType.ASSET,
-        Account.account_subtype.in_([AccountSubType.CASH_BANK, AccountSubType.CURRENT_ASSET]),
-        Account.is_active == True,
-    )
-    if temple_id is not None:
-        cash_accounts = cash_accounts.filter(Account.temple_id == temple_id)
-    cash_accounts = cash_accounts.all()
-
-    opening_balance = 0.0
-    for acc in cash_accounts:
-        balance_filter = [
-            JournalLine.account_id == acc.id,
-            JournalEntry.status == JournalEntryStatus.POSTED,
-            func.date(JournalEntry.entry_date) < date,
-        ]
-        if temple_id is not None:
-            balance_filter.append(JournalEntry.temple_id == temple_id)
-
-        balance_query = (
-            db.query(
-                func.sum(JournalLine.debit_amount).label("total_debit"),
-                func.sum(JournalLine.credit_amount).label("total_credit"),
-            )
-            .join(JournalLine.journal_entry)
-            .filter(*balance_filter)
-            .first()
-        )
-
-        debit = float(balance_query.total_debit or 0) + acc.opening_balance_debit
-        credit = float(balance_query.total_credit or 0) + acc.opening_balance_credit
-        opening_balance += debit - credit
+    # Opening balance (balance before this date) for all cash/bank accounts in one read
+    period_balances = get_period_balances(db, _day_book_accounts(db, temple_id), date, date)
+    opening_balance = sum(opening for opening, _ in period_balances.values())
 
     # Separate receipts and payments
     receipts = []
@@ -1846,83 +1954,27 @@ def get_day_book(
     total_receipts = 0.0
     total_payments = 0.0
 
-    for entry in entries:
-        # Get all lines for this entry
-        lines = db.query(JournalLine).filter(JournalLine.journal_entry_id == entry.id).all()
-
-        for line in lines:
-            account = db.query(Account).filter(Account.id == line.account_id).first()
-            if not account:
-                continue
-
-            # Determine if this is a receipt (money coming in) or payment (money going out)
-            is_cash_bank = account.account_subtype in [
-                AccountSubType.CASH_BANK,
-                AccountSubType.CURRENT_ASSET,
-            ]
-            is_income = account.account_type == AccountType.INCOME
-            is_expense = account.account_type == AccountType.EXPENSE
-
-            if is_cash_bank and line.debit_amount > 0:
-                # Money received (cash/bank debited)
-                receipts.append(
-                    DayBookEntry(
-                        entry_number=entry.entry_number,
-                        entry_date=entry.entry_date,
-                        narration=entry.narration or line.description or "",
-                        voucher_type=entry.reference_type or "Manual",
-                        debit_amount=line.debit_amount,
-                        credit_amount=0.0,
-                        account_name=account.account_name,
-                        party_name=None,
-                    )
-                )
-                total_receipts += line.debit_amount
-            elif is_cash_bank and line.credit_amount > 0:
-                # Money paid (cash/bank credited)
-                payments.append(
-                    DayBookEntry(
-                        entry_number=entry.entry_number,
-                        entry_date=entry.entry_date,
-                        narration=entry.narration or line.description or "",
-                        voucher_type=entry.reference_type or "Manual",
-                        debit_amount=0.0,
-                        credit_amount=line.credit_amount,
-                        account_name=account.account_name,
-                        party_name=None,
-                    )
-                )
-                total_payments += line.credit_amount
-            elif is_income and line.credit_amount > 0:
-                # Income recognized (receipt)
-                receipts.append(
-                    DayBookEntry(
-                        entry_number=entry.entry_number,
-                        entry_date=entry.entry_date,
-                        narration=entry.narration or line.description or "",
-                        voucher_type=entry.reference_type or "Manual",
-                        debit_amount=0.0,
-                        credit_amount=line.credit_amount,
-                        account_name=account.account_name,
-                        party_name=None,
-                    )
-                )
-                total_receipts += line.credit_amount
-            elif is_expense and line.debit_amount > 0:
-                # Expense incurred (payment)
-                payments.append(
-                    DayBookEntry(
-                        entry_number=entry.entry_number,
-                        entry_date=entry.entry_date,
-                        narration=entry.narration or line.description or "",
-                        voucher_type=entry.reference_type or "Manual",
-                        debit_amount=line.debit_amount,
-                        credit_amount=0.0,
-                        account_name=account.account_name,
-                        party_name=None,
-                    )
-                )
-                total_payments += line.debit_amount
+    for line in iter_journal_lines(db, temple_id, date, date):
+        side = _day_book_side(line)
+        if side is None:
+            continue
+        is_receipt, debit_amount, credit_amount = side
+        book_entry = DayBookEntry(
+            entry_number=line.entry_number,
+            entry_date=line.entry_date,
+            narration=_line_narration(line),
+            voucher_type=_voucher_type(line.reference_type),
+            debit_amount=debit_amount,
+            credit_amount=credit_amount,
+            account_name=line.account_name,
+            party_name=None,
+        )
+        if is_receipt:
+            receipts.append(book_entry)
+            total_receipts += debit_amount + credit_amount
+        else:
+            payments.append(book_entry)
+            total_payments += debit_amount + credit_amount
 
     net_cash_flow = total_receipts - total_payments
     closing_balance = opening_balance + net_cash_flow
@@ -1952,20 +2004,7 @@ def get_cash_book(
     Shows all cash receipts and payments with running balance
     """
     temple_id = current_user.temple_id
-
-    # Get cash accounts
-    cash_account_filter = [
-        Account.account_type == AccountType.ASSET,
-        Account.account_subtype == AccountSubType.CASH_BANK,
-        Account.is_active == True,
-    ]
-    if temple_id is not None:
-        cash_account_filter.append(Account.temple_id == temple_id)
-    if counter_id:
-        # If counter-specific, filter by account code pattern
-        cash_account_filter.append(Account.account_code.like(f"110{counter_id}%"))
-
-    cash_accounts = db.query(Account).filter(*cash_account_filter).all()
+    cash_accounts = _cash_book_accounts(db, temple_id, counter_id)
 
     if not cash_accounts:
         # Return empty cash book
@@ -1979,54 +2018,10 @@ def get_cash_book(
             total_payments=0.0,
         )
 
-    cash_account_ids = [acc.id for acc in cash_accounts]
-
-    # Calculate opening balance
-    opening_filter = [
-        JournalLine.account_id.in_(cash_account_ids),
-        JournalEntry.status == JournalEntryStatus.POSTED,
-        func.date(JournalEntry.entry_date) < from_date,
-    ]
-    if temple_id is not None:
-        opening_filter.append(JournalEntry.temple_id == temple_id)
-
-    opening_query = (
-        db.query(
-            func.sum(JournalLine.debit_amount).label("total_debit"),
-            func.sum(JournalLine.credit_amount).label("total_credit"),
-        )
-        .join(JournalLine.journal_entry)
-        .filter(*opening_filter)
-        .first()
-    )
-
-    opening_debit = float(opening_query.total_debit or 0)
-    opening_credit = float(opening_query.total_credit or 0)
-
-    # Add opening balances from accounts
-    for acc in cash_accounts:
-        opening_debit += acc.opening_balance_debit
-        opening_credit += acc.opening_balance_credit
-
-    opening_balance = opening_debit - opening_credit
-
-    # Get all transactions in date range
-    lines_filter = [
-        JournalLine.account_id.in_(cash_account_ids),
-        JournalEntry.status == JournalEntryStatus.POSTED,
-        func.date(JournalEntry.entry_date) >= from_date,
-        func.date(JournalEntry.entry_date) <= to_date,
-    ]
-    if temple_id is not None:
-        lines_filter.append(JournalEntry.temple_id == temple_id)
-
-    lines = (
-        db.query(JournalLine)
-        .join(JournalLine.journal_entry)
-        .filter(*lines_filter)
-        .order_by(JournalEntry.entry_date, JournalEntry.id)
-        .all()
-    )
+    # Opening and closing balances for all cash accounts in one grouped read
+    period_balances = get_period_balances(db, cash_accounts, from_date, to_date)
+    opening_balance = sum(opening for opening, _ in period_balances.values())
+    closing_balance = sum(closing for _, closing in period_balances.values())
 
     # Build cash book entries
     entries = []
@@ -2034,35 +2029,24 @@ def get_cash_book(
     total_receipts = 0.0
     total_payments = 0.0
 
+    lines = iter_journal_lines(
+        db, temple_id, from_date, to_date, [account.id for account in cash_accounts]
+    )
     for line in lines:
-        account = db.query(Account).filter(Account.id == line.account_id).first()
-        entry = line.journal_entry
-
-        receipt_amount = 0.0
-        payment_amount = 0.0
-
-        if line.debit_amount > 0:
-            # Cash received
-            receipt_amount = line.debit_amount
-            total_receipts += receipt_amount
-            running_balance += receipt_amount
-        elif line.credit_amount > 0:
-            # Cash paid
-            payment_amount = line.credit_amount
-            total_payments += payment_amount
-            running_balance -= payment_amount
+        receipt_amount, payment_amount = _book_movement(line)
+        total_receipts += receipt_amount
+        total_payments += payment_amount
+        running_balance += receipt_amount - payment_amount
 
         entries.append(
             CashBookEntry(
-                date=entry.entry_date.date()
-                if hasattr(entry.entry_date, "date")
-                else entry.entry_date,
-                entry_number=entry.entry_number,
-                narration=entry.narration or line.description or "",
+                date=as_day(line.entry_date),
+                entry_number=line.entry_number,
+                narration=_line_narration(line),
                 receipt_amount=receipt_amount,
                 payment_amount=payment_amount,
                 running_balance=running_balance,
-                voucher_type=entry.reference_type or "Manual",
+                voucher_type=_voucher_type(line.reference_type),
                 party_name=None,
             )
         )
@@ -2072,7 +2056,7 @@ def get_cash_book(
         to_date=to_date,
         opening_balance=opening_balance,
         entries=entries,
-        closing_balance=running_balance,
+        closing_balance=closing_balance,
         total_receipts=total_receipts,
         total_payments=total_payments,
     )
@@ -2091,60 +2075,12 @@ def get_bank_book(
     Shows deposits, withdrawals, and cheque tracking
     """
     temple_id = current_user.temple_id
+    account = _bank_book_account(db, temple_id, account_id)
 
-    # Get bank account
-    account_filter = [Account.id == account_id]
-    if temple_id is not None:
-        account_filter.append(Account.temple_id == temple_id)
-
-    account = db.query(Account).filter(*account_filter).first()
-
-    if not account:
-        raise HTTPException(status_code=404, detail="Bank account not found")
-
-    if account.account_subtype != AccountSubType.CASH_BANK:
-        raise HTTPException(status_code=400, detail="Account is not a bank account")
-
-    # Calculate opening balance
-    opening_filter = [
-        JournalLine.account_id == account_id,
-        JournalEntry.status == JournalEntryStatus.POSTED,
-        func.date(JournalEntry.entry_date) < from_date,
+    # Opening and closing balances from the daily balance snapshots
+    opening_balance, closing_balance = get_period_balances(db, [account], from_date, to_date)[
+        account.id
     ]
-    if temple_id is not None:
-        opening_filter.append(JournalEntry.temple_id == temple_id)
-
-    opening_query = (
-        db.query(
-            func.sum(JournalLine.debit_amount).label("total_debit"),
-            func.sum(JournalLine.credit_amount).label("total_credit"),
-        )
-        .join(JournalLine.journal_entry)
-        .filter(*opening_filter)
-        .first()
-    )
-
-    opening_debit = float(opening_query.total_debit or 0) + account.opening_balance_debit
-    opening_credit = float(opening_query.total_credit or 0) + account.opening_balance_credit
-    opening_balance = opening_debit - opening_credit
-
-    # Get all transactions in date range
-    lines_filter = [
-        JournalLine.account_id == account_id,
-        JournalEntry.status == JournalEntryStatus.POSTED,
-        func.date(JournalEntry.entry_date) >= from_date,
-        func.date(JournalEntry.entry_date) <= to_date,
-    ]
-    if temple_id is not None:
-        lines_filter.append(JournalEntry.temple_id == temple_id)
-
-    lines = (
-        db.query(JournalLine)
-        .join(JournalLine.journal_entry)
-        .filter(*lines_filter)
-        .order_by(JournalEntry.entry_date, JournalEntry.id)
-        .all()
-    )
 
     # Build bank book entries
     entries = []
@@ -2153,47 +2089,27 @@ def get_bank_book(
     total_deposits = 0.0
     total_withdrawals = 0.0
 
-    for line in lines:
-        entry = line.journal_entry
+    for line in iter_journal_lines(db, temple_id, from_date, to_date, [account.id]):
+        deposit_amount, withdrawal_amount = _book_movement(line)
+        total_deposits += deposit_amount
+        total_withdrawals += withdrawal_amount
+        running_balance += deposit_amount - withdrawal_amount
 
-        deposit_amount = 0.0
-        withdrawal_amount = 0.0
-        cheque_number = None
+        # Cheque number of a withdrawal, from its narration
+        cheque_number = _cheque_number(_line_narration(line)) if withdrawal_amount else None
+        # For now, assume cheques are cleared. In real system, track clearance status
         cleared = True
 
-        if line.debit_amount > 0:
-            # Deposit
-            deposit_amount = line.debit_amount
-            total_deposits += deposit_amount
-            running_balance += deposit_amount
-        elif line.credit_amount > 0:
-            # Withdrawal
-            withdrawal_amount = line.credit_amount
-            total_withdrawals += withdrawal_amount
-            running_balance -= withdrawal_amount
-
-            # Try to extract cheque number from narration or reference
-            narration = entry.narration or line.description or ""
-            if "cheque" in narration.lower() or "chq" in narration.lower():
-                # Extract cheque number (simple pattern matching)
-                chq_match = re.search(r"ch[eq]*\s*[#:]?\s*(\d+)", narration, re.IGNORECASE)
-                if chq_match:
-                    cheque_number = chq_match.group(1)
-                    # For now, assume cheques are cleared. In real system, track clearance status
-                    cleared = True
-
         entries.append(
             BankBookEntry(
-                date=entry.entry_date.date()
-                if hasattr(entry.entry_date, "date")
-                else entry.entry_date,
-                entry_number=entry.entry_number,
-                narration=entry.narration or line.description or "",
+                date=as_day(line.entry_date),
+                entry_number=line.entry_number,
+                narration=_line_narration(line),
                 cheque_number=cheque_number,
                 deposit_amount=deposit_amount,
                 withdrawal_amount=withdrawal_amount,
                 running_balance=running_balance,
-                voucher_type=entry.reference_type or "Manual",
+                voucher_type=_voucher_type(line.reference_type),
                 cleared=cleared,
             )
         )
@@ -2202,29 +2118,19 @@ def get_bank_book(
         if cheque_number and not cleared:
             outstanding_cheques.append(
                 BankBookEntry(
-                    date=entry.entry_date.date()
-                    if hasattr(entry.entry_date, "date")
-                    else entry.entry_date,
-                    entry_number=entry.entry_number,
-                    narration=entry.narration or line.description or "",
+                    date=as_day(line.entry_date),
+                    entry_number=line.entry_number,
+                    narration=_line_narration(line),
                     cheque_number=cheque_number,
                     deposit_amount=0.0,
                     withdrawal_amount=withdrawal_amount,
                     running_balance=0.0,
-                    voucher_type=entry.reference_type or "Manual",
+                    voucher_type=_voucher_type(line.reference_type),
                     cleared=False,
                 )
             )
 
-    # Get bank details from account name or separate bank table (if exists)
-    bank_name = None
-    account_number = None
-    # Try to extract from account name (e.g., "Bank - SBI Current Account")
-    if " - " in account.account_name:
-        parts = account.account_name.split(" - ")
-        if len(parts) >= 2:
-            bank_name = parts[0].replace("Bank", "").strip()
-            account_number = parts[1] if len(parts) > 1 else None
+    bank_name, account_number = _bank_details(account)
 
     return BankBookResponse(
         account_id=account_id,
@@ -2236,7 +2142,7 @@ def get_bank_book(
         to_date=to_date,
         opening_balance=opening_balance,
         entries=entries,
-        closing_balance=running_balance,
+        closing_balance=closing_balance,
         total_deposits=total_deposits,
         total_withdrawals=total_withdrawals,
         outstanding_cheques=outstanding_cheques,
@@ -2247,6 +2153,211 @@ def get_bank_book(
 # EXPORT ENDPOINTS
 # ==========================================
 
+_BOOK_FOOTER = "MandirMitra Temple Management System"
+
+
+@register_export("day_book")
+def build_day_book_export(db: Session, current_user: User, date=None) -> ExportReport:
+    """Day Book as an export report, streamed from the day's journal lines"""
+    day = date_param(date) or datetime.now().date()
+    temple_id = current_user.temple_id
+    period_balances = get_period_balances(db, _day_book_accounts(db, temple_id), day, day)
+    opening_balance = sum(opening for opening, _ in period_balances.values())
+
+    # Receipts and payments are two passes over the lines; totals accumulate as they stream
+    totals = {True: 0.0, False: 0.0}
+
+    def rows(receipts: bool):
+        for line in iter_journal_lines(db, temple_id, day, day):
+            side = _day_book_side(line)
+            if side is None or side[0] != receipts:
+                continue
+            amount = side[1] + side[2]
+            totals[receipts] += amount
+            yield [
+                line.entry_number,
+                line.account_name,
+                _line_narration(line),
+                _voucher_type(line.reference_type),
+                amount,
+            ]
+
+    columns = [
+        ExportColumn("Entry No", 15),
+        ExportColumn("Account", 25),
+        ExportColumn("Narration", 35),
+        ExportColumn("Voucher Type", 15),
+        ExportColumn("Amount", 15, "amount"),
+    ]
+    return ExportReport(
+        title="MandirMitra DAY BOOK REPORT",
+        filename=f"DayBook_{day}",
+        sheet_title=f"Day Book - {day}",
+        header_lines=[
+            f"Date: {day.strftime('%d-%m-%Y')}",
+            f"Opening Balance: {opening_balance:,.2f}",
+        ],
+        sections=[
+            ExportSection(
+                columns,
+                rows(True),
+                title="RECEIPTS",
+                totals=lambda: ["", "", "", "Total Receipts", totals[True]],
+            ),
+            ExportSection(
+                columns,
+                rows(False),
+                title="PAYMENTS",
+                totals=lambda: ["", "", "", "Total Payments", totals[False]],
+            ),
+        ],
+        footer_lines=lambda: [
+            f"Closing Balance: {opening_balance + totals[True] - totals[False]:,.2f}",
+            _BOOK_FOOTER,
+        ],
+    )
+
+
+@register_export("cash_book")
+def build_cash_book_export(
+    db: Session, current_user: User, from_date=None, to_date=None, counter_id: Optional[int] = None
+) -> ExportReport:
+    """Cash Book as an export report, streamed from the cash account lines"""
+    from_date, to_date = date_param(from_date), date_param(to_date)
+    if not from_date or not to_date:
+        raise ValueError("from_date and to_date are required")
+    temple_id = current_user.temple_id
+    cash_accounts = _cash_book_accounts(db, temple_id, counter_id)
+    period_balances = get_period_balances(db, cash_accounts, from_date, to_date)
+    opening_balance = sum(opening for opening, _ in period_balances.values())
+    closing_balance = sum(closing for _, closing in period_balances.values())
+
+    # Running balance and totals accumulate while the lines stream past
+    summary = {"balance": opening_balance, "receipts": 0.0, "payments": 0.0}
+
+    def rows():
+        if not cash_accounts:
+            return
+        account_ids = [account.id for account in cash_accounts]
+        for line in iter_journal_lines(db, temple_id, from_date, to_date, account_ids):
+            receipt_amount, payment_amount = _book_movement(line)
+            summary["receipts"] += receipt_amount
+            summary["payments"] += payment_amount
+            summary["balance"] += receipt_amount - payment_amount
+            yield [
+                as_day(line.entry_date),
+                line.entry_number,
+                _line_narration(line),
+                receipt_amount,
+                payment_amount,
+                summary["balance"],
+                _voucher_type(line.reference_type),
+            ]
+
+    return ExportReport(
+        title=f"CASH BOOK REPORT ({from_date} to {to_date})",
+        filename=f"CashBook_{from_date}_{to_date}",
+        sheet_title="Cash Book",
+        landscape=True,
+        header_lines=[f"Opening Balance: {opening_balance:,.2f}"],
+        sections=[
+            ExportSection(
+                [
+                    ExportColumn("Date", 12, "date"),
+                    ExportColumn("Entry No", 15),
+                    ExportColumn("Narration", 40),
+                    ExportColumn("Receipt", 14, "amount"),
+                    ExportColumn("Payment", 14, "amount"),
+                    ExportColumn("Balance", 15, "amount"),
+                    ExportColumn("Voucher Type", 14),
+                ],
+                rows(),
+                totals=lambda: [
+                    "",
+                    "",
+                    "Totals",
+                    summary["receipts"],
+                    summary["payments"],
+                    None,
+                    "",
+                ],
+            )
+        ],
+        footer_lines=[f"Closing Balance: {closing_balance:,.2f}", _BOOK_FOOTER],
+    )
+
+
+@register_export("bank_book")
+def build_bank_book_export(
+    db: Session, current_user: User, account_id: int = None, from_date=None, to_date=None
+) -> ExportReport:
+    """Bank Book as an export report, streamed from the bank account's lines"""
+    from_date, to_date = date_param(from_date), date_param(to_date)
+    if not account_id or not from_date or not to_date:
+        raise ValueError("account_id, from_date and to_date are required")
+    temple_id = current_user.temple_id
+    account = _bank_book_account(db, temple_id, account_id)
+    opening_balance, closing_balance = get_period_balances(db, [account], from_date, to_date)[
+        account.id
+    ]
+    bank_name, account_number = _bank_details(account)
+
+    # Running balance and totals accumulate while the lines stream past
+    summary = {"balance": opening_balance, "deposits": 0.0, "withdrawals": 0.0}
+
+    def rows():
+        for line in iter_journal_lines(db, temple_id, from_date, to_date, [account.id]):
+            deposit_amount, withdrawal_amount = _book_movement(line)
+            summary["deposits"] += deposit_amount
+            summary["withdrawals"] += withdrawal_amount
+            summary["balance"] += deposit_amount - withdrawal_amount
+            cheque_number = _cheque_number(_line_narration(line)) if withdrawal_amount else None
+            yield [
+                as_day(line.entry_date),
+                line.entry_number,
+                _line_narration(line),
+                cheque_number or "-",
+                deposit_amount,
+                withdrawal_amount,
+                summary["balance"],
+            ]
+
+    return ExportReport(
+        title=f"BANK BOOK: {account.account_name} ({bank_name or 'Bank'})",
+        filename=f"BankBook_{from_date}_{to_date}",
+        sheet_title="Bank Book",
+        landscape=True,
+        header_lines=[
+            f"Period: {from_date} to {to_date}",
+            f"Account No: {account_number or 'N/A'}",
+            f"Opening Balance: {opening_balance:,.2f}",
+        ],
+        sections=[
+            ExportSection(
+                [
+                    ExportColumn("Date", 12, "date"),
+                    ExportColumn("Entry No", 15),
+                    ExportColumn("Narration", 40),
+                    ExportColumn("Cheque No", 12),
+                    ExportColumn("Deposit", 14, "amount"),
+                    ExportColumn("Withdrawal", 14, "amount"),
+                    ExportColumn("Balance", 15, "amount"),
+                ],
+                rows(),
+                totals=lambda: [
+                    "",
+                    "",
+                    "Totals",
+                    "",
+                    summary["deposits"],
+                    summary["withdrawals"],
+                    None,
+                ],
+            )
+        ],
+        footer_lines=[f"Closing Balance: {closing_balance:,.2f}", _BOOK_FOOTER],
+    )
+
 
 @router.get("/reports/day-book/export/excel")
 def export_day_book_excel(
@@ -2255,116 +2366,7 @@ def export_day_book_excel(
     current_user: User = Depends(get_current_user),
 ):
     """Export Day Book to Excel"""
-    # Get data using existing logic
-    data = get_day_book(date, db, current_user)
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = f"Day Book - {date}"
-
-    # Headers
-    ws.merge_cells("A1:F1")
-    ws["A1"] = "MandirMitra DAY BOOK REPORT"
-    ws["A1"].font = Font(bold=True, size=14)
-    ws["A1"].alignment = Alignment(horizontal="center")
-
-    ws.merge_cells("A2:F2")
-    ws["A2"] = f"Date: {date.strftime('%d-%m-%Y')}"
-    ws["A2"].alignment = Alignment(horizontal="center")
-
-    # Opening Balance
-    ws.merge_cells("A4:E4")
-    ws["A4"] = "Opening Balance"
-    ws["A4"].font = Font(bold=True)
-    ws["F4"] = data.opening_balance
-    ws["F4"].font = Font(bold=True)
-
-    # Receipts Section
-    row = 6
-    ws.merge_cells(f"A{row}:F{row}")
-    ws[f"A{row}"] = "RECEIPTS"
-    ws[f"A{row}"].font = Font(bold=True)
-    ws[f"A{row}"].alignment = Alignment(horizontal="center")
-    row += 1
-
-    headers = ["Entry No", "Account", "Narration", "Voucher Type", "Amount"]
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=row, column=col)
-        cell.value = header
-        cell.font = Font(bold=True)
-        cell.border = Border(bottom=Side(style="thin"))
-    row += 1
-
-    for entry in data.receipts:
-        ws.cell(row=row, column=1, value=entry.entry_number)
-        ws.cell(row=row, column=2, value=entry.account_name)
-        ws.cell(row=row, column=3, value=entry.narration)
-        ws.cell(row=row, column=4, value=entry.voucher_type)
-        amount = entry.debit_amount if entry.debit_amount > 0 else entry.credit_amount
-        ws.cell(row=row, column=5, value=amount)
-        row += 1
-
-    ws.merge_cells(f"A{row}:D{row}")
-    ws[f"A{row}"] = "Total Receipts"
-    ws[f"A{row}"].font = Font(bold=True)
-    ws[f"A{row}"].alignment = Alignment(horizontal="right")
-    ws[f"E{row}"] = data.total_receipts
-    ws[f"E{row}"].font = Font(bold=True)
-    row += 2
-
-    # Payments Section
-    ws.merge_cells(f"A{row}:F{row}")
-    ws[f"A{row}"] = "PAYMENTS"
-    ws[f"A{row}"].font = Font(bold=True)
-    ws[f"A{row}"].alignment = Alignment(horizontal="center")
-    row += 1
-
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=row, column=col)
-        cell.value = header
-        cell.font = Font(bold=True)
-        cell.border = Border(bottom=Side(style="thin"))
-    row += 1
-
-    for entry in data.payments:
-        ws.cell(row=row, column=1, value=entry.entry_number)
-        ws.cell(row=row, column=2, value=entry.account_name)
-        ws.cell(row=row, column=3, value=entry.narration)
-        ws.cell(row=row, column=4, value=entry.voucher_type)
-        amount = entry.credit_amount if entry.credit_amount > 0 else entry.debit_amount
-        ws.cell(row=row, column=5, value=amount)
-        row += 1
-
-    ws.merge_cells(f"A{row}:D{row}")
-    ws[f"A{row}"] = "Total Payments"
-    ws[f"A{row}"].font = Font(bold=True)
-    ws[f"A{row}"].alignment = Alignment(horizontal="right")
-    ws[f"E{row}"] = data.total_payments
-    ws[f"E{row}"].font = Font(bold=True)
-    row += 2
-
-    # Closing Balance
-    ws.merge_cells(f"A{row}:E{row}")
-    ws[f"A{row}"] = "Closing Balance"
-    ws[f"A{row}"].font = Font(bold=True)
-    ws[f"F{row}"] = data.closing_balance
-    ws[f"F{row}"].font = Font(bold=True)
-
-    # Adjust column widths
-    for col in range(1, 7):
-        ws.column_dimensions[chr(64 + col)].width = 15
-    ws.column_dimensions["B"].width = 25
-    ws.column_dimensions["C"].width = 35
-
-    buffer = io.BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-
-    return StreamingResponse(
-        buffer,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename=DayBook_{date}.xlsx"},
-    )
+    return export_response(build_day_book_export(db, current_user, date), "excel")
 
 
 @router.get("/reports/day-book/export/pdf")
@@ -2374,101 +2376,7 @@ def export_day_book_pdf(
     current_user: User = Depends(get_current_user),
 ):
     """Export Day Book to PDF"""
-    data = get_day_book(date, db, current_user)
-
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4)
-    elements = []
-    styles = getSampleStyleSheet()
-
-    # Title
-    title = Paragraph(f"Day Book Report - {date.strftime('%d-%m-%Y')}", styles["Title"])
-    elements.append(title)
-    elements.append(Spacer(1, 0.2 * inch))
-
-    # Opening Balance
-    elements.append(
-        Paragraph(f"<b>Opening Balance:</b> ₹{data.opening_balance:,.2f}", styles["Normal"])
-    )
-    elements.append(Spacer(1, 0.2 * inch))
-
-    # Receipts Table
-    elements.append(Paragraph("<b>RECEIPTS</b>", styles["Heading3"]))
-    receipt_data = [["Entry No", "Account", "Narration", "Amount"]]
-    for entry in data.receipts:
-        amount = entry.debit_amount if entry.debit_amount > 0 else entry.credit_amount
-        receipt_data.append(
-            [
-                entry.entry_number,
-                entry.account_name,
-                Paragraph(entry.narration[:50], styles["Normal"]),
-                f"₹{amount:,.2f}",
-            ]
-        )
-
-    # Add total receipt row
-    receipt_data.append(["", "", "Total Receipts", f"₹{data.total_receipts:,.2f}"])
-
-    r_table = Table(receipt_data, colWidths=[1.2 * inch, 2 * inch, 2.5 * inch, 1 * inch])
-    r_table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("ALIGN", (-1, 0), (-1, -1), "RIGHT"),
-                ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),  # Total row bold
-            ]
-        )
-    )
-    elements.append(r_table)
-    elements.append(Spacer(1, 0.3 * inch))
-
-    # Payments Table
-    elements.append(Paragraph("<b>PAYMENTS</b>", styles["Heading3"]))
-    payment_data = [["Entry No", "Account", "Narration", "Amount"]]
-    for entry in data.payments:
-        amount = entry.credit_amount if entry.credit_amount > 0 else entry.debit_amount
-        payment_data.append(
-            [
-                entry.entry_number,
-                entry.account_name,
-                Paragraph(entry.narration[:50], styles["Normal"]),
-                f"₹{amount:,.2f}",
-            ]
-        )
-
-    # Add total payment row
-    payment_data.append(["", "", "Total Payments", f"₹{data.total_payments:,.2f}"])
-
-    p_table = Table(payment_data, colWidths=[1.2 * inch, 2 * inch, 2.5 * inch, 1 * inch])
-    p_table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("ALIGN", (-1, 0), (-1, -1), "RIGHT"),
-                ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
-            ]
-        )
-    )
-    elements.append(p_table)
-    elements.append(Spacer(1, 0.3 * inch))
-
-    # Closing Balance
-    elements.append(
-        Paragraph(f"<b>Closing Balance:</b> ₹{data.closing_balance:,.2f}", styles["Normal"])
-    )
-
-    doc.build(elements)
-    buffer.seek(0)
-
-    return StreamingResponse(
-        buffer,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename=DayBook_{date}.pdf"},
-    )
+    return export_response(build_day_book_export(db, current_user, date), "pdf")
 
 
 @router.get("/reports/cash-book/export/excel")
@@ -2480,68 +2388,8 @@ def export_cash_book_excel(
     current_user: User = Depends(get_current_user),
 ):
     """Export Cash Book to Excel"""
-    data = get_cash_book(from_date, to_date, counter_id, db, current_user)
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Cash Book"
-
-    ws.merge_cells("A1:G1")
-    ws["A1"] = f"CASH BOOK REPORT ({from_date} to {to_date})"
-    ws["A1"].font = Font(bold=True, size=14)
-    ws["A1"].alignment = Alignment(horizontal="center")
-
-    ws["A3"] = f"Opening Balance: {data.opening_balance}"
-    ws["A3"].font = Font(bold=True)
-
-    headers = ["Date", "Entry No", "Narration", "Receipt", "Payment", "Balance", "Voucher Type"]
-    row = 5
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=row, column=col)
-        cell.value = header
-        cell.font = Font(bold=True)
-        cell.border = Border(bottom=Side(style="thin"))
-    row += 1
-
-    for entry in data.entries:
-        ws.cell(row=row, column=1, value=entry.date)
-        ws.cell(row=row, column=2, value=entry.entry_number)
-        ws.cell(row=row, column=3, value=entry.narration)
-        ws.cell(row=row, column=4, value=entry.receipt_amount)
-        ws.cell(row=row, column=5, value=entry.payment_amount)
-        ws.cell(row=row, column=6, value=entry.running_balance)
-        ws.cell(row=row, column=7, value=entry.voucher_type)
-        row += 1
-
-    ws.merge_cells(f"A{row}:C{row}")
-    ws[f"A{row}"] = "Totals"
-    ws[f"A{row}"].font = Font(bold=True)
-    ws[f"A{row}"].alignment = Alignment(horizontal="right")
-    ws[f"D{row}"] = data.total_receipts
-    ws[f"D{row}"].font = Font(bold=True)
-    ws[f"E{row}"] = data.total_payments
-    ws[f"E{row}"].font = Font(bold=True)
-    row += 1
-
-    ws.merge_cells(f"A{row}:E{row}")
-    ws[f"A{row}"] = f"Closing Balance: {data.closing_balance}"
-    ws[f"A{row}"].font = Font(bold=True)
-
-    # Columns width
-    ws.column_dimensions["A"].width = 12
-    ws.column_dimensions["C"].width = 40
-
-    buffer = io.BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-
-    return StreamingResponse(
-        buffer,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Content-Disposition": f"attachment; filename=CashBook_{from_date}_{to_date}.xlsx"
-        },
-    )
+    report = build_cash_book_export(db, current_user, from_date, to_date, counter_id)
+    return export_response(report, "excel")
 
 
 @router.get("/reports/cash-book/export/pdf")
@@ -2553,71 +2401,8 @@ def export_cash_book_pdf(
     current_user: User = Depends(get_current_user),
 ):
     """Export Cash Book to PDF"""
-    data = get_cash_book(from_date, to_date, counter_id, db, current_user)
-
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4))
-    elements = []
-    styles = getSampleStyleSheet()
-
-    title = Paragraph(f"Cash Book Report ({from_date} to {to_date})", styles["Title"])
-    elements.append(title)
-    elements.append(Spacer(1, 0.2 * inch))
-
-    elements.append(
-        Paragraph(f"<b>Opening Balance:</b> ₹{data.opening_balance:,.2f}", styles["Normal"])
-    )
-    elements.append(Spacer(1, 0.2 * inch))
-
-    table_data = [["Date", "Entry No", "Narration", "Receipt", "Payment", "Balance"]]
-    for entry in data.entries:
-        table_data.append(
-            [
-                str(entry.date),
-                entry.entry_number,
-                Paragraph(entry.narration[:40], styles["Normal"]),
-                f"{entry.receipt_amount:,.2f}",
-                f"{entry.payment_amount:,.2f}",
-                f"{entry.running_balance:,.2f}",
-            ]
-        )
-
-    # Total Row
-    table_data.append(
-        [
-            "",
-            "",
-            "Totals",
-            f"{data.total_receipts:,.2f}",
-            f"{data.total_payments:,.2f}",
-            f"{data.closing_balance:,.2f}",
-        ]
-    )
-
-    t = Table(
-        table_data, colWidths=[1.2 * inch, 1.2 * inch, 3 * inch, 1.2 * inch, 1.2 * inch, 1.5 * inch]
-    )
-    t.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("ALIGN", (3, 0), (-1, -1), "RIGHT"),  # Amounts right aligned
-                ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
-            ]
-        )
-    )
-    elements.append(t)
-
-    doc.build(elements)
-    buffer.seek(0)
-
-    return StreamingResponse(
-        buffer,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename=CashBook_{from_date}_{to_date}.pdf"},
-    )
+    report = build_cash_book_export(db, current_user, from_date, to_date, counter_id)
+    return export_response(report, "pdf")
 
 
 @router.get("/reports/bank-book/export/excel")
@@ -2629,70 +2414,8 @@ def export_bank_book_excel(
     current_user: User = Depends(get_current_user),
 ):
     """Export Bank Book to Excel"""
-    data = get_bank_book(account_id, from_date, to_date, db, current_user)
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Bank Book"
-
-    ws.merge_cells("A1:G1")
-    ws["A1"] = f"BANK BOOK: {data.account_name} ({data.bank_name or 'Bank'})"
-    ws["A1"].font = Font(bold=True, size=14)
-    ws["A1"].alignment = Alignment(horizontal="center")
-
-    ws["A2"] = f"Period: {from_date} to {to_date}"
-    ws["A3"] = f"Account No: {data.account_number or 'N/A'}"
-    ws["A4"] = f"Opening Balance: {data.opening_balance}"
-    ws["A4"].font = Font(bold=True)
-
-    headers = ["Date", "Entry No", "Narration", "Cheque No", "Deposit", "Withdrawal", "Balance"]
-    row = 6
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=row, column=col)
-        cell.value = header
-        cell.font = Font(bold=True)
-        cell.border = Border(bottom=Side(style="thin"))
-    row += 1
-
-    for entry in data.entries:
-        ws.cell(row=row, column=1, value=entry.date)
-        ws.cell(row=row, column=2, value=entry.entry_number)
-        ws.cell(row=row, column=3, value=entry.narration)
-        ws.cell(row=row, column=4, value=entry.cheque_number or "-")
-        ws.cell(row=row, column=5, value=entry.deposit_amount)
-        ws.cell(row=row, column=6, value=entry.withdrawal_amount)
-        ws.cell(row=row, column=7, value=entry.running_balance)
-        row += 1
-
-    ws.merge_cells(f"A{row}:D{row}")
-    ws[f"A{row}"] = "Totals"
-    ws[f"A{row}"].font = Font(bold=True)
-    ws[f"A{row}"].alignment = Alignment(horizontal="right")
-    ws[f"E{row}"] = data.total_deposits
-    ws[f"E{row}"].font = Font(bold=True)
-    ws[f"F{row}"] = data.total_withdrawals
-    ws[f"F{row}"].font = Font(bold=True)
-    row += 1
-
-    ws.merge_cells(f"A{row}:F{row}")
-    ws[f"A{row}"] = f"Closing Balance: {data.closing_balance}"
-    ws[f"A{row}"].font = Font(bold=True)
-
-    # Columns width
-    ws.column_dimensions["A"].width = 12
-    ws.column_dimensions["C"].width = 40
-
-    buffer = io.BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-
-    return StreamingResponse(
-        buffer,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Content-Disposition": f"attachment; filename=BankBook_{from_date}_{to_date}.xlsx"
-        },
-    )
+    report = build_bank_book_export(db, current_user, account_id, from_date, to_date)
+    return export_response(report, "excel")
 
 
 @router.get("/reports/bank-book/export/pdf")
@@ -2704,70 +2427,8 @@ def export_bank_book_pdf(
     current_user: User = Depends(get_current_user),
 ):
     """Export Bank Book to PDF"""
-    data = get_bank_book(account_id, from_date, to_date, db, current_user)
-
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4))
-    elements = []
-    styles = getSampleStyleSheet()
-
-    title = Paragraph(f"Bank Book: {data.account_name} ({from_date} to {to_date})", styles["Title"])
-    elements.append(title)
-    elements.append(Spacer(1, 0.2 * inch))
-
-    elements.append(
-        Paragraph(f"<b>Opening Balance:</b> ₹{data.opening_balance:,.2f}", styles["Normal"])
-    )
-    elements.append(Spacer(1, 0.2 * inch))
-
-    table_data = [["Date", "Narration", "Cheque", "Deposit", "Withdrawal", "Balance"]]
-    for entry in data.entries:
-        table_data.append(
-            [
-                str(entry.date),
-                Paragraph(entry.narration[:30], styles["Normal"]),
-                entry.cheque_number or "-",
-                f"{entry.deposit_amount:,.2f}",
-                f"{entry.withdrawal_amount:,.2f}",
-                f"{entry.running_balance:,.2f}",
-            ]
-        )
-
-    table_data.append(
-        [
-            "",
-            "Totals",
-            "",
-            f"{data.total_deposits:,.2f}",
-            f"{data.total_withdrawals:,.2f}",
-            f"{data.closing_balance:,.2f}",
-        ]
-    )
-
-    t = Table(
-        table_data, colWidths=[1.2 * inch, 3.5 * inch, 1 * inch, 1.2 * inch, 1.2 * inch, 1.5 * inch]
-    )
-    t.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("ALIGN", (3, 0), (-1, -1), "RIGHT"),
-                ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
-            ]
-        )
-    )
-    elements.append(t)
-
-    doc.build(elements)
-    buffer.seek(0)
-
-    return StreamingResponse(
-        buffer,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename=BankBook_{from_date}_{to_date}.pdf"},
-    )
+    report = build_bank_book_export(db, current_user, account_id, from_date, to_date)
+    return export_response(report, "pdf")
 
 
 @router.get("/debug/account-transactions/{account_code}")
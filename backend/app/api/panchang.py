@@ -2,10 +2,10 @@
 Panchang API Endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from datetime import datetime, date
-from typing import Optional
+from typing import Optional, Tuple
 from pydantic import BaseModel
 
 from app.core.database import get_db
@@ -13,6 +13,12 @@ from app.core.security import get_current_user
 from app.models.user import User
 from app.models.panchang_display_settings import PanchangDisplaySettings
 from app.services.panchang_service import PanchangService
+from app.services.panchang_cache_service import (
+    DEFAULT_PREFILL_DAYS,
+    PanchangCacheService,
+    prefill_due,
+    prefill_panchang_cache_job,
+)
 
 router = APIRouter(prefix="/api/v1/panchang", tags=["panchang"])
 
@@ -22,11 +28,16 @@ panchang_service = PanchangService()
 
 @router.get("/today")
 def get_today_panchang(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
 ):
     """
     Get today's panchang data using Swiss Ephemeris with Lahiri Ayanamsa
     Provides accurate Vedic Panchang calculations based on temple's location
+
+    Served from the panchang day cache (calculated once per day and location);
+    the following days are pre-calculated in the background.
     """
     import traceback
     import logging
@@ -36,34 +47,23 @@ def get_today_panchang(
     try:
         # Get current date and time
         now = datetime.now()
-        logger.info(f"Calculating panchang for {now}")
 
-        # Get temple's panchang settings for location
-        panchang_settings = (
-            db.query(PanchangDisplaySettings)
-            .filter(PanchangDisplaySettings.temple_id == current_user.temple_id)
-            .first()
+        lat, lon, city = _get_temple_location(db, current_user.temple_id)
+
+        cache_service = PanchangCacheService(db, panchang_service)
+        panchang_data = cache_service.get_day(now.date(), lat, lon, city)
+
+        # Moon sign changes during the day - refresh it for the current time (one ephemeris call)
+        panchang_data["moon_sign"] = panchang_service.get_moon_sign(
+            panchang_service.get_julian_day(now)
         )
 
-        # Default to Bangalore if settings not found
-        if panchang_settings and panchang_settings.latitude and panchang_settings.longitude:
-            lat = float(panchang_settings.latitude)
-            lon = float(panchang_settings.longitude)
-            city = panchang_settings.city_name or "Bengaluru"
-            logger.info(f"Using panchang settings: {city} ({lat}, {lon})")
-        else:
-            # Fallback to Bangalore
-            lat = 12.9716
-            lon = 77.5946
-            city = "Bengaluru"
-            logger.info(f"Using default location: {city} ({lat}, {lon})")
-
-        # Calculate real panchang using Swiss Ephemeris with temple's location
-        logger.info("Starting panchang calculation...")
-        panchang_data = panchang_service.calculate_panchang(now, lat, lon, city)
-        logger.info("Panchang calculation completed successfully")
-
-        # Return calculated panchang data
+        # Keep the rolling window filled ahead of time
+        if prefill_due(lat, lon, now.date()):
+            background_tasks.add_task(
+                prefill_panchang_cache_job, now.date(), DEFAULT_PREFILL_DAYS, lat, lon, city
+            )
+
         return panchang_data
 
     except Exception as e:
@@ -82,6 +82,51 @@ def get_today_panchang(
         )
 
 
+@router.post("/cache/prefill")
+def prefill_panchang_cache(
+    background_tasks: BackgroundTasks,
+    days_ahead: int = Query(DEFAULT_PREFILL_DAYS, ge=1, le=400),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Pre-calculate the panchang cache for the temple location
+    Admin/Manager only - runs in the background
+    """
+    if current_user.role not in ["admin", "temple_manager"] and not current_user.is_superuser:
+        raise HTTPException(status_code=403, detail="Only admins can trigger pre-calculation")
+
+    lat, lon, city = _get_temple_location(db, current_user.temple_id)
+    start_date = date.today()
+    background_tasks.add_task(prefill_panchang_cache_job, start_date, days_ahead, lat, lon, city)
+
+    return {
+        "success": True,
+        "message": f"Panchang pre-calculation scheduled for {days_ahead} days",
+        "start_date": start_date.isoformat(),
+        "location": {"city": city, "latitude": lat, "longitude": lon},
+    }
+
+
+def _get_temple_location(db: Session, temple_id: Optional[int]) -> Tuple[float, float, str]:
+    """Temple's panchang location from display settings (defaults to Bengaluru)"""
+    panchang_settings = (
+        db.query(PanchangDisplaySettings)
+        .filter(PanchangDisplaySettings.temple_id == temple_id)
+        .first()
+    )
+
+    if panchang_settings and panchang_settings.latitude and panchang_settings.longitude:
+        return (
+            float(panchang_settings.latitude),
+            float(panchang_settings.longitude),
+            panchang_settings.city_name or "Bengaluru",
+        )
+
+    # Fallback to Bangalore
+    return 12.9716, 77.5946, "Bengaluru"
+
+
 class KundliRequest(BaseModel):
     birth_datetime: str
     latitude: float
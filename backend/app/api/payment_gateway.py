@@ -22,6 +22,8 @@ from app.models.accounting import (
     Account,
 )
 from app.services.payment_gateway import payment_gateway_service
+from app.services.numbering_service import next_gateway_receipt_number
+from app.services.seva_capacity_service import reserve_seva_slot
 from pydantic import BaseModel, Field
 
 router = APIRouter(prefix="/api/v1/payments", tags=["payment-gateway"])
@@ -139,22 +141,10 @@ def create_payment_order(
     else:
         receipt_prefix = f"PAY/{year}/"
 
-    # Get last receipt number
-    last_donation = (
-        db.query(Donation)
-        .filter(Donation.receipt_number.like(f"{receipt_prefix}%"))
-        .order_by(Donation.id.desc())
-        .first()
-    )
-
-    if last_donation and last_donation.receipt_number:
-        try:
-            last_num = int(last_donation.receipt_number.split("/")[-1])
-            receipt_number = f"{receipt_prefix}{last_num + 1:04d}"
-        except:
-            receipt_number = f"{receipt_prefix}0001"
-    else:
-        receipt_number = f"{receipt_prefix}0001"
+    # Reserve the receipt number now - the order may be paid (and the donation
+    # created) long after this request, so the number is committed at once
+    receipt_number = next_gateway_receipt_number(db, receipt_prefix)
+    db.commit()
 
     # Prepare notes for Razorpay
     notes = {
@@ -293,18 +283,29 @@ def verify_payment(
             except:
                 pass
 
+        # Online bookings count against the same per-day capacity as counter bookings
+        try:
+            slot_free = reserve_seva_slot(db, request.seva_id, booking_date)
+        except ValueError:
+            db.rollback()
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Seva not found")
+        if not slot_free:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="No slots available for this seva on the selected date",
+            )
+
         # Create seva booking
         seva_booking = SevaBooking(
-            temple_id=current_user.temple_id,
             devotee_id=request.devotee_id,
             seva_id=request.seva_id,
+            user_id=current_user.id,
             booking_date=booking_date,
             amount_paid=amount,
             payment_method="online",
-            payment_status="paid",
-            transaction_id=request.razorpay_payment_id,
-            notes=request.notes,
-            created_by=current_user.id,
+            payment_reference=request.razorpay_payment_id,
+            admin_notes=request.notes,
         )
         db.add(seva_booking)
         db.flush()
@@ -457,16 +457,64 @@ def get_seva_schedule(
 # EXPORT ENDPOINTS
 # ==========================================
 
-from fastapi.responses import StreamingResponse
-import io
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from app.services.export_service import (
+    ExportColumn,
+    ExportReport,
+    ExportSection,
+    date_param,
+    export_response,
+    register_export,
+)
+
+
+@register_export("seva_detailed")
+def build_detailed_seva_export(
+    db: Session,
+    current_user: User,
+    from_date=None,
+    to_date=None,
+    status: Optional[str] = None,
+    seva_id: Optional[int] = None,
+) -> ExportReport:
+    """Detailed Seva Report as an export report"""
+    from_date, to_date = date_param(from_date), date_param(to_date)
+    if not from_date or not to_date:
+        raise ValueError("from_date and to_date are required")
+    data = get_detailed_seva_report(from_date, to_date, status, seva_id, db, current_user)
+    return ExportReport(
+        title=f"DETAILED SEVA REPORT ({from_date} to {to_date})",
+        filename=f"SevaReport_{from_date}_{to_date}",
+        sheet_title="Seva Report",
+        landscape=True,
+        sections=[
+            ExportSection(
+                [
+                    ExportColumn("Receipt Date", 13, "date"),  # When money was received
+                    ExportColumn("Seva Date", 13, "date"),  # When seva will be performed
+                    ExportColumn("Receipt No", 15),
+                    ExportColumn("Seva Name", 30),
+                    ExportColumn("Devotee", 25),
+                    ExportColumn("Mobile", 14),
+                    ExportColumn("Amount", 13, "amount"),
+                    ExportColumn("Status", 12),
+                ],
+                (
+                    [
+                        item.receipt_date,
+                        item.booking_date,
+                        item.receipt_number,
+                        item.seva_name,
+                        item.devotee_name,
+                        item.devotee_mobile or "-",
+                        item.amount,
+                        item.status,
+                    ]
+                    for item in data.sevas
+                ),
+                totals=["", "", "", "", "", "Total Amount", data.total_amount, ""],
+            )
+        ],
+    )
 
 
 @router.get("/sevas/detailed/export/excel")
@@ -479,72 +527,8 @@ def export_detailed_seva_excel(
     current_user: User = Depends(get_current_user),
 ):
     """Export Detailed Seva Report to Excel"""
-    data = get_detailed_seva_report(from_date, to_date, status, seva_id, db, current_user)
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Seva Report"
-
-    ws.merge_cells("A1:H1")
-    ws["A1"] = f"DETAILED SEVA REPORT ({from_date} to {to_date})"
-    ws["A1"].font = Font(bold=True, size=14)
-    ws["A1"].alignment = Alignment(horizontal="center")
-
-    headers = [
-        "Receipt Date",
-        "Seva Date",
-        "Receipt No",
-        "Seva Name",
-        "Devotee",
-        "Mobile",
-        "Amount",
-        "Status",
-    ]
-    row = 3
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=row, column=col)
-        cell.value = header
-        cell.font = Font(bold=True)
-        cell.border = Border(bottom=Side(style="thin"))
-    row += 1
-
-    for item in data.sevas:
-        ws.cell(
-            row=row, column=1, value=item.receipt_date
-        )  # Receipt date (when money was received)
-        ws.cell(
-            row=row, column=2, value=item.booking_date
-        )  # Seva date (when seva will be performed)
-        ws.cell(row=row, column=3, value=item.receipt_number)
-        ws.cell(row=row, column=4, value=item.seva_name)
-        ws.cell(row=row, column=5, value=item.devotee_name)
-        ws.cell(row=row, column=6, value=item.devotee_mobile or "-")
-        ws.cell(row=row, column=7, value=item.amount)
-        ws.cell(row=row, column=8, value=item.status)
-        row += 1
-
-    ws.merge_cells(f"A{row}:F{row}")
-    ws[f"A{row}"] = "Total Amount"
-    ws[f"A{row}"].font = Font(bold=True)
-    ws[f"A{row}"].alignment = Alignment(horizontal="right")
-    ws[f"G{row}"] = data.total_amount
-    ws[f"G{row}"].font = Font(bold=True)
-
-    # Column width adjustment
-    ws.column_dimensions["D"].width = 30
-    ws.column_dimensions["E"].width = 25
-
-    buffer = io.BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-
-    return StreamingResponse(
-        buffer,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Content-Disposition": f"attachment; filename=SevaReport_{from_date}_{to_date}.xlsx"
-        },
-    )
+    report = build_detailed_seva_export(db, current_user, from_date, to_date, status, seva_id)
+    return export_response(report, "excel")
 
 
 @router.get("/sevas/detailed/export/pdf")
@@ -557,59 +541,5 @@ def export_detailed_seva_pdf(
     current_user: User = Depends(get_current_user),
 ):
     """Export Detailed Seva Report to PDF"""
-    data = get_detailed_seva_report(from_date, to_date, status, seva_id, db, current_user)
-
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4))
-    elements = []
-    styles = getSampleStyleSheet()
-
-    title = Paragraph(f"Seva Report ({from_date} to {to_date})", styles["Title"])
-    elements.append(title)
-    elements.append(Spacer(1, 0.2 * inch))
-
-    table_data = [
-        ["Receipt Date", "Seva Date", "Receipt", "Seva Name", "Devotee", "Amount", "Status"]
-    ]
-    for item in data.sevas:
-        table_data.append(
-            [
-                str(item.receipt_date),  # Receipt date (when money was received)
-                str(item.booking_date),  # Seva date (when seva will be performed)
-                item.receipt_number,
-                Paragraph(item.seva_name[:30], styles["Normal"]),
-                Paragraph(item.devotee_name[:25], styles["Normal"]),
-                f"{item.amount:,.2f}",
-                item.status,
-            ]
-        )
-
-    table_data.append(["", "", "", "", "Total", f"{data.total_amount:,.2f}", ""])
-
-    t = Table(
-        table_data,
-        colWidths=[1.2 * inch, 1.2 * inch, 1.5 * inch, 3 * inch, 2 * inch, 1.2 * inch, 1.2 * inch],
-    )
-    t.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("ALIGN", (4, 0), (4, -1), "RIGHT"),
-                ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
-            ]
-        )
-    )
-    elements.append(t)
-
-    doc.build(elements)
-    buffer.seek(0)
-
-    return StreamingResponse(
-        buffer,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"attachment; filename=SevaReport_{from_date}_{to_date}.pdf"
-        },
-    )
+    report = build_detailed_seva_export(db, current_user, from_date, to_date, status, seva_id)
+    return export_response(report, "pdf")
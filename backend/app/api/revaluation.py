@@ -21,6 +21,7 @@ from app.models.accounting import (
     JournalEntryStatus,
     TransactionType,
 )
+from app.services.numbering_service import next_journal_entry_number
 
 router = APIRouter(prefix="/api/v1/assets/revaluation", tags=["revaluation"])
 
@@ -135,23 +136,7 @@ def create_revaluation(
 
     # Create journal entry
     year = revaluation_data.revaluation_date.year
-    prefix = f"JE/{year}/"
-    last_entry = (
-        db.query(JournalEntry)
-        .filter(JournalEntry.temple_id == temple_id, JournalEntry.entry_number.like(f"{prefix}%"))
-        .order_by(JournalEntry.id.desc())
-        .first()
-    )
-
-    new_num = 1
-    if last_entry:
-        try:
-            last_num = int(last_entry.entry_number.split("/")[-1])
-            new_num = last_num + 1
-        except:
-            pass
-
-    entry_number = f"{prefix}{new_num:04d}"
+    entry_number = next_journal_entry_number(db, temple_id, year)
     entry_date = datetime.combine(revaluation_data.revaluation_date, datetime.min.time())
 
     # Get current revaluation reserve balance
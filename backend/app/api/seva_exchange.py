@@ -22,6 +22,7 @@ from app.schemas.seva_exchange import (
     BookingSummary,
     ExchangeRequestStatus as SchemaStatus
 )
+from app.services.seva_capacity_service import holds_slot, release_slot, reserve_slot
 
 router = APIRouter(prefix="/api/v1/seva-exchange-requests", tags=["seva-exchange"])
 
@@ -340,6 +341,13 @@ def approve_or_reject_exchange(
         original_date_a = booking_a.booking_date
         original_date_b = booking_b.booking_date
         
+        # Move the held slots with the bookings (no-op when both are the same seva)
+        if booking_a.seva_id != booking_b.seva_id:
+            for booking, new_date in ((booking_a, original_date_b), (booking_b, original_date_a)):
+                if holds_slot(booking.status):
+                    release_slot(db, booking.seva_id, booking.booking_date)
+                    reserve_slot(db, booking.seva_id, new_date)
+
         # Swap dates
         booking_a.booking_date = original_date_b
         booking_b.booking_date = original_date_a
@@ -6,7 +6,6 @@ Handles temple sevas/poojas/archanas
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_
 from typing import List, Optional
 from datetime import date, datetime, timedelta
 from pydantic import BaseModel
@@ -14,11 +13,9 @@ import io
 
 from app.core.database import get_db
 from app.core.security import get_current_user
-from app.core.auto_setup import is_standalone_mode
 from app.models.user import User
 from app.models.seva import Seva, SevaBooking, SevaCategory, SevaAvailability, SevaBookingStatus
 from app.models.devotee import Devotee
-from app.models.temple import Temple
 from app.models.accounting import (
     Account,
     JournalEntry,
@@ -36,6 +33,25 @@ from app.schemas.seva import (
     SevaBookingResponse,
 )
 from app.services.printer import get_print_queue
+from app.services.seva_capacity_service import (
+    booked_slots,
+    holds_slot,
+    release_slot,
+    reserve_slot,
+)
+from app.services.seva_availability_service import (
+    availability_type,
+    booking_counts,
+    month_grid,
+    seva_calendar,
+)
+from app.services.journal_posting_service import get_account_by_code
+from app.services.receipt_pdf_service import (
+    get_receipt_template,
+    render_seva_receipt,
+    seva_receipt_data,
+)
+from app.services.numbering_service import next_journal_entry_number, next_seva_receipt_number
 from app.constants.hindu_constants import GOTHRAS, NAKSHATRAS, RASHIS
 
 router = APIRouter(prefix="/api/v1/sevas", tags=["sevas"])
@@ -221,14 +237,7 @@ def post_seva_to_accounting(db: Session, booking: SevaBooking, temple_id: int):
             )
             if not debit_account:
                 # Fallback to hardcoded code if helper doesn't find account
-                debit_account = (
-                    db.query(Account)
-                    .filter(
-                        Account.temple_id == temple_id,
-                        Account.account_code == "11001",  # Cash in Hand - Counter
-                    )
-                    .first()
-                )
+                debit_account = get_account_by_code(db, temple_id, "11001")  # Cash in Hand - Counter
         elif payment_method_upper in [
             "UPI",
             "ONLINE",
@@ -246,11 +255,7 @@ def post_seva_to_accounting(db: Session, booking: SevaBooking, temple_id: int):
                 bank_account_id=getattr(booking, "bank_account_id", None),
             )
             if not debit_account and fallback_code:
-                debit_account = (
-                    db.query(Account)
-                    .filter(Account.temple_id == temple_id, Account.account_code == fallback_code)
-                    .first()
-                )
+                debit_account = get_account_by_code(db, temple_id, fallback_code)
             if not debit_account:
                 print(
                     f"  WARNING: No bank account found for payment method {payment_method}. Please create a bank account in Bank Account Management."
@@ -261,11 +266,7 @@ def post_seva_to_accounting(db: Session, booking: SevaBooking, temple_id: int):
                 db, temple_id, payment_method_upper, hundi=False
             )
             if not debit_account:
-                debit_account = (
-                    db.query(Account)
-                    .filter(Account.temple_id == temple_id, Account.account_code == "11001")
-                    .first()
-                )
+                debit_account = get_account_by_code(db, temple_id, "11001")
 
         # Check if this is an advance booking
         # Receipt date = booking.created_at.date() (system-generated, cannot be changed)
@@ -279,11 +280,7 @@ def post_seva_to_accounting(db: Session, booking: SevaBooking, temple_id: int):
         if is_advance_booking:
             # For advance bookings, always credit Advance Seva Booking (21003)
             credit_account_code = "21003"  # Advance Seva Booking
-            credit_account = (
-                db.query(Account)
-                .filter(Account.temple_id == temple_id, Account.account_code == credit_account_code)
-                .first()
-            )
+            credit_account = get_account_by_code(db, temple_id, credit_account_code)
 
             if credit_account:
                 print(
@@ -304,13 +301,7 @@ def post_seva_to_accounting(db: Session, booking: SevaBooking, temple_id: int):
             # Fallback: Use 42002 - Seva Income (General) as default
             if not credit_account:
                 credit_account_code = "42002"  # Seva Income - General
-                credit_account = (
-                    db.query(Account)
-                    .filter(
-                        Account.temple_id == temple_id, Account.account_code == credit_account_code
-                    )
-                    .first()
-                )
+                credit_account = get_account_by_code(db, temple_id, credit_account_code)
 
                 if credit_account:
                     print(
@@ -347,33 +338,7 @@ def post_seva_to_accounting(db: Session, booking: SevaBooking, temple_id: int):
 
         # Generate entry number first
         year = booking.booking_date.year
-        prefix = f"JE/{year}/"
-
-        # Get last entry number for this year
-        # Use load_only to avoid integrity_hash column if it doesn't exist
-        from sqlalchemy.orm import load_only
-
-        last_entry = (
-            db.query(JournalEntry)
-            .options(load_only(JournalEntry.id, JournalEntry.entry_number, JournalEntry.temple_id))
-            .filter(
-                JournalEntry.temple_id == temple_id, JournalEntry.entry_number.like(f"{prefix}%")
-            )
-            .order_by(JournalEntry.id.desc())
-            .first()
-        )
-
-        if last_entry:
-            # Extract number and increment
-            try:
-                last_num = int(last_entry.entry_number.split("/")[-1])
-                new_num = last_num + 1
-            except:
-                new_num = 1
-        else:
-            new_num = 1
-
-        entry_number = f"{prefix}{new_num:04d}"
+        entry_number = next_journal_entry_number(db, temple_id, year)
 
         # Entry date should be receipt date (when money was received), not booking date
         # Receipt date = booking.created_at.date() (system-generated, cannot be changed)
@@ -529,6 +494,11 @@ def list_sevas(
         # It's a string (from raw SQL query)
         return str(value).lower() if value else None
 
+    # Bookings of the day for all sevas with a daily limit, in one query
+    day_counts = booking_counts(
+        db, [seva.id for seva in sevas if seva.max_bookings_per_day], check_date, check_date
+    )
+
     result = []
     for seva in sevas:
         try:
@@ -579,17 +549,7 @@ def list_sevas(
             # Check booking availability
             bookings_available = None
             if seva.max_bookings_per_day:
-                bookings_count = (
-                    db.query(SevaBooking)
-                    .filter(
-                        SevaBooking.seva_id == seva.id,
-                        SevaBooking.booking_date == check_date,
-                        SevaBooking.status.in_(
-                            [SevaBookingStatus.PENDING, SevaBookingStatus.CONFIRMED]
-                        ),
-                    )
-                    .count()
-                )
+                bookings_count = day_counts.get((seva.id, check_date), 0)
                 bookings_available = max(0, seva.max_bookings_per_day - bookings_count)
 
             # Create response object
@@ -949,102 +909,40 @@ def get_available_dates(
     if not seva.is_active:
         raise HTTPException(status_code=400, detail="Seva is not active")
 
-    # Normalize availability
-    availability_str = str(seva.availability).lower()
-    if hasattr(seva.availability, "value"):
-        availability_str = seva.availability.value.lower()
-
-    # Calculate date range
-    start_date = date.today()
-    end_date = start_date + timedelta(weeks=weeks_ahead)
-
-    available_dates = []
-    current_date = start_date
-
-    day_names = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
-
-    while current_date <= end_date:
-        day_of_week = (current_date.weekday() + 1) % 7  # 0=Sunday, 6=Saturday
-
-        # Check if seva is available on this day
-        is_available_day = True
-        if availability_str == "specific_day":
-            is_available_day = day_of_week == seva.specific_day
-        elif availability_str == "except_day":
-            # Check multiple excluded days (except_days) or single excluded day (except_day for backward compatibility)
-            except_days_list = []
-            if hasattr(seva, "except_days") and seva.except_days:
-                import json
-
-                if isinstance(seva.except_days, str):
-                    try:
-                        except_days_list = json.loads(seva.except_days)
-                    except json.JSONDecodeError:
-                        except_days_list = []
-                elif isinstance(seva.except_days, list):
-                    except_days_list = seva.except_days
-            # Also check legacy except_day field for backward compatibility
-            if (
-                hasattr(seva, "except_day")
-                and seva.except_day is not None
-                and seva.except_day not in except_days_list
-            ):
-                except_days_list.append(seva.except_day)
-
-            is_available_day = day_of_week not in except_days_list if except_days_list else True
-        elif availability_str == "weekday":
-            is_available_day = day_of_week >= 1 and day_of_week <= 5
-        elif availability_str == "weekend":
-            is_available_day = day_of_week == 0 or day_of_week == 6
-        # 'daily' and 'festival_only' are always available (subject to max bookings)
-
-        if is_available_day:
-            # Check advance booking limit (only if advance_booking_days is set)
-            days_ahead = (current_date - start_date).days
-            if seva.advance_booking_days is None or days_ahead <= seva.advance_booking_days:
-                # Count existing bookings for this date
-                existing_bookings = (
-                    db.query(SevaBooking)
-                    .filter(
-                        SevaBooking.seva_id == seva_id,
-                        SevaBooking.booking_date == current_date,
-                        SevaBooking.status.in_(
-                            [SevaBookingStatus.PENDING, SevaBookingStatus.CONFIRMED]
-                        ),
-                    )
-                    .count()
-                )
-
-                max_bookings = seva.max_bookings_per_day if seva.max_bookings_per_day else 999
-                available_slots = max(0, max_bookings - existing_bookings)
-                is_available = available_slots > 0
-
-                available_dates.append(
-                    {
-                        "date": current_date.isoformat(),
-                        "day_of_week": day_names[day_of_week],
-                        "day_number": day_of_week,
-                        "available_slots": available_slots,
-                        "max_slots": max_bookings,
-                        "booked_slots": existing_bookings,
-                        "is_available": is_available,
-                        "time_slot": seva.time_slot,
-                    }
-                )
-
-        current_date += timedelta(days=1)
-
     return {
         "seva_id": seva_id,
         "seva_name": seva.name_english,
-        "availability_type": availability_str,
+        "availability_type": availability_type(seva),
         "specific_day": seva.specific_day,
         "max_bookings_per_day": seva.max_bookings_per_day,
         "advance_booking_days": seva.advance_booking_days,
-        "available_dates": available_dates,
+        "available_dates": seva_calendar(db, seva, weeks_ahead),
     }
 
 
+@router.get("/availability/month")
+def get_month_availability(
+    year: int = Query(..., ge=2000, le=2100),
+    month: int = Query(..., ge=1, le=12),
+    seva_ids: Optional[List[int]] = Query(None, description="Sevas to include (default: all active)"),
+    category: Optional[SevaCategory] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """Booking grid of all (or the given) active sevas for one month
+
+    One entry per seva with one cell per day: whether the seva is performed,
+    booked slots, available slots and whether it can still be booked.
+    """
+    query = db.query(Seva).filter(Seva.is_active == True)
+    if seva_ids:
+        query = query.filter(Seva.id.in_(seva_ids))
+    if category:
+        query = query.filter(Seva.category == category)
+
+    return month_grid(db, query.order_by(Seva.id).all(), year, month)
+
+
 # ===== SEVA BOOKINGS =====
 
 
@@ -1252,74 +1150,19 @@ def create_booking(
                 detail=f"Seva not available on {day_names[day_of_week]}. This seva is not performed on: {', '.join(excluded_day_names)}",
             )
 
-    # Check max bookings per day
-    if seva.max_bookings_per_day:
-        existing_bookings = (
-            db.query(SevaBooking)
-            .filter(
-                SevaBooking.seva_id == seva.id,
-                SevaBooking.booking_date == booking_data.booking_date,
-                SevaBooking.status.in_([SevaBookingStatus.PENDING, SevaBookingStatus.CONFIRMED]),
-            )
-            .count()
+    # Claim a slot (atomic, so concurrent counters cannot overbook); released
+    # again if anything below fails and the transaction is rolled back
+    if not reserve_slot(db, seva.id, booking_data.booking_date, seva.max_bookings_per_day):
+        existing_bookings = booked_slots(db, seva.id, booking_data.booking_date)
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=f"No slots available for this date. Maximum {seva.max_bookings_per_day} booking(s) allowed per day. Already booked: {existing_bookings}/{seva.max_bookings_per_day}",
         )
 
-        if existing_bookings >= seva.max_bookings_per_day:
-            available_slots = seva.max_bookings_per_day - existing_bookings
-            raise HTTPException(
-                status_code=400,
-                detail=f"No slots available for this date. Maximum {seva.max_bookings_per_day} booking(s) allowed per day. Already booked: {existing_bookings}/{seva.max_bookings_per_day}",
-            )
-
-    # Generate receipt number - sequential serial number format (SEV000001, SEV000002, etc.)
-    # In standalone mode, use simple "SEV" prefix (no temple-specific prefix needed)
-    receipt_prefix = "SEV"
-
-    # Filter by receipt prefix pattern
-    # In standalone mode, don't filter by temple (single temple environment)
-    # In multi-tenant mode, filter through seva relationship if needed
-    booking_filter = [
-        SevaBooking.receipt_number.isnot(None),
-        SevaBooking.receipt_number.like(f"{receipt_prefix}%"),
-    ]
-
-    # In multi-tenant mode, filter by temple through seva relationship
-    if not is_standalone_mode() and current_user.temple_id:
-        seva_ids = db.query(Seva.id).filter(Seva.temple_id == current_user.temple_id).all()
-        if seva_ids:
-            seva_id_list = [s[0] for s in seva_ids]
-            booking_filter.append(SevaBooking.seva_id.in_(seva_id_list))
-
-    last_booking = (
-        db.query(SevaBooking).filter(and_(*booking_filter)).order_by(SevaBooking.id.desc()).first()
-    )
-
-    if last_booking and last_booking.receipt_number:
-        # Extract the number part from the last receipt (e.g., SEV000001 -> 1, SEV000123 -> 123)
-        try:
-            last_num_str = last_booking.receipt_number.replace("SEV", "").strip()
-            # Handle both old format (timestamp-based like SEV202512180951133) and new format (serial like SEV000001)
-            if (
-                last_num_str.isdigit() and len(last_num_str) <= 6
-            ):  # Simple serial number (SEV000001 to SEV999999)
-                last_num = int(last_num_str)
-            elif (
-                last_num_str.isdigit() and len(last_num_str) > 10
-            ):  # Old timestamp format - use booking ID
-                # For old format, use the maximum booking ID + 1 to continue sequence
-                max_booking = db.query(SevaBooking).order_by(SevaBooking.id.desc()).first()
-                last_num = max_booking.id if max_booking else 0
-            else:
-                # Fallback to booking ID
-                last_num = last_booking.id
-            new_num = last_num + 1
-        except (ValueError, AttributeError):
-            # Fallback: use count of bookings + 1
-            new_num = (db.query(SevaBooking).count() or 0) + 1
-    else:
-        new_num = 1
-
-    receipt_number = f"{receipt_prefix}{str(new_num).zfill(6)}"  # SEV000001, SEV000002, etc.
+    # Sequential receipt number (SEV000001, SEV000002, ...) from the shared
+    # receipt counter - allocated atomically, so concurrent bookings never clash
+    receipt_number = next_seva_receipt_number(db)
 
     # Create booking (but don't commit yet - wait for accounting)
     try:
@@ -1400,7 +1243,22 @@ def update_booking(
     if current_user.role != "admin" and booking.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to update this booking")
 
-    for key, value in booking_data.dict(exclude_unset=True).items():
+    changes = booking_data.dict(exclude_unset=True)
+    new_date = changes.get("booking_date") or booking.booking_date
+    new_status = changes.get("status") or booking.status
+    held, holds = holds_slot(booking.status), holds_slot(new_status)
+    if holds and (not held or new_date != booking.booking_date):
+        seva = db.query(Seva).filter(Seva.id == booking.seva_id).first()
+        max_per_day = seva.max_bookings_per_day if seva else None
+        if not reserve_slot(db, booking.seva_id, new_date, max_per_day):
+            db.rollback()
+            raise HTTPException(status_code=400, detail="No slots available for this date")
+        if held:
+            release_slot(db, booking.seva_id, booking.booking_date)
+    elif held and not holds:
+        release_slot(db, booking.seva_id, booking.booking_date)
+
+    for key, value in changes.items():
         setattr(booking, key, value)
 
     booking.updated_at = datetime.utcnow()
@@ -1425,6 +1283,9 @@ def cancel_booking(
     if current_user.role != "admin" and booking.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to cancel this booking")
 
+    if holds_slot(booking.status):
+        release_slot(db, booking.seva_id, booking.booking_date)
+
     booking.status = SevaBookingStatus.CANCELLED
     booking.cancelled_at = datetime.utcnow()
     booking.cancellation_reason = reason
@@ -1575,6 +1436,17 @@ def approve_reschedule(
         raise HTTPException(status_code=400, detail="No reschedule request found")
 
     if approve:
+        # Move the slot to the new date before changing the booking
+        if holds_slot(booking.status) and booking.reschedule_requested_date != booking.booking_date:
+            seva = db.query(Seva).filter(Seva.id == booking.seva_id).first()
+            max_per_day = seva.max_bookings_per_day if seva else None
+            if not reserve_slot(db, booking.seva_id, booking.reschedule_requested_date, max_per_day):
+                db.rollback()
+                raise HTTPException(
+                    status_code=400, detail="No slots available on the requested date"
+                )
+            release_slot(db, booking.seva_id, booking.booking_date)
+
         # Approve: Update booking date
         booking.booking_date = booking.reschedule_requested_date
         booking.reschedule_approved = True
@@ -1798,34 +1670,7 @@ def process_refund(
             if debit_account and credit_account:
                 # Generate entry number
                 year = datetime.now().year
-                prefix = f"JE/{year}/"
-                from sqlalchemy.orm import load_only
-
-                last_entry = (
-                    db.query(JournalEntry)
-                    .options(
-                        load_only(
-                            JournalEntry.id, JournalEntry.entry_number, JournalEntry.temple_id
-                        )
-                    )
-                    .filter(
-                        JournalEntry.temple_id == temple_id,
-                        JournalEntry.entry_number.like(f"{prefix}%"),
-                    )
-                    .order_by(JournalEntry.id.desc())
-                    .first()
-                )
-
-                if last_entry:
-                    try:
-                        last_num = int(last_entry.entry_number.split("/")[-1])
-                        new_num = last_num + 1
-                    except:
-                        new_num = 1
-                else:
-                    new_num = 1
-
-                entry_number = f"{prefix}{new_num:04d}"
+                entry_number = next_journal_entry_number(db, temple_id, year)
 
                 # Create journal entry for refund
                 refund_entry = JournalEntry(
@@ -1916,74 +1761,11 @@ def get_refund_status(
     }
 
 
-def _number_to_words(n):
-    """Convert number to words (simple implementation)"""
-    ones = ["", "One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine"]
-    tens = ["", "", "Twenty", "Thirty", "Forty", "Fifty", "Sixty", "Seventy", "Eighty", "Ninety"]
-    teens = [
-        "Ten",
-        "Eleven",
-        "Twelve",
-        "Thirteen",
-        "Fourteen",
-        "Fifteen",
-        "Sixteen",
-        "Seventeen",
-        "Eighteen",
-        "Nineteen",
-    ]
-
-    if n == 0:
-        return "Zero"
-
-    def convert_hundreds(num):
-        result = ""
-        if num >= 100:
-            result += ones[num // 100] + " Hundred "
-            num %= 100
-        if num >= 20:
-            result += tens[num // 10] + " "
-            num %= 10
-        elif num >= 10:
-            result += teens[num - 10] + " "
-            return result
-        if num > 0:
-            result += ones[num] + " "
-        return result
-
-    result = ""
-    if n >= 10000000:  # Crores
-        result += convert_hundreds(n // 10000000) + "Crore "
-        n %= 10000000
-    if n >= 100000:  # Lakhs
-        result += convert_hundreds(n // 100000) + "Lakh "
-        n %= 100000
-    if n >= 1000:  # Thousands
-        result += convert_hundreds(n // 1000) + "Thousand "
-        n %= 1000
-    if n > 0:
-        result += convert_hundreds(n)
-
-    return result.strip()
-
-
 def _generate_seva_receipt_pdf(booking: SevaBooking, db: Session, temple_id: int = None):
     """
     Helper function to generate PDF receipt buffer for a seva booking
     Similar to donation receipts but customized for seva bookings
     """
-    from reportlab.lib.pagesizes import A4
-    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import inch
-    from reportlab.lib import colors
-    from reportlab.lib.enums import TA_CENTER
-    import requests
-    import os
-
-    # Get temple info
-    temple = None
-    temple_logo_path = None
     # Get temple_id from parameter, or from booking's devotee/user
     if not temple_id:
         if booking.devotee and hasattr(booking.devotee, "temple_id"):
@@ -1991,194 +1773,8 @@ def _generate_seva_receipt_pdf(booking: SevaBooking, db: Session, temple_id: int
         elif booking.user and hasattr(booking.user, "temple_id"):
             temple_id = booking.user.temple_id
 
-    if temple_id:
-        temple = db.query(Temple).filter(Temple.id == temple_id).first()
-        if temple and temple.logo_url:
-            try:
-                if temple.logo_url.startswith("http"):
-                    response = requests.get(temple.logo_url, timeout=5)
-                    if response.status_code == 200:
-                        temple_logo_path = io.BytesIO(response.content)
-                elif os.path.exists(temple.logo_url):
-                    temple_logo_path = temple.logo_url
-            except:
-                temple_logo_path = None
-
-    # Get devotee and seva info
-    devotee = booking.devotee if hasattr(booking, "devotee") else None
-    seva = booking.seva if hasattr(booking, "seva") else None
-
-    # Ensure seva is loaded - if not, try to load it
-    if not seva and hasattr(booking, "seva_id") and booking.seva_id:
-        from app.models.seva import Seva
-
-        seva = db.query(Seva).filter(Seva.id == booking.seva_id).first()
-
-    # Create PDF
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5 * inch, bottomMargin=0.5 * inch)
-    elements = []
-
-    styles = getSampleStyleSheet()
-
-    # Title style
-    title_style = ParagraphStyle(
-        "ReceiptTitle",
-        parent=styles["Heading1"],
-        fontSize=20,
-        textColor=colors.HexColor("#FF9933"),
-        spaceAfter=12,
-        alignment=TA_CENTER,
-        fontName="Helvetica-Bold",
-    )
-
-    # Header style
-    header_style = ParagraphStyle(
-        "ReceiptHeader",
-        parent=styles["Normal"],
-        fontSize=14,
-        textColor=colors.black,
-        alignment=TA_CENTER,
-        spaceAfter=6,
-    )
-
-    # Temple header
-    if temple:
-        if temple_logo_path:
-            try:
-                logo = Image(temple_logo_path, width=1.2 * inch, height=1.2 * inch)
-                logo.hAlign = "CENTER"
-                elements.append(logo)
-                elements.append(Spacer(1, 0.1 * inch))
-            except:
-                pass
-
-        if temple.name:
-            elements.append(Paragraph(temple.name, title_style))
-
-        if temple.address:
-            elements.append(Paragraph(temple.address, header_style))
-
-        if temple.phone:
-            elements.append(Paragraph(f"Phone: {temple.phone}", styles["Normal"]))
-
-        if temple.email:
-            elements.append(Paragraph(f"Email: {temple.email}", styles["Normal"]))
-
-        elements.append(Spacer(1, 0.2 * inch))
-        elements.append(Paragraph("_" * 80, styles["Normal"]))
-        elements.append(Spacer(1, 0.2 * inch))
-
-    # Receipt title
-    elements.append(Paragraph("SEVA BOOKING RECEIPT", title_style))
-    elements.append(Spacer(1, 0.2 * inch))
-
-    # Receipt details table
-    # Receipt Date / Booking Date = when the booking was made (created_at.date())
-    # Seva Date = when the seva will be performed (booking_date)
-    receipt_date = booking.created_at.date() if booking.created_at else None
-    receipt_data = [
-        ["Receipt Number:", booking.receipt_number or f"SEV{booking.id}"],
-        ["Receipt Date:", receipt_date.strftime("%d-%m-%Y") if receipt_date else ""],
-        ["Seva Date:", booking.booking_date.strftime("%d-%m-%Y") if booking.booking_date else ""],
-        ["Seva Time:", booking.booking_time or "All Day"],
-        ["Seva Name:", seva.name_english if seva else "N/A"],
-        ["Devotee Name:", devotee.name if devotee else "N/A"],
-        ["Phone:", devotee.phone if devotee else "N/A"],
-        ["Address:", devotee.address if devotee and devotee.address else "N/A"],
-        ["Payment Mode:", booking.payment_method.upper() if booking.payment_method else "Cash"],
-        ["Amount Paid:", f"₹ {booking.amount_paid:,.2f}"],
-    ]
-
-    # Add additional booking details if available
-    if booking.gotra:
-        receipt_data.append(["Gotra:", booking.gotra])
-    if booking.nakshatra:
-        receipt_data.append(["Nakshatra:", booking.nakshatra])
-    if booking.rashi:
-        receipt_data.append(["Rashi:", booking.rashi])
-    if booking.special_request:
-        receipt_data.append(["Special Request:", booking.special_request])
-    if booking.payment_method == "UPI" and booking.upi_reference_number:
-        receipt_data.append(["UPI Reference:", booking.upi_reference_number])
-    if booking.payment_method == "Cheque" and booking.cheque_number:
-        receipt_data.append(["Cheque Number:", booking.cheque_number])
-        if booking.cheque_bank_name:
-            receipt_data.append(["Bank Name:", booking.cheque_bank_name])
-    if booking.payment_method == "Online" and booking.utr_number:
-        receipt_data.append(["UTR Number:", booking.utr_number])
-
-    receipt_table = Table(receipt_data, colWidths=[2.5 * inch, 4 * inch])
-    receipt_table.setStyle(
-        TableStyle(
-            [
-                ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
-                ("FONTNAME", (1, 0), (1, -1), "Helvetica"),
-                ("FONTSIZE", (0, 0), (-1, -1), 11),
-                ("ALIGN", (0, 0), (0, -1), "LEFT"),
-                ("ALIGN", (1, 0), (1, -1), "LEFT"),
-                ("VALIGN", (0, 0), (-1, -1), "TOP"),
-                ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
-                ("TOPPADDING", (0, 0), (-1, -1), 8),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ]
-        )
-    )
-
-    elements.append(receipt_table)
-    elements.append(Spacer(1, 0.3 * inch))
-
-    # Amount in words
-    amount_words = f"Rupees {_number_to_words(int(booking.amount_paid))} Only"
-    elements.append(Paragraph(f"<b>Amount in Words:</b> {amount_words}", styles["Normal"]))
-    elements.append(Spacer(1, 0.3 * inch))
-
-    # Booking status note
-    status_note = ""
-    if booking.status == SevaBookingStatus.PENDING:
-        status_note = "This booking is pending approval."
-    elif booking.status == SevaBookingStatus.CONFIRMED:
-        status_note = "This booking is confirmed. Please arrive on time."
-    elif booking.status == SevaBookingStatus.COMPLETED:
-        status_note = "This seva has been completed."
-    elif booking.status == SevaBookingStatus.CANCELLED:
-        status_note = "This booking has been cancelled."
-
-    if status_note:
-        elements.append(Paragraph(f"<b>Status:</b> {status_note}", styles["Normal"]))
-        elements.append(Spacer(1, 0.2 * inch))
-
-    # Footer
-    footer_style = ParagraphStyle(
-        "ReceiptFooter",
-        parent=styles["Normal"],
-        fontSize=9,
-        textColor=colors.grey,
-        alignment=TA_CENTER,
-    )
-
-    elements.append(Spacer(1, 0.5 * inch))
-    elements.append(Paragraph("_" * 80, styles["Normal"]))
-    elements.append(Spacer(1, 0.1 * inch))
-
-    if temple and temple.authorized_signatory_name:
-        elements.append(
-            Paragraph(f"Authorized Signatory: {temple.authorized_signatory_name}", styles["Normal"])
-        )
-        if temple.authorized_signatory_designation:
-            elements.append(Paragraph(temple.authorized_signatory_designation, styles["Normal"]))
-
-    elements.append(Spacer(1, 0.2 * inch))
-    elements.append(
-        Paragraph(f"Generated on {datetime.now().strftime('%d-%m-%Y %H:%M:%S')}", footer_style)
-    )
-    elements.append(Paragraph("MandirMitra Temple Management System", footer_style))
-
-    # Build PDF
-    doc.build(elements)
-    buffer.seek(0)
-
-    return buffer
+    template = get_receipt_template(db, temple_id)
+    return io.BytesIO(render_seva_receipt(template, seva_receipt_data(booking)))
 
 
 @router.get("/bookings/{booking_id}/receipt/pdf")
@@ -2339,23 +1935,7 @@ def transfer_advance_booking_to_income(
 
     # Generate entry number
     year = booking.booking_date.year
-    prefix = f"JE/{year}/"
-    last_entry = (
-        db.query(JournalEntry)
-        .filter(JournalEntry.temple_id == temple_id, JournalEntry.entry_number.like(f"{prefix}%"))
-        .order_by(JournalEntry.id.desc())
-        .first()
-    )
-
-    new_num = 1
-    if last_entry and last_entry.entry_number:
-        try:
-            last_num = int(last_entry.entry_number.split("/")[-1])
-            new_num = last_num + 1
-        except ValueError:
-            pass  # Fallback to 1 if parsing fails
-
-    entry_number = f"{prefix}{new_num:04d}"
+    entry_number = next_journal_entry_number(db, temple_id, year)
 
     journal_entry = JournalEntry(
         temple_id=temple_id,
@@ -2523,31 +2103,7 @@ def _transfer_advance_bookings_batch_internal(db: Session, temple_id: int, creat
             entry_date = datetime.combine(booking.booking_date, datetime.min.time())
 
             year = booking.booking_date.year
-            prefix = f"JE/{year}/"
-            from sqlalchemy.orm import load_only
-
-            last_entry = (
-                db.query(JournalEntry)
-                .options(
-                    load_only(JournalEntry.id, JournalEntry.entry_number, JournalEntry.temple_id)
-                )
-                .filter(
-                    JournalEntry.temple_id == booking_temple_id,
-                    JournalEntry.entry_number.like(f"{prefix}%"),
-                )
-                .order_by(JournalEntry.id.desc())
-                .first()
-            )
-
-            new_num = 1
-            if last_entry and last_entry.entry_number:
-                try:
-                    last_num = int(last_entry.entry_number.split("/")[-1])
-                    new_num = last_num + 1
-                except ValueError:
-                    pass
-
-            entry_number = f"{prefix}{new_num:04d}"
+            entry_number = next_journal_entry_number(db, booking_temple_id, year)
 
             journal_entry = JournalEntry(
                 temple_id=booking_temple_id,
@@ -2739,31 +2295,7 @@ def transfer_advance_bookings_batch(
             entry_date = datetime.combine(booking.booking_date, datetime.min.time())
 
             year = booking.booking_date.year
-            prefix = f"JE/{year}/"
-            from sqlalchemy.orm import load_only
-
-            last_entry = (
-                db.query(JournalEntry)
-                .options(
-                    load_only(JournalEntry.id, JournalEntry.entry_number, JournalEntry.temple_id)
-                )
-                .filter(
-                    JournalEntry.temple_id == booking_temple_id,
-                    JournalEntry.entry_number.like(f"{prefix}%"),
-                )
-                .order_by(JournalEntry.id.desc())
-                .first()
-            )
-
-            new_num = 1
-            if last_entry and last_entry.entry_number:
-                try:
-                    last_num = int(last_entry.entry_number.split("/")[-1])
-                    new_num = last_num + 1
-                except ValueError:
-                    pass
-
-            entry_number = f"{prefix}{new_num:04d}"
+            entry_number = next_journal_entry_number(db, booking_temple_id, year)
 
             journal_entry = JournalEntry(
                 temple_id=booking_temple_id,
@@ -16,6 +16,7 @@ from app.models.upi_banking import UpiPayment, UpiPaymentPurpose
 from app.models.devotee import Devotee
 from app.models.donation import Donation
 from app.models.seva import SevaBooking
+from app.services.seva_capacity_service import reserve_seva_slot
 from app.models.inkind_sponsorship import Sponsorship
 from app.models.accounting import (
     Account,
@@ -232,14 +233,25 @@ def quick_log_payment(
 
     # If SEVA purpose and seva_id provided, create seva booking
     if payment_data.payment_purpose == UpiPaymentPurpose.SEVA and payment_data.seva_id:
+        # Online bookings count against the same per-day capacity as counter bookings
+        try:
+            slot_free = reserve_seva_slot(db, payment_data.seva_id, date.today())
+        except ValueError:
+            db.rollback()
+            raise HTTPException(status_code=404, detail="Seva not found")
+        if not slot_free:
+            db.rollback()
+            raise HTTPException(status_code=400, detail="No slots available for this seva today")
+
         seva_booking = SevaBooking(
-            temple_id=current_user.temple_id,
             devotee_id=payment_data.devotee_id,
             seva_id=payment_data.seva_id,
+            user_id=current_user.id,
             booking_date=date.today(),
             amount_paid=payment_data.amount,
             payment_method="upi",
-            payment_status="paid",
+            sender_upi_id=sender_upi_id,
+            upi_reference_number=payment_data.upi_reference_number,
         )
         db.add(seva_booking)
         db.flush()
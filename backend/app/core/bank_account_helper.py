@@ -114,11 +114,9 @@ def get_cash_account_for_payment(
     else:
         account_code = '11001'  # Cash in Hand - Counter (no leading zero)
     
-    account = db.query(Account).filter(
-        Account.temple_id == temple_id,
-        Account.account_code == account_code
-    ).first()
-    
-    return account
+    # Cached code lookup - counter receipts resolve the same account every time
+    from app.services.journal_posting_service import get_account_by_code
+
+    return get_account_by_code(db, temple_id, account_code)
 
 
@@ -100,6 +100,31 @@ class Settings(BaseSettings):
     BACKUP_ENABLED: bool = True
     BACKUP_PATH: str = "backups"
     BACKUP_RETENTION_DAYS: int = 30
+    # Tables loaded in parallel by a restore (SQLite always loads one at a time)
+    RESTORE_WORKERS: int = 4
+
+    # Document numbering
+    # 1 = allocate receipt/voucher numbers inside the posting transaction (gapless).
+    # > 1 = each worker reserves blocks of this many numbers up front, so busy
+    # counters never wait on each other (numbers of unused blocks are skipped).
+    NUMBER_BLOCK_SIZE: int = 1
+
+    # Seconds an account code -> id lookup is cached per temple (journal posting)
+    ACCOUNT_CODE_CACHE_TTL: int = 300
+
+    # Seconds a compiled receipt PDF template (styles, header, logo) is cached per temple
+    RECEIPT_TEMPLATE_CACHE_TTL: int = 600
+
+    # Keep lifetime donation/booking figures per devotee in devotee_stats and
+    # serve devotee lists from it instead of aggregating donations and bookings
+    DEVOTEE_STATS_ENABLED: bool = False
+
+    # Keep per-month denomination totals of each hundi in
+    # hundi_monthly_denomination_totals and read whole months of hundi reports from it
+    HUNDI_MONTHLY_ROLLUP_ENABLED: bool = False
+
+    # Worker processes rendering bulk 80G certificates (1 = render in the job itself)
+    CERTIFICATE_PROCESSES: int = 4
 
     # Deployment mode helpers
     @property
@@ -106,6 +106,15 @@ def init_db():
     from app.models.seva import Seva, SevaBooking
     from app.models.accounting import Account, JournalEntry, JournalLine
     from app.models.panchang_display_settings import PanchangDisplaySettings
+    from app.models.panchang_cache import PanchangDayCache
+    from app.models.sacred_events_cache import SacredEventsCache
+    from app.models.background_job import BackgroundJob
+    from app.models.dashboard_rollup import DonationDailyTotal, SevaDailyTotal
+    from app.models.devotee_duplicate import DevoteeMatchKey, DevoteeDuplicateGroup
+    from app.models.devotee_stats import DevoteeStats
+    from app.models.devotee_search import DevoteeSearchIndex, DevoteeTag
+    from app.models.number_sequence import NumberSequence
+    from app.models.integrity_checkpoint import IntegrityCheckpoint
 
     from app.models.inventory import Store, Item, StockBalance, StockMovement
     from app.models.asset import Asset
@@ -117,6 +126,7 @@ def init_db():
         AssetDocument,
     )
     from app.models.hundi import HundiOpening, HundiMaster, HundiDenominationCount
+    from app.models.hundi_rollup import HundiMonthlyDenominationTotal
     from app.models.hr import (
         Employee,
         Department,
@@ -0,0 +1,73 @@
+"""
+Database Utilities
+Date coercion and portable insert-or-ignore / insert-or-add statements shared
+by the counter, rollup and snapshot services
+"""
+
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import Table, insert, update
+from sqlalchemy.exc import IntegrityError
+
+
+def as_day(value) -> Optional[date]:
+    """Calendar day of a date, datetime or ISO string (SQLite returns func.date() as text)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+def dialect_insert(dialect_name: str):
+    """INSERT construct with ON CONFLICT support for the dialect, or None"""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        return pg_insert
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+        return sqlite_insert
+    return None
+
+
+def insert_or_ignore(db, table: Table, values: Dict, keys: List[str]) -> None:
+    """
+    Insert a row unless one with the same `keys` exists - a concurrent caller
+    inserting the same row is not an error
+    """
+    dialect_ins = dialect_insert(db.get_bind().dialect.name)
+    if dialect_ins is not None:
+        db.execute(dialect_ins(table).values(**values).on_conflict_do_nothing(index_elements=keys))
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(table).values(**values))
+    except IntegrityError:
+        pass
+
+
+def insert_or_add(
+    connection, table: Table, values: Dict, increments: Dict, keys: List[str]
+) -> None:
+    """
+    Insert a row, or apply `increments` (column -> expression) to the row with
+    the same `keys`
+    """
+    dialect_ins = dialect_insert(connection.dialect.name)
+    if dialect_ins is not None:
+        connection.execute(
+            dialect_ins(table)
+            .values(**values)
+            .on_conflict_do_update(index_elements=keys, set_=increments)
+        )
+        return
+    result = connection.execute(
+        update(table).where(*(table.c[key] == values[key] for key in keys)).values(**increments)
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(table).values(**values))
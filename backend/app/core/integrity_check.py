@@ -7,16 +7,37 @@ Simple approach:
 2. Hash includes: transaction data + previous hash (creates chain)
 3. On startup, verify all hashes match
 4. If any hash doesn't match → Tampering detected!
+
+Verified stretches of the chain are recorded as signed checkpoints (last
+entry id, its hash). Startup only hashes entries after the newest valid
+checkpoint; a full re-verification runs as a background job.
 """
 
 import hashlib
+import hmac
 import json
 from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import literal_column, select, text
 from sqlalchemy.orm import Session
+
+from app.core.config import settings
 from app.models.accounting import JournalEntry
+from app.models.integrity_checkpoint import IntegrityCheckpoint
+
+INTEGRITY_JOB_TYPE = "journal_integrity_verification"
 
+INITIAL_HASH = "INITIAL"
 
-def calculate_integrity_hash(entry: JournalEntry, previous_hash: str = "INITIAL") -> str:
+# Entries hashed per query
+VERIFY_BATCH_SIZE = 1000
+
+# Entries between checkpoints written while verifying
+CHECKPOINT_EVERY = 10000
+
+
+def calculate_integrity_hash(entry: JournalEntry, previous_hash: str = INITIAL_HASH) -> str:
     """
     Calculate integrity hash for a journal entry
     
@@ -51,112 +72,271 @@ def calculate_integrity_hash(entry: JournalEntry, previous_hash: str = "INITIAL"
     return hashlib.sha256(data_string.encode('utf-8')).hexdigest()
 
 
-def verify_database_integrity(db: Session) -> tuple[bool, str]:
+def checkpoint_signature(last_entry_id: int, chain_hash: str, entries_verified: int) -> str:
+    """HMAC of a checkpoint's fields - only the application can write a valid one"""
+    message = f"{last_entry_id}|{chain_hash}|{entries_verified}"
+    return hmac.new(settings.SECRET_KEY.encode("utf-8"), message.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def latest_checkpoint(db: Session) -> Optional[IntegrityCheckpoint]:
+    """Newest checkpoint with a valid signature (forged ones are reported and skipped)"""
+    checkpoints = db.query(IntegrityCheckpoint).order_by(IntegrityCheckpoint.id.desc()).limit(10)
+    for checkpoint in checkpoints:
+        expected = checkpoint_signature(
+            checkpoint.last_entry_id, checkpoint.chain_hash, checkpoint.entries_verified
+        )
+        if hmac.compare_digest(checkpoint.signature, expected):
+            return checkpoint
+        print(f"⚠️  Ignoring integrity checkpoint {checkpoint.id}: invalid signature")
+    return None
+
+
+def save_checkpoint(
+    db: Session, last_entry_id: int, chain_hash: str, entries_verified: int, source: str
+) -> IntegrityCheckpoint:
+    checkpoint = IntegrityCheckpoint(
+        last_entry_id=last_entry_id,
+        chain_hash=chain_hash,
+        entries_verified=entries_verified,
+        signature=checkpoint_signature(last_entry_id, chain_hash, entries_verified),
+        source=source,
+    )
+    db.add(checkpoint)
+    return checkpoint
+
+
+def _integrity_column_missing(db: Session) -> Optional[str]:
+    """Why the chain can't be verified yet, or None when the integrity_hash column exists"""
+    # Use raw SQL to check if column exists - works with both SQLite and PostgreSQL
+    try:
+        if db.get_bind().dialect.name == "sqlite":
+            # SQLite: Check if column exists in table
+            result = db.execute(text("""
+                SELECT COUNT(*) as count 
+                FROM pragma_table_info('journal_entries') 
+                WHERE name = 'integrity_hash'
+            """))
+        else:
+            # PostgreSQL: Check information_schema
+            result = db.execute(text("""
+                SELECT COUNT(*) as count 
+                FROM information_schema.columns 
+                WHERE table_name = 'journal_entries' 
+                AND column_name = 'integrity_hash'
+            """))
+        if result.fetchone()[0] == 0:
+            return "ℹ️  Integrity hash column not yet added (run: python scripts/add_integrity_hash_column.py)"
+    except Exception as e:
+        # If check fails, assume column doesn't exist and skip gracefully
+        error_msg = str(e).lower()
+        if 'integrity_hash' in error_msg or 'does not exist' in error_msg or 'no such column' in error_msg:
+            return "ℹ️  Integrity hash column not yet added (run: python scripts/add_integrity_hash_column.py)"
+        # Some other error - log it but don't fail startup
+        print(f"⚠️  Warning: Could not check integrity_hash column: {e}")
+        return "ℹ️  Integrity check skipped (column check failed)"
+    return None
+
+
+# The column is added by a migration script and is not mapped on JournalEntry
+_HASH_COLUMN = literal_column("integrity_hash")
+
+_HASHED_COLUMNS = (
+    JournalEntry.id,
+    JournalEntry.entry_number,
+    JournalEntry.total_amount,
+    JournalEntry.narration,
+    JournalEntry.status,
+    JournalEntry.entry_date,
+    JournalEntry.created_by,
+    JournalEntry.created_at,
+)
+
+
+def _entry_batches(db: Session, after_id: int, batch_size: int) -> Iterator[list]:
+    """Hashed fields and stored hash of entries after after_id, keyset-paged by id"""
+    last_id = after_id
+    while True:
+        rows = db.execute(
+            select(*_HASHED_COLUMNS, _HASH_COLUMN.label("integrity_hash"))
+            .where(JournalEntry.id > last_id)
+            .order_by(JournalEntry.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def verify_chain(
+    db: Session,
+    after_id: int = 0,
+    previous_hash: str = INITIAL_HASH,
+    entries_before: int = 0,
+    source: str = "startup",
+    batch_size: int = VERIFY_BATCH_SIZE,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> Tuple[int, List[Dict]]:
     """
-    Verify database integrity on startup
-    
-    Checks:
-    1. All transaction hashes are correct (chain is unbroken)
-    2. No transactions are missing
-    
-    Returns: (is_valid, message)
+    Verify the hash chain from the entry after after_id, in streamed batches
+
+    Entries without a hash get one. A checkpoint is written every
+    CHECKPOINT_EVERY entries and at the end, for as long as no tampering has
+    been found.
+
+    Returns:
+        (entries verified, [tampered entry info])
     """
-    try:
-        # Check if integrity_hash column exists (graceful handling)
-        # Use raw SQL to check if column exists - works with both SQLite and PostgreSQL
-        try:
-            from sqlalchemy import text
-            if 'sqlite' in str(db.bind.url).lower():
-                # SQLite: Check if column exists in table
-                result = db.execute(text("""
-                    SELECT COUNT(*) as count 
-                    FROM pragma_table_info('journal_entries') 
-                    WHERE name = 'integrity_hash'
-                """))
-                count = result.fetchone()[0]
-            else:
-                # PostgreSQL: Check information_schema
-                result = db.execute(text("""
-                    SELECT COUNT(*) as count 
-                    FROM information_schema.columns 
-                    WHERE table_name = 'journal_entries' 
-                    AND column_name = 'integrity_hash'
-                """))
-                count = result.fetchone()[0]
-            
-            if count == 0:
-                return True, "ℹ️  Integrity hash column not yet added (run: python scripts/add_integrity_hash_column.py)"
-        except Exception as e:
-            # If check fails, assume column doesn't exist and skip gracefully
-            error_msg = str(e).lower()
-            if 'integrity_hash' in error_msg or 'does not exist' in error_msg or 'no such column' in error_msg:
-                return True, "ℹ️  Integrity hash column not yet added (run: python scripts/add_integrity_hash_column.py)"
-            # Some other error - log it but don't fail startup
-            print(f"⚠️  Warning: Could not check integrity_hash column: {e}")
-            return True, "ℹ️  Integrity check skipped (column check failed)"
-        
-        # Get all entries in order (by ID)
-        entries = db.query(JournalEntry).order_by(JournalEntry.id).all()
-        
-        if not entries:
-            return True, "✅ No transactions to verify"
-        
-        previous_hash = "INITIAL"
-        tampered_entries = []
-        
-        for entry in entries:
-            # Calculate expected hash
+    tampered = []
+    verified = since_checkpoint = 0
+    last_id = after_id
+    for rows in _entry_batches(db, after_id, batch_size):
+        missing = []
+        for entry in rows:
             expected_hash = calculate_integrity_hash(entry, previous_hash)
-            
-            # Check if hash matches
-            # Use getattr to safely access integrity_hash (column may not exist yet)
-            actual_hash = getattr(entry, 'integrity_hash', None)
+            actual_hash = entry.integrity_hash
             if not actual_hash:
                 # Missing hash - old entry without hash, generate and save it
-                # Only try to set if column exists
-                if hasattr(JournalEntry, 'integrity_hash'):
-                    try:
-                        entry.integrity_hash = expected_hash
-                        db.commit()
-                        db.refresh(entry)
-                        print(f"ℹ️  Generated missing hash for entry {entry.entry_number} (ID: {entry.id})")
-                    except (AttributeError, Exception):
-                        pass  # Column doesn't exist, skip
+                missing.append({"entry_id": entry.id, "hash": expected_hash})
             elif actual_hash != expected_hash:
                 # Hash doesn't match - TAMPERING DETECTED!
-                tampered_entries.append({
+                tampered.append({
                     'id': entry.id,
                     'entry_number': entry.entry_number,
                     'expected_hash': expected_hash[:16] + '...',
-                    'actual_hash': actual_hash[:16] + '...' if actual_hash else 'MISSING'
+                    'actual_hash': actual_hash[:16] + '...'
                 })
-            
             previous_hash = actual_hash or expected_hash
-        
-        if tampered_entries:
-            error_msg = (
-                "🚨 SECURITY ALERT: DATABASE TAMPERING DETECTED!\n\n"
-                f"Found {len(tampered_entries)} transaction(s) that have been modified:\n\n"
+            last_id = entry.id
+
+        if missing:
+            db.execute(
+                text("UPDATE journal_entries SET integrity_hash = :hash WHERE id = :entry_id"), missing
             )
-            for entry_info in tampered_entries:
-                error_msg += (
-                    f"  • Entry #{entry_info['entry_number']} (ID: {entry_info['id']})\n"
-                    f"    Expected: {entry_info['expected_hash']}\n"
-                    f"    Actual:   {entry_info['actual_hash']}\n\n"
+            print(f"ℹ️  Generated missing hashes for {len(missing)} entries")
+        verified += len(rows)
+        since_checkpoint += len(rows)
+        if not tampered and since_checkpoint >= CHECKPOINT_EVERY:
+            save_checkpoint(db, last_id, previous_hash, entries_before + verified, source)
+            since_checkpoint = 0
+        db.commit()
+        if on_progress:
+            on_progress(verified)
+
+    if not tampered and since_checkpoint:
+        save_checkpoint(db, last_id, previous_hash, entries_before + verified, source)
+        db.commit()
+    return verified, tampered
+
+
+def _tampering_message(tampered_entries: List[Dict]) -> str:
+    error_msg = (
+        "🚨 SECURITY ALERT: DATABASE TAMPERING DETECTED!\n\n"
+        f"Found {len(tampered_entries)} transaction(s) that have been modified:\n\n"
+    )
+    for entry_info in tampered_entries:
+        error_msg += (
+            f"  • Entry #{entry_info['entry_number']} (ID: {entry_info['id']})\n"
+            f"    Expected: {entry_info['expected_hash']}\n"
+            f"    Actual:   {entry_info['actual_hash']}\n\n"
+        )
+    error_msg += (
+        "⚠️  This indicates unauthorized modification of financial data.\n"
+        "Please contact administrator immediately.\n"
+        "Check audit_log.txt file for original transaction details."
+    )
+    return error_msg
+
+
+def verify_database_integrity(
+    db: Session, full: bool = False, on_progress: Optional[Callable[[int], None]] = None
+) -> tuple[bool, str]:
+    """
+    Verify database integrity (on startup: only entries added since the last checkpoint)
+    
+    Checks:
+    1. All transaction hashes are correct (chain is unbroken)
+    2. The entry of the last checkpoint still ends the verified chain
+    
+    With full=True the whole chain is re-verified from the first entry.
+    
+    Returns: (is_valid, message)
+    """
+    try:
+        skip_message = _integrity_column_missing(db)
+        if skip_message:
+            return True, skip_message
+
+        checkpoint = None if full else latest_checkpoint(db)
+        after_id, previous_hash, entries_before = 0, INITIAL_HASH, 0
+        if checkpoint:
+            anchor = db.execute(
+                select(_HASH_COLUMN).select_from(JournalEntry.__table__).where(
+                    JournalEntry.id == checkpoint.last_entry_id
                 )
-            error_msg += (
-                "⚠️  This indicates unauthorized modification of financial data.\n"
-                "Please contact administrator immediately.\n"
-                "Check audit_log.txt file for original transaction details."
+            ).first()
+            if anchor is None or anchor[0] != checkpoint.chain_hash:
+                return False, _tampering_message([{
+                    'id': checkpoint.last_entry_id,
+                    'entry_number': 'checkpoint',
+                    'expected_hash': checkpoint.chain_hash[:16] + '...',
+                    'actual_hash': (anchor[0] or 'MISSING')[:16] + '...' if anchor else 'DELETED',
+                }])
+            after_id = checkpoint.last_entry_id
+            previous_hash = checkpoint.chain_hash
+            entries_before = checkpoint.entries_verified
+
+        verified, tampered = verify_chain(
+            db,
+            after_id,
+            previous_hash,
+            entries_before,
+            source="full" if full else "startup",
+            on_progress=on_progress,
+        )
+        if tampered:
+            return False, _tampering_message(tampered)
+
+        if not entries_before and not verified:
+            return True, "✅ No transactions to verify"
+        if checkpoint:
+            return True, (
+                f"✅ Database integrity verified ({verified} new transactions checked, "
+                f"{entries_before} verified earlier)"
             )
-            return False, error_msg
-        
-        return True, f"✅ Database integrity verified ({len(entries)} transactions checked)"
+        return True, f"✅ Database integrity verified ({verified} transactions checked)"
     
     except Exception as e:
+        db.rollback()
         return False, f"❌ Integrity check failed: {str(e)}"
 
 
+def integrity_verification_job(job_id: int) -> None:
+    """Background task entry point - re-verifies the whole hash chain"""
+    from app.core.database import SessionLocal
+    from app.services.background_job_service import (
+        complete_job,
+        fail_job,
+        start_job,
+        update_progress,
+    )
+
+    db = SessionLocal()
+    try:
+        start_job(db, job_id, total=db.query(JournalEntry).count())
+
+        def progress(verified: int) -> None:
+            update_progress(db, job_id, verified, f"{verified} transactions verified")
+
+        is_valid, message = verify_database_integrity(db, full=True, on_progress=progress)
+        complete_job(db, job_id, {"is_valid": is_valid, "message": message})
+    except Exception as e:
+        print(f"⚠️  Integrity verification failed: {str(e)}")
+        fail_job(db, job_id, str(e))
+    finally:
+        db.close()
+
+
 def verify_audit_log_integrity(db: Session) -> tuple[bool, str]:
     """
     Verify audit log file matches database
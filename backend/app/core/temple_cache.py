@@ -0,0 +1,78 @@
+"""
+Per-temple in-process cache
+
+Values are built on first use for a temple and kept in memory. A temple's
+value is dropped after `ttl` seconds, so writes made by other worker
+processes are picked up, and as soon as a watched row of the temple is
+written through the ORM in this process - again when the writing session
+commits or rolls back, since a value rebuilt inside that transaction may
+have read the uncommitted (or rolled back) row.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+WRITE_EVENTS = ("after_insert", "after_update", "after_delete")
+
+
+class TempleCache:
+    """Values per temple - subclasses implement build()"""
+
+    def __init__(self, name: str, ttl: float):
+        self.ttl = ttl
+        self._values: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+        self._written_key = f"{name}_written_temples"
+        event.listen(Session, "after_commit", self._drop_written)
+        event.listen(Session, "after_soft_rollback", self._drop_written)
+
+    def build(self, db: Session, temple_id: int):
+        """Value of a temple (temple_id 0 = no temple)"""
+        raise NotImplementedError
+
+    def get(self, db: Session, temple_id: Optional[int]):
+        key = temple_id or 0
+        now = time.monotonic()
+        with self._lock:
+            cached = self._values.get(key)
+        if cached and now - cached[0] < self.ttl:
+            return cached[1]
+
+        value = self.build(db, key)
+        with self._lock:
+            self._values[key] = (now, value)
+        return value
+
+    def invalidate(self, temple_id: Optional[int] = None) -> None:
+        """Drop one temple's value, or all values"""
+        with self._lock:
+            if temple_id is None:
+                self._values.clear()
+            else:
+                self._values.pop(temple_id or 0, None)
+
+    def watch(
+        self,
+        model,
+        temple_of: Callable[[object], Optional[int]],
+        events: Iterable[str] = WRITE_EVENTS,
+    ) -> None:
+        """Invalidate a temple when one of its `model` rows is written"""
+
+        def written(mapper, connection, target):
+            temple_id = temple_of(target) or 0
+            self.invalidate(temple_id)
+            session = object_session(target)
+            if session is not None:
+                session.info.setdefault(self._written_key, set()).add(temple_id)
+
+        for name in events:
+            event.listen(model, name, written)
+
+    def _drop_written(self, session, *args):
+        for temple_id in session.info.pop(self._written_key, ()):
+            self.invalidate(temple_id)
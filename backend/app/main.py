@@ -35,6 +35,12 @@ from app.models.user import User
 from app.models.donation import Donation, DonationCategory
 from app.models.devotee import Devotee
 from app.models.panchang_display_settings import PanchangDisplaySettings
+from app.models.panchang_cache import PanchangDayCache
+from app.models.sacred_events_cache import SacredEventsCache
+from app.models.background_job import BackgroundJob
+from app.models.dashboard_rollup import DonationDailyTotal, SevaDailyTotal
+from app.models.devotee_duplicate import DevoteeMatchKey, DevoteeDuplicateGroup
+from app.models.number_sequence import NumberSequence
 from app.models.seva import Seva, SevaBooking
 from app.models.seva_exchange import SevaExchangeRequest
 from app.models.accounting import Account, JournalEntry, JournalLine
@@ -56,6 +62,7 @@ from app.models.inkind_sponsorship import (
 # DO NOT import BankReconciliation from app.models.upi_banking
 from app.models.upi_banking import UpiPayment, BankAccount, BankTransaction
 from app.models.hundi import HundiOpening, HundiDenominationCount, HundiMaster
+from app.models.hundi_rollup import HundiMonthlyDenominationTotal
 from app.models.inventory import Item, StockBalance, StockMovement, Store
 from app.models.asset import (
     Asset,
@@ -116,6 +123,7 @@ from app.api.inventory import router as inventory_router
 from app.api.inventory_additional import router as inventory_additional_router
 from app.api.inventory_alerts import router as inventory_alerts_router
 from app.api.monitoring import router as monitoring_router
+from app.api.exports import router as exports_router
 
 # Create FastAPI app
 app = FastAPI(
@@ -180,6 +188,7 @@ app.include_router(inventory_router)
 app.include_router(inventory_additional_router)
 app.include_router(inventory_alerts_router)
 app.include_router(monitoring_router)
+app.include_router(exports_router)
 
 
 # Initialize database on startup
@@ -208,6 +217,76 @@ async def startup_event():
         print(f"⚠️  Warning: Could not run integrity check: {str(e)}")
         # Don't fail startup if integrity check fails
 
+    # Backfill account balance snapshots on first start after upgrade
+    try:
+        from app.core.database import SessionLocal
+        from app.services.account_balance_service import ensure_account_balance_snapshots
+
+        db = SessionLocal()
+        try:
+            if ensure_account_balance_snapshots(db):
+                print("[OK] Account balance snapshots rebuilt from posted journal entries")
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"⚠️  Warning: Could not verify account balance snapshots: {str(e)}")
+
+    # Backfill dashboard donation/seva rollups on first start after upgrade
+    try:
+        from app.core.database import SessionLocal
+        from app.services.dashboard_rollup_service import ensure_dashboard_rollups
+
+        db = SessionLocal()
+        try:
+            if ensure_dashboard_rollups(db):
+                print("[OK] Dashboard rollups rebuilt from donations and seva bookings")
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"⚠️  Warning: Could not verify dashboard rollups: {str(e)}")
+
+    # Backfill devotee_stats when it has just been enabled
+    try:
+        from app.core.database import SessionLocal
+        from app.services.devotee_stats_service import ensure_devotee_stats
+
+        db = SessionLocal()
+        try:
+            if ensure_devotee_stats(db):
+                print("[OK] Devotee stats rebuilt from donations and seva bookings")
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"⚠️  Warning: Could not verify devotee stats: {str(e)}")
+
+    # Backfill the monthly hundi rollup when it has just been enabled
+    try:
+        from app.core.database import SessionLocal
+        from app.services.hundi_report_service import ensure_hundi_rollup
+
+        db = SessionLocal()
+        try:
+            if ensure_hundi_rollup(db):
+                print("[OK] Monthly hundi rollup rebuilt from denomination counts")
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"⚠️  Warning: Could not verify monthly hundi rollup: {str(e)}")
+
+    # Create the devotee search backend and backfill its index
+    try:
+        from app.core.database import SessionLocal
+        from app.services.devotee_search_service import ensure_devotee_search_index
+
+        db = SessionLocal()
+        try:
+            if ensure_devotee_search_index(db):
+                print("[OK] Devotee search index rebuilt")
+        finally:
+            db.close()
+    except Exception as e:
+        print(f"⚠️  Warning: Could not verify devotee search index: {str(e)}")
+
     # Create temple from configuration (for standalone packages)
     try:
         from app.core.setup_wizard import create_temple_from_config
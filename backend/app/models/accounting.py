@@ -12,7 +12,9 @@ from sqlalchemy import (
     Text,
     ForeignKey,
     Enum as SQLEnum,
+    Date,
     DateTime,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -234,3 +236,39 @@ class JournalLine(Base):
 
     def __repr__(self):
         return f"<JournalLine(account={self.account_id}, debit={self.debit_amount}, credit={self.credit_amount})>"
+
+
+class AccountBalanceSnapshot(Base):
+    """
+    Account Balance Snapshot - Posted debit/credit totals per account per day
+    Kept in sync with posted journal lines by app.services.account_balance_service,
+    so balance reports aggregate one row per account-day instead of every line
+    """
+
+    __tablename__ = "account_balance_snapshots"
+    __table_args__ = (
+        UniqueConstraint("account_id", "balance_date", name="uq_account_balance_snapshot_day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # References
+    temple_id = Column(Integer, ForeignKey("temples.id"), nullable=False, index=True)
+    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False, index=True)
+
+    # Day the movements belong to (date part of JournalEntry.entry_date)
+    balance_date = Column(Date, nullable=False, index=True)
+
+    # Posted movements for the day
+    debit_total = Column(Float, nullable=False, default=0.0)
+    credit_total = Column(Float, nullable=False, default=0.0)
+
+    # Running totals up to and including balance_date (opening balance lookups)
+    cumulative_debit = Column(Float, nullable=False, default=0.0)
+    cumulative_credit = Column(Float, nullable=False, default=0.0)
+
+    # Timestamps
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<AccountBalanceSnapshot(account={self.account_id}, date='{self.balance_date}', debit={self.debit_total}, credit={self.credit_total})>"
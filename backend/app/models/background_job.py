@@ -0,0 +1,66 @@
+"""
+Background Job Model
+Tracks long-running work started from the API (pre-calculations, bulk
+imports, exports, backups) so clients can poll status and progress
+"""
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Text,
+    DateTime,
+    ForeignKey,
+    JSON,
+    Enum as SQLEnum,
+)
+from datetime import datetime
+import enum
+
+from app.core.database import Base
+
+
+class BackgroundJobStatus(str, enum.Enum):
+    """Lifecycle of a background job"""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class BackgroundJob(Base):
+    """A queued or running background job and its progress"""
+
+    __tablename__ = "background_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # What the job does and for whom (temple_id is None for system-wide jobs)
+    job_type = Column(String(50), nullable=False, index=True)
+    temple_id = Column(Integer, ForeignKey("temples.id"), nullable=True, index=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=True)
+
+    # Status and progress
+    status = Column(
+        SQLEnum(BackgroundJobStatus),
+        nullable=False,
+        default=BackgroundJobStatus.PENDING,
+        index=True,
+    )
+    progress_current = Column(Integer, nullable=False, default=0)
+    progress_total = Column(Integer, nullable=False, default=0)
+    message = Column(String(255), nullable=True)
+
+    # Input parameters and outcome
+    params = Column(JSON, nullable=True)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<BackgroundJob(id={self.id}, type='{self.job_type}', status='{self.status}')>"
@@ -0,0 +1,58 @@
+"""
+Dashboard Rollup Models
+Per-temple, per-day totals of donations and seva bookings, kept current by
+a Session flush hook so the dashboard reads a handful of rows instead of
+aggregating the transaction tables on every refresh
+"""
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    Float,
+    Date,
+    DateTime,
+    UniqueConstraint,
+)
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class DonationDailyTotal(Base):
+    """Non-cancelled donations of one temple on one donation date"""
+
+    __tablename__ = "donation_daily_totals"
+    __table_args__ = (
+        UniqueConstraint("temple_id", "total_date", name="uq_donation_daily_total_day"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    temple_id = Column(Integer, nullable=False, default=0, index=True)  # 0 = no temple (standalone)
+    total_date = Column(Date, nullable=False, index=True)
+
+    amount = Column(Float, nullable=False, default=0.0)
+    count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<DonationDailyTotal(temple={self.temple_id}, date='{self.total_date}', amount={self.amount})>"
+
+
+class SevaDailyTotal(Base):
+    """Non-cancelled seva bookings of one temple, by the day they were booked (paid)"""
+
+    __tablename__ = "seva_daily_totals"
+    __table_args__ = (UniqueConstraint("temple_id", "total_date", name="uq_seva_daily_total_day"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    temple_id = Column(Integer, nullable=False, default=0, index=True)  # 0 = no temple (standalone)
+    total_date = Column(Date, nullable=False, index=True)
+
+    amount = Column(Float, nullable=False, default=0.0)
+    count = Column(Integer, nullable=False, default=0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SevaDailyTotal(temple={self.temple_id}, date='{self.total_date}', amount={self.amount})>"
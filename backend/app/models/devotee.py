@@ -3,12 +3,20 @@ Devotee Model - Devotee/CRM data
 """
 
 from sqlalchemy import Column, Integer, String, Boolean, Text, Date, ForeignKey
-from sqlalchemy.orm import relationship
-from datetime import datetime
+from sqlalchemy.orm import relationship, validates
+from datetime import date, datetime
+from typing import Optional
 
 from app.core.database import Base
 
 
+def month_day_ordinal(date_of_birth: Optional[date]) -> Optional[int]:
+    """Month-day ordinal of a birthday (month * 100 + day, e.g. 229 for 29 Feb)"""
+    if date_of_birth is None:
+        return None
+    return date_of_birth.month * 100 + date_of_birth.day
+
+
 class Devotee(Base):
     """Devotee/CRM data"""
 
@@ -45,6 +53,7 @@ class Devotee(Base):
 
     # Optional Details
     date_of_birth = Column(Date)
+    birth_month_day = Column(Integer, index=True)  # Kept in step with date_of_birth
     gothra = Column(String(100))
     nakshatra = Column(String(50))
     rashi = Column(String(50))
@@ -76,5 +85,10 @@ class Devotee(Base):
     donations = relationship("Donation", back_populates="devotee")
     family_head = relationship("Devotee", remote_side=[id], backref="family_members")
 
+    @validates("date_of_birth")
+    def _set_birth_month_day(self, key, value):
+        self.birth_month_day = month_day_ordinal(value)
+        return value
+
     def __repr__(self):
         return f"<Devotee(id={self.id}, name='{self.name}', phone='{self.phone}')>"
@@ -0,0 +1,72 @@
+"""
+Devotee Duplicate Models
+Blocking keys used to find likely duplicate devotees, and the candidate
+duplicate groups found by the deduplication job for the merge screen
+"""
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Float,
+    DateTime,
+    ForeignKey,
+    Index,
+    JSON,
+    Enum as SQLEnum,
+)
+from datetime import datetime
+import enum
+
+from app.core.database import Base
+
+
+class DuplicateGroupStatus(str, enum.Enum):
+    """Review state of a candidate duplicate group"""
+
+    OPEN = "open"  # Waiting for review
+    MERGED = "merged"  # Merged through /devotees/merge
+    DISMISSED = "dismissed"  # Reviewed - not duplicates
+
+
+class DevoteeMatchKey(Base):
+    """
+    One blocking key of one devotee (normalized phone, email or city + name)
+    Devotees sharing a key are the only ones compared with each other
+    """
+
+    __tablename__ = "devotee_match_keys"
+    __table_args__ = (Index("ix_devotee_match_keys_temple_key", "temple_id", "match_key"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    temple_id = Column(Integer, nullable=False, default=0)  # 0 = no temple (standalone)
+    devotee_id = Column(
+        Integer, ForeignKey("devotees.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    match_key = Column(String(160), nullable=False)
+
+    def __repr__(self):
+        return f"<DevoteeMatchKey(devotee={self.devotee_id}, key='{self.match_key}')>"
+
+
+class DevoteeDuplicateGroup(Base):
+    """Devotees that are probably the same person"""
+
+    __tablename__ = "devotee_duplicate_groups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    temple_id = Column(Integer, nullable=False, default=0, index=True)
+
+    devotee_ids = Column(JSON, nullable=False)  # Sorted list of devotee ids
+    score = Column(Float, nullable=False)  # Best pair score in the group (0-1)
+    reasons = Column(JSON)  # e.g. ["phone", "name_city"]
+
+    status = Column(
+        SQLEnum(DuplicateGroupStatus), default=DuplicateGroupStatus.OPEN, nullable=False, index=True
+    )
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<DevoteeDuplicateGroup(id={self.id}, devotees={self.devotee_ids}, status='{self.status}')>"
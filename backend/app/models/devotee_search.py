@@ -0,0 +1,52 @@
+"""
+Devotee Search Models
+Normalized search keys and tags of devotees, kept current by a Session flush
+hook so counter searches and tag filters use indexes instead of scanning
+devotees with ILIKE '%term%' and JSON string matches
+"""
+
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Index
+
+from app.core.database import Base
+
+
+class DevoteeSearchIndex(Base):
+    """
+    Search keys of one devotee
+    name_text: lower case words of the name (Kannada transliterated) and email
+    phonetic_text: phonetic code of each name word, e.g. "srnvs" for Srinivas
+    """
+
+    __tablename__ = "devotee_search_index"
+    __table_args__ = (
+        Index("ix_devotee_search_index_temple_phone", "temple_id", "phone_key"),
+        Index("ix_devotee_search_index_temple_phone_rev", "temple_id", "phone_reversed"),
+    )
+
+    devotee_id = Column(Integer, ForeignKey("devotees.id", ondelete="CASCADE"), primary_key=True)
+    temple_id = Column(Integer, nullable=False, default=0)  # 0 = no temple (standalone)
+
+    name_text = Column(Text, nullable=False, default="")
+    phonetic_text = Column(Text, nullable=False, default="")
+    phone_key = Column(String(20), nullable=True)  # Digits only, without country code
+    phone_reversed = Column(String(20), nullable=True)  # phone_key reversed, for suffix search
+
+    def __repr__(self):
+        return f"<DevoteeSearchIndex(devotee={self.devotee_id}, name='{self.name_text}')>"
+
+
+class DevoteeTag(Base):
+    """One tag of one devotee (mirrors the JSON list in devotees.tags)"""
+
+    __tablename__ = "devotee_tags"
+    __table_args__ = (Index("ix_devotee_tags_temple_tag", "temple_id", "tag"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    temple_id = Column(Integer, nullable=False, default=0)
+    devotee_id = Column(
+        Integer, ForeignKey("devotees.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    tag = Column(String(50), nullable=False)
+
+    def __repr__(self):
+        return f"<DevoteeTag(devotee={self.devotee_id}, tag='{self.tag}')>"
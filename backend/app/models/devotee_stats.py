@@ -0,0 +1,29 @@
+"""
+Devotee Stats Model
+Lifetime donation and booking figures per devotee, kept current by a Session
+flush hook (when settings.DEVOTEE_STATS_ENABLED) so devotee lists don't
+aggregate donations and bookings for every row they show
+"""
+
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class DevoteeStats(Base):
+    """Donations and seva bookings of one devotee"""
+
+    __tablename__ = "devotee_stats"
+
+    devotee_id = Column(Integer, ForeignKey("devotees.id", ondelete="CASCADE"), primary_key=True)
+
+    donation_total = Column(Float, nullable=False, default=0.0)
+    donation_count = Column(Integer, nullable=False, default=0)
+    booking_count = Column(Integer, nullable=False, default=0)
+    last_visit_date = Column(Date, nullable=True)  # Latest donation date or seva date
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<DevoteeStats(devotee={self.devotee_id}, donations={self.donation_count}, bookings={self.booking_count})>"
@@ -11,6 +11,7 @@ from sqlalchemy import (
     Text,
     Date,
     ForeignKey,
+    Index,
     Enum as SQLEnum,
     TypeDecorator,
 )
@@ -111,6 +112,8 @@ class Donation(Base):
     """Donation transactions"""
 
     __tablename__ = "donations"
+    # Keyset pagination of donation listings (temple, newest first)
+    __table_args__ = (Index("ix_donations_temple_date_id", "temple_id", "donation_date", "id"),)
 
     # Primary Key
     id = Column(Integer, primary_key=True, index=True)
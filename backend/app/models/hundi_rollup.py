@@ -0,0 +1,53 @@
+"""
+Hundi Rollup Model
+Per-temple, per-month denomination totals of each hundi, kept current by a
+Session flush hook (when settings.HUNDI_MONTHLY_ROLLUP_ENABLED) so hundi
+reports over whole months don't rescan every denomination count
+"""
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Float,
+    Date,
+    DateTime,
+    Index,
+    UniqueConstraint,
+)
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class HundiMonthlyDenominationTotal(Base):
+    """Notes/coins of one denomination counted from one hundi in one month"""
+
+    __tablename__ = "hundi_monthly_denomination_totals"
+    __table_args__ = (
+        UniqueConstraint(
+            "temple_id",
+            "month",
+            "hundi_code",
+            "denomination_value",
+            "denomination_type",
+            name="uq_hundi_monthly_denomination",
+        ),
+        Index("ix_hundi_monthly_temple_month", "temple_id", "month"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    temple_id = Column(Integer, nullable=False, default=0)  # 0 = no temple (standalone)
+    month = Column(Date, nullable=False)  # First day of the month of the scheduled opening date
+    hundi_code = Column(String(50), nullable=False)
+
+    denomination_value = Column(Float, nullable=False)
+    denomination_type = Column(String(20), nullable=False)  # "note" or "coin"
+
+    quantity = Column(Integer, nullable=False, default=0)
+    amount = Column(Float, nullable=False, default=0.0)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<HundiMonthlyDenominationTotal(hundi='{self.hundi_code}', month='{self.month}', denomination={self.denomination_value}, amount={self.amount})>"
@@ -0,0 +1,31 @@
+"""
+Integrity Checkpoint Model
+Signed record of how far the journal entry hash chain has been verified, so
+that verification can resume there instead of re-hashing the whole ledger
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class IntegrityCheckpoint(Base):
+    """Journal entries up to last_entry_id verified, ending in chain_hash"""
+
+    __tablename__ = "integrity_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    last_entry_id = Column(Integer, nullable=False)  # Last journal entry verified
+    chain_hash = Column(String(64), nullable=False)  # Its integrity hash - the chain up to it
+    entries_verified = Column(Integer, nullable=False, default=0)  # Entries in the chain up to it
+
+    # HMAC (SECRET_KEY) of the fields above - a checkpoint edited in the database is ignored
+    signature = Column(String(64), nullable=False)
+
+    source = Column(String(20), nullable=False, default="startup")  # startup / full
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<IntegrityCheckpoint(last_entry_id={self.last_entry_id}, entries={self.entries_verified})>"
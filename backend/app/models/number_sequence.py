@@ -0,0 +1,31 @@
+"""
+Number Sequence Model
+Last number handed out per temple, document series and period - backs
+receipt, voucher and journal entry numbering
+"""
+
+from sqlalchemy import Column, Integer, String, DateTime, UniqueConstraint
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class NumberSequence(Base):
+    """Counter of one numbering series (e.g. JE for 2025 of temple 3)"""
+
+    __tablename__ = "number_sequences"
+    __table_args__ = (UniqueConstraint("temple_id", "series", "period", name="uq_number_sequence"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    temple_id = Column(Integer, nullable=False, default=0)  # 0 = shared / no temple
+    series = Column(String(50), nullable=False)  # e.g. "JE", "DONATION", "HUNDI/H1"
+    period = Column(
+        String(10), nullable=False, default=""
+    )  # "2025", "2025-26" or "" (never resets)
+
+    last_value = Column(Integer, nullable=False, default=0)  # Last number allocated
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<NumberSequence(temple={self.temple_id}, series='{self.series}', period='{self.period}', last={self.last_value})>"
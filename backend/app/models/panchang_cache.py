@@ -0,0 +1,52 @@
+"""
+Panchang Day Cache Model
+Stores fully calculated panchang for a date and temple location so that
+dashboards and kiosks do not recompute Swiss Ephemeris data on every refresh
+"""
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    Date,
+    DateTime,
+    JSON,
+    UniqueConstraint,
+)
+from datetime import datetime
+
+from app.core.database import Base
+
+
+class PanchangDayCache(Base):
+    """Cached panchang for (date, rounded location, ayanamsa)"""
+
+    __tablename__ = "panchang_day_cache"
+    __table_args__ = (
+        UniqueConstraint(
+            "panchang_date", "lat_key", "lon_key", "ayanamsa", name="uq_panchang_day_cache_key"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    # Cache key
+    panchang_date = Column(Date, nullable=False, index=True)
+    lat_key = Column(Integer, nullable=False)  # Latitude rounded to 0.01 degree (x100)
+    lon_key = Column(Integer, nullable=False)  # Longitude rounded to 0.01 degree (x100)
+    ayanamsa = Column(String(20), nullable=False, default="LAHIRI")
+
+    # Calculation version - rows from an older calculation are recomputed
+    version = Column(Integer, nullable=False, default=1)
+
+    # Location label used for the calculation
+    city = Column(String(100), nullable=True)
+
+    # Full calculate_panchang() result
+    data = Column(JSON, nullable=False)
+
+    # Timestamps
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<PanchangDayCache(date='{self.panchang_date}', lat={self.lat_key}, lon={self.lon_key})>"
@@ -4,7 +4,7 @@ Stores pre-calculated important dates (Nakshatra, Ekadashi, Pradosha, etc.)
 for quick lookup by counter clerks
 """
 
-from sqlalchemy import Column, BigInteger, String, Date, DateTime, ForeignKey
+from sqlalchemy import Column, BigInteger, Integer, String, Date, DateTime, ForeignKey, UniqueConstraint
 from sqlalchemy.sql import func
 from datetime import date, datetime
 
@@ -15,9 +15,12 @@ class SacredEventsCache(Base):
     """Cache table for sacred events dates"""
     
     __tablename__ = "sacred_events_cache"
+    __table_args__ = (
+        UniqueConstraint("temple_id", "event_code", "event_date", name="uq_sacred_events_cache_event"),
+    )
     
-    # Primary Key
-    id = Column(BigInteger, primary_key=True, index=True, autoincrement=True)
+    # Primary Key (SQLite only auto-increments INTEGER primary keys)
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, index=True, autoincrement=True)
     
     # Temple (for multi-tenant support)
     temple_id = Column(BigInteger, ForeignKey("temples.id", ondelete="CASCADE"), nullable=True, index=True)
@@ -37,6 +40,10 @@ class SacredEventsCache(Base):
     valid_from = Column(Date, nullable=True)
     valid_to = Column(Date, nullable=True)
     
+    # Location/settings fingerprint the day was calculated with - days with a
+    # different fingerprint are recalculated by the pre-calculation job
+    calc_key = Column(String(40), nullable=True)
+    
     # Timestamps
     created_at = Column(DateTime, nullable=False, server_default=func.now())
     updated_at = Column(DateTime, nullable=False, server_default=func.now(), onupdate=func.now())
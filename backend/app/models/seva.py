@@ -15,6 +15,7 @@ from sqlalchemy import (
     Text,
     Enum as SQLEnum,
     TypeDecorator,
+    UniqueConstraint,
 )
 from sqlalchemy.orm import relationship, foreign
 from app.core.database import Base
@@ -250,3 +251,26 @@ class SevaBooking(Base):
         primaryjoin="SevaBooking.priest_id == foreign(User.id)",
         overlaps="user,reschedule_approved_by_user",
     )
+
+
+class SevaDayCapacity(Base):
+    """
+    Slots held on one seva on one date
+
+    Bookings claim a slot with a conditional UPDATE (booked < max) instead of
+    counting bookings, so concurrent counters cannot overbook. Rows are
+    created on first use, seeded from the bookings already on that date.
+    """
+
+    __tablename__ = "seva_day_capacity"
+    __table_args__ = (UniqueConstraint("seva_id", "booking_date", name="uq_seva_day_capacity_day"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    seva_id = Column(Integer, ForeignKey("sevas.id"), nullable=False, index=True)
+    booking_date = Column(Date, nullable=False)
+    booked = Column(Integer, nullable=False, default=0)  # Pending + confirmed bookings
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<SevaDayCapacity(seva={self.seva_id}, date='{self.booking_date}', booked={self.booked})>"
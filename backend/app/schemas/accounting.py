@@ -317,6 +317,43 @@ class JournalEntryCancel(BaseModel):
     cancellation_reason: str = Field(..., min_length=1)
 
 
+class JournalBatchLine(BaseModel):
+    """Journal line of a batch posting - account by id or by code"""
+
+    account_id: Optional[int] = None
+    account_code: Optional[str] = None
+    debit_amount: float = Field(0.0, ge=0)
+    credit_amount: float = Field(0.0, ge=0)
+    description: Optional[str] = None
+
+    @model_validator(mode="after")
+    def validate_account(self):
+        if self.account_id is None and not self.account_code:
+            raise ValueError("Either account_id or account_code is required")
+        return self
+
+
+class JournalBatchEntry(JournalEntryBase):
+    """One receipt of a batch posting"""
+
+    payment_mode: Optional[str] = None  # Counter receipts - may be consolidated
+    journal_lines: List[JournalBatchLine] = Field(..., min_items=2)
+
+
+class JournalBatchCreate(BaseModel):
+    """Schema for posting a batch of receipts"""
+
+    entries: List[JournalBatchEntry] = Field(..., min_items=1)
+    consolidate_counter_receipts: bool = False  # One voucher per day and payment mode
+
+
+class JournalBatchResponse(BaseModel):
+    """Journal entry id of each submitted entry, in order"""
+
+    entry_ids: List[int]
+    entries_created: int
+
+
 # ===== TRIAL BALANCE SCHEMA =====
 
 
@@ -369,6 +406,7 @@ class AccountLedgerResponse(BaseModel):
     opening_balance: float
     closing_balance: float
     entries: List[LedgerEntry]
+    next_cursor: Optional[str] = None  # Pass back as `cursor` to fetch the next page
 
 
 # ===== PROFIT & LOSS SCHEMA =====
@@ -0,0 +1,566 @@
+"""
+Account Balance Service
+Maintains per-account, per-day balance snapshots of posted journal lines
+and answers balance queries from them with grouped reads
+
+Snapshots are updated from a Session flush hook, so every code path that
+posts, cancels or edits journal entries (donations, sevas, hundi, manual
+vouchers, reversals, ...) keeps them current without extra calls.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import and_, case, event, func, insert, inspect, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.db_utils import as_day, insert_or_add
+from app.models.accounting import (
+    Account,
+    AccountBalanceSnapshot,
+    JournalEntry,
+    JournalEntryStatus,
+    JournalLine,
+)
+
+_PENDING_DELTAS_KEY = "account_balance_snapshot_deltas"
+
+
+# ===== SNAPSHOT MAINTENANCE =====
+
+
+def _collect_deltas(session: Session) -> Dict[Tuple[int, int, date], list]:
+    """
+    Work out how pending changes move posted balances
+
+    Each affected line contributes minus its stored amounts (if its entry is
+    posted in the database) and plus its in-memory amounts (if its entry is
+    posted after the flush). Untouched lines of untouched entries cancel
+    out, so only changed lines and lines of changed entries are visited.
+    Old values are read back from the database because expired attributes
+    carry no history.
+    """
+    deltas = defaultdict(lambda: [0.0, 0.0])
+
+    lines = {}
+    # session.new / session.deleted build a new set on every access
+    new, deleted = session.new, session.deleted
+    for obj in list(new) + list(session.dirty) + list(deleted):
+        if isinstance(obj, JournalLine):
+            lines[id(obj)] = obj
+        elif isinstance(obj, JournalEntry) and obj not in new:
+            attrs = inspect(obj).attrs
+            changed = (
+                obj in deleted
+                or attrs.status.history.has_changes()
+                or attrs.entry_date.history.has_changes()
+                or attrs.temple_id.history.has_changes()
+            )
+            if changed:
+                for line in obj.journal_lines:
+                    lines[id(line)] = line
+
+    if not lines:
+        return {}
+
+    # Old contribution: what the database currently counts as posted
+    persisted_ids = [line.id for line in lines.values() if line not in new and line.id is not None]
+    if persisted_ids:
+        stored = session.execute(
+            select(
+                JournalEntry.temple_id,
+                JournalLine.account_id,
+                JournalEntry.entry_date,
+                JournalLine.debit_amount,
+                JournalLine.credit_amount,
+            )
+            .join(JournalEntry, JournalLine.journal_entry_id == JournalEntry.id)
+            .where(
+                JournalLine.id.in_(persisted_ids),
+                JournalEntry.status == JournalEntryStatus.POSTED,
+            )
+        ).all()
+        for temple_id, account_id, entry_date, debit, credit in stored:
+            key = (temple_id, account_id, as_day(entry_date))
+            deltas[key][0] -= float(debit or 0)
+            deltas[key][1] -= float(credit or 0)
+
+    # New contribution: in-memory state that is about to be written
+    for line in lines.values():
+        if line in deleted:
+            continue
+        entry = line.journal_entry
+        if entry is None and line.journal_entry_id is not None:
+            entry = session.get(JournalEntry, line.journal_entry_id)
+        if entry is None or entry in deleted:
+            continue
+        if entry.status != JournalEntryStatus.POSTED:
+            continue
+        key = (entry.temple_id, line.account_id, as_day(entry.entry_date))
+        deltas[key][0] += float(line.debit_amount or 0)
+        deltas[key][1] += float(line.credit_amount or 0)
+
+    return {
+        key: amounts
+        for key, amounts in deltas.items()
+        if abs(amounts[0]) > 1e-9 or abs(amounts[1]) > 1e-9
+    }
+
+
+def _apply_deltas(connection, deltas: Dict[Tuple[int, int, date], list]) -> None:
+    """
+    Add day movements to the snapshot table (upsert on account_id + balance_date)
+    and carry them into the running totals of every later day of the account
+    """
+    table = AccountBalanceSnapshot.__table__
+    now = datetime.utcnow()
+
+    for (temple_id, account_id, day), (debit, credit) in sorted(
+        deltas.items(), key=lambda item: (item[0][1], item[0][2])
+    ):
+        prior = (
+            select(table.c.cumulative_debit, table.c.cumulative_credit)
+            .where(table.c.account_id == account_id, table.c.balance_date < day)
+            .order_by(table.c.balance_date.desc())
+            .limit(1)
+        )
+        values = dict(
+            temple_id=temple_id,
+            account_id=account_id,
+            balance_date=day,
+            debit_total=debit,
+            credit_total=credit,
+            cumulative_debit=func.coalesce(
+                prior.with_only_columns(table.c.cumulative_debit).scalar_subquery(), 0.0
+            )
+            + debit,
+            cumulative_credit=func.coalesce(
+                prior.with_only_columns(table.c.cumulative_credit).scalar_subquery(), 0.0
+            )
+            + credit,
+            updated_at=now,
+        )
+        increments = {
+            "debit_total": table.c.debit_total + debit,
+            "credit_total": table.c.credit_total + credit,
+            "cumulative_debit": table.c.cumulative_debit + debit,
+            "cumulative_credit": table.c.cumulative_credit + credit,
+            "updated_at": now,
+        }
+
+        insert_or_add(connection, table, values, increments, ["account_id", "balance_date"])
+
+        # Later days already include everything up to their date
+        connection.execute(
+            update(table)
+            .where(table.c.account_id == account_id, table.c.balance_date > day)
+            .values(
+                cumulative_debit=table.c.cumulative_debit + debit,
+                cumulative_credit=table.c.cumulative_credit + credit,
+            )
+        )
+
+
+@event.listens_for(Session, "before_flush")
+def _snapshot_before_flush(session, flush_context, instances):
+    with session.no_autoflush:
+        session.info[_PENDING_DELTAS_KEY] = _collect_deltas(session)
+
+
+@event.listens_for(Session, "after_flush")
+def _snapshot_after_flush(session, flush_context):
+    deltas = session.info.pop(_PENDING_DELTAS_KEY, None)
+    if deltas:
+        _apply_deltas(session.connection(), deltas)
+
+
+def record_posted_lines(db: Session, lines: Iterable[Tuple[int, int, date, float, float]]) -> None:
+    """
+    Add posted lines written with bulk INSERTs (which bypass the flush hook)
+    to the snapshots
+
+    Args:
+        lines: (temple_id, account_id, entry date, debit, credit) per line
+    """
+    deltas = defaultdict(lambda: [0.0, 0.0])
+    for temple_id, account_id, day, debit, credit in lines:
+        key = (temple_id, account_id, as_day(day))
+        deltas[key][0] += float(debit or 0)
+        deltas[key][1] += float(credit or 0)
+    if deltas:
+        _apply_deltas(db.connection(), deltas)
+
+
+def rebuild_account_balance_snapshots(
+    db: Session, temple_id: Optional[int] = None, batch_size: int = 1000
+) -> int:
+    """
+    Recompute snapshots from posted journal lines
+    Used for backfilling existing installations and after bulk data repairs
+
+    Returns:
+        Number of snapshot rows written
+    """
+    delete_query = db.query(AccountBalanceSnapshot)
+    if temple_id is not None:
+        delete_query = delete_query.filter(AccountBalanceSnapshot.temple_id == temple_id)
+    delete_query.delete(synchronize_session=False)
+
+    entry_day = func.date(JournalEntry.entry_date)
+    source = (
+        select(
+            JournalEntry.temple_id,
+            JournalLine.account_id,
+            entry_day,
+            func.coalesce(func.sum(JournalLine.debit_amount), 0.0),
+            func.coalesce(func.sum(JournalLine.credit_amount), 0.0),
+        )
+        .join(JournalEntry, JournalLine.journal_entry_id == JournalEntry.id)
+        .where(JournalEntry.status == JournalEntryStatus.POSTED)
+        .group_by(JournalEntry.temple_id, JournalLine.account_id, entry_day)
+        .order_by(JournalLine.account_id, entry_day)
+    )
+    if temple_id is not None:
+        source = source.where(JournalEntry.temple_id == temple_id)
+
+    table = AccountBalanceSnapshot.__table__
+    now = datetime.utcnow()
+    written = 0
+    batch = []
+    current_account = None
+    running_debit = running_credit = 0.0
+
+    for row_temple_id, account_id, day, debit, credit in db.execute(source):
+        if account_id != current_account:
+            current_account = account_id
+            running_debit = running_credit = 0.0
+        running_debit += float(debit)
+        running_credit += float(credit)
+        batch.append(
+            dict(
+                temple_id=row_temple_id,
+                account_id=account_id,
+                balance_date=as_day(day),
+                debit_total=float(debit),
+                credit_total=float(credit),
+                cumulative_debit=running_debit,
+                cumulative_credit=running_credit,
+                updated_at=now,
+            )
+        )
+        if len(batch) >= batch_size:
+            db.execute(insert(table), batch)
+            written += len(batch)
+            batch = []
+
+    if batch:
+        db.execute(insert(table), batch)
+        written += len(batch)
+
+    db.commit()
+    return written
+
+
+def ensure_account_balance_snapshots(db: Session) -> bool:
+    """
+    Backfill snapshots when the table is empty but posted entries exist
+    (first start after upgrading). Returns True if a rebuild ran.
+    """
+    has_snapshots = db.query(AccountBalanceSnapshot.id).first() is not None
+    if has_snapshots:
+        return False
+
+    has_posted_lines = (
+        db.query(JournalLine.id)
+        .join(JournalEntry, JournalLine.journal_entry_id == JournalEntry.id)
+        .filter(JournalEntry.status == JournalEntryStatus.POSTED)
+        .first()
+        is not None
+    )
+    if not has_posted_lines:
+        return False
+
+    rebuild_account_balance_snapshots(db)
+    return True
+
+
+# ===== BALANCE QUERIES =====
+
+
+def get_account_balances(
+    db: Session,
+    temple_id: Optional[int],
+    as_of_date: date,
+    account_ids: Optional[Iterable[int]] = None,
+) -> Dict[int, Tuple[float, float]]:
+    """
+    Posted debit and credit totals per account up to and including as_of_date
+    One grouped read over the snapshot table (opening balances not included)
+
+    Returns:
+        Dict of account_id -> (total_debit, total_credit)
+    """
+    query = db.query(
+        AccountBalanceSnapshot.account_id,
+        func.sum(AccountBalanceSnapshot.debit_total),
+        func.sum(AccountBalanceSnapshot.credit_total),
+    ).filter(AccountBalanceSnapshot.balance_date <= as_of_date)
+
+    if temple_id is not None:
+        query = query.filter(AccountBalanceSnapshot.temple_id == temple_id)
+    if account_ids is not None:
+        query = query.filter(AccountBalanceSnapshot.account_id.in_(list(account_ids)))
+
+    rows = query.group_by(AccountBalanceSnapshot.account_id).all()
+    return {
+        account_id: (float(debit or 0), float(credit or 0)) for account_id, debit, credit in rows
+    }
+
+
+def get_balance_before(db: Session, account_id: int, day: date) -> Tuple[float, float]:
+    """
+    Posted debit and credit totals of an account strictly before `day`
+    One indexed lookup of the latest snapshot (opening balances not included)
+    """
+    row = (
+        db.query(
+            AccountBalanceSnapshot.cumulative_debit,
+            AccountBalanceSnapshot.cumulative_credit,
+        )
+        .filter(
+            AccountBalanceSnapshot.account_id == account_id,
+            AccountBalanceSnapshot.balance_date < day,
+        )
+        .order_by(AccountBalanceSnapshot.balance_date.desc())
+        .first()
+    )
+    if not row:
+        return 0.0, 0.0
+    return float(row[0] or 0), float(row[1] or 0)
+
+
+def get_balance_through(db: Session, account_id: int, day: date) -> Tuple[float, float]:
+    """Posted debit and credit totals of an account up to and including `day`"""
+    return get_balance_before(db, account_id, day + timedelta(days=1))
+
+
+def get_period_balances(
+    db: Session,
+    accounts: Iterable,
+    from_date: date,
+    to_date: date,
+) -> Dict[int, Tuple[float, float]]:
+    """
+    Opening (before from_date) and closing (through to_date) balances for a
+    set of accounts in one grouped read over the snapshot table.
+    Balances are debit-positive and include each account's opening balance.
+
+    Args:
+        accounts: Account rows (need id, opening_balance_debit/credit)
+
+    Returns:
+        Dict of account_id -> (opening_balance, closing_balance)
+    """
+    accounts = list(accounts)
+    balances = {}
+    for account in accounts:
+        account_opening = (account.opening_balance_debit or 0) - (
+            account.opening_balance_credit or 0
+        )
+        balances[account.id] = (account_opening, account_opening)
+
+    if not accounts:
+        return balances
+
+    net = AccountBalanceSnapshot.debit_total - AccountBalanceSnapshot.credit_total
+    rows = (
+        db.query(
+            AccountBalanceSnapshot.account_id,
+            func.sum(case((AccountBalanceSnapshot.balance_date < from_date, net), else_=0.0)),
+            func.sum(net),
+        )
+        .filter(
+            AccountBalanceSnapshot.account_id.in_(list(balances.keys())),
+            AccountBalanceSnapshot.balance_date <= to_date,
+        )
+        .group_by(AccountBalanceSnapshot.account_id)
+        .all()
+    )
+    for account_id, before, through in rows:
+        opening, closing = balances[account_id]
+        balances[account_id] = (opening + float(before or 0), closing + float(through or 0))
+
+    return balances
+
+
+# ===== LEDGER LINES =====
+
+
+def encode_ledger_cursor(entry_date: datetime, entry_id: int, line_id: int) -> str:
+    """Opaque keyset cursor for the ledger listing"""
+    return f"{entry_date.isoformat()}|{entry_id}|{line_id}"
+
+
+def decode_ledger_cursor(cursor: str) -> Tuple[datetime, int, int]:
+    """Inverse of encode_ledger_cursor; raises ValueError on malformed input"""
+    entry_date, entry_id, line_id = cursor.split("|")
+    return datetime.fromisoformat(entry_date), int(entry_id), int(line_id)
+
+
+def _ledger_lines_query(
+    db: Session,
+    account_id: int,
+    temple_id: Optional[int],
+    from_date: date,
+    to_date: date,
+):
+    query = (
+        db.query(
+            JournalLine.id.label("line_id"),
+            JournalLine.debit_amount,
+            JournalLine.credit_amount,
+            JournalEntry.id.label("entry_id"),
+            JournalEntry.entry_date,
+            JournalEntry.entry_number,
+            JournalEntry.narration,
+            JournalEntry.reference_type,
+            JournalEntry.reference_id,
+        )
+        .join(JournalEntry, JournalLine.journal_entry_id == JournalEntry.id)
+        .filter(
+            JournalLine.account_id == account_id,
+            JournalEntry.status == JournalEntryStatus.POSTED,
+            func.date(JournalEntry.entry_date) >= from_date,
+            func.date(JournalEntry.entry_date) <= to_date,
+        )
+    )
+    if temple_id is not None:
+        query = query.filter(JournalEntry.temple_id == temple_id)
+    return query
+
+
+def _after_key(after: Tuple[datetime, int, int]):
+    """Keyset condition: (entry_date, entry id, line id) strictly after `after`"""
+    after_date, after_entry_id, after_line_id = after
+    return or_(
+        JournalEntry.entry_date > after_date,
+        and_(
+            JournalEntry.entry_date == after_date,
+            or_(
+                JournalEntry.id > after_entry_id,
+                and_(JournalEntry.id == after_entry_id, JournalLine.id > after_line_id),
+            ),
+        ),
+    )
+
+
+def iter_ledger_lines(
+    db: Session,
+    account_id: int,
+    temple_id: Optional[int],
+    from_date: date,
+    to_date: date,
+    after: Optional[Tuple[datetime, int, int]] = None,
+    batch_size: int = 500,
+):
+    """
+    Yield posted ledger rows of an account in (entry_date, entry id, line id)
+    order, fetching `batch_size` rows at a time with keyset pagination.
+    Rows carry the entry columns directly, so no relationship loads happen.
+    """
+    base = _ledger_lines_query(db, account_id, temple_id, from_date, to_date)
+    return _iter_keyset(base, after, batch_size)
+
+
+def iter_journal_lines(
+    db: Session,
+    temple_id: Optional[int],
+    from_date: date,
+    to_date: date,
+    account_ids: Optional[Iterable[int]] = None,
+    batch_size: int = 500,
+):
+    """
+    Yield posted journal lines of a period (of `account_ids` only, if given)
+    in ledger order, with their entry and account columns, fetched in keyset
+    batches - the Day, Cash and Bank Book exports stream through this
+    """
+    query = (
+        db.query(
+            JournalLine.id.label("line_id"),
+            JournalLine.debit_amount,
+            JournalLine.credit_amount,
+            JournalLine.description,
+            JournalEntry.id.label("entry_id"),
+            JournalEntry.entry_date,
+            JournalEntry.entry_number,
+            JournalEntry.narration,
+            JournalEntry.reference_type,
+            Account.account_name,
+            Account.account_type,
+            Account.account_subtype,
+        )
+        .join(JournalEntry, JournalLine.journal_entry_id == JournalEntry.id)
+        .join(Account, JournalLine.account_id == Account.id)
+        .filter(
+            JournalEntry.status == JournalEntryStatus.POSTED,
+            func.date(JournalEntry.entry_date) >= from_date,
+            func.date(JournalEntry.entry_date) <= to_date,
+        )
+    )
+    if account_ids is not None:
+        query = query.filter(JournalLine.account_id.in_(list(account_ids)))
+    if temple_id is not None:
+        query = query.filter(JournalEntry.temple_id == temple_id)
+    return _iter_keyset(query, None, batch_size)
+
+
+def _iter_keyset(query, after: Optional[Tuple[datetime, int, int]], batch_size: int):
+    """Rows of a journal line query after the `after` key, `batch_size` at a time"""
+    base = query.order_by(JournalEntry.entry_date, JournalEntry.id, JournalLine.id)
+    while True:
+        query = base
+        if after is not None:
+            query = query.filter(_after_key(after))
+        rows = query.limit(batch_size).all()
+        for row in rows:
+            yield row
+        if len(rows) < batch_size:
+            return
+        last = rows[-1]
+        after = (last.entry_date, last.entry_id, last.line_id)
+
+
+def get_ledger_balance_through_key(
+    db: Session,
+    account_id: int,
+    temple_id: Optional[int],
+    key: Tuple[datetime, int, int],
+) -> Tuple[float, float]:
+    """
+    Posted totals of an account up to and including the ledger row at `key`
+    Snapshot lookup for earlier days plus one SUM over the same day's lines
+    """
+    key_date, key_entry_id, key_line_id = key
+    day = key_date.date()
+    debit, credit = get_balance_before(db, account_id, day)
+
+    same_day = (
+        db.query(
+            func.sum(JournalLine.debit_amount),
+            func.sum(JournalLine.credit_amount),
+        )
+        .join(JournalEntry, JournalLine.journal_entry_id == JournalEntry.id)
+        .filter(
+            JournalLine.account_id == account_id,
+            JournalEntry.status == JournalEntryStatus.POSTED,
+            func.date(JournalEntry.entry_date) == day,
+            ~_after_key(key),
+        )
+    )
+    if temple_id is not None:
+        same_day = same_day.filter(JournalEntry.temple_id == temple_id)
+    day_debit, day_credit = same_day.first()
+
+    return debit + float(day_debit or 0), credit + float(day_credit or 0)
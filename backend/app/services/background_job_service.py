@@ -0,0 +1,114 @@
+"""
+Background Job Service
+Create, update and report BackgroundJob rows
+
+Job functions run in FastAPI BackgroundTasks with their own database
+session; progress is committed as it is reported so that a poll from the
+API sees it while the job is still running.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.background_job import BackgroundJob, BackgroundJobStatus
+
+
+def create_job(
+    db: Session,
+    job_type: str,
+    temple_id: Optional[int] = None,
+    created_by: Optional[int] = None,
+    params: Optional[Dict[str, Any]] = None,
+) -> BackgroundJob:
+    """Queue a job (status pending) and return it"""
+    job = BackgroundJob(
+        job_type=job_type,
+        temple_id=temple_id,
+        created_by=created_by,
+        params=params or {},
+        status=BackgroundJobStatus.PENDING,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def start_job(db: Session, job_id: int, total: int = 0) -> Optional[BackgroundJob]:
+    """Mark a job running with the number of work units it will report"""
+    job = db.query(BackgroundJob).filter(BackgroundJob.id == job_id).first()
+    if job is None:
+        return None
+    job.status = BackgroundJobStatus.RUNNING
+    job.started_at = datetime.utcnow()
+    job.progress_current = 0
+    job.progress_total = total
+    db.commit()
+    return job
+
+
+def update_progress(db: Session, job_id: int, current: int, message: Optional[str] = None) -> None:
+    """Record how many work units are done"""
+    values = {"progress_current": current}
+    if message is not None:
+        values["message"] = message[:255]
+    db.query(BackgroundJob).filter(BackgroundJob.id == job_id).update(
+        values, synchronize_session=False
+    )
+    db.commit()
+
+
+def complete_job(db: Session, job_id: int, result: Optional[Dict[str, Any]] = None) -> None:
+    """Mark a job completed with its result"""
+    job = db.query(BackgroundJob).filter(BackgroundJob.id == job_id).first()
+    if job is None:
+        return
+    job.status = BackgroundJobStatus.COMPLETED
+    job.progress_current = job.progress_total or job.progress_current
+    job.result = result or {}
+    job.completed_at = datetime.utcnow()
+    db.commit()
+
+
+def fail_job(db: Session, job_id: int, error: str) -> None:
+    """Mark a job failed; the caller's transaction is rolled back first"""
+    db.rollback()
+    job = db.query(BackgroundJob).filter(BackgroundJob.id == job_id).first()
+    if job is None:
+        return
+    job.status = BackgroundJobStatus.FAILED
+    job.error = error
+    job.completed_at = datetime.utcnow()
+    db.commit()
+
+
+def get_job(db: Session, job_id: int, temple_id: Optional[int] = None) -> Optional[BackgroundJob]:
+    """Fetch a job; when temple_id is given, only that temple's jobs are visible"""
+    query = db.query(BackgroundJob).filter(BackgroundJob.id == job_id)
+    if temple_id is not None:
+        query = query.filter(BackgroundJob.temple_id == temple_id)
+    return query.first()
+
+
+def job_to_dict(job: BackgroundJob) -> Dict[str, Any]:
+    """Status payload returned by job polling endpoints"""
+    percent = 0.0
+    if job.progress_total:
+        percent = round(100.0 * job.progress_current / job.progress_total, 1)
+    status = job.status.value if isinstance(job.status, BackgroundJobStatus) else job.status
+    return {
+        "job_id": job.id,
+        "job_type": job.job_type,
+        "status": status,
+        "progress_current": job.progress_current,
+        "progress_total": job.progress_total,
+        "progress_percent": percent,
+        "message": job.message,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+    }
@@ -0,0 +1,303 @@
+"""
+Backup Service
+Streams database tables into compressed backup archives
+
+An archive is a ZIP file with one newline-delimited JSON member per table
+(<table>.ndjson, deflate-compressed) and a manifest.json describing them:
+
+    {
+        "format_version": 1,
+        "backup_type": "full" | "incremental",
+        "base_backup": <archive this one continues, incremental only>,
+        "created_at": ..., "created_by": ...,
+        "tables": {
+            "<table>": {
+                "file": "<table>.ndjson",
+                "columns": [...],
+                "row_count": ...,
+                "sha256": <of the uncompressed member>,
+                "high_water": {"id": ..., "updated_at": ...}
+            }
+        }
+    }
+
+Each line of a table member is the JSON list of one row's values in
+"columns" order. Tables are discovered by reflecting the database once and
+written in foreign key order (parents first), which is the order a restore
+has to load them in.
+
+Rows are read with a server-side cursor in batches of BATCH_ROWS and written
+straight into the archive, so memory use does not depend on database size.
+
+Incremental backups write, per table, only rows with an id or updated_at
+above the high-water marks recorded by the previous backup; tables with
+neither column are copied in full. Deleted rows are not tracked - restoring
+a chain of incremental backups restores the rows as last written.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import zipfile
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import Date, DateTime, MetaData, Table, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+BACKUP_JOB_TYPE = "database_backup"
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+ARCHIVE_EXTENSION = ".zip"
+
+# Rows fetched per round trip of the server-side cursor
+BATCH_ROWS = 1000
+
+# Not worth restoring: job bookkeeping (including the running backup's own job)
+EXCLUDED_TABLES = ("background_jobs",)
+
+# SQLite FTS5 devotee search table and its shadow tables - rebuilt after a restore
+EXCLUDED_TABLE_PREFIXES = ("devotee_search_fts",)
+
+# Columns whose maximum is remembered for incremental backups
+HIGH_WATER_COLUMNS = ("id", "updated_at")
+
+
+# ===== ARCHIVES =====
+
+
+def backup_directory() -> str:
+    os.makedirs(settings.BACKUP_PATH, exist_ok=True)
+    return settings.BACKUP_PATH
+
+
+def backup_filename(backup_type: str, now: Optional[datetime] = None) -> str:
+    timestamp = (now or datetime.now()).strftime("%Y%m%d_%H%M%S")
+    return f"backup_{timestamp}_{backup_type}{ARCHIVE_EXTENSION}"
+
+
+def list_backups() -> List[str]:
+    """Archive file names in the backup directory, newest first (names start with the time)"""
+    names = [name for name in os.listdir(backup_directory()) if name.endswith(ARCHIVE_EXTENSION)]
+    return sorted(names, reverse=True)
+
+
+def read_manifest(path: str) -> Dict:
+    """Manifest of an archive, read without touching the table members"""
+    with zipfile.ZipFile(path) as archive:
+        return json.loads(archive.read(MANIFEST_NAME))
+
+
+def latest_manifest() -> Optional[Dict]:
+    """(file name added as "file") manifest of the newest readable archive"""
+    for name in list_backups():
+        try:
+            manifest = read_manifest(os.path.join(backup_directory(), name))
+        except (zipfile.BadZipFile, KeyError, ValueError):
+            continue
+        manifest["file"] = name
+        return manifest
+    return None
+
+
+# ===== ROWS =====
+
+
+def json_value(value):
+    """Row value as JSON (dates ISO formatted, decimals as text, bytes base64)"""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(bytes(value)).decode("ascii")
+    return value
+
+
+def _high_water_param(column, value):
+    """Stored high-water mark in the column's own type, for the comparison"""
+    if isinstance(value, str):
+        if isinstance(column.type, DateTime):
+            return datetime.fromisoformat(value)
+        if isinstance(column.type, Date):
+            return date.fromisoformat(value)
+    return value
+
+
+def _newer_than(table: Table, high_water: Dict) -> Optional[object]:
+    """WHERE clause selecting rows above the high-water marks (None = all rows)"""
+    conditions = [
+        table.c[name] > _high_water_param(table.c[name], value)
+        for name, value in high_water.items()
+        if name in table.c and value is not None
+    ]
+    return or_(*conditions) if conditions else None
+
+
+def write_table(
+    db: Session, archive: zipfile.ZipFile, table: Table, since: Optional[Dict] = None
+) -> Dict:
+    """
+    Stream one table into the archive
+
+    Args:
+        since: High-water marks of the previous backup; only newer rows are written
+
+    Returns:
+        The table's manifest entry
+    """
+    columns = [column.name for column in table.columns]
+    tracked = [name for name in HIGH_WATER_COLUMNS if name in table.c]
+    high_water = {name: (since or {}).get(name) for name in tracked}
+    positions = {name: columns.index(name) for name in tracked}
+
+    query = select(table)
+    if since:
+        condition = _newer_than(table, since)
+        if condition is not None:
+            query = query.where(condition)
+    if "id" in table.c:
+        query = query.order_by(table.c.id)
+
+    digest = hashlib.sha256()
+    row_count = 0
+    filename = f"{table.name}.ndjson"
+    result = (
+        db.connection().execution_options(stream_results=True, yield_per=BATCH_ROWS).execute(query)
+    )
+    with archive.open(filename, "w", force_zip64=True) as member:
+        for rows in result.partitions():
+            lines = []
+            for row in rows:
+                values = [json_value(value) for value in row]
+                for name, position in positions.items():
+                    value = values[position]
+                    if value is not None and (high_water[name] is None or value > high_water[name]):
+                        high_water[name] = value
+                lines.append(json.dumps(values, ensure_ascii=False, default=str))
+            data = ("\n".join(lines) + "\n").encode("utf-8")
+            digest.update(data)
+            member.write(data)
+            row_count += len(rows)
+
+    return {
+        "file": filename,
+        "columns": columns,
+        "row_count": row_count,
+        "sha256": digest.hexdigest(),
+        "high_water": high_water,
+    }
+
+
+def backup_tables(db: Session) -> List[Table]:
+    """Tables of the database in foreign key order, reflected once"""
+    metadata = MetaData()
+    metadata.reflect(bind=db.connection())
+    return [
+        table
+        for table in metadata.sorted_tables
+        if table.name not in EXCLUDED_TABLES and not table.name.startswith(EXCLUDED_TABLE_PREFIXES)
+    ]
+
+
+def write_backup(
+    db: Session,
+    path: str,
+    base: Optional[Dict] = None,
+    created_by: Optional[str] = None,
+    tables: Optional[List[Table]] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict:
+    """
+    Write a backup archive
+
+    Args:
+        base: Manifest of the previous backup - writes an incremental backup
+        tables: Tables to write (default: every table, see backup_tables)
+        on_progress: Called with (tables done, total tables) after each table
+
+    Returns:
+        The archive's manifest
+    """
+    if tables is None:
+        tables = backup_tables(db)
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "backup_type": "incremental" if base else "full",
+        "base_backup": base.get("file") if base else None,
+        "created_at": datetime.now().isoformat(),
+        "created_by": created_by,
+        "tables": {},
+    }
+    base_tables = base["tables"] if base else {}
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for done, table in enumerate(tables, start=1):
+            since = base_tables.get(table.name, {}).get("high_water") if base else None
+            manifest["tables"][table.name] = write_table(db, archive, table, since)
+            if on_progress:
+                on_progress(done, len(tables))
+        archive.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2, default=str))
+    return manifest
+
+
+def manifest_summary(manifest: Dict) -> Dict:
+    tables = manifest["tables"]
+    return {
+        "backup_type": manifest["backup_type"],
+        "base_backup": manifest.get("base_backup"),
+        "tables_backed_up": list(tables),
+        "total_records": sum(table["row_count"] for table in tables.values()),
+        "created_at": manifest["created_at"],
+    }
+
+
+def backup_job(job_id: int, incremental: bool, created_by: Optional[str]) -> None:
+    """
+    Background task entry point - writes a full or incremental backup archive
+
+    The tables are read in one transaction of their own session; job progress
+    is committed through a second session so that it does not end it.
+    """
+    from app.core.database import SessionLocal
+    from app.services.background_job_service import (
+        complete_job,
+        fail_job,
+        start_job,
+        update_progress,
+    )
+
+    db = SessionLocal()
+    jobs = SessionLocal()
+    path = None
+    try:
+        tables = backup_tables(db)
+        start_job(jobs, job_id, total=len(tables))
+        base = latest_manifest() if incremental else None
+        filename = backup_filename("incremental" if base else "full")
+        path = os.path.join(backup_directory(), filename)
+
+        def progress(done: int, total: int) -> None:
+            update_progress(jobs, job_id, done, f"{done} of {total} tables backed up")
+
+        manifest = write_backup(db, path, base, created_by, tables, on_progress=progress)
+        db.rollback()
+        result = manifest_summary(manifest)
+        result["backup_file"] = filename
+        result["file_size"] = os.path.getsize(path)
+        result["file_size_mb"] = round(result["file_size"] / (1024 * 1024), 2)
+        complete_job(jobs, job_id, result)
+    except Exception as e:
+        print(f"⚠️  Database backup failed: {str(e)}")
+        db.rollback()
+        if path and os.path.exists(path):
+            os.remove(path)
+        fail_job(jobs, job_id, str(e))
+    finally:
+        db.close()
+        jobs.close()
@@ -0,0 +1,100 @@
+"""
+Birthday Service
+Upcoming devotee birthdays from the indexed month-day ordinal
+
+Devotee.birth_month_day holds month * 100 + day of the date of birth, so a
+window of days maps to one or two ordinal ranges (two when it crosses the
+year end) that the database answers from the index. 29 Feb birthdays are
+celebrated on 28 Feb in non-leap years.
+"""
+
+import calendar
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, case, or_
+from sqlalchemy.orm import Query, Session
+
+from app.models.devotee import Devotee, month_day_ordinal
+
+BACKFILL_BATCH_SIZE = 1000
+
+FEB_28 = 228
+FEB_29 = 229
+
+
+def birthday_ranges(start: date, days: int) -> Optional[List[Tuple[int, int]]]:
+    """
+    Month-day ordinal ranges (inclusive) covering start .. start + days
+
+    Returns None when the window covers the whole year.
+    """
+    if days >= 365:
+        return None
+
+    end = start + timedelta(days=days)
+    if end.year == start.year:
+        spans = [(start.year, month_day_ordinal(start), month_day_ordinal(end))]
+    else:
+        spans = [
+            (start.year, month_day_ordinal(start), 1231),
+            (end.year, 101, month_day_ordinal(end)),
+        ]
+
+    ranges = []
+    for year, low, high in spans:
+        # No 29 Feb this year - its birthdays fall on 28 Feb
+        if not calendar.isleap(year) and low <= FEB_28 <= high < FEB_29:
+            high = FEB_29
+        ranges.append((low, high))
+    return ranges
+
+
+def upcoming_birthdays_query(
+    db: Session, temple_id: Optional[int], days: int = 30, today: Optional[date] = None
+) -> Query:
+    """
+    Devotees with a birthday in the next `days` days, soonest first
+
+    The query is ordered by (wrap, month-day, id) so callers can page it with
+    offset/limit or iterate it with yield_per.
+    """
+    today = today or date.today()
+    start = month_day_ordinal(today)
+
+    query = db.query(Devotee).filter(Devotee.birth_month_day.isnot(None))
+    if temple_id:
+        query = query.filter(Devotee.temple_id == temple_id)
+
+    ranges = birthday_ranges(today, days)
+    if ranges is not None:
+        query = query.filter(
+            or_(*[Devotee.birth_month_day.between(low, high) for low, high in ranges])
+        )
+
+    # Birthdays after today's month-day come first, then those after new year
+    wrapped = case((Devotee.birth_month_day >= start, 0), else_=1)
+    return query.order_by(wrapped, Devotee.birth_month_day, Devotee.id)
+
+
+def backfill_birth_month_day(db: Session) -> int:
+    """Fill birth_month_day for devotees saved before the column existed; commits"""
+    updated = 0
+    while True:
+        rows = (
+            db.query(Devotee.id, Devotee.date_of_birth)
+            .filter(and_(Devotee.date_of_birth.isnot(None), Devotee.birth_month_day.is_(None)))
+            .limit(BACKFILL_BATCH_SIZE)
+            .all()
+        )
+        if not rows:
+            return updated
+        db.bulk_update_mappings(
+            Devotee,
+            [
+                {"id": row.id, "birth_month_day": month_day_ordinal(row.date_of_birth)}
+                for row in rows
+            ],
+        )
+        db.commit()
+        updated += len(rows)
@@ -0,0 +1,309 @@
+"""
+80G Certificate Service
+Bulk 80G certificate generation as a background job
+
+Eligible donations are selected with one id query (80G categories only) and
+loaded in chunks with their devotee and category eagerly, then turned into
+plain dicts. Chunks are rendered in a process pool - a bounded number of
+chunks is in flight at a time - and written to disk as they complete:
+
+- "zip": one PDF per certificate, added to a ZIP archive
+- "pdf": every certificate on its own page of one merged PDF
+
+The merged PDF has to be written by a single canvas, so it is drawn in the
+job process (page by page - the story is never built in memory); the ZIP is
+what parallelises. The client polls the job and downloads the file.
+"""
+
+import io
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas as pdf_canvas
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+from sqlalchemy.orm import Session, contains_eager, joinedload
+
+from app.core.config import settings
+from app.models.donation import Donation, DonationCategory
+from app.models.temple import Temple
+
+CERTIFICATE_JOB_TYPE = "bulk_80g_certificates"
+
+OUTPUT_FORMATS = ("zip", "pdf")
+
+# Donations per chunk sent to a worker
+CHUNK_SIZE = 200
+
+CERTIFICATE_TABLE_STYLE = TableStyle(
+    [
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#FF9933")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+        ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, 0), 14),
+        ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+        ("BACKGROUND", (0, 1), (-1, -1), colors.beige),
+        ("GRID", (0, 0), (-1, -1), 1, colors.black),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ]
+)
+
+Certificate = Dict
+RenderedCertificate = Tuple[str, bytes]
+
+
+# ===== DATA =====
+
+
+def temple_certificate_data(temple: Optional[Temple]) -> Dict:
+    """Temple fields printed on certificates, as a plain dict"""
+    if temple is None:
+        return {"name": "Temple", "address": "", "pan_number": "", "certificate_80g_number": ""}
+    return {
+        "name": temple.name,
+        "address": temple.address or "",
+        "pan_number": temple.pan_number or "",
+        "certificate_80g_number": temple.certificate_80g_number or "",
+    }
+
+
+def eligible_donation_ids(
+    db: Session,
+    temple_id: Optional[int],
+    donation_ids: Optional[List[int]] = None,
+    financial_year: Optional[str] = None,
+) -> List[int]:
+    """Ids of active donations in 80G eligible categories, by id"""
+    query = (
+        db.query(Donation.id)
+        .join(DonationCategory, Donation.category_id == DonationCategory.id)
+        .filter(Donation.is_cancelled == False, DonationCategory.is_80g_eligible == True)
+    )
+    if temple_id:
+        query = query.filter(Donation.temple_id == temple_id)
+    if donation_ids:
+        query = query.filter(Donation.id.in_(donation_ids))
+    if financial_year:
+        query = query.filter(Donation.financial_year == financial_year)
+    return [donation_id for (donation_id,) in query.order_by(Donation.id)]
+
+
+def certificate_data(donation: Donation) -> Certificate:
+    """Plain certificate data of a donation (devotee and category loaded)"""
+    devotee = donation.devotee
+    return {
+        "receipt_number": donation.receipt_number,
+        "donation_date": donation.donation_date,
+        "amount": donation.amount,
+        "category_name": donation.category.name if donation.category else "",
+        "devotee_name": devotee.name if devotee else "Anonymous",
+        "devotee_address": (devotee.address if devotee else "") or "",
+    }
+
+
+def iter_certificate_chunks(
+    db: Session, donation_ids: List[int], chunk_size: int = CHUNK_SIZE
+) -> Iterator[List[Certificate]]:
+    """Certificate data of the donations, one eager-loaded query per chunk"""
+    for start in range(0, len(donation_ids), chunk_size):
+        ids = donation_ids[start : start + chunk_size]
+        donations = (
+            db.query(Donation)
+            .join(DonationCategory, Donation.category_id == DonationCategory.id)
+            .options(contains_eager(Donation.category), joinedload(Donation.devotee))
+            .filter(Donation.id.in_(ids))
+            .order_by(Donation.id)
+            .all()
+        )
+        yield [certificate_data(donation) for donation in donations]
+        # Chunks are done with - don't keep them in the identity map
+        db.expunge_all()
+
+
+# ===== RENDERING =====
+
+
+def _format_date(value) -> str:
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%d-%m-%Y")
+    return str(value) if value else ""
+
+
+def certificate_table(temple: Dict, cert: Certificate) -> Table:
+    """Certificate of one donation as a table flowable"""
+    rows = [
+        ["Certificate of Donation - Section 80G"],
+        [""],
+        ["Temple Name:", temple["name"]],
+        ["Address:", temple["address"]],
+        ["PAN:", temple["pan_number"]],
+        ["80G Registration:", temple["certificate_80g_number"]],
+        [""],
+        ["Donor Details:"],
+        ["Name:", cert["devotee_name"]],
+        ["Address:", cert["devotee_address"]],
+        [""],
+        ["Donation Details:"],
+        ["Receipt Number:", cert["receipt_number"]],
+        ["Date:", _format_date(cert["donation_date"])],
+        ["Amount:", f"₹{cert['amount']:,.2f}"],
+        ["Category:", cert["category_name"]],
+        [""],
+        [
+            "This donation is eligible for tax deduction under Section 80G of the Income Tax Act, 1961."
+        ],
+        [""],
+    ]
+    table = Table(rows, colWidths=[2 * inch, 4 * inch])
+    table.setStyle(CERTIFICATE_TABLE_STYLE)
+    return table
+
+
+def certificate_filename(cert: Certificate) -> str:
+    receipt = str(cert["receipt_number"]).replace("/", "-")
+    return f"80g_certificate_{receipt}.pdf"
+
+
+def render_certificate(temple: Dict, cert: Certificate) -> bytes:
+    """PDF bytes of one certificate"""
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A4).build([certificate_table(temple, cert)])
+    return buffer.getvalue()
+
+
+def render_chunk(temple: Dict, certs: List[Certificate]) -> List[RenderedCertificate]:
+    """(file name, PDF bytes) per certificate - runs in a worker process"""
+    return [(certificate_filename(cert), render_certificate(temple, cert)) for cert in certs]
+
+
+def draw_certificate(canvas, temple: Dict, cert: Certificate) -> None:
+    """Draw one certificate as a page of a merged PDF"""
+    page_width, page_height = A4
+    table = certificate_table(temple, cert)
+    width, height = table.wrapOn(canvas, page_width - 2 * inch, page_height - 2 * inch)
+    table.drawOn(canvas, (page_width - width) / 2, page_height - inch - height)
+    canvas.showPage()
+
+
+# ===== OUTPUT =====
+
+
+def _rendered_chunks(
+    temple: Dict, chunks: Iterator[List[Certificate]], processes: int
+) -> Iterator[List[RenderedCertificate]]:
+    """Rendered chunks in order; with processes > 1 rendered in a process pool"""
+    if processes <= 1:
+        for certs in chunks:
+            yield render_chunk(temple, certs)
+        return
+
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        pending = deque()
+        for certs in chunks:
+            pending.append(pool.submit(render_chunk, temple, certs))
+            # Bound what is held in memory: a couple of chunks per worker
+            if len(pending) >= 2 * processes:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_certificates(
+    db: Session,
+    path: str,
+    donation_ids: List[int],
+    temple: Dict,
+    output_format: str = "zip",
+    processes: int = 1,
+    chunk_size: int = CHUNK_SIZE,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Write the certificates of the donations to path, chunk by chunk
+
+    Args:
+        on_progress: Called with the number of certificates written after each chunk
+
+    Returns:
+        Number of certificates written
+    """
+    chunks = iter_certificate_chunks(db, donation_ids, chunk_size)
+    written = 0
+
+    if output_format == "pdf":
+        canvas = pdf_canvas.Canvas(path, pagesize=A4)
+        canvas.setTitle("80G Tax Exemption Certificates")
+        for certs in chunks:
+            for cert in certs:
+                draw_certificate(canvas, temple, cert)
+            written += len(certs)
+            if on_progress:
+                on_progress(written)
+        canvas.save()
+        return written
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for rendered in _rendered_chunks(temple, chunks, processes):
+            for filename, pdf in rendered:
+                archive.writestr(filename, pdf)
+            written += len(rendered)
+            if on_progress:
+                on_progress(written)
+    return written
+
+
+def certificate_file_path(job_id: int, output_format: str) -> str:
+    """Where the output of a bulk certificate job is written"""
+    directory = os.path.join(settings.UPLOAD_DIR, "certificates", "bulk")
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"80g_certificates_{job_id}.{output_format}")
+
+
+def bulk_certificate_job(
+    job_id: int, donation_ids: List[int], temple_id: Optional[int], output_format: str
+) -> None:
+    """Background task entry point - writes the certificates of an id list to disk"""
+    from app.core.database import SessionLocal
+    from app.services.background_job_service import (
+        complete_job,
+        fail_job,
+        start_job,
+        update_progress,
+    )
+
+    db = SessionLocal()
+    path = certificate_file_path(job_id, output_format)
+    try:
+        start_job(db, job_id, total=len(donation_ids))
+        temple = None
+        if temple_id:
+            temple = db.query(Temple).filter(Temple.id == temple_id).first()
+        temple_data = temple_certificate_data(temple)
+
+        def progress(written: int) -> None:
+            update_progress(db, job_id, written, f"{written} certificates generated")
+
+        count = write_certificates(
+            db,
+            path,
+            donation_ids,
+            temple_data,
+            output_format,
+            processes=settings.CERTIFICATE_PROCESSES,
+            on_progress=progress,
+        )
+        complete_job(db, job_id, {"certificate_count": count, "format": output_format})
+    except Exception as e:
+        print(f"⚠️  Bulk 80G certificate generation failed: {str(e)}")
+        if os.path.exists(path):
+            os.remove(path)
+        fail_job(db, job_id, str(e))
+    finally:
+        db.close()
@@ -0,0 +1,376 @@
+"""
+Dashboard Rollup Service
+Maintains donation_daily_totals / seva_daily_totals and serves the dashboard
+statistics tiles from them
+
+Rollups are updated from a Session flush hook, so every code path that
+creates, cancels, edits or deletes donations and seva bookings keeps them
+current. The statistics themselves are read with one statement and kept in
+a short in-process TTL cache, which changes in this process invalidate.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import case, event, func, insert, literal, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core.db_utils import as_day, insert_or_add
+from app.models.dashboard_rollup import DonationDailyTotal, SevaDailyTotal
+from app.models.devotee import Devotee
+from app.models.donation import Donation
+from app.models.seva import SevaBooking, SevaBookingStatus
+from app.models.user import User
+
+_PENDING_ROLLUPS_KEY = "dashboard_rollup_deltas"
+
+# Seconds a computed statistics payload is reused
+STATS_CACHE_TTL_SECONDS = 30
+
+_stats_cache: Dict[Tuple[Optional[int], date], Tuple[float, Dict]] = {}
+_stats_lock = threading.Lock()
+
+
+# ===== ROLLUP MAINTENANCE =====
+
+
+def _booking_temple(session: Session, booking: SevaBooking) -> int:
+    """Temple of a booking - its devotee's, else the booking user's (0 if none)"""
+    devotee = booking.devotee
+    if devotee is None and booking.devotee_id is not None:
+        devotee = session.get(Devotee, booking.devotee_id)
+    if devotee is not None and devotee.temple_id is not None:
+        return devotee.temple_id
+
+    # SevaBooking.user is mapped as a collection, so look the user up by id
+    user = session.get(User, booking.user_id) if booking.user_id is not None else None
+    if user is not None and user.temple_id is not None:
+        return user.temple_id
+    return 0
+
+
+def _collect_deltas(session: Session) -> Dict[Tuple[type, int, date], list]:
+    """
+    Work out how pending changes move the daily totals
+
+    Changed rows contribute minus their stored state (read back from the
+    database, since expired attributes carry no history) and plus their
+    in-memory state, so edits that do not affect the totals cancel out.
+    """
+    deltas = defaultdict(lambda: [0.0, 0])
+
+    donations = []
+    bookings = []
+    # session.new / session.deleted build a new set on every access
+    new, deleted = session.new, session.deleted
+    for obj in list(new) + list(session.dirty) + list(deleted):
+        if isinstance(obj, Donation):
+            donations.append(obj)
+        elif isinstance(obj, SevaBooking):
+            bookings.append(obj)
+
+    if not donations and not bookings:
+        return {}
+
+    donation_ids = [d.id for d in donations if d not in new and d.id is not None]
+    if donation_ids:
+        stored = session.execute(
+            select(
+                func.coalesce(Donation.temple_id, 0), Donation.donation_date, Donation.amount
+            ).where(
+                Donation.id.in_(donation_ids),
+                or_(Donation.is_cancelled == False, Donation.is_cancelled.is_(None)),
+            )
+        ).all()
+        for temple_id, day, amount in stored:
+            key = (DonationDailyTotal, temple_id, as_day(day))
+            deltas[key][0] -= float(amount or 0)
+            deltas[key][1] -= 1
+
+    for donation in donations:
+        if donation in deleted or donation.is_cancelled:
+            continue
+        key = (DonationDailyTotal, donation.temple_id or 0, as_day(donation.donation_date))
+        deltas[key][0] += float(donation.amount or 0)
+        deltas[key][1] += 1
+
+    booking_ids = [b.id for b in bookings if b not in new and b.id is not None]
+    if booking_ids:
+        stored = session.execute(
+            select(
+                func.coalesce(Devotee.temple_id, User.temple_id, 0),
+                SevaBooking.created_at,
+                SevaBooking.amount_paid,
+            )
+            .select_from(SevaBooking)
+            .outerjoin(Devotee, SevaBooking.devotee_id == Devotee.id)
+            .outerjoin(User, SevaBooking.user_id == User.id)
+            .where(
+                SevaBooking.id.in_(booking_ids),
+                or_(
+                    SevaBooking.status != SevaBookingStatus.CANCELLED,
+                    SevaBooking.status.is_(None),
+                ),
+            )
+        ).all()
+        for temple_id, created_at, amount in stored:
+            key = (SevaDailyTotal, temple_id, as_day(created_at))
+            deltas[key][0] -= float(amount or 0)
+            deltas[key][1] -= 1
+
+    for booking in bookings:
+        if booking in deleted or booking.status == SevaBookingStatus.CANCELLED:
+            continue
+        # created_at is filled by its column default on insert
+        day = as_day(booking.created_at) or datetime.utcnow().date()
+        key = (SevaDailyTotal, _booking_temple(session, booking), day)
+        deltas[key][0] += float(booking.amount_paid or 0)
+        deltas[key][1] += 1
+
+    return {
+        key: values
+        for key, values in deltas.items()
+        if key[2] is not None and (abs(values[0]) > 1e-9 or values[1] != 0)
+    }
+
+
+def _apply_deltas(connection, deltas: Dict[Tuple[type, int, date], list]) -> None:
+    """Add movements to the rollup tables (upsert on temple_id + total_date)"""
+    now = datetime.utcnow()
+
+    for (model, temple_id, day), (amount, count) in deltas.items():
+        table = model.__table__
+        values = dict(
+            temple_id=temple_id, total_date=day, amount=amount, count=count, updated_at=now
+        )
+        increments = {
+            "amount": table.c.amount + amount,
+            "count": table.c.count + count,
+            "updated_at": now,
+        }
+
+        insert_or_add(connection, table, values, increments, ["temple_id", "total_date"])
+
+
+@event.listens_for(Session, "before_flush")
+def _rollup_before_flush(session, flush_context, instances):
+    with session.no_autoflush:
+        session.info[_PENDING_ROLLUPS_KEY] = _collect_deltas(session)
+
+
+@event.listens_for(Session, "after_flush")
+def _rollup_after_flush(session, flush_context):
+    deltas = session.info.pop(_PENDING_ROLLUPS_KEY, None)
+    if deltas:
+        _apply_deltas(session.connection(), deltas)
+        invalidate_dashboard_cache({temple_id for _, temple_id, _ in deltas})
+
+
+def record_donations(db: Session, donations: Iterable[Tuple[int, date, float]]) -> None:
+    """
+    Add donations written with bulk INSERTs (which bypass the flush hook)
+    to the rollups
+
+    Args:
+        donations: (temple_id, donation_date, amount) per active donation
+    """
+    deltas = defaultdict(lambda: [0.0, 0])
+    for temple_id, day, amount in donations:
+        key = (DonationDailyTotal, temple_id or 0, as_day(day))
+        deltas[key][0] += float(amount or 0)
+        deltas[key][1] += 1
+    if deltas:
+        _apply_deltas(db.connection(), deltas)
+        invalidate_dashboard_cache({temple_id for _, temple_id, _ in deltas})
+
+
+def rebuild_dashboard_rollups(db: Session, temple_id: Optional[int] = None) -> int:
+    """
+    Recompute both rollup tables from donations and seva bookings
+    Used for backfilling existing installations and after bulk data repairs
+
+    Returns:
+        Number of rollup rows written
+    """
+    donation_temple = func.coalesce(Donation.temple_id, 0)
+    donation_source = (
+        select(
+            donation_temple,
+            Donation.donation_date,
+            func.coalesce(func.sum(Donation.amount), 0.0),
+            func.count(Donation.id),
+        )
+        .where(or_(Donation.is_cancelled == False, Donation.is_cancelled.is_(None)))
+        .group_by(donation_temple, Donation.donation_date)
+    )
+
+    booking_temple = func.coalesce(Devotee.temple_id, User.temple_id, 0)
+    booking_day = func.date(SevaBooking.created_at)
+    booking_source = (
+        select(
+            booking_temple,
+            booking_day,
+            func.coalesce(func.sum(SevaBooking.amount_paid), 0.0),
+            func.count(SevaBooking.id),
+        )
+        .select_from(SevaBooking)
+        .outerjoin(Devotee, SevaBooking.devotee_id == Devotee.id)
+        .outerjoin(User, SevaBooking.user_id == User.id)
+        .where(
+            SevaBooking.created_at.isnot(None),
+            or_(
+                SevaBooking.status != SevaBookingStatus.CANCELLED,
+                SevaBooking.status.is_(None),
+            ),
+        )
+        .group_by(booking_temple, booking_day)
+    )
+
+    if temple_id is not None:
+        donation_source = donation_source.where(donation_temple == temple_id)
+        booking_source = booking_source.where(booking_temple == temple_id)
+
+    written = 0
+    now = datetime.utcnow()
+    for model, source in ((DonationDailyTotal, donation_source), (SevaDailyTotal, booking_source)):
+        delete_query = db.query(model)
+        if temple_id is not None:
+            delete_query = delete_query.filter(model.temple_id == temple_id)
+        delete_query.delete(synchronize_session=False)
+
+        rows = [
+            dict(
+                temple_id=row_temple_id,
+                total_date=as_day(day),
+                amount=float(amount),
+                count=int(count),
+                updated_at=now,
+            )
+            for row_temple_id, day, amount, count in db.execute(source)
+            if day is not None
+        ]
+        if rows:
+            db.execute(insert(model.__table__), rows)
+        written += len(rows)
+
+    db.commit()
+    invalidate_dashboard_cache()
+    return written
+
+
+def ensure_dashboard_rollups(db: Session) -> bool:
+    """Rebuild the rollups if they are empty but donations or bookings exist"""
+    if db.query(DonationDailyTotal.id).first() or db.query(SevaDailyTotal.id).first():
+        return False
+    if not db.query(Donation.id).first() and not db.query(SevaBooking.id).first():
+        return False
+    rebuild_dashboard_rollups(db)
+    return True
+
+
+# ===== DASHBOARD STATISTICS =====
+
+
+def invalidate_dashboard_cache(temple_ids: Optional[Iterable[int]] = None) -> None:
+    """Drop cached statistics (for the given temples, or all)"""
+    with _stats_lock:
+        if temple_ids is None:
+            _stats_cache.clear()
+            return
+        affected = set(temple_ids)
+        for key in list(_stats_cache):
+            # Statistics without a temple filter (standalone) cover every temple
+            if key[0] is None or key[0] in affected:
+                del _stats_cache[key]
+
+
+def dashboard_periods(today: date) -> Dict[str, date]:
+    """Month and financial-year (April-March) windows containing today"""
+    month_start = date(today.year, today.month, 1)
+    month_end = (
+        date(today.year + 1, 1, 1) if today.month == 12 else date(today.year, today.month + 1, 1)
+    )
+    if today.month >= 4:
+        year_start, year_end = date(today.year, 4, 1), date(today.year + 1, 4, 1)
+    else:
+        year_start, year_end = date(today.year - 1, 4, 1), date(today.year, 4, 1)
+    return {
+        "today": today,
+        "month_start": month_start,
+        "month_end": month_end,
+        "year_start": year_start,
+        "year_end": year_end,
+    }
+
+
+def _totals_select(model, kind: str, temple_id: Optional[int], periods: Dict[str, date]):
+    day = model.total_date
+    in_month = (day >= periods["month_start"]) & (day < periods["month_end"])
+    on_today = day == periods["today"]
+
+    def windowed(condition, column):
+        return func.coalesce(func.sum(case((condition, column), else_=0)), 0)
+
+    query = select(
+        literal(kind).label("kind"),
+        windowed(on_today, model.amount).label("today_amount"),
+        windowed(on_today, model.count).label("today_count"),
+        windowed(in_month, model.amount).label("month_amount"),
+        windowed(in_month, model.count).label("month_count"),
+        func.coalesce(func.sum(model.amount), 0).label("year_amount"),
+        func.coalesce(func.sum(model.count), 0).label("year_count"),
+    ).where(
+        # The month always lies inside the financial year
+        day >= periods["year_start"],
+        day < periods["year_end"],
+    )
+    if temple_id is not None:
+        query = query.where(model.temple_id == temple_id)
+    return query
+
+
+def get_dashboard_stats(
+    db: Session, temple_id: Optional[int], today: Optional[date] = None
+) -> Dict:
+    """
+    Donation and seva totals for today, this month and this financial year
+
+    temple_id None returns totals across all temples (standalone mode).
+    Results are cached for STATS_CACHE_TTL_SECONDS per temple and day.
+    """
+    today = today or date.today()
+    key = (temple_id, today)
+    with _stats_lock:
+        cached = _stats_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+    periods = dashboard_periods(today)
+    statement = union_all(
+        _totals_select(DonationDailyTotal, "donations", temple_id, periods),
+        _totals_select(SevaDailyTotal, "sevas", temple_id, periods),
+    )
+
+    stats = {
+        kind: {
+            "today": {"amount": 0.0, "count": 0},
+            "month": {"amount": 0.0, "count": 0},
+            "year": {"amount": 0.0, "count": 0},
+        }
+        for kind in ("donations", "sevas")
+    }
+    for row in db.execute(statement):
+        stats[row.kind] = {
+            "today": {"amount": float(row.today_amount), "count": int(row.today_count)},
+            "month": {"amount": float(row.month_amount), "count": int(row.month_count)},
+            "year": {"amount": float(row.year_amount), "count": int(row.year_count)},
+        }
+
+    stats["period"] = {name: value.isoformat() for name, value in periods.items()}
+
+    with _stats_lock:
+        _stats_cache[key] = (time.monotonic() + STATS_CACHE_TTL_SECONDS, stats)
+    return stats
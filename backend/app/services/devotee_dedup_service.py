@@ -0,0 +1,465 @@
+"""
+Devotee Deduplication Service
+Finds likely duplicate devotees without comparing every pair
+
+Each devotee gets a few blocking keys - normalized phone, normalized email
+and city + first name token. Only devotees sharing a key are compared;
+each pair is scored (0-1) and pairs at or above the threshold are joined
+into groups, so A~B and B~C end up in one group.
+
+The background job keeps the keys in devotee_match_keys and the groups in
+devotee_duplicate_groups for the merge screen. After the first run it only
+re-keys devotees changed since the previous run and re-scores the blocks
+those changes touch.
+"""
+
+import re
+from collections import defaultdict
+from datetime import datetime
+from difflib import SequenceMatcher
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.background_job import BackgroundJob, BackgroundJobStatus
+from app.models.devotee import Devotee
+from app.models.devotee_duplicate import (
+    DevoteeDuplicateGroup,
+    DevoteeMatchKey,
+    DuplicateGroupStatus,
+)
+
+DEDUP_JOB_TYPE = "devotee_dedup"
+DEFAULT_THRESHOLD = 0.8
+
+# Blocks larger than this (e.g. a common first name in a big city) are only
+# compared with their NEIGHBOUR_WINDOW nearest names instead of pairwise
+MAX_BLOCK_SIZE = 200
+NEIGHBOUR_WINDOW = 20
+
+# IN-list size for key/id lookups
+CHUNK_SIZE = 500
+
+# Pair scores for exact contact matches; name matches score their similarity
+PHONE_MATCH_SCORE = 1.0
+EMAIL_MATCH_SCORE = 0.95
+
+_NAME_PREFIX = re.compile(r"^(m/s|mr|mrs|ms|miss|dr|sri|shri|smt|kum)\.?\s+")
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+# Normalization
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """Digits only, without country code; None for placeholders like 0000000000"""
+    digits = re.sub(r"\D", "", phone or "")
+    if len(digits) > 10:
+        digits = digits[-10:]
+    if len(digits) < 6 or len(set(digits)) == 1:
+        return None
+    return digits
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    email = (email or "").strip().lower()
+    return email if "@" in email else None
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Lower case words without honorifics (Mr., Smt., M/s ...) or punctuation"""
+    name = _NAME_PREFIX.sub("", (name or "").strip().lower())
+    return " ".join(_NON_ALNUM.sub(" ", name).split())
+
+
+def _normalize_city(city: Optional[str]) -> str:
+    return " ".join(_NON_ALNUM.sub(" ", (city or "").lower()).split())
+
+
+def _profile(devotee_id: int, name, phone, email, city) -> Dict:
+    """Normalized fields of one devotee, as compared by match_score"""
+    return {
+        "id": devotee_id,
+        "phone": normalize_phone(phone),
+        "email": normalize_email(email),
+        "name": normalize_name(name),
+        "city": _normalize_city(city),
+    }
+
+
+def blocking_keys(profile: Dict) -> List[str]:
+    """Keys under which a devotee is compared with others"""
+    keys = []
+    if profile["phone"]:
+        keys.append(f"p:{profile['phone']}")
+    if profile["email"]:
+        keys.append(f"e:{profile['email'][:150]}")
+    if profile["name"] and profile["city"]:
+        first = profile["name"].split()[0]
+        keys.append(f"n:{profile['city'][:80]}|{first[:60]}")
+    return keys
+
+
+# Scoring
+
+
+def match_score(a: Dict, b: Dict) -> Tuple[float, Optional[str]]:
+    """Similarity (0-1) of two profiles and what matched"""
+    if a["phone"] and a["phone"] == b["phone"]:
+        return PHONE_MATCH_SCORE, "phone"
+    if a["email"] and a["email"] == b["email"]:
+        return EMAIL_MATCH_SCORE, "email"
+    if a["name"] and b["name"] and a["city"] and a["city"] == b["city"]:
+        return SequenceMatcher(None, a["name"], b["name"]).ratio(), "name_city"
+    return 0.0, None
+
+
+def _candidate_pairs(members: List[int], profiles: Dict[int, Dict]) -> Iterable[Tuple[int, int]]:
+    if len(members) <= MAX_BLOCK_SIZE:
+        return combinations(members, 2)
+    ordered = sorted(members, key=lambda devotee_id: profiles[devotee_id]["name"])
+    return (
+        (ordered[i], ordered[j])
+        for i in range(len(ordered))
+        for j in range(i + 1, min(i + 1 + NEIGHBOUR_WINDOW, len(ordered)))
+    )
+
+
+def group_blocks(
+    blocks: Iterable[List[int]], profiles: Dict[int, Dict], threshold: float
+) -> List[Dict]:
+    """
+    Score the pairs inside each block and join matches into groups
+
+    Returns [{"devotee_ids": [...], "score": best pair score, "reasons": [...]}]
+    sorted by score, best first.
+    """
+    parent: Dict[int, int] = {}
+
+    def find(devotee_id: int) -> int:
+        while parent[devotee_id] != devotee_id:
+            parent[devotee_id] = parent[parent[devotee_id]]
+            devotee_id = parent[devotee_id]
+        return devotee_id
+
+    compared: Set[Tuple[int, int]] = set()
+    matches = []
+    for members in blocks:
+        for a, b in _candidate_pairs(members, profiles):
+            pair = (a, b) if a < b else (b, a)
+            if pair in compared:
+                continue
+            compared.add(pair)
+            score, reason = match_score(profiles[a], profiles[b])
+            if reason and score >= threshold:
+                parent.setdefault(a, a)
+                parent.setdefault(b, b)
+                parent[find(a)] = find(b)
+                matches.append((a, score, reason))
+
+    groups: Dict[int, Dict] = {}
+    for devotee_id in parent:
+        root = find(devotee_id)
+        groups.setdefault(root, {"devotee_ids": [], "score": 0.0, "reasons": set()})
+        groups[root]["devotee_ids"].append(devotee_id)
+    for devotee_id, score, reason in matches:
+        group = groups[find(devotee_id)]
+        group["score"] = max(group["score"], round(score, 4))
+        group["reasons"].add(reason)
+
+    result = []
+    for group in groups.values():
+        group["devotee_ids"].sort()
+        group["reasons"] = sorted(group["reasons"])
+        result.append(group)
+    result.sort(key=lambda g: (-g["score"], g["devotee_ids"][0]))
+    return result
+
+
+# On-demand search
+
+
+def _devotee_query(db: Session, temple_id: Optional[int]):
+    query = db.query(Devotee.id, Devotee.name, Devotee.phone, Devotee.email, Devotee.city)
+    if temple_id:
+        query = query.filter(Devotee.temple_id == temple_id)
+    return query
+
+
+def find_duplicate_groups(
+    db: Session, temple_id: Optional[int], threshold: float = DEFAULT_THRESHOLD
+) -> List[Dict]:
+    """
+    Duplicate groups of a temple, computed in one pass over its devotees
+
+    Devotees are streamed once and bucketed by blocking key in memory, so the
+    cost grows with the number of devotees rather than the number of pairs.
+    """
+    profiles: Dict[int, Dict] = {}
+    blocks: Dict[str, List[int]] = defaultdict(list)
+    for row in _devotee_query(db, temple_id).yield_per(2000):
+        profile = _profile(*row)
+        profiles[row.id] = profile
+        for key in blocking_keys(profile):
+            blocks[key].append(row.id)
+
+    return group_blocks(
+        (members for members in blocks.values() if len(members) > 1), profiles, threshold
+    )
+
+
+# Stored keys and groups (background job)
+
+
+def _chunks(values: List, size: int = CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def _last_scan_at(db: Session, scope: int) -> Optional[str]:
+    """Start time (ISO) of the last completed scan of this temple"""
+    jobs = db.query(BackgroundJob).filter(
+        BackgroundJob.job_type == DEDUP_JOB_TYPE,
+        BackgroundJob.status == BackgroundJobStatus.COMPLETED,
+        BackgroundJob.temple_id == scope if scope else BackgroundJob.temple_id.is_(None),
+    )
+    for job in jobs.order_by(BackgroundJob.id.desc()).limit(5):
+        if job.result and job.result.get("scanned_at"):
+            return job.result["scanned_at"]
+    return None
+
+
+def _refresh_match_keys(
+    db: Session, temple_id: Optional[int], since: Optional[str]
+) -> Tuple[Optional[Set[str]], Set[int]]:
+    """
+    Rewrite the keys of devotees changed since `since` (all when None)
+
+    Returns the keys whose blocks may have changed (None = all of them) and
+    the ids of the devotees that were re-keyed.
+    """
+    scope = temple_id or 0
+    query = _devotee_query(db, temple_id)
+    if since is not None:
+        query = query.filter((Devotee.updated_at >= since) | Devotee.updated_at.is_(None))
+    changed = {row.id: _profile(*row) for row in query}
+
+    dirty: Optional[Set[str]] = None
+    if since is None:
+        db.query(DevoteeMatchKey).filter(DevoteeMatchKey.temple_id == scope).delete(
+            synchronize_session=False
+        )
+    else:
+        dirty = set()
+        for ids in _chunks(list(changed)):
+            dirty.update(
+                key
+                for (key,) in db.query(DevoteeMatchKey.match_key).filter(
+                    DevoteeMatchKey.devotee_id.in_(ids)
+                )
+            )
+            db.query(DevoteeMatchKey).filter(DevoteeMatchKey.devotee_id.in_(ids)).delete(
+                synchronize_session=False
+            )
+
+        # Keys of devotees deleted (or merged away) since the last run
+        orphans = (
+            db.query(DevoteeMatchKey.id, DevoteeMatchKey.match_key)
+            .outerjoin(Devotee, Devotee.id == DevoteeMatchKey.devotee_id)
+            .filter(DevoteeMatchKey.temple_id == scope, Devotee.id.is_(None))
+            .all()
+        )
+        dirty.update(row.match_key for row in orphans)
+        for ids in _chunks([row.id for row in orphans]):
+            db.query(DevoteeMatchKey).filter(DevoteeMatchKey.id.in_(ids)).delete(
+                synchronize_session=False
+            )
+
+    mappings = [
+        {"temple_id": scope, "devotee_id": devotee_id, "match_key": key}
+        for devotee_id, profile in changed.items()
+        for key in blocking_keys(profile)
+    ]
+    db.bulk_insert_mappings(DevoteeMatchKey, mappings)
+    if dirty is not None:
+        dirty.update(mapping["match_key"] for mapping in mappings)
+    return dirty, set(changed)
+
+
+def _shared_keys(db: Session, scope: int, keys: Optional[Iterable[str]]) -> List[str]:
+    """Keys (of the given ones, or all) held by more than one devotee"""
+    base = (
+        db.query(DevoteeMatchKey.match_key)
+        .filter(DevoteeMatchKey.temple_id == scope)
+        .group_by(DevoteeMatchKey.match_key)
+        .having(func.count(DevoteeMatchKey.id) > 1)
+    )
+    if keys is None:
+        return [key for (key,) in base]
+    shared = []
+    for chunk in _chunks(list(keys)):
+        shared.extend(key for (key,) in base.filter(DevoteeMatchKey.match_key.in_(chunk)))
+    return shared
+
+
+def _keys_of(db: Session, devotee_ids: Iterable[int]) -> Set[str]:
+    keys = set()
+    for ids in _chunks(list(devotee_ids)):
+        keys.update(
+            key
+            for (key,) in db.query(DevoteeMatchKey.match_key).filter(
+                DevoteeMatchKey.devotee_id.in_(ids)
+            )
+        )
+    return keys
+
+
+def _load_blocks(db: Session, scope: int, keys: List[str]) -> Dict[str, List[int]]:
+    blocks: Dict[str, List[int]] = defaultdict(list)
+    for chunk in _chunks(keys):
+        for key, devotee_id in db.query(
+            DevoteeMatchKey.match_key, DevoteeMatchKey.devotee_id
+        ).filter(DevoteeMatchKey.temple_id == scope, DevoteeMatchKey.match_key.in_(chunk)):
+            blocks[key].append(devotee_id)
+    return blocks
+
+
+def _load_profiles(db: Session, devotee_ids: Iterable[int]) -> Dict[int, Dict]:
+    profiles = {}
+    for ids in _chunks(list(devotee_ids)):
+        for row in db.query(
+            Devotee.id, Devotee.name, Devotee.phone, Devotee.email, Devotee.city
+        ).filter(Devotee.id.in_(ids)):
+            profiles[row.id] = _profile(*row)
+    return profiles
+
+
+def scan_duplicates(
+    db: Session,
+    temple_id: Optional[int],
+    threshold: float = DEFAULT_THRESHOLD,
+    since: Optional[str] = None,
+) -> Dict:
+    """
+    Refresh the stored duplicate groups of a temple
+
+    With `since` (ISO timestamp) only devotees updated after it are re-keyed,
+    and only the open groups touching their blocks are replaced. Groups that
+    were dismissed are not raised again with the same members.
+    Commits; returns counts for the job result.
+    """
+    scope = temple_id or 0
+    dirty, changed = _refresh_match_keys(db, temple_id, since)
+    blocks = _load_blocks(db, scope, _shared_keys(db, scope, dirty))
+    affected = set(changed).union(*blocks.values())
+
+    open_groups = db.query(DevoteeDuplicateGroup).filter(
+        DevoteeDuplicateGroup.temple_id == scope,
+        DevoteeDuplicateGroup.status == DuplicateGroupStatus.OPEN,
+    )
+    if dirty is None:
+        stale = open_groups.all()
+    else:
+        stale = [g for g in open_groups if affected.intersection(g.devotee_ids)]
+        # Members of replaced groups may be linked through untouched blocks
+        extra = {devotee_id for g in stale for devotee_id in g.devotee_ids} - affected
+        if extra:
+            more = set(_shared_keys(db, scope, _keys_of(db, extra))) - set(blocks)
+            blocks.update(_load_blocks(db, scope, list(more)))
+
+    profiles = _load_profiles(db, {devotee_id for ids in blocks.values() for devotee_id in ids})
+    blocks_found = [
+        [devotee_id for devotee_id in members if devotee_id in profiles]
+        for members in blocks.values()
+    ]
+    groups = group_blocks(blocks_found, profiles, threshold)
+
+    dismissed = {
+        tuple(g.devotee_ids)
+        for g in db.query(DevoteeDuplicateGroup.devotee_ids).filter(
+            DevoteeDuplicateGroup.temple_id == scope,
+            DevoteeDuplicateGroup.status == DuplicateGroupStatus.DISMISSED,
+        )
+    }
+    for group in stale:
+        db.delete(group)
+    created = 0
+    for group in groups:
+        if tuple(group["devotee_ids"]) in dismissed:
+            continue
+        db.add(
+            DevoteeDuplicateGroup(
+                temple_id=scope,
+                devotee_ids=group["devotee_ids"],
+                score=group["score"],
+                reasons=group["reasons"],
+                status=DuplicateGroupStatus.OPEN,
+            )
+        )
+        created += 1
+    db.commit()
+
+    return {
+        "devotees_rekeyed": len(changed),
+        "blocks_scored": len(blocks_found),
+        "groups_replaced": len(stale),
+        "groups_found": created,
+    }
+
+
+def release_merged_devotees(db: Session, primary_id: int, duplicate_ids: List[int]) -> None:
+    """
+    Close open groups touched by a merge and drop the merged devotees' keys
+    Called by /devotees/merge before the duplicates are deleted
+    """
+    merged = set(duplicate_ids) | {primary_id}
+    db.query(DevoteeMatchKey).filter(DevoteeMatchKey.devotee_id.in_(duplicate_ids)).delete(
+        synchronize_session=False
+    )
+    open_groups = db.query(DevoteeDuplicateGroup).filter(
+        DevoteeDuplicateGroup.status == DuplicateGroupStatus.OPEN
+    )
+    for group in open_groups:
+        if merged.intersection(group.devotee_ids):
+            group.status = DuplicateGroupStatus.MERGED
+
+
+def devotee_dedup_job(
+    job_id: int, temple_id: Optional[int], threshold: float = DEFAULT_THRESHOLD, full: bool = False
+) -> None:
+    """
+    Background task entry point - refreshes a temple's stored duplicate groups
+
+    Incremental after the first completed run unless `full` is set.
+
+    Args:
+        job_id: BackgroundJob to report progress on
+        temple_id: Temple to scan (None = all devotees, standalone installs)
+        threshold: Minimum pair score (0-1) to treat two devotees as duplicates
+        full: Re-key every devotee and rebuild all open groups
+    """
+    from app.core.database import SessionLocal
+    from app.services.background_job_service import (
+        complete_job,
+        fail_job,
+        start_job,
+        update_progress,
+    )
+
+    db = SessionLocal()
+    try:
+        start_job(db, job_id, total=1)
+        scanned_at = datetime.utcnow().isoformat()
+        since = None if full else _last_scan_at(db, temple_id or 0)
+        update_progress(db, job_id, 0, "Full scan" if since is None else f"Changes since {since}")
+
+        result = scan_duplicates(db, temple_id, threshold, since)
+        result.update({"scanned_at": scanned_at, "incremental": since is not None})
+        complete_job(db, job_id, result)
+    except Exception as e:
+        print(f"⚠️  Devotee duplicate scan failed: {str(e)}")
+        fail_job(db, job_id, str(e))
+    finally:
+        db.close()
@@ -0,0 +1,549 @@
+"""
+Devotee Search Service
+Indexed devotee search for the counter: name prefixes, phonetic name
+matches, Kannada names, phone number prefixes/suffixes and tags
+
+Each devotee has a devotee_search_index row (name words with Kannada
+transliterated to Latin, phonetic codes of the name words, normalized phone
+and its reverse) and one devotee_tags row per tag. A Session flush hook
+keeps both current. Searches run on the index with the backend of the
+database:
+
+- PostgreSQL: tsvector prefix/phonetic match plus pg_trgm word similarity
+  (typos), both backed by GIN indexes
+- SQLite (standalone): an FTS5 table over the same keys
+- Otherwise (or before the FTS5 table exists): word-prefix LIKE on the
+  narrow index table
+
+ensure_devotee_search_index creates the backend objects and backfills the
+index on startup.
+"""
+
+import json
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import (
+    and_,
+    column,
+    delete,
+    event,
+    func,
+    insert,
+    inspect,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+    text,
+)
+from sqlalchemy.orm import Session
+
+from app.models.devotee import Devotee
+from app.models.devotee_search import DevoteeSearchIndex, DevoteeTag
+from app.services.devotee_dedup_service import normalize_name, normalize_phone
+
+_PENDING_SEARCH_KEY = "devotee_search_pending"
+_FTS_READY_KEY = "devotee_search_fts"
+_TRGM_READY_KEY = "devotee_search_trgm"
+
+FTS_TABLE = "devotee_search_fts"
+VIP_TAGS = ("VIP", "Patron")
+
+# Devotee fields the index is built from
+INDEXED_FIELDS = ("name", "full_name", "email", "phone", "tags", "temple_id")
+
+# Shortest term matched by phonetic code / phone digits
+MIN_PHONETIC_LENGTH = 3
+MIN_PHONE_DIGITS = 3
+
+CHUNK_SIZE = 500
+
+_PG_TSVECTOR = "to_tsvector('simple'::regconfig, name_text || ' ' || phonetic_text)"
+_PG_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS ix_devotee_search_index_trgm "
+    "ON devotee_search_index USING gin (name_text gin_trgm_ops)",
+    f"CREATE INDEX IF NOT EXISTS ix_devotee_search_index_tsv "
+    f"ON devotee_search_index USING gin (({_PG_TSVECTOR}))",
+)
+_FTS_DDL = f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(name_text, phonetic_text)"
+_fts = table(FTS_TABLE, column("rowid"), column("name_text"), column("phonetic_text"))
+
+
+# Kannada transliteration
+
+_KN_VOWELS = {
+    "ಅ": "a",
+    "ಆ": "aa",
+    "ಇ": "i",
+    "ಈ": "ii",
+    "ಉ": "u",
+    "ಊ": "uu",
+    "ಋ": "ru",
+    "ಎ": "e",
+    "ಏ": "ee",
+    "ಐ": "ai",
+    "ಒ": "o",
+    "ಓ": "oo",
+    "ಔ": "au",
+}
+_KN_CONSONANTS = {
+    "ಕ": "k",
+    "ಖ": "kh",
+    "ಗ": "g",
+    "ಘ": "gh",
+    "ಙ": "ng",
+    "ಚ": "ch",
+    "ಛ": "chh",
+    "ಜ": "j",
+    "ಝ": "jh",
+    "ಞ": "ny",
+    "ಟ": "t",
+    "ಠ": "th",
+    "ಡ": "d",
+    "ಢ": "dh",
+    "ಣ": "n",
+    "ತ": "t",
+    "ಥ": "th",
+    "ದ": "d",
+    "ಧ": "dh",
+    "ನ": "n",
+    "ಪ": "p",
+    "ಫ": "ph",
+    "ಬ": "b",
+    "ಭ": "bh",
+    "ಮ": "m",
+    "ಯ": "y",
+    "ರ": "r",
+    "ಱ": "r",
+    "ಲ": "l",
+    "ಳ": "l",
+    "ೞ": "l",
+    "ವ": "v",
+    "ಶ": "sh",
+    "ಷ": "sh",
+    "ಸ": "s",
+    "ಹ": "h",
+}
+_KN_VOWEL_SIGNS = {
+    "ಾ": "aa",
+    "ಿ": "i",
+    "ೀ": "ii",
+    "ು": "u",
+    "ೂ": "uu",
+    "ೃ": "ru",
+    "ೆ": "e",
+    "ೇ": "ee",
+    "ೈ": "ai",
+    "ೊ": "o",
+    "ೋ": "oo",
+    "ೌ": "au",
+}
+_KN_OTHER = {"ಂ": "m", "ಃ": "h", **{chr(0x0CE6 + n): str(n) for n in range(10)}}
+_KN_VIRAMA = "್"
+_KN_NUKTA = "಼"
+
+
+def transliterate(value: Optional[str]) -> str:
+    """Kannada script to Latin letters (ಶ್ರೀನಿವಾಸ -> shriinivaasa); other text unchanged"""
+    out = []
+    inherent_a = False  # Last consonant still carries its inherent "a"
+    for ch in value or "":
+        if ch in _KN_CONSONANTS:
+            if inherent_a:
+                out.append("a")
+            out.append(_KN_CONSONANTS[ch])
+            inherent_a = True
+        elif ch in _KN_VOWEL_SIGNS:
+            out.append(_KN_VOWEL_SIGNS[ch])
+            inherent_a = False
+        elif ch == _KN_VIRAMA:
+            inherent_a = False
+        elif ch == _KN_NUKTA:
+            continue
+        else:
+            if inherent_a:
+                out.append("a")
+                inherent_a = False
+            out.append(_KN_VOWELS.get(ch) or _KN_OTHER.get(ch) or ch)
+    if inherent_a:
+        out.append("a")
+    return "".join(out)
+
+
+# Normalization
+
+_PHONETIC_RULES = (
+    ("chh", "c"),
+    ("ksh", "ks"),
+    ("ch", "c"),
+    ("sh", "s"),
+    ("ph", "f"),
+    ("kh", "k"),
+    ("gh", "g"),
+    ("jh", "j"),
+    ("th", "t"),
+    ("dh", "d"),
+    ("bh", "b"),
+    ("ck", "k"),
+    ("q", "k"),
+    ("x", "ks"),
+    ("z", "j"),
+    ("w", "v"),
+    ("ee", "i"),
+    ("oo", "u"),
+)
+
+
+def search_words(value: Optional[str]) -> List[str]:
+    """Lower case ASCII words of a name or search term, Kannada transliterated"""
+    value = unicodedata.normalize("NFKD", transliterate(value))
+    value = value.encode("ascii", "ignore").decode("ascii")
+    return normalize_name(value).split()
+
+
+def phonetic_key(word: str) -> str:
+    """
+    Spelling-insensitive code of a name word
+
+    Aspirates and spelling variants are folded (sh/s, th/t, w/v, ee/i ...),
+    then vowels and "h" after the first letter are dropped and repeats
+    collapsed, so Srinivas, Shreenivaas and ಶ್ರೀನಿವಾಸ all give "srnvs".
+    """
+    word = re.sub(r"[^a-z]", "", word.lower())
+    if not word:
+        return ""
+    for source, target in _PHONETIC_RULES:
+        word = word.replace(source, target)
+    code = word[0] + re.sub(r"[aeiouyh]", "", word[1:])
+    return re.sub(r"(.)\1+", r"\1", code)
+
+
+def parse_tags(tags) -> List[str]:
+    """Tags of a devotee from the JSON list in devotees.tags"""
+    if not tags:
+        return []
+    try:
+        values = json.loads(tags) if isinstance(tags, str) else tags
+    except (TypeError, ValueError):
+        return []
+    if not isinstance(values, list):
+        return []
+    return list(dict.fromkeys(str(tag).strip()[:50] for tag in values if str(tag).strip()))
+
+
+def search_keys(name, full_name, email, phone) -> Dict:
+    """devotee_search_index values of one devotee"""
+    names = list(dict.fromkeys(search_words(name) + search_words(full_name)))
+    email_words = search_words((email or "").replace("@", " "))
+    phonetic = [phonetic_key(word) for word in names if len(word) >= 2]
+    phone_key = normalize_phone(phone)
+    return {
+        "name_text": " ".join(dict.fromkeys(names + email_words)),
+        "phonetic_text": " ".join(dict.fromkeys(code for code in phonetic if code)),
+        "phone_key": phone_key,
+        "phone_reversed": phone_key[::-1] if phone_key else None,
+    }
+
+
+# Backend
+
+
+def _dialect(connection) -> str:
+    return connection.dialect.name
+
+
+def _fts_ready(connection) -> bool:
+    """Whether the SQLite FTS5 table exists (only positives are cached)"""
+    if _dialect(connection) != "sqlite":
+        return False
+    if connection.info.get(_FTS_READY_KEY):
+        return True
+    found = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE},
+    ).first()
+    if found:
+        connection.info[_FTS_READY_KEY] = True
+    return bool(found)
+
+
+def _trgm_ready(connection) -> bool:
+    """Whether pg_trgm is installed (only positives are cached)"""
+    if connection.info.get(_TRGM_READY_KEY):
+        return True
+    found = connection.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first()
+    if found:
+        connection.info[_TRGM_READY_KEY] = True
+    return bool(found)
+
+
+def ensure_search_backend(db: Session) -> str:
+    """
+    Create the full-text objects of the database (idempotent); commits
+
+    Returns "postgresql", "fts5" or "like" (the fallback when they can't be
+    created, e.g. SQLite without FTS5 or no CREATE EXTENSION privilege).
+    """
+    dialect = _dialect(db.get_bind())
+    statements = {"postgresql": _PG_DDL, "sqlite": (_FTS_DDL,)}.get(dialect)
+    if not statements:
+        return "like"
+    try:
+        for statement in statements:
+            db.execute(text(statement))
+        db.commit()
+    except Exception:
+        db.rollback()
+        return "postgresql" if dialect == "postgresql" else "like"
+    return "postgresql" if dialect == "postgresql" else "fts5"
+
+
+# Index maintenance
+
+
+def _chunks(values: List, size: int = CHUNK_SIZE):
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+def _index_rows(rows) -> tuple:
+    entries, tags = [], []
+    for row in rows:
+        temple_id = row.temple_id or 0
+        entries.append(
+            {
+                "devotee_id": row.id,
+                "temple_id": temple_id,
+                **search_keys(row.name, row.full_name, row.email, row.phone),
+            }
+        )
+        tags.extend(
+            {"devotee_id": row.id, "temple_id": temple_id, "tag": tag}
+            for tag in parse_tags(row.tags)
+        )
+    return entries, tags
+
+
+def _write_index(connection, entries: List[Dict], tags: List[Dict]) -> None:
+    if entries:
+        connection.execute(insert(DevoteeSearchIndex.__table__), entries)
+        if _fts_ready(connection):
+            connection.execute(
+                insert(_fts),
+                [
+                    {
+                        "rowid": entry["devotee_id"],
+                        "name_text": entry["name_text"],
+                        "phonetic_text": entry["phonetic_text"],
+                    }
+                    for entry in entries
+                ],
+            )
+    if tags:
+        connection.execute(insert(DevoteeTag.__table__), tags)
+
+
+def _devotee_rows(connection, devotee_ids=None):
+    query = select(
+        Devotee.id,
+        Devotee.temple_id,
+        Devotee.name,
+        Devotee.full_name,
+        Devotee.email,
+        Devotee.phone,
+        Devotee.tags,
+    )
+    if devotee_ids is not None:
+        query = query.where(Devotee.id.in_(devotee_ids))
+    return connection.execute(query)
+
+
+def refresh_search_index(connection, devotee_ids: Iterable[int]) -> None:
+    """Rewrite the search keys and tags of the devotees (deleted devotees are dropped)"""
+    devotee_ids = sorted({devotee_id for devotee_id in devotee_ids if devotee_id is not None})
+    fts = _fts_ready(connection)
+    for ids in _chunks(devotee_ids):
+        connection.execute(
+            delete(DevoteeSearchIndex.__table__).where(DevoteeSearchIndex.devotee_id.in_(ids))
+        )
+        connection.execute(delete(DevoteeTag.__table__).where(DevoteeTag.devotee_id.in_(ids)))
+        if fts:
+            connection.execute(delete(_fts).where(_fts.c.rowid.in_(ids)))
+        _write_index(connection, *_index_rows(_devotee_rows(connection, ids)))
+
+
+def rebuild_search_index(db: Session) -> int:
+    """Rebuild devotee_search_index, devotee_tags (and the FTS5 table); returns devotees indexed"""
+    connection = db.connection()
+    connection.execute(delete(DevoteeSearchIndex.__table__))
+    connection.execute(delete(DevoteeTag.__table__))
+    if _fts_ready(connection):
+        connection.execute(delete(_fts))
+
+    # Read everything first - SQLite can't write while a cursor is open
+    rows = _devotee_rows(connection).all()
+    for chunk in _chunks(rows):
+        _write_index(connection, *_index_rows(chunk))
+    db.commit()
+    return len(rows)
+
+
+def ensure_devotee_search_index(db: Session) -> bool:
+    """Create the search backend and rebuild the index if it is missing rows; True if rebuilt"""
+    backend = ensure_search_backend(db)
+    devotees = db.query(func.count(Devotee.id)).scalar() or 0
+    indexed = db.query(func.count(DevoteeSearchIndex.devotee_id)).scalar() or 0
+    stale = indexed != devotees
+    if backend == "fts5" and not stale:
+        fts_rows = db.execute(select(func.count()).select_from(_fts)).scalar() or 0
+        stale = fts_rows != indexed
+    if not stale:
+        return False
+    rebuild_search_index(db)
+    return True
+
+
+@event.listens_for(Session, "before_flush")
+def _search_before_flush(session, flush_context, instances):
+    written = [obj for obj in list(session.new) + list(session.deleted) if isinstance(obj, Devotee)]
+    for obj in session.dirty:
+        if isinstance(obj, Devotee):
+            state = inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in INDEXED_FIELDS):
+                written.append(obj)
+    if written:
+        session.info[_PENDING_SEARCH_KEY] = written
+
+
+@event.listens_for(Session, "after_flush")
+def _search_after_flush(session, flush_context):
+    written = session.info.pop(_PENDING_SEARCH_KEY, None)
+    if written:
+        # Ids of new devotees are only set by the flush
+        refresh_search_index(session.connection(), [obj.id for obj in written])
+
+
+# Queries
+
+
+def _phone_digits(term: str) -> Optional[str]:
+    """Digits of a term that is a (partial) phone number"""
+    if not re.fullmatch(r"[+\d\s\-()]+", term):
+        return None
+    digits = re.sub(r"\D", "", term)
+    if len(digits) < MIN_PHONE_DIGITS:
+        return None
+    return digits[-10:]
+
+
+def _starts_with(column, prefix: str):
+    # A range keeps the btree index usable regardless of collation; ":" sorts after "9"
+    return and_(column >= prefix, column < prefix + ":")
+
+
+def _token_codes(tokens: List[str]) -> List[Optional[str]]:
+    codes = []
+    for token in tokens:
+        code = phonetic_key(token) if len(token) >= MIN_PHONETIC_LENGTH else ""
+        codes.append(code if len(code) >= 2 else None)
+    return codes
+
+
+def _fts_match(tokens: List[str], codes: List[Optional[str]]) -> str:
+    clauses = []
+    for token, code in zip(tokens, codes):
+        clause = f'name_text : "{token}"*'
+        if code:
+            clause += f' OR phonetic_text : "{code}"'
+        clauses.append(f"({clause})")
+    return " AND ".join(clauses)
+
+
+def _pg_tsquery(tokens: List[str], codes: List[Optional[str]]) -> str:
+    clauses = [
+        f"({token}:* | {code})" if code else f"{token}:*" for token, code in zip(tokens, codes)
+    ]
+    return " & ".join(clauses)
+
+
+def _name_condition(connection, tokens: List[str]):
+    """Condition on devotee_search_index (or the FTS5 table) for name words"""
+    codes = _token_codes(tokens)
+    dialect = _dialect(connection)
+    if dialect == "postgresql":
+        condition = literal_column(_PG_TSVECTOR).op("@@")(
+            func.to_tsquery(literal_column("'simple'::regconfig"), _pg_tsquery(tokens, codes))
+        )
+        if _trgm_ready(connection):
+            # Word similarity catches typos that prefix and phonetic matches miss
+            condition = or_(condition, DevoteeSearchIndex.name_text.op("%>")(" ".join(tokens)))
+        return condition
+    if _fts_ready(connection):
+        fts_ids = select(_fts.c.rowid).where(
+            text(f"{FTS_TABLE} MATCH :fts_query").bindparams(fts_query=_fts_match(tokens, codes))
+        )
+        return DevoteeSearchIndex.devotee_id.in_(fts_ids)
+
+    padded_names = literal(" ") + DevoteeSearchIndex.name_text
+    padded_codes = literal(" ") + DevoteeSearchIndex.phonetic_text + literal(" ")
+    clauses = []
+    for token, code in zip(tokens, codes):
+        clause = padded_names.like(f"% {token}%")
+        if code:
+            clause = or_(clause, padded_codes.like(f"% {code} %"))
+        clauses.append(clause)
+    return and_(*clauses)
+
+
+def search_devotee_ids(db: Session, term: str, temple_id: Optional[int] = None):
+    """
+    Subquery of devotee ids matching a search term, or None if the term has
+    nothing searchable
+
+    Digits match the start or end of the phone number; words match the
+    start of name or email words, or the sound of name words.
+    """
+    term = (term or "").strip()
+    query = select(DevoteeSearchIndex.devotee_id)
+    if temple_id:
+        query = query.where(DevoteeSearchIndex.temple_id == temple_id)
+
+    digits = _phone_digits(term)
+    if digits:
+        return query.where(
+            or_(
+                _starts_with(DevoteeSearchIndex.phone_key, digits),
+                _starts_with(DevoteeSearchIndex.phone_reversed, digits[::-1]),
+            )
+        )
+    tokens = search_words(term)
+    if not tokens:
+        return None
+    return query.where(_name_condition(db.connection(), tokens))
+
+
+def apply_search(query, db: Session, term: Optional[str], temple_id: Optional[int] = None):
+    """Filter a Devotee query by a search term"""
+    if not term or not term.strip():
+        return query
+    ids = search_devotee_ids(db, term, temple_id)
+    if ids is None:
+        return query.filter(Devotee.id.is_(None))
+    return query.filter(Devotee.id.in_(ids))
+
+
+def tagged_devotee_ids(tags: Iterable[str], temple_id: Optional[int] = None):
+    """Subquery of ids of devotees having any of the tags"""
+    query = select(DevoteeTag.devotee_id).where(DevoteeTag.tag.in_(list(tags)))
+    if temple_id:
+        query = query.where(DevoteeTag.temple_id == temple_id)
+    return query
+
+
+def apply_tag_filter(query, tags: Iterable[str], temple_id: Optional[int] = None):
+    """Filter a Devotee query to devotees having any of the tags"""
+    return query.filter(Devotee.id.in_(tagged_devotee_ids(tags, temple_id)))
@@ -0,0 +1,229 @@
+"""
+Devotee Stats Service
+Family, donation and booking figures shown with devotee lists
+
+devotee_list_stats fetches the figures for a whole page of devotees with a
+few grouped queries (family heads, family sizes, donations, bookings)
+instead of several queries per devotee.
+
+With settings.DEVOTEE_STATS_ENABLED the donation and booking figures are
+read from the devotee_stats table instead, which a Session flush hook keeps
+current: devotees whose donations or bookings are written in a flush have
+their row recomputed from the transaction tables (so moves between
+devotees, cancellations and deletes are all accounted for).
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, event, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.core.db_utils import as_day
+from app.core.config import settings
+from app.models.devotee import Devotee
+from app.models.devotee_stats import DevoteeStats
+from app.models.donation import Donation
+from app.models.seva import SevaBooking
+
+_PENDING_STATS_KEY = "devotee_stats_pending"
+
+
+def _empty_stats() -> Dict:
+    return {
+        "total_donations": 0.0,
+        "donation_count": 0,
+        "booking_count": 0,
+        "last_visit_date": None,
+    }
+
+
+def compute_stats(db, devotee_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict]:
+    """
+    Donation and booking figures per devotee, aggregated from the transaction tables
+
+    Args:
+        db: Session or Connection
+        devotee_ids: Devotees to compute (default: all)
+    """
+    donations = select(
+        Donation.devotee_id,
+        func.coalesce(func.sum(Donation.amount), 0.0),
+        func.count(Donation.id),
+        func.max(Donation.donation_date),
+    ).group_by(Donation.devotee_id)
+    bookings = select(
+        SevaBooking.devotee_id, func.count(SevaBooking.id), func.max(SevaBooking.booking_date)
+    ).group_by(SevaBooking.devotee_id)
+    if devotee_ids is not None:
+        devotee_ids = list(devotee_ids)
+        donations = donations.where(Donation.devotee_id.in_(devotee_ids))
+        bookings = bookings.where(SevaBooking.devotee_id.in_(devotee_ids))
+
+    stats: Dict[int, Dict] = {}
+    for devotee_id, total, count, last_day in db.execute(donations):
+        stats[devotee_id] = {
+            "total_donations": float(total),
+            "donation_count": int(count),
+            "booking_count": 0,
+            "last_visit_date": as_day(last_day),
+        }
+    for devotee_id, count, last_day in db.execute(bookings):
+        entry = stats.setdefault(devotee_id, _empty_stats())
+        entry["booking_count"] = int(count)
+        days = [day for day in (entry["last_visit_date"], as_day(last_day)) if day]
+        entry["last_visit_date"] = max(days) if days else None
+    return stats
+
+
+def devotee_list_stats(db: Session, devotees: List[Devotee]) -> Dict[int, Dict]:
+    """
+    Figures of DevoteeResponse for a page of devotees, by devotee id
+
+    Returns:
+        {devotee_id: {"family_head_name", "family_members_count", "total_donations",
+                      "donation_count", "booking_count", "last_visit_date"}}
+    """
+    if not devotees:
+        return {}
+    ids = [devotee.id for devotee in devotees]
+
+    head_ids = {devotee.family_head_id for devotee in devotees if devotee.family_head_id}
+    heads = {}
+    if head_ids:
+        heads = dict(db.query(Devotee.id, Devotee.name).filter(Devotee.id.in_(head_ids)).all())
+
+    members = dict(
+        db.query(Devotee.family_head_id, func.count(Devotee.id))
+        .filter(Devotee.family_head_id.in_(ids))
+        .group_by(Devotee.family_head_id)
+        .all()
+    )
+
+    if settings.DEVOTEE_STATS_ENABLED:
+        activity = {
+            row.devotee_id: {
+                "total_donations": row.donation_total,
+                "donation_count": row.donation_count,
+                "booking_count": row.booking_count,
+                "last_visit_date": row.last_visit_date,
+            }
+            for row in db.query(DevoteeStats).filter(DevoteeStats.devotee_id.in_(ids))
+        }
+    else:
+        activity = compute_stats(db, ids)
+
+    return {
+        devotee.id: {
+            "family_head_name": heads.get(devotee.family_head_id),
+            "family_members_count": members.get(devotee.id, 0),
+            **activity.get(devotee.id, _empty_stats()),
+        }
+        for devotee in devotees
+    }
+
+
+# ===== SUMMARY TABLE =====
+
+
+def refresh_devotee_stats(connection, devotee_ids: Iterable[int]) -> None:
+    """Recompute the devotee_stats rows of the devotees (no row = no activity)"""
+    devotee_ids = sorted({devotee_id for devotee_id in devotee_ids if devotee_id is not None})
+    if not devotee_ids:
+        return
+    stats = compute_stats(connection, devotee_ids)
+    connection.execute(
+        delete(DevoteeStats.__table__).where(DevoteeStats.devotee_id.in_(devotee_ids))
+    )
+    rows = [
+        {
+            "devotee_id": devotee_id,
+            "donation_total": values["total_donations"],
+            "donation_count": values["donation_count"],
+            "booking_count": values["booking_count"],
+            "last_visit_date": values["last_visit_date"],
+            "updated_at": datetime.utcnow(),
+        }
+        for devotee_id, values in stats.items()
+    ]
+    if rows:
+        connection.execute(insert(DevoteeStats.__table__), rows)
+
+
+def record_devotee_activity(db: Session, devotee_ids: Iterable[int]) -> None:
+    """Refresh devotee_stats after donations or bookings written with bulk INSERTs"""
+    if settings.DEVOTEE_STATS_ENABLED:
+        refresh_devotee_stats(db.connection(), devotee_ids)
+
+
+def rebuild_devotee_stats(db: Session) -> int:
+    """Recompute the whole devotee_stats table; returns rows written"""
+    db.execute(delete(DevoteeStats.__table__))
+    stats = compute_stats(db)
+    now = datetime.utcnow()
+    rows = [
+        {
+            "devotee_id": devotee_id,
+            "donation_total": values["total_donations"],
+            "donation_count": values["donation_count"],
+            "booking_count": values["booking_count"],
+            "last_visit_date": values["last_visit_date"],
+            "updated_at": now,
+        }
+        for devotee_id, values in stats.items()
+        if devotee_id is not None
+    ]
+    if rows:
+        db.execute(insert(DevoteeStats.__table__), rows)
+    db.commit()
+    return len(rows)
+
+
+def ensure_devotee_stats(db: Session) -> bool:
+    """Rebuild devotee_stats if enabled and empty while donations or bookings exist"""
+    if not settings.DEVOTEE_STATS_ENABLED:
+        return False
+    if db.query(DevoteeStats.devotee_id).first():
+        return False
+    if not db.query(Donation.id).first() and not db.query(SevaBooking.id).first():
+        return False
+    rebuild_devotee_stats(db)
+    return True
+
+
+@event.listens_for(Session, "before_flush")
+def _stats_before_flush(session, flush_context, instances):
+    if not settings.DEVOTEE_STATS_ENABLED:
+        return
+    new, deleted = session.new, session.deleted
+    written = [
+        obj
+        for obj in list(new) + list(session.dirty) + list(deleted)
+        if isinstance(obj, (Donation, SevaBooking))
+    ]
+    if not written:
+        return
+
+    # Devotees the stored rows belong to (a row may move to another devotee)
+    devotee_ids = set()
+    with session.no_autoflush:
+        for model in (Donation, SevaBooking):
+            ids = [
+                obj.id for obj in written if isinstance(obj, model) and obj not in new and obj.id
+            ]
+            if ids:
+                devotee_ids.update(
+                    session.execute(select(model.devotee_id).where(model.id.in_(ids))).scalars()
+                )
+    session.info[_PENDING_STATS_KEY] = (devotee_ids, [obj for obj in written if obj not in deleted])
+
+
+@event.listens_for(Session, "after_flush")
+def _stats_after_flush(session, flush_context):
+    pending = session.info.pop(_PENDING_STATS_KEY, None)
+    if not pending:
+        return
+    devotee_ids, written = pending
+    # Foreign keys of new rows are only set by the flush
+    devotee_ids.update(obj.devotee_id for obj in written)
+    refresh_devotee_stats(session.connection(), devotee_ids)
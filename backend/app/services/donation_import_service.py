@@ -0,0 +1,546 @@
+"""
+Donation Import Service
+Streams a CSV/Excel donation file into donations and journal entries
+
+The file is read row by row (csv.DictReader, openpyxl read-only mode) and
+imported in chunks. For each chunk the devotees (by phone), categories (by
+name) and same-day donations of the duplicate check are fetched with one IN
+query each, receipt and journal entry numbers are reserved as a block, new
+devotees, donations, journal entries and lines are written with one
+multi-row INSERT each and the chunk is committed. Debit and credit
+accounts are resolved once per payment mode / category for the whole file.
+
+A row that fails validation is reported and skipped without affecting the
+rest of its chunk; if a chunk fails in the database it is retried row by
+row so that only the offending rows are lost.
+"""
+
+import csv
+import os
+from datetime import date, datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.accounting import Account, TransactionType
+from app.models.devotee import Devotee
+from app.models.donation import Donation, DonationCategory, DonationType
+from app.services.dashboard_rollup_service import record_donations
+from app.services.devotee_stats_service import record_devotee_activity
+from app.services.journal_posting_service import (
+    bulk_insert,
+    get_account_by_code,
+    post_journal_batch,
+)
+from app.services.numbering_service import next_donation_receipt_numbers
+
+IMPORT_JOB_TYPE = "donation_import"
+
+# Rows per transaction
+CHUNK_SIZE = 500
+
+# Errors kept in the job result; the full list goes to the error report file
+MAX_REPORTED_ERRORS = 100
+
+EXCEL_EXTENSIONS = ("xlsx", "xls")
+
+BANK_PAYMENT_MODES = ("UPI", "ONLINE", "CARD", "NETBANKING", "BANK", "CHEQUE", "DD")
+
+DEFAULT_CATEGORY = "General Donation"
+DEFAULT_CREDIT_ACCOUNT_CODE = "44001"  # General Donations
+
+Row = Tuple[int, Dict]
+RowError = Tuple[int, str]
+
+
+# ===== READING =====
+
+
+def _cell(value) -> Optional[str]:
+    """Cell value as stripped text; whole floats from Excel lose their '.0'"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()[:10]
+    text = str(value).strip()
+    return text or None
+
+
+def iter_rows(path: str) -> Iterator[Row]:
+    """(row number, {header: text}) for every non-empty data row, streamed from disk"""
+    extension = path.rsplit(".", 1)[-1].lower()
+    if extension in EXCEL_EXTENSIONS:
+        from openpyxl import load_workbook
+
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            headers = [_cell(h) for h in next(rows, ())]
+            for row_num, values in enumerate(rows, start=2):
+                if not any(v is not None and str(v).strip() for v in values):
+                    continue
+                yield row_num, {h: _cell(v) for h, v in zip(headers, values) if h}
+        finally:
+            wb.close()
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for row_num, row in enumerate(csv.DictReader(f), start=2):
+                data = {k.strip(): _cell(v) for k, v in row.items() if k}
+                if any(data.values()):
+                    yield row_num, data
+
+
+def count_rows(path: str) -> int:
+    """Data rows in the file (for progress); Excel uses the sheet dimensions"""
+    extension = path.rsplit(".", 1)[-1].lower()
+    if extension in EXCEL_EXTENSIONS:
+        from openpyxl import load_workbook
+
+        wb = load_workbook(path, read_only=True)
+        try:
+            return max((wb.active.max_row or 1) - 1, 0)
+        finally:
+            wb.close()
+    with open(path, "rb") as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
+def clean_phone(phone: str) -> str:
+    """Same cleaning as the donation counter: no spaces/dashes, no +91 prefix"""
+    phone = phone.replace(" ", "").replace("-", "")
+    if phone.startswith("+91") or (phone.startswith("91") and len(phone) > 10):
+        phone = phone[-10:]
+    elif phone.startswith("0091"):
+        phone = phone[-10:]
+    return phone
+
+
+def parse_row(data: Dict) -> Dict:
+    """Validated donation fields of one row; ValueError describes what is wrong"""
+    name = data.get("devotee_name")
+    if not name and data.get("devotee_first_name"):
+        name = " ".join(
+            filter(None, [data.get("devotee_first_name"), data.get("devotee_last_name")])
+        )
+    phone = data.get("devotee_phone")
+    if not name or not phone or not data.get("amount"):
+        raise ValueError("Missing required fields (devotee_name, devotee_phone, amount)")
+
+    try:
+        amount = float(data["amount"].replace(",", ""))
+    except ValueError:
+        raise ValueError(f"Invalid amount '{data['amount']}'")
+    if amount <= 0:
+        raise ValueError("Amount must be greater than 0")
+
+    donation_date = date.today()
+    if data.get("donation_date"):
+        try:
+            donation_date = date.fromisoformat(data["donation_date"][:10])
+        except ValueError:
+            raise ValueError(f"Invalid donation_date '{data['donation_date']}' (use YYYY-MM-DD)")
+
+    return {
+        "devotee_name": name,
+        "devotee_phone": clean_phone(phone),
+        "amount": amount,
+        "category": data.get("category") or DEFAULT_CATEGORY,
+        "payment_mode": data.get("payment_mode") or "Cash",
+        "donation_date": donation_date,
+        "address": data.get("address"),
+        "city": data.get("city"),
+        "state": data.get("state"),
+        "pincode": data.get("pincode"),
+        "country": data.get("country") or "India",
+        "notes": data.get("notes"),
+    }
+
+
+# ===== ACCOUNTS =====
+
+
+class AccountResolver:
+    """
+    Debit and credit accounts of imported donations, looked up once per
+    payment mode / category - same rules as post_donation_to_accounting
+    """
+
+    def __init__(self, db: Session, temple_id: Optional[int]):
+        self.db = db
+        self.temple_id = temple_id
+        self._debit: Dict[str, Optional[Account]] = {}
+        self._credit: Dict[int, Optional[Account]] = {}
+
+    def debit(self, payment_mode: str) -> Account:
+        mode = (payment_mode or "CASH").upper()
+        if mode not in self._debit:
+            self._debit[mode] = self._find_debit(mode)
+        account = self._debit[mode]
+        if account is None:
+            raise ValueError(
+                f"Debit account not found for payment mode '{payment_mode}' for temple "
+                f"{self.temple_id}. Please create the account (Cash: 11001, Hundi: 11002) in "
+                "Chart of Accounts or configure a bank account in Bank Account Management."
+            )
+        return account
+
+    def credit(self, category: DonationCategory) -> Account:
+        if category.id not in self._credit:
+            account = None
+            if category.account_id:
+                account = self.db.query(Account).filter(Account.id == category.account_id).first()
+            if account is None:
+                account = self._by_code(DEFAULT_CREDIT_ACCOUNT_CODE)
+            self._credit[category.id] = account
+        account = self._credit[category.id]
+        if account is None:
+            raise ValueError(
+                f"Credit account not found for donation category '{category.name}'. Please link "
+                "an account to the donation category or create default income accounts."
+            )
+        return account
+
+    def _by_code(self, code: str) -> Optional[Account]:
+        return get_account_by_code(self.db, self.temple_id, code)
+
+    def _find_debit(self, mode: str) -> Optional[Account]:
+        from app.core.bank_account_helper import (
+            get_bank_account_for_payment,
+            get_cash_account_for_payment,
+        )
+
+        hundi = "HUNDI" in mode
+        account = None
+        if mode in BANK_PAYMENT_MODES:
+            account, fallback_code = get_bank_account_for_payment(self.db, self.temple_id, mode)
+            if account is None and fallback_code:
+                account = self._by_code(fallback_code)
+        elif hundi:
+            account = get_cash_account_for_payment(self.db, self.temple_id, mode, hundi=True)
+        else:
+            account = get_cash_account_for_payment(self.db, self.temple_id, "CASH", hundi=False)
+
+        if account is None:
+            # Last resort, as for counter donations: cash in hand
+            account = get_cash_account_for_payment(
+                self.db, self.temple_id, "HUNDI" if hundi else "CASH", hundi=hundi
+            )
+        return account
+
+
+# ===== IMPORT =====
+
+
+def _devotees_by_phone(
+    db: Session, rows: List[Dict], temple_id: Optional[int]
+) -> Dict[str, Tuple[int, str]]:
+    """(id, name) per phone of the chunk - existing devotee (lowest id) or a new one"""
+    phones = {row["devotee_phone"] for row in rows}
+    devotees = {}
+    for devotee_id, phone, name in (
+        db.query(Devotee.id, Devotee.phone, Devotee.name)
+        .filter(Devotee.phone.in_(phones))
+        .order_by(Devotee.id)
+    ):
+        devotees.setdefault(phone, (devotee_id, name))
+
+    new = {}
+    for row in rows:
+        phone = row["devotee_phone"]
+        if phone in devotees or phone in new:
+            continue
+        first_name, _, last_name = row["devotee_name"].partition(" ")
+        new[phone] = {
+            "first_name": first_name,
+            "last_name": last_name.strip() or None,
+            "name": row["devotee_name"],
+            "full_name": row["devotee_name"],
+            "phone": phone,
+            "address": row["address"],
+            "pincode": row["pincode"],
+            "city": row["city"],
+            "state": row["state"],
+            "country": row["country"],
+            "temple_id": temple_id,
+        }
+    ids = bulk_insert(db, Devotee, list(new.values()), "phone")
+    for phone, values in new.items():
+        devotees[phone] = (ids[phone], values["name"])
+    return devotees
+
+
+def _categories_by_name(
+    db: Session, rows: List[Dict], temple_id: Optional[int]
+) -> Dict[str, DonationCategory]:
+    """Existing categories of the chunk's names, new ones created (80G eligible)"""
+    names = {row["category"] for row in rows}
+    categories = {}
+    for category in (
+        db.query(DonationCategory)
+        .filter(DonationCategory.name.in_(names))
+        .order_by(DonationCategory.id)
+    ):
+        categories.setdefault(category.name, category)
+
+    new = [
+        DonationCategory(name=name, is_80g_eligible=True, temple_id=temple_id)
+        for name in sorted(names - categories.keys())
+    ]
+    if new:
+        db.add_all(new)
+        db.flush()
+        categories.update({category.name: category for category in new})
+    return categories
+
+
+def _existing_donations(db: Session, devotee_ids, days) -> set:
+    """(devotee_id, amount, date) of active donations - the duplicate check"""
+    rows = db.query(Donation.devotee_id, Donation.amount, Donation.donation_date).filter(
+        Donation.devotee_id.in_(devotee_ids),
+        Donation.donation_date.in_(days),
+        Donation.is_cancelled == False,
+    )
+    return {(devotee_id, amount, day) for devotee_id, amount, day in rows}
+
+
+def import_chunk(
+    db: Session,
+    chunk: List[Row],
+    temple_id: Optional[int],
+    user_id: Optional[int],
+    accounts: AccountResolver,
+) -> Tuple[int, List[RowError]]:
+    """
+    Import one chunk of rows and commit it
+
+    Devotees, donations, journal entries and journal lines are each written
+    with one multi-row INSERT; balance snapshots, dashboard rollups and
+    devotee stats, which are otherwise maintained by flush hooks, are
+    updated explicitly.
+
+    Returns:
+        (donations imported, [(row number, error)])
+    """
+    errors: List[RowError] = []
+    parsed = []
+    for row_num, data in chunk:
+        try:
+            parsed.append((row_num, parse_row(data)))
+        except ValueError as e:
+            errors.append((row_num, str(e)))
+    if not parsed:
+        return 0, errors
+
+    rows = [row for _, row in parsed]
+    devotees = _devotees_by_phone(db, rows, temple_id)
+    categories = _categories_by_name(db, rows, temple_id)
+    seen = _existing_donations(
+        db,
+        {devotee_id for devotee_id, _ in devotees.values()},
+        {row["donation_date"] for row in rows},
+    )
+
+    accepted = []
+    for row_num, row in parsed:
+        devotee_id, devotee_name = devotees[row["devotee_phone"]]
+        category = categories[row["category"]]
+        key = (devotee_id, row["amount"], row["donation_date"])
+        if key in seen:
+            errors.append(
+                (row_num, "Possible duplicate - Similar donation exists for this devotee and date")
+            )
+            continue
+        try:
+            debit, credit = accounts.debit(row["payment_mode"]), accounts.credit(category)
+        except ValueError as e:
+            errors.append((row_num, str(e)))
+            continue
+        seen.add(key)
+        accepted.append((row, devotee_id, devotee_name, category, debit.id, credit.id))
+    if not accepted:
+        db.commit()
+        return 0, errors
+
+    # Receipt numbers reserved as one block
+    year = datetime.now().year
+    receipts = next_donation_receipt_numbers(db, year, len(accepted))
+    donation_ids = bulk_insert(
+        db,
+        Donation,
+        [
+            {
+                "temple_id": temple_id,
+                "devotee_id": devotee_id,
+                "category_id": category.id,
+                "receipt_number": receipt,
+                "donation_type": DonationType.CASH,
+                "amount": row["amount"],
+                "payment_mode": row["payment_mode"],
+                "donation_date": row["donation_date"],
+                "financial_year": f"{year}-{str(year+1)[-2:]}",
+                "notes": row["notes"],
+                "created_by": user_id,
+            }
+            for (row, devotee_id, _, category, _, _), receipt in zip(accepted, receipts)
+        ],
+        "receipt_number",
+    )
+    record_donations(db, [(temple_id, row["donation_date"], row["amount"]) for row, *_ in accepted])
+    record_devotee_activity(db, {devotee_id for _, devotee_id, *_ in accepted})
+
+    post_journal_batch(
+        db,
+        [
+            {
+                "temple_id": temple_id,
+                "entry_date": row["donation_date"],
+                "narration": f"Donation from {devotee_name} - {category.name}",
+                "reference_type": TransactionType.DONATION,
+                "reference_id": donation_ids[receipt],
+                "created_by": user_id or 1,
+                "lines": [
+                    {
+                        "account_id": debit_id,
+                        "debit_amount": row["amount"],
+                        "description": f"Donation received via {row['payment_mode']}",
+                    },
+                    {
+                        "account_id": credit_id,
+                        "credit_amount": row["amount"],
+                        "description": f"Donation income - {category.name}",
+                    },
+                ],
+            }
+            for (row, _, devotee_name, category, debit_id, credit_id), receipt in zip(
+                accepted, receipts
+            )
+        ],
+    )
+
+    db.commit()
+    return len(donation_ids), errors
+
+
+def import_donations(
+    db: Session,
+    path: str,
+    temple_id: Optional[int],
+    user_id: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict:
+    """
+    Import every row of a donation file
+
+    Args:
+        on_progress: Called with (rows processed, donations imported) after each chunk
+
+    Returns:
+        {"total_rows", "success_count", "error_count", "errors": [(row, error), ...]}
+    """
+    accounts = AccountResolver(db, temple_id)
+    processed = imported = 0
+    errors: List[RowError] = []
+
+    def run(chunk: List[Row]) -> None:
+        nonlocal imported
+        try:
+            count, chunk_errors = import_chunk(db, chunk, temple_id, user_id, accounts)
+        except Exception as e:
+            db.rollback()
+            if len(chunk) == 1:
+                errors.append((chunk[0][0], str(e)))
+                return
+            # Find the offending rows - everything else still goes in
+            for row in chunk:
+                run([row])
+            return
+        imported += count
+        errors.extend(chunk_errors)
+
+    chunk: List[Row] = []
+    for row in iter_rows(path):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            run(chunk)
+            processed += len(chunk)
+            chunk = []
+            if on_progress:
+                on_progress(processed, imported)
+    if chunk:
+        run(chunk)
+        processed += len(chunk)
+        if on_progress:
+            on_progress(processed, imported)
+
+    errors.sort()
+    return {
+        "total_rows": processed,
+        "success_count": imported,
+        "error_count": len(errors),
+        "errors": errors,
+    }
+
+
+def write_error_report(path: str, errors: List[RowError]) -> None:
+    """CSV of (row, error) for rows that were not imported"""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["row", "error"])
+        writer.writerows(errors)
+
+
+def import_file_path(job_id: int, extension: str) -> str:
+    """Where the upload of an import job is kept while the job runs"""
+    directory = os.path.join(settings.UPLOAD_DIR, "imports")
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"donations_{job_id}.{extension}")
+
+
+def error_report_path(upload_path: str) -> str:
+    return f"{upload_path}.errors.csv"
+
+
+def donation_import_job(
+    job_id: int, path: str, temple_id: Optional[int], user_id: Optional[int]
+) -> None:
+    """
+    Background task entry point - imports an uploaded donation file
+
+    The upload is removed afterwards; rows that failed are written to an
+    error report next to it (see error_report_path).
+    """
+    from app.core.database import SessionLocal
+    from app.services.background_job_service import (
+        complete_job,
+        fail_job,
+        start_job,
+        update_progress,
+    )
+
+    db = SessionLocal()
+    try:
+        start_job(db, job_id, total=count_rows(path))
+
+        def progress(processed: int, imported: int) -> None:
+            update_progress(db, job_id, processed, f"{imported} donations imported")
+
+        result = import_donations(db, path, temple_id, user_id, on_progress=progress)
+        errors = result.pop("errors")
+        if errors:
+            write_error_report(error_report_path(path), errors)
+        result["errors"] = [
+            f"Row {row_num}: {error}" for row_num, error in errors[:MAX_REPORTED_ERRORS]
+        ]
+        result["has_error_report"] = bool(errors)
+        complete_job(db, job_id, result)
+    except Exception as e:
+        print(f"⚠️  Donation import failed: {str(e)}")
+        fail_job(db, job_id, str(e))
+    finally:
+        db.close()
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,117 @@
+"""
+Donation Query Service
+Temple-scoped donation queries for listings and exports
+
+Devotee and category are loaded in the same statement as the donations, and
+pages are cut with keyset pagination on (donation_date, id) - newest first -
+so deep pages cost the same as the first one. Exports walk the whole range
+in keyset batches through iter_donations instead of loading it at once.
+"""
+
+from datetime import date, datetime
+from typing import Iterator, List, Optional, Tuple, Union
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query, Session, joinedload
+
+from app.models.donation import Donation
+
+# Donations fetched per round trip by iter_donations
+EXPORT_BATCH_SIZE = 500
+
+DateLike = Union[date, str, None]
+
+
+def as_date(value: DateLike) -> Optional[date]:
+    """Date of a YYYY-MM-DD string (ValueError if malformed)"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value[:10])
+
+
+def donation_query(
+    db: Session,
+    temple_id: Optional[int],
+    date_from: DateLike = None,
+    date_to: DateLike = None,
+    on_date: DateLike = None,
+    include_cancelled: bool = True,
+) -> Query:
+    """
+    Donations of a temple with devotee and category eager-loaded
+
+    Args:
+        temple_id: Temple of the user (None = no temple, e.g. standalone super admin)
+        date_from/date_to: Inclusive range; either end may be open
+        on_date: Single day (overrides the range)
+    """
+    query = db.query(Donation).options(joinedload(Donation.devotee), joinedload(Donation.category))
+    if temple_id:
+        query = query.filter(Donation.temple_id == temple_id)
+    if not include_cancelled:
+        query = query.filter(Donation.is_cancelled == False)
+
+    if on_date:
+        query = query.filter(Donation.donation_date == as_date(on_date))
+    else:
+        if date_from:
+            query = query.filter(Donation.donation_date >= as_date(date_from))
+        if date_to:
+            query = query.filter(Donation.donation_date <= as_date(date_to))
+    return query
+
+
+def encode_cursor(donation: Donation) -> str:
+    """Opaque position after a donation, e.g. "2025-01-31.1842" """
+    return f"{as_date(donation.donation_date).isoformat()}.{donation.id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """(donation_date, id) of a cursor (ValueError if malformed)"""
+    day, _, donation_id = cursor.partition(".")
+    return date.fromisoformat(day), int(donation_id)
+
+
+def keyset_page(
+    query: Query, limit: int, cursor: Optional[str] = None, offset: int = 0
+) -> Tuple[List[Donation], Optional[str]]:
+    """
+    One page of donations, newest first
+
+    Returns the donations and the cursor of the next page (None on the
+    last page). `offset` is only for clients still paging with skip.
+    """
+    if cursor:
+        day, last_id = decode_cursor(cursor)
+        query = query.filter(
+            or_(
+                Donation.donation_date < day,
+                and_(Donation.donation_date == day, Donation.id < last_id),
+            )
+        )
+    query = query.order_by(Donation.donation_date.desc(), Donation.id.desc())
+    if offset:
+        query = query.offset(offset)
+    donations = query.limit(limit + 1).all()
+    if len(donations) > limit:
+        return donations[:limit], encode_cursor(donations[limit - 1])
+    return donations, None
+
+
+def iter_donations(query: Query, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Donation]:
+    """
+    Every donation of the query, newest first, fetched in keyset batches
+
+    The session's identity map holds objects weakly, so only the current
+    batch stays in memory while the caller writes rows out.
+    """
+    cursor = None
+    while True:
+        donations, cursor = keyset_page(query, batch_size, cursor)
+        yield from donations
+        if cursor is None:
+            return
@@ -0,0 +1,578 @@
+"""
+Export Service
+Shared Excel / PDF / CSV export engine for reports and accounting books
+
+A report is described once - title and header lines, one or more sections of
+rows under ExportColumns with optional totals, footer lines - and rendered
+in any format:
+
+- Excel: openpyxl write-only workbook (rows are spooled to disk, not kept
+  as cell objects)
+- PDF: drawn row by row on a canvas, a page at a time, with the column
+  header repeated on every page (no platypus story in memory)
+- CSV: written row by row
+
+Sections take their rows from iterables, so a report fed by a streaming
+query is never held in memory. Synchronous exports are rendered into a
+temporary file that is streamed back; very large ones can be queued as
+background jobs (EXPORT_JOB_TYPE) that leave the file in UPLOAD_DIR/exports
+for download. Report builders register themselves by name with
+register_export so jobs can rebuild a report from its JSON parameters.
+"""
+
+import csv
+import inspect
+import io
+import os
+import tempfile
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from fastapi.responses import StreamingResponse
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.drawing.image import Image as ExcelImage
+from openpyxl.styles import Border, Font, Side
+from openpyxl.utils import get_column_letter
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.units import inch
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas as pdf_canvas
+
+from app.core.config import settings
+
+EXPORT_JOB_TYPE = "report_export"
+
+# format -> (file extension, media type)
+EXPORT_FORMATS = {
+    "excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "pdf": (".pdf", "application/pdf"),
+    "csv": (".csv", "text/csv"),
+}
+
+# Rows between progress reports of background exports
+PROGRESS_EVERY = 1000
+
+# Bytes per chunk streamed back to the client
+STREAM_CHUNK_SIZE = 64 * 1024
+
+AMOUNT_FORMAT = "#,##0.00"
+DATE_FORMAT = "DD-MM-YYYY"
+
+_TITLE_FONT = Font(bold=True, size=14)
+_BOLD_FONT = Font(bold=True)
+_HEADER_BORDER = Border(bottom=Side(style="thin"))
+
+_PDF_MARGIN = 0.5 * inch
+_PDF_ROW_HEIGHT = 16
+_PDF_FONT_SIZE = 8
+_PDF_CELL_PADDING = 3
+
+
+# ===== REPORT DEFINITION =====
+
+
+class ExportColumn:
+    """One column of a section: header, width (Excel characters) and kind"""
+
+    def __init__(self, header: str, width: float = 15, kind: str = "text"):
+        self.header = header
+        self.width = width
+        self.kind = kind  # "text", "amount" or "date"
+
+
+class ExportSection:
+    """
+    Rows under a set of columns, with an optional heading and totals row
+
+    totals may be a callable returning the row - it is called after the rows
+    are consumed, so totals can be summed while a stream is written.
+    """
+
+    def __init__(
+        self,
+        columns: List[ExportColumn],
+        rows: Iterable[Sequence],
+        title: Optional[str] = None,
+        totals=None,
+    ):
+        self.columns = columns
+        self.rows = rows
+        self.title = title
+        self.totals = totals
+
+
+class ExportReport:
+    """A report rendered by write_export; footer_lines may also be a callable"""
+
+    def __init__(
+        self,
+        title: str,
+        filename: str,
+        sections: List[ExportSection],
+        header_lines: Sequence[str] = (),
+        footer_lines=(),
+        landscape: bool = False,
+        logo: Optional[bytes] = None,
+        sheet_title: Optional[str] = None,
+    ):
+        self.title = title
+        self.filename = filename  # Without extension
+        self.sections = sections
+        self.header_lines = list(header_lines)
+        self.footer_lines = footer_lines
+        self.landscape = landscape
+        self.logo = logo
+        self.sheet_title = sheet_title or title
+
+
+def _resolve(value):
+    return value() if callable(value) else value
+
+
+def date_param(value) -> Optional[date]:
+    """Date of a report parameter given as a date or YYYY-MM-DD string"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def format_value(value, kind: str = "text") -> str:
+    """Display text of a value in PDF cells"""
+    if value is None:
+        return ""
+    if kind == "amount" and isinstance(value, (int, float)):
+        return f"{value:,.2f}"
+    if isinstance(value, datetime):
+        return value.strftime("%d-%m-%Y %H:%M")
+    if isinstance(value, date):
+        return value.strftime("%d-%m-%Y")
+    return str(value)
+
+
+def _csv_value(value, kind: str):
+    if value is None:
+        return ""
+    if kind == "amount" and isinstance(value, (int, float)):
+        return f"{value:.2f}"
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+class _Progress:
+    """Counts written rows and reports every PROGRESS_EVERY of them"""
+
+    def __init__(self, on_progress: Optional[Callable[[int], None]]):
+        self.rows = 0
+        self.on_progress = on_progress
+
+    def row(self) -> None:
+        self.rows += 1
+        if self.on_progress and self.rows % PROGRESS_EVERY == 0:
+            self.on_progress(self.rows)
+
+
+# ===== EXCEL =====
+
+
+def _excel_cell(ws, value, kind: str = "text", font: Optional[Font] = None, border=None):
+    cell = WriteOnlyCell(ws, value=value)
+    if kind == "amount":
+        cell.number_format = AMOUNT_FORMAT
+    elif kind == "date" or isinstance(value, date):
+        cell.number_format = DATE_FORMAT
+    if font is not None:
+        cell.font = font
+    if border is not None:
+        cell.border = border
+    return cell
+
+
+def _excel_row(ws, values: Sequence, columns: List[ExportColumn], font=None) -> List:
+    return [
+        _excel_cell(ws, value, column.kind, font) if (font or column.kind != "text") else value
+        for value, column in zip(values, columns)
+    ]
+
+
+def write_excel(report: ExportReport, out, on_progress=None) -> int:
+    """Write the report as a write-only workbook; returns data rows written"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=report.sheet_title[:31])
+    progress = _Progress(on_progress)
+
+    # Column widths have to be set before the first row is written
+    widths: Dict[int, float] = {}
+    for section in report.sections:
+        for index, column in enumerate(section.columns, 1):
+            widths[index] = max(widths.get(index, 0), column.width)
+    for index, width in widths.items():
+        ws.column_dimensions[get_column_letter(index)].width = width
+
+    if report.logo:
+        try:
+            logo = ExcelImage(io.BytesIO(report.logo))
+            logo.width = logo.height = 60
+            ws.add_image(logo, "A1")
+            for _ in range(4):
+                ws.append([])
+        except Exception:
+            pass  # Logo failed, continue without it
+
+    ws.append([_excel_cell(ws, report.title, font=_TITLE_FONT)])
+    for line in report.header_lines:
+        ws.append([line])
+
+    for section in report.sections:
+        ws.append([])
+        if section.title:
+            ws.append([_excel_cell(ws, section.title, font=_BOLD_FONT)])
+        ws.append(
+            [
+                _excel_cell(ws, column.header, font=_BOLD_FONT, border=_HEADER_BORDER)
+                for column in section.columns
+            ]
+        )
+        for row in section.rows:
+            ws.append(_excel_row(ws, row, section.columns))
+            progress.row()
+        totals = _resolve(section.totals)
+        if totals:
+            ws.append(_excel_row(ws, totals, section.columns, font=_BOLD_FONT))
+
+    footer_lines = _resolve(report.footer_lines)
+    if footer_lines:
+        ws.append([])
+        for line in footer_lines:
+            ws.append([_excel_cell(ws, line, font=_BOLD_FONT)])
+
+    wb.save(out)
+    return progress.rows
+
+
+# ===== PDF =====
+
+
+def _fit(text: str, font: str, size: float, width: float) -> str:
+    """Text cut (with "...") to fit a cell width"""
+    text = text.replace("₹", "Rs.")  # Not in the standard Helvetica glyphs
+    if stringWidth(text, font, size) <= width:
+        return text
+    # Start from an estimate and trim - Helvetica averages about half an em
+    text = text[: max(int(width / (size * 0.45)), 1)]
+    while text and stringWidth(text + "...", font, size) > width:
+        text = text[:-1]
+    return text + "..."
+
+
+class _PdfWriter:
+    """Draws lines and table rows top-down, starting new pages as needed"""
+
+    def __init__(self, out, report: ExportReport):
+        self.pagesize = landscape(A4) if report.landscape else A4
+        self.canvas = pdf_canvas.Canvas(out, pagesize=self.pagesize)
+        self.canvas.setTitle(report.title)
+        self.title = report.title
+        self.width = self.pagesize[0] - 2 * _PDF_MARGIN
+        self.page = 1
+        self.header = None  # (columns, widths) repeated on new pages
+        self.y = self.pagesize[1] - _PDF_MARGIN
+
+    def _page_footer(self) -> None:
+        self.canvas.setFont("Helvetica", 7)
+        self.canvas.setFillColor(colors.grey)
+        self.canvas.drawString(_PDF_MARGIN, _PDF_MARGIN / 2, self.title)
+        self.canvas.drawRightString(
+            self.pagesize[0] - _PDF_MARGIN, _PDF_MARGIN / 2, f"Page {self.page}"
+        )
+        self.canvas.setFillColor(colors.black)
+
+    def _ensure(self, height: float) -> None:
+        if self.y - height >= _PDF_MARGIN:
+            return
+        self._page_footer()
+        self.canvas.showPage()
+        self.page += 1
+        self.y = self.pagesize[1] - _PDF_MARGIN
+        if self.header:
+            self._draw_row(*self.header, [c.header for c in self.header[0]], header=True)
+
+    def logo(self, data: bytes) -> None:
+        try:
+            size = 0.8 * inch
+            self._ensure(size)
+            x = (self.pagesize[0] - size) / 2
+            self.canvas.drawImage(
+                ImageReader(io.BytesIO(data)),
+                x,
+                self.y - size,
+                size,
+                size,
+                preserveAspectRatio=True,
+                mask="auto",
+            )
+            self.y -= size + 6
+        except Exception:
+            pass  # Logo failed, continue without it
+
+    def line(self, text: str, size: float = 9, bold: bool = False, center: bool = False) -> None:
+        font = "Helvetica-Bold" if bold else "Helvetica"
+        self._ensure(size + 6)
+        self.y -= size + 4
+        self.canvas.setFont(font, size)
+        text = _fit(text, font, size, self.width)
+        if center:
+            self.canvas.drawCentredString(self.pagesize[0] / 2, self.y, text)
+        else:
+            self.canvas.drawString(_PDF_MARGIN, self.y, text)
+        self.y -= 2
+
+    def gap(self, height: float = 8) -> None:
+        self.y -= height
+
+    def start_table(self, columns: List[ExportColumn]) -> None:
+        total = sum(column.width for column in columns) or 1
+        widths = [self.width * column.width / total for column in columns]
+        self._ensure(2 * _PDF_ROW_HEIGHT)  # Header with at least one row
+        self.header = (columns, widths)
+        self._draw_row(columns, widths, [column.header for column in columns], header=True)
+
+    def end_table(self) -> None:
+        self.header = None
+
+    def row(self, values: Sequence, bold: bool = False) -> None:
+        self._ensure(_PDF_ROW_HEIGHT)
+        self._draw_row(*self.header, values, bold=bold)
+
+    def _draw_row(self, columns, widths, values, header: bool = False, bold: bool = False) -> None:
+        c = self.canvas
+        top, bottom = self.y, self.y - _PDF_ROW_HEIGHT
+        if header:
+            c.setFillColor(colors.lightgrey)
+            c.rect(_PDF_MARGIN, bottom, self.width, _PDF_ROW_HEIGHT, stroke=0, fill=1)
+            c.setFillColor(colors.black)
+        font = "Helvetica-Bold" if header or bold else "Helvetica"
+        c.setFont(font, _PDF_FONT_SIZE)
+        c.setLineWidth(0.5)
+
+        x = _PDF_MARGIN
+        text_y = bottom + (_PDF_ROW_HEIGHT - _PDF_FONT_SIZE) / 2 + 1
+        for column, width, value in zip(columns, widths, values):
+            text = value if header else format_value(value, column.kind)
+            text = _fit(text, font, _PDF_FONT_SIZE, width - 2 * _PDF_CELL_PADDING)
+            if column.kind == "amount" and not header:
+                c.drawRightString(x + width - _PDF_CELL_PADDING, text_y, text)
+            else:
+                c.drawString(x + _PDF_CELL_PADDING, text_y, text)
+            c.line(x, top, x, bottom)
+            x += width
+        c.line(x, top, x, bottom)
+        c.line(_PDF_MARGIN, top, x, top)
+        c.line(_PDF_MARGIN, bottom, x, bottom)
+        self.y = bottom
+
+    def save(self) -> None:
+        self._page_footer()
+        self.canvas.save()
+
+
+def write_pdf(report: ExportReport, out, on_progress=None) -> int:
+    """Draw the report page by page; returns data rows written"""
+    pdf = _PdfWriter(out, report)
+    progress = _Progress(on_progress)
+
+    if report.logo:
+        pdf.logo(report.logo)
+    pdf.line(report.title, size=14, bold=True, center=True)
+    for line in report.header_lines:
+        pdf.line(line, center=True)
+    pdf.gap()
+
+    for section in report.sections:
+        if section.title:
+            pdf.line(section.title, size=10, bold=True)
+        pdf.start_table(section.columns)
+        for row in section.rows:
+            pdf.row(row)
+            progress.row()
+        totals = _resolve(section.totals)
+        if totals:
+            pdf.row(totals, bold=True)
+        pdf.end_table()
+        pdf.gap(12)
+
+    for line in _resolve(report.footer_lines) or ():
+        pdf.line(line, bold=True)
+    pdf.save()
+    return progress.rows
+
+
+# ===== CSV =====
+
+
+def write_csv(report: ExportReport, out, on_progress=None) -> int:
+    """Write the report as UTF-8 CSV (with BOM, for Excel); returns data rows written"""
+    text = io.TextIOWrapper(out, encoding="utf-8-sig", newline="")
+    writer = csv.writer(text)
+    progress = _Progress(on_progress)
+
+    writer.writerow([report.title])
+    for line in report.header_lines:
+        writer.writerow([line])
+    for section in report.sections:
+        writer.writerow([])
+        if section.title:
+            writer.writerow([section.title])
+        writer.writerow([column.header for column in section.columns])
+        for row in section.rows:
+            writer.writerow([_csv_value(v, c.kind) for v, c in zip(row, section.columns)])
+            progress.row()
+        totals = _resolve(section.totals)
+        if totals:
+            writer.writerow([_csv_value(v, c.kind) for v, c in zip(totals, section.columns)])
+    footer_lines = _resolve(report.footer_lines)
+    if footer_lines:
+        writer.writerow([])
+        for line in footer_lines:
+            writer.writerow([line])
+
+    text.flush()
+    text.detach()  # Leave `out` open for the caller
+    return progress.rows
+
+
+# ===== OUTPUT =====
+
+_WRITERS = {"excel": write_excel, "pdf": write_pdf, "csv": write_csv}
+
+
+def write_export(report: ExportReport, output_format: str, out, on_progress=None) -> int:
+    """Render a report into a binary file object; returns data rows written"""
+    return _WRITERS[output_format](report, out, on_progress)
+
+
+def _iter_file(handle, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    try:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        handle.close()
+
+
+def export_response(report: ExportReport, output_format: str) -> StreamingResponse:
+    """
+    Render a report into a temporary file and stream it back
+
+    Rendering finishes inside the request (while its DB session is open);
+    only the finished file is streamed, in chunks.
+    """
+    extension, media_type = EXPORT_FORMATS[output_format]
+    handle = tempfile.TemporaryFile()
+    try:
+        write_export(report, output_format, handle)
+        handle.seek(0)
+    except Exception:
+        handle.close()
+        raise
+    return StreamingResponse(
+        _iter_file(handle),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={report.filename}{extension}"},
+    )
+
+
+# ===== BACKGROUND EXPORTS =====
+
+_REPORT_BUILDERS: Dict[str, Callable[..., ExportReport]] = {}
+
+
+def register_export(name: str):
+    """
+    Register a report builder for background exports
+
+    The builder is called as builder(db, user, **params) with the JSON
+    parameters of the export request.
+    """
+
+    def decorator(builder: Callable[..., ExportReport]):
+        _REPORT_BUILDERS[name] = builder
+        return builder
+
+    return decorator
+
+
+def export_builder(name: str) -> Optional[Callable[..., ExportReport]]:
+    return _REPORT_BUILDERS.get(name)
+
+
+def export_names() -> List[str]:
+    return sorted(_REPORT_BUILDERS)
+
+
+def check_export_params(name: str, params: Dict[str, Any]) -> None:
+    """Raise TypeError if the builder doesn't take these parameters"""
+    inspect.signature(_REPORT_BUILDERS[name]).bind(None, None, **params)
+
+
+def export_file_path(job_id: int, output_format: str) -> str:
+    """Where the output of a background export is written"""
+    directory = os.path.join(settings.UPLOAD_DIR, "exports")
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"export_{job_id}{EXPORT_FORMATS[output_format][0]}")
+
+
+def export_job(
+    job_id: int, name: str, output_format: str, params: Dict[str, Any], user_id: int
+) -> None:
+    """Background task entry point - renders a registered report to disk"""
+    from app.core.database import SessionLocal
+    from app.models.user import User
+    from app.services.background_job_service import (
+        complete_job,
+        fail_job,
+        start_job,
+        update_progress,
+    )
+
+    db = SessionLocal()
+    jobs = SessionLocal()  # Progress commits don't expire the report's objects
+    path = export_file_path(job_id, output_format)
+    try:
+        start_job(jobs, job_id)
+        user = db.query(User).filter(User.id == user_id).first()
+        report = _REPORT_BUILDERS[name](db, user, **params)
+
+        def progress(rows: int) -> None:
+            update_progress(jobs, job_id, rows, f"{rows} rows written")
+
+        with open(path, "wb") as out:
+            rows = write_export(report, output_format, out, on_progress=progress)
+        complete_job(
+            jobs,
+            job_id,
+            {
+                "rows": rows,
+                "format": output_format,
+                "filename": report.filename + EXPORT_FORMATS[output_format][0],
+                "download_url": f"/api/v1/exports/{job_id}/download",
+            },
+        )
+    except Exception as e:
+        print(f"⚠️  Export {name} failed: {str(e)}")
+        db.rollback()
+        if os.path.exists(path):
+            os.remove(path)
+        fail_job(jobs, job_id, str(e))
+    finally:
+        db.close()
+        jobs.close()
@@ -0,0 +1,384 @@
+"""
+Hundi Report Service
+Hundi-wise, daily and denomination-wise hundi collection figures
+
+Each breakdown is one grouped query: openings grouped by hundi_code and by
+scheduled_date, and denomination counts joined to their openings grouped by
+(denomination_value, denomination_type).
+
+With settings.HUNDI_MONTHLY_ROLLUP_ENABLED the denomination figures of whole
+calendar months in the report range are read from
+hundi_monthly_denomination_totals instead; only the partial months at the
+ends of the range are aggregated from the counts. A Session flush hook keeps
+the rollup current by recomputing the (temple, month) rows touched by
+written denomination counts and openings.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, delete, event, func, insert, inspect, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.db_utils import as_day
+from app.core.config import settings
+from app.models.hundi import HundiDenominationCount, HundiOpening
+from app.models.hundi_rollup import HundiMonthlyDenominationTotal
+
+_PENDING_ROLLUP_KEY = "hundi_rollup_months"
+
+# Opening fields the rollup rows are keyed on
+_OPENING_KEYS = ("temple_id", "scheduled_date", "hundi_code")
+
+MonthKey = Tuple[int, date]  # (temple_id or 0, first day of month)
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+
+def next_month(day: date) -> date:
+    return date(day.year + 1, 1, 1) if day.month == 12 else date(day.year, day.month + 1, 1)
+
+
+def split_range(
+    from_date: date, to_date: date
+) -> Tuple[Optional[Tuple[date, date]], List[Tuple[date, date]]]:
+    """
+    Split an inclusive date range into whole calendar months and the rest
+
+    Returns:
+        (half-open (first_month, end_month) range of the whole months, or None;
+         inclusive (start, end) ranges of the partial months at either end)
+    """
+    first = from_date if from_date.day == 1 else next_month(from_date)
+    end = month_start(to_date + timedelta(days=1))
+    if first >= end:
+        return None, [(from_date, to_date)]
+    edges = []
+    if from_date < first:
+        edges.append((from_date, first - timedelta(days=1)))
+    if end <= to_date:
+        edges.append((end, to_date))
+    return (first, end), edges
+
+
+# ===== REPORT =====
+
+
+def _opening_filters(temple_id: Optional[int], hundi_code: Optional[str]) -> list:
+    filters = [HundiOpening.temple_id == temple_id]
+    if hundi_code:
+        filters.append(HundiOpening.hundi_code == hundi_code)
+    return filters
+
+
+def _denomination_totals(db: Session, filters: list, from_date: date, to_date: date) -> list:
+    """(value, type, quantity, amount) rows aggregated from the denomination counts"""
+    return db.execute(
+        select(
+            HundiDenominationCount.denomination_value,
+            HundiDenominationCount.denomination_type,
+            func.coalesce(func.sum(HundiDenominationCount.quantity), 0),
+            func.coalesce(func.sum(HundiDenominationCount.total_amount), 0.0),
+        )
+        .join(HundiOpening, HundiDenominationCount.hundi_opening_id == HundiOpening.id)
+        .where(
+            *filters,
+            HundiOpening.scheduled_date >= from_date,
+            HundiOpening.scheduled_date <= to_date,
+        )
+        .group_by(
+            HundiDenominationCount.denomination_value, HundiDenominationCount.denomination_type
+        )
+    ).all()
+
+
+def _rollup_totals(
+    db: Session, temple_id: Optional[int], hundi_code: Optional[str], first: date, end: date
+) -> list:
+    """(value, type, quantity, amount) rows of whole months [first, end) from the rollup"""
+    rollup = HundiMonthlyDenominationTotal
+    query = (
+        select(
+            rollup.denomination_value,
+            rollup.denomination_type,
+            func.coalesce(func.sum(rollup.quantity), 0),
+            func.coalesce(func.sum(rollup.amount), 0.0),
+        )
+        .where(rollup.temple_id == (temple_id or 0), rollup.month >= first, rollup.month < end)
+        .group_by(rollup.denomination_value, rollup.denomination_type)
+    )
+    if hundi_code:
+        query = query.where(rollup.hundi_code == hundi_code)
+    return db.execute(query).all()
+
+
+def denomination_summary(
+    db: Session,
+    temple_id: Optional[int],
+    from_date: date,
+    to_date: date,
+    hundi_code: Optional[str] = None,
+) -> List[Dict]:
+    """Quantity and amount per denomination, highest denomination first"""
+    filters = _opening_filters(temple_id, hundi_code)
+    if settings.HUNDI_MONTHLY_ROLLUP_ENABLED:
+        months, edges = split_range(from_date, to_date)
+        rows = _rollup_totals(db, temple_id, hundi_code, *months) if months else []
+        for start, end in edges:
+            rows += _denomination_totals(db, filters, start, end)
+    else:
+        rows = _denomination_totals(db, filters, from_date, to_date)
+
+    summary = defaultdict(lambda: [0, 0.0])
+    for value, kind, quantity, amount in rows:
+        summary[(value, kind)][0] += int(quantity)
+        summary[(value, kind)][1] += float(amount)
+    return [
+        {
+            "denomination_value": value,
+            "denomination_type": kind,
+            "total_quantity": quantity,
+            "total_amount": amount,
+        }
+        for (value, kind), (quantity, amount) in sorted(
+            summary.items(), key=lambda item: (-item[0][0], item[0][1])
+        )
+    ]
+
+
+def hundi_report(
+    db: Session,
+    temple_id: Optional[int],
+    from_date: date,
+    to_date: date,
+    hundi_code: Optional[str] = None,
+) -> Dict:
+    """Figures of the hundi openings scheduled in a date range (HundiReportResponse fields)"""
+    in_range = _opening_filters(temple_id, hundi_code) + [
+        HundiOpening.scheduled_date >= from_date,
+        HundiOpening.scheduled_date <= to_date,
+    ]
+    amount = func.coalesce(func.sum(HundiOpening.total_amount), 0.0)
+
+    hundi_wise = [
+        {
+            "hundi_code": code,
+            "count": int(count),
+            "amount": float(total),
+            "deposited": float(deposited),
+        }
+        for code, count, total, deposited in db.execute(
+            select(
+                HundiOpening.hundi_code,
+                func.count(HundiOpening.id),
+                amount,
+                func.coalesce(func.sum(HundiOpening.bank_deposit_amount), 0.0),
+            )
+            .where(*in_range)
+            .group_by(HundiOpening.hundi_code)
+            .order_by(HundiOpening.hundi_code)
+        )
+    ]
+
+    daily = [
+        {"date": as_day(day).isoformat(), "count": int(count), "amount": float(total)}
+        for day, count, total in db.execute(
+            select(HundiOpening.scheduled_date, func.count(HundiOpening.id), amount)
+            .where(*in_range)
+            .group_by(HundiOpening.scheduled_date)
+            .order_by(HundiOpening.scheduled_date)
+        )
+    ]
+
+    total_amount = sum(row["amount"] for row in hundi_wise)
+    total_deposited = sum(row["deposited"] for row in hundi_wise)
+    return {
+        "from_date": from_date,
+        "to_date": to_date,
+        "total_openings": sum(row["count"] for row in hundi_wise),
+        "total_amount": total_amount,
+        "total_deposited": total_deposited,
+        "total_pending": total_amount - total_deposited,
+        "hundi_wise_breakdown": hundi_wise,
+        "daily_breakdown": daily,
+        "denomination_wise_summary": denomination_summary(
+            db, temple_id, from_date, to_date, hundi_code
+        ),
+    }
+
+
+# ===== MONTHLY ROLLUP =====
+
+
+def _rollup_source(months: Optional[Iterable[MonthKey]] = None):
+    """Grouped denomination counts per temple, month and hundi (of the given months)"""
+    temple = func.coalesce(HundiOpening.temple_id, 0)
+    query = (
+        select(
+            temple,
+            HundiOpening.scheduled_date,
+            HundiOpening.hundi_code,
+            HundiDenominationCount.denomination_value,
+            HundiDenominationCount.denomination_type,
+            func.coalesce(func.sum(HundiDenominationCount.quantity), 0),
+            func.coalesce(func.sum(HundiDenominationCount.total_amount), 0.0),
+        )
+        .join(HundiOpening, HundiDenominationCount.hundi_opening_id == HundiOpening.id)
+        .group_by(
+            temple,
+            HundiOpening.scheduled_date,
+            HundiOpening.hundi_code,
+            HundiDenominationCount.denomination_value,
+            HundiDenominationCount.denomination_type,
+        )
+    )
+    if months is not None:
+        query = query.where(
+            or_(
+                *(
+                    and_(
+                        temple == temple_id,
+                        HundiOpening.scheduled_date >= month,
+                        HundiOpening.scheduled_date < next_month(month),
+                    )
+                    for temple_id, month in months
+                )
+            )
+        )
+    return query
+
+
+def _rollup_rows(connection, months: Optional[Iterable[MonthKey]] = None) -> List[Dict]:
+    # Grouped by day in SQL (portable), folded into months here
+    totals = defaultdict(lambda: [0, 0.0])
+    for temple_id, day, code, value, kind, quantity, amount in connection.execute(
+        _rollup_source(months)
+    ):
+        key = (temple_id, month_start(as_day(day)), code, value, kind)
+        totals[key][0] += int(quantity)
+        totals[key][1] += float(amount)
+    now = datetime.utcnow()
+    return [
+        {
+            "temple_id": temple_id,
+            "month": month,
+            "hundi_code": code,
+            "denomination_value": value,
+            "denomination_type": kind,
+            "quantity": quantity,
+            "amount": amount,
+            "updated_at": now,
+        }
+        for (temple_id, month, code, value, kind), (quantity, amount) in totals.items()
+    ]
+
+
+def refresh_hundi_months(connection, months: Iterable[MonthKey]) -> None:
+    """Recompute the rollup rows of (temple_id, month) pairs from the denomination counts"""
+    months = sorted(set(months))
+    if not months:
+        return
+    rollup = HundiMonthlyDenominationTotal.__table__
+    for temple_id, month in months:
+        connection.execute(
+            delete(rollup).where(rollup.c.temple_id == temple_id, rollup.c.month == month)
+        )
+    rows = _rollup_rows(connection, months)
+    if rows:
+        connection.execute(insert(rollup), rows)
+
+
+def rebuild_hundi_rollup(db: Session) -> int:
+    """Recompute the whole rollup table; returns rows written"""
+    db.execute(delete(HundiMonthlyDenominationTotal.__table__))
+    rows = _rollup_rows(db)
+    if rows:
+        db.execute(insert(HundiMonthlyDenominationTotal.__table__), rows)
+    db.commit()
+    return len(rows)
+
+
+def ensure_hundi_rollup(db: Session) -> bool:
+    """Rebuild the rollup if enabled and empty while denomination counts exist"""
+    if not settings.HUNDI_MONTHLY_ROLLUP_ENABLED:
+        return False
+    if db.query(HundiMonthlyDenominationTotal.id).first():
+        return False
+    if not db.query(HundiDenominationCount.id).first():
+        return False
+    rebuild_hundi_rollup(db)
+    return True
+
+
+def _month_key(temple_id: Optional[int], day) -> Optional[MonthKey]:
+    day = as_day(day)
+    return (temple_id or 0, month_start(day)) if day else None
+
+
+@event.listens_for(Session, "before_flush")
+def _rollup_before_flush(session, flush_context, instances):
+    if not settings.HUNDI_MONTHLY_ROLLUP_ENABLED:
+        return
+    new, deleted = session.new, session.deleted
+    counts, openings = [], []
+    for obj in list(new) + list(session.dirty) + list(deleted):
+        if isinstance(obj, HundiDenominationCount):
+            counts.append(obj)
+        elif isinstance(obj, HundiOpening) and obj not in new:
+            # New openings have no stored counts; others matter when deleted or moved
+            if obj in deleted or any(
+                inspect(obj).attrs[name].history.has_changes() for name in _OPENING_KEYS
+            ):
+                openings.append(obj)
+    if not counts and not openings:
+        return
+
+    months: Set[MonthKey] = set()
+    with session.no_autoflush:
+        # Months the stored rows belong to (an opening may be moved to another date)
+        count_ids = [c.id for c in counts if c not in new and c.id]
+        opening_ids = [o.id for o in openings if o.id]
+        stored = []
+        if count_ids:
+            stored += session.execute(
+                select(HundiOpening.temple_id, HundiOpening.scheduled_date)
+                .join(
+                    HundiDenominationCount,
+                    HundiDenominationCount.hundi_opening_id == HundiOpening.id,
+                )
+                .where(HundiDenominationCount.id.in_(count_ids))
+            ).all()
+        if opening_ids:
+            stored += session.execute(
+                select(HundiOpening.temple_id, HundiOpening.scheduled_date).where(
+                    HundiOpening.id.in_(opening_ids)
+                )
+            ).all()
+        months.update(_month_key(temple_id, day) for temple_id, day in stored)
+
+        # Months they are written to
+        for count in counts:
+            if count in deleted:
+                continue
+            opening = count.hundi_opening
+            if opening is None and count.hundi_opening_id is not None:
+                opening = session.get(HundiOpening, count.hundi_opening_id)
+            if opening is not None:
+                months.add(_month_key(opening.temple_id, opening.scheduled_date))
+        for opening in openings:
+            if opening not in deleted:
+                months.add(_month_key(opening.temple_id, opening.scheduled_date))
+
+    months.discard(None)
+    if months:
+        session.info[_PENDING_ROLLUP_KEY] = months
+
+
+@event.listens_for(Session, "after_flush")
+def _rollup_after_flush(session, flush_context):
+    months = session.info.pop(_PENDING_ROLLUP_KEY, None)
+    if months:
+        refresh_hundi_months(session.connection(), months)
@@ -0,0 +1,262 @@
+"""
+Journal Posting Service
+Posts batches of journal entries for high-volume receipt sources (counter
+donations, sevas, hundi, token seva, UPI quick-log, imports)
+
+Account codes are resolved through a per-temple TempleCache: the first
+lookup for a temple loads all of its account codes with one query and later
+lookups are dictionary hits until one of its accounts is written or
+settings.ACCOUNT_CODE_CACHE_TTL expires.
+
+post_journal_batch() writes all entries of a batch with one multi-row
+INSERT and all lines with another, reserves the entry numbers as one block
+per temple and year, and updates the balance snapshots explicitly (bulk
+INSERTs bypass the flush hook). Same-day counter receipts can optionally be
+consolidated into one summary voucher per payment mode.
+"""
+
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from typing import Dict, FrozenSet, List, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.temple_cache import TempleCache
+from app.models.accounting import Account, JournalEntry, JournalEntryStatus, JournalLine
+from app.services.account_balance_service import record_posted_lines
+from app.services.numbering_service import next_journal_entry_numbers
+
+# Debits must equal credits within this difference (same as manual entries)
+BALANCE_TOLERANCE = 0.01
+
+
+# ===== ACCOUNT CODE CACHE =====
+
+
+class AccountCodeCache(TempleCache):
+    """Account code -> account id, per temple"""
+
+    def build(self, db: Session, temple_id: int) -> tuple:
+        rows = (
+            db.query(Account.account_code, Account.id)
+            .filter(Account.temple_id == temple_id)
+            .order_by(Account.id.desc())
+            .all()
+        )
+        # Lowest id wins when a code is duplicated, as with .first() by id
+        return dict(rows), frozenset(account_id for _, account_id in rows)
+
+    def codes(self, db: Session, temple_id: Optional[int]) -> Dict[str, int]:
+        return self.get(db, temple_id)[0]
+
+    def ids(self, db: Session, temple_id: Optional[int]) -> FrozenSet[int]:
+        """Ids of all accounts of the temple"""
+        return self.get(db, temple_id)[1]
+
+    def account_id(self, db: Session, temple_id: Optional[int], code: str) -> Optional[int]:
+        return self.codes(db, temple_id).get(code)
+
+
+account_codes = AccountCodeCache("account_code", settings.ACCOUNT_CODE_CACHE_TTL)
+account_codes.watch(Account, lambda account: account.temple_id)
+
+
+def get_account_by_code(db: Session, temple_id: Optional[int], code: str) -> Optional[Account]:
+    """Account of a temple by code - served from the session's identity map when loaded"""
+    account_id = account_codes.account_id(db, temple_id, code)
+    return db.get(Account, account_id) if account_id is not None else None
+
+
+# ===== BATCH POSTING =====
+
+
+def bulk_insert(db: Session, model, rows: List[Dict], key: str) -> Dict:
+    """
+    Multi-row INSERT ... RETURNING; new ids by the value of `key`, which is
+    unique within `rows` (matching by key instead of by position lets SQLite
+    batch the rows too)
+    """
+    if not rows:
+        return {}
+    stmt = insert(model).returning(getattr(model, key), model.id)
+    return dict(db.execute(stmt, rows).all())
+
+
+def _as_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.combine(value, datetime.min.time())
+
+
+def _resolve_lines(db: Session, posting: Dict) -> List[Dict]:
+    """Lines with account ids - codes looked up, ids checked against the temple"""
+    temple_id = posting["temple_id"] or 0
+    codes = account_codes.codes(db, temple_id)
+    ids = account_codes.ids(db, temple_id)
+    lines = []
+    for line in posting["lines"]:
+        account_id = line.get("account_id")
+        if account_id is None:
+            account_id = codes.get(line.get("account_code"))
+            if account_id is None:
+                raise ValueError(
+                    f"Account {line.get('account_code')} not found for temple {temple_id}. Please create it in Chart of Accounts."
+                )
+        elif account_id not in ids:
+            raise ValueError(f"Account ID {account_id} does not belong to temple {temple_id}")
+        lines.append(
+            {
+                "account_id": account_id,
+                "debit_amount": float(line.get("debit_amount") or 0),
+                "credit_amount": float(line.get("credit_amount") or 0),
+                "description": line.get("description"),
+            }
+        )
+
+    total_debit = sum(line["debit_amount"] for line in lines)
+    total_credit = sum(line["credit_amount"] for line in lines)
+    if len(lines) < 2 or abs(total_debit - total_credit) > BALANCE_TOLERANCE:
+        raise ValueError(
+            f"Unbalanced posting '{posting['narration']}': debits ({total_debit}) must equal credits ({total_credit})"
+        )
+    return lines
+
+
+def _consolidate(entries: List[Dict]) -> Dict:
+    """One summary voucher for same-day counter receipts of one payment mode"""
+    first = entries[0]
+    totals = OrderedDict()
+    for entry in entries:
+        for line in entry["lines"]:
+            side = "debit_amount" if line["debit_amount"] else "credit_amount"
+            key = (line["account_id"], side)
+            if key not in totals:
+                totals[key] = dict(line, debit_amount=0.0, credit_amount=0.0)
+            totals[key][side] += line[side]
+    day = first["entry_date"].date()
+    return dict(
+        first,
+        entry_date=_as_datetime(day),
+        narration=f"Counter receipts - {first['payment_mode'].upper()} - {day.strftime('%d-%m-%Y')} ({len(entries)} receipts)",
+        reference_id=None,
+        lines=list(totals.values()),
+    )
+
+
+def post_journal_batch(
+    db: Session,
+    postings: List[Dict],
+    consolidate: bool = False,
+) -> List[int]:
+    """
+    Post a batch of journal entries in the caller's transaction (no commit)
+
+    Each posting is a dict with temple_id, entry_date, narration, created_by,
+    optional reference_type / reference_id / payment_mode and lines - dicts
+    with account_id or account_code, debit_amount, credit_amount and
+    description.
+
+    Args:
+        consolidate: merge postings that have a payment_mode (counter
+            receipts) into one voucher per temple, day, payment mode and
+            reference type, with one line per account and side
+
+    Returns:
+        Journal entry id of each posting, in order (shared by consolidated ones)
+
+    Raises:
+        ValueError: unknown account code, foreign account or unbalanced lines
+    """
+    entries = [
+        dict(
+            posting,
+            temple_id=posting["temple_id"] or 0,
+            entry_date=_as_datetime(posting["entry_date"]),
+            lines=_resolve_lines(db, posting),
+        )
+        for posting in postings
+    ]
+    if not entries:
+        return []
+
+    # Entries to write and, per posting, the index of its entry
+    vouchers = []
+    voucher_of = []
+    groups: Dict[tuple, List[int]] = defaultdict(list)
+    for i, entry in enumerate(entries):
+        if consolidate and entry.get("payment_mode"):
+            key = (
+                entry["temple_id"],
+                entry["entry_date"].date(),
+                entry["payment_mode"].upper(),
+                entry.get("reference_type"),
+            )
+            groups[key].append(i)
+            voucher_of.append(key)
+        else:
+            voucher_of.append(len(vouchers))
+            vouchers.append(entry)
+    group_index = {}
+    for key, members in groups.items():
+        group_index[key] = len(vouchers)
+        if len(members) == 1:
+            vouchers.append(entries[members[0]])
+        else:
+            vouchers.append(_consolidate([entries[i] for i in members]))
+    voucher_of = [group_index[v] if isinstance(v, tuple) else v for v in voucher_of]
+
+    # Entry numbers - one block per temple and year
+    by_year = defaultdict(list)
+    for i, voucher in enumerate(vouchers):
+        by_year[(voucher["temple_id"], voucher["entry_date"].year)].append(i)
+    numbers = [None] * len(vouchers)
+    for (temple_id, year), indexes in by_year.items():
+        for i, number in zip(
+            indexes, next_journal_entry_numbers(db, temple_id, year, len(indexes))
+        ):
+            numbers[i] = number
+
+    now = datetime.utcnow()
+    entry_ids = bulk_insert(
+        db,
+        JournalEntry,
+        [
+            {
+                "temple_id": voucher["temple_id"],
+                "entry_date": voucher["entry_date"],
+                "entry_number": number,
+                "narration": voucher["narration"],
+                "reference_type": voucher.get("reference_type"),
+                "reference_id": voucher.get("reference_id"),
+                "total_amount": sum(line["debit_amount"] for line in voucher["lines"]),
+                "status": JournalEntryStatus.POSTED,
+                "created_by": voucher["created_by"],
+                "posted_by": voucher["created_by"],
+                "posted_at": now,
+            }
+            for voucher, number in zip(vouchers, numbers)
+        ],
+        "entry_number",
+    )
+
+    lines = []
+    postings_made = []
+    for voucher, number in zip(vouchers, numbers):
+        entry_id = entry_ids[number]
+        for line in voucher["lines"]:
+            lines.append(dict(line, journal_entry_id=entry_id))
+            postings_made.append(
+                (
+                    voucher["temple_id"],
+                    line["account_id"],
+                    voucher["entry_date"],
+                    line["debit_amount"],
+                    line["credit_amount"],
+                )
+            )
+    db.execute(insert(JournalLine), lines)
+    record_posted_lines(db, postings_made)
+
+    return [entry_ids[numbers[v]] for v in voucher_of]
@@ -0,0 +1,283 @@
+"""
+Numbering Service
+Receipt, voucher and journal entry numbers from the number_sequences table
+
+Each (temple, series, period) has one counter row. Numbers are taken with
+
+    UPDATE number_sequences SET last_value = last_value + :count WHERE ...
+
+so allocation is atomic - the row lock (PostgreSQL) or write lock (SQLite)
+serialises concurrent callers, and two callers can never receive the same
+number. No document table is scanned except once per series and period,
+when its counter row is created from the highest number already issued.
+
+By default numbers are allocated inside the caller's transaction, so a
+rolled back document gives its number back and the series stays gapless.
+With settings.NUMBER_BLOCK_SIZE > 1 each worker process reserves blocks of
+numbers in short transactions of its own and hands them out from memory;
+busy counters then never wait on each other, at the cost of gaps when a
+block is not used up.
+"""
+
+import re
+import threading
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.db_utils import insert_or_ignore
+from app.models.number_sequence import NumberSequence
+
+# Series names
+JOURNAL_ENTRY_SERIES = "JE"
+DONATION_RECEIPT_SERIES = "DONATION"
+SEVA_RECEIPT_SERIES = "SEVA"
+GATEWAY_RECEIPT_SERIES = "GATEWAY/{prefix}"
+HUNDI_OPENING_SERIES = "HUNDI/{hundi_code}"
+
+# Receipt numbers are unique across temples, so their counters are shared
+SHARED_TEMPLE = 0
+
+Seed = Callable[[Session], int]
+
+SequenceKey = Tuple[int, str, str]
+
+
+def financial_year(day: date) -> str:
+    """Indian financial year (April-March) label, e.g. '2025-26'"""
+    start = day.year if day.month >= 4 else day.year - 1
+    return f"{start}-{(start + 1) % 100:02d}"
+
+
+def _key(temple_id: Optional[int], series: str, period) -> SequenceKey:
+    return (temple_id or SHARED_TEMPLE, series, str(period or ""))
+
+
+def _filter(key: SequenceKey):
+    temple_id, series, period = key
+    return (
+        NumberSequence.temple_id == temple_id,
+        NumberSequence.series == series,
+        NumberSequence.period == period,
+    )
+
+
+def _create_counter(db: Session, key: SequenceKey, start: int) -> None:
+    """Insert the counter row unless another caller just did"""
+    temple_id, series, period = key
+    values = {
+        "temple_id": temple_id,
+        "series": series,
+        "period": period,
+        "last_value": start,
+        "updated_at": datetime.utcnow(),
+    }
+    insert_or_ignore(db, NumberSequence.__table__, values, ["temple_id", "series", "period"])
+
+
+def allocate(
+    db: Session,
+    temple_id: Optional[int],
+    series: str,
+    period="",
+    count: int = 1,
+    seed: Optional[Seed] = None,
+) -> int:
+    """
+    Reserve `count` consecutive numbers and return the first
+
+    Runs in the caller's transaction and does not commit. `seed` returns the
+    highest number already issued; it is only called when the counter row
+    does not exist yet.
+    """
+    key = _key(temple_id, series, period)
+    bump = (
+        update(NumberSequence)
+        .where(*_filter(key))
+        .values(last_value=NumberSequence.last_value + count, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if db.execute(bump).rowcount == 0:
+        _create_counter(db, key, seed(db) if seed else 0)
+        db.execute(bump)
+
+    last = db.query(NumberSequence.last_value).filter(*_filter(key)).scalar()
+    return last - count + 1
+
+
+class NumberBlockAllocator:
+    """
+    Per-process cache of pre-allocated number blocks
+
+    A block is reserved in a short transaction of its own (committed at
+    once), so the counter row is never held locked by a slow posting.
+    """
+
+    def __init__(self, block_size: int, session_factory: Optional[Callable[[], Session]] = None):
+        self.block_size = block_size
+        self._session_factory = session_factory
+        self._blocks: Dict[SequenceKey, List[int]] = {}
+        self._lock = threading.Lock()
+
+    def _new_session(self) -> Session:
+        if self._session_factory is not None:
+            return self._session_factory()
+        from app.core.database import SessionLocal
+
+        return SessionLocal()
+
+    def next(
+        self, temple_id: Optional[int], series: str, period="", seed: Optional[Seed] = None
+    ) -> int:
+        key = _key(temple_id, series, period)
+        with self._lock:
+            block = self._blocks.get(key)
+            if not block or block[0] > block[1]:
+                db = self._new_session()
+                try:
+                    first = allocate(db, temple_id, series, period, self.block_size, seed)
+                    db.commit()
+                finally:
+                    db.close()
+                block = self._blocks[key] = [first, first + self.block_size - 1]
+            number = block[0]
+            block[0] += 1
+            return number
+
+    def clear(self) -> None:
+        with self._lock:
+            self._blocks.clear()
+
+
+block_allocator = NumberBlockAllocator(max(settings.NUMBER_BLOCK_SIZE, 1))
+
+
+def reset_number_sequences(db: Session) -> None:
+    """
+    Drop every counter row (and this process's blocks); each is created again
+    from the highest number already issued on its next use. Commits.
+    """
+    db.query(NumberSequence).delete(synchronize_session=False)
+    db.commit()
+    block_allocator.clear()
+
+
+def next_number(
+    db: Session, temple_id: Optional[int], series: str, period="", seed: Optional[Seed] = None
+) -> int:
+    """Next number of a series - from a worker block when NUMBER_BLOCK_SIZE > 1"""
+    if block_allocator.block_size > 1:
+        return block_allocator.next(temple_id, series, period, seed)
+    return allocate(db, temple_id, series, period, 1, seed)
+
+
+# Seeds - highest number already issued under a prefix
+
+
+def max_suffix(
+    numbers: Iterable[Optional[str]], prefix: str, max_digits: Optional[int] = None
+) -> int:
+    """Highest integer that follows `prefix` in the given document numbers"""
+    pattern = re.compile(re.escape(prefix) + r"(\d+)$")
+    highest = 0
+    for number in numbers:
+        match = pattern.match(number or "")
+        if match and (max_digits is None or len(match.group(1)) <= max_digits):
+            highest = max(highest, int(match.group(1)))
+    return highest
+
+
+def _seed_from(column, prefix: str, *criteria, max_digits: Optional[int] = None) -> Seed:
+    def seed(db: Session) -> int:
+        rows = db.query(column).filter(column.like(f"{prefix}%"), *criteria)
+        return max_suffix((value for (value,) in rows), prefix, max_digits)
+
+    return seed
+
+
+# Document numbers
+
+
+def _journal_entry_seed(temple_id: Optional[int], prefix: str) -> Seed:
+    from app.models.accounting import JournalEntry
+
+    return _seed_from(JournalEntry.entry_number, prefix, JournalEntry.temple_id == (temple_id or 0))
+
+
+def next_journal_entry_number(db: Session, temple_id: Optional[int], year: int) -> str:
+    """JE/YYYY/NNNN - per temple and calendar year"""
+    prefix = f"JE/{year}/"
+    seed = _journal_entry_seed(temple_id, prefix)
+    return f"{prefix}{next_number(db, temple_id, JOURNAL_ENTRY_SERIES, year, seed):04d}"
+
+
+def next_journal_entry_numbers(
+    db: Session, temple_id: Optional[int], year: int, count: int
+) -> List[str]:
+    """`count` consecutive journal entry numbers for a batch, in the caller's transaction"""
+    prefix = f"JE/{year}/"
+    seed = _journal_entry_seed(temple_id, prefix)
+    first = allocate(db, temple_id, JOURNAL_ENTRY_SERIES, year, count, seed)
+    return [f"{prefix}{n:04d}" for n in range(first, first + count)]
+
+
+def _donation_receipt_seed(prefix: str) -> Seed:
+    from app.models.donation import Donation
+
+    return _seed_from(Donation.receipt_number, prefix)
+
+
+def next_donation_receipt_number(db: Session, year: int) -> str:
+    """TMP001-YYYY-NNNNN - shared by all temples, per calendar year"""
+    prefix = f"TMP001-{year}-"
+    seed = _donation_receipt_seed(prefix)
+    number = next_number(db, SHARED_TEMPLE, DONATION_RECEIPT_SERIES, year, seed)
+    return f"{prefix}{str(number).zfill(5)}"
+
+
+def next_donation_receipt_numbers(db: Session, year: int, count: int) -> List[str]:
+    """`count` consecutive donation receipt numbers for a batch, in the caller's transaction"""
+    prefix = f"TMP001-{year}-"
+    seed = _donation_receipt_seed(prefix)
+    first = allocate(db, SHARED_TEMPLE, DONATION_RECEIPT_SERIES, year, count, seed)
+    return [f"{prefix}{str(n).zfill(5)}" for n in range(first, first + count)]
+
+
+def next_seva_receipt_number(db: Session) -> str:
+    """SEV000001 - shared by all temples, never resets"""
+    from app.models.seva import SevaBooking
+
+    def seed(db: Session) -> int:
+        numbers = [
+            value
+            for (value,) in db.query(SevaBooking.receipt_number).filter(
+                SevaBooking.receipt_number.like("SEV%")
+            )
+        ]
+        highest = max_suffix(numbers, "SEV", max_digits=6)
+        if max_suffix(numbers, "SEV") > highest:
+            # Older timestamp-style receipts continue from the booking ids
+            last_id = db.query(SevaBooking.id).order_by(SevaBooking.id.desc()).first()
+            highest = max(highest, last_id[0] if last_id else 0)
+        return highest
+
+    number = next_number(db, SHARED_TEMPLE, SEVA_RECEIPT_SERIES, "", seed)
+    return f"SEV{str(number).zfill(6)}"
+
+
+def next_gateway_receipt_number(db: Session, prefix: str) -> str:
+    """DON/YYYY/NNNN, SEVA/YYYY/NNNN or PAY/YYYY/NNNN for online payments"""
+    from app.models.donation import Donation
+
+    seed = _seed_from(Donation.receipt_number, prefix)
+    number = next_number(db, SHARED_TEMPLE, GATEWAY_RECEIPT_SERIES.format(prefix=prefix), "", seed)
+    return f"{prefix}{number:04d}"
+
+
+def next_hundi_opening_number(db: Session, temple_id: int, hundi_code: str, year: int) -> str:
+    """HUNDI/<code>/YYYY/NNNN - per temple, hundi and calendar year"""
+    series = HUNDI_OPENING_SERIES.format(hundi_code=hundi_code)[:50]
+    return f"HUNDI/{hundi_code}/{year}/{next_number(db, temple_id, series, year):04d}"
@@ -0,0 +1,207 @@
+"""
+Panchang Cache Service
+Serves daily panchang from a persistent per-location cache with an
+in-process LRU on top, so each day is calculated once per temple location
+instead of once per dashboard/kiosk request
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.panchang_cache import PanchangDayCache
+from app.services.panchang_service import PanchangService
+
+# Bump when PanchangService output changes so cached days are recalculated
+PANCHANG_CACHE_VERSION = 2
+
+# PanchangService always calculates with Lahiri ayanamsa
+AYANAMSA = "LAHIRI"
+
+# Reference time used for a calendar day (same as the Ready Reckoner)
+DAY_REFERENCE_HOUR = 6
+
+# Days kept calculated ahead of today
+DEFAULT_PREFILL_DAYS = 60
+
+_MEMORY_CACHE_SIZE = 512
+_memory_cache: "OrderedDict[Tuple, Dict]" = OrderedDict()
+_memory_lock = threading.Lock()
+
+# Last day a rolling-window prefill was scheduled for each location (this process)
+_prefill_scheduled: Dict[Tuple[int, int], date] = {}
+
+
+def location_key(lat: float, lon: float) -> Tuple[int, int]:
+    """Round a location to 0.01 degree (~1 km); timings differ by seconds within it"""
+    return int(round(lat * 100)), int(round(lon * 100))
+
+
+def _memory_get(key: Tuple) -> Optional[Dict]:
+    with _memory_lock:
+        data = _memory_cache.get(key)
+        if data is not None:
+            _memory_cache.move_to_end(key)
+        return data
+
+
+def _memory_put(key: Tuple, data: Dict) -> None:
+    with _memory_lock:
+        _memory_cache[key] = data
+        _memory_cache.move_to_end(key)
+        while len(_memory_cache) > _MEMORY_CACHE_SIZE:
+            _memory_cache.popitem(last=False)
+
+
+def prefill_due(lat: float, lon: float, today: date) -> bool:
+    """True the first time a location is seen on a given day - used to roll the window"""
+    key = location_key(lat, lon)
+    with _memory_lock:
+        if _prefill_scheduled.get(key) == today:
+            return False
+        _prefill_scheduled[key] = today
+        return True
+
+
+def clear_memory_cache() -> None:
+    """Drop the in-process LRU (e.g. after a temple location change)"""
+    with _memory_lock:
+        _memory_cache.clear()
+
+
+class PanchangCacheService:
+    """Read-through cache in front of PanchangService.calculate_panchang"""
+
+    def __init__(self, db: Session, panchang_service: Optional[PanchangService] = None):
+        self.db = db
+        self.panchang_service = panchang_service or PanchangService()
+
+    def _row(self, day: date, lat_key: int, lon_key: int) -> Optional[PanchangDayCache]:
+        return (
+            self.db.query(PanchangDayCache)
+            .filter(
+                PanchangDayCache.panchang_date == day,
+                PanchangDayCache.lat_key == lat_key,
+                PanchangDayCache.lon_key == lon_key,
+                PanchangDayCache.ayanamsa == AYANAMSA,
+            )
+            .first()
+        )
+
+    def _calculate(self, day: date, lat: float, lon: float, city: str) -> Dict:
+        dt = datetime.combine(day, datetime.min.time().replace(hour=DAY_REFERENCE_HOUR))
+        return self.panchang_service.calculate_panchang(dt, lat, lon, city)
+
+    def _store(self, day: date, lat_key: int, lon_key: int, city: str, data: Dict) -> None:
+        row = self._row(day, lat_key, lon_key)
+        if row is None:
+            row = PanchangDayCache(
+                panchang_date=day,
+                lat_key=lat_key,
+                lon_key=lon_key,
+                ayanamsa=AYANAMSA,
+            )
+            self.db.add(row)
+        row.version = PANCHANG_CACHE_VERSION
+        row.city = city
+        row.data = data
+        row.computed_at = datetime.utcnow()
+        try:
+            self.db.commit()
+        except IntegrityError:
+            # Another worker stored the same day first - theirs is equivalent
+            self.db.rollback()
+
+    def get_day(
+        self, day: date, lat: float = 12.9716, lon: float = 77.5946, city: str = "Bengaluru"
+    ) -> Dict:
+        """
+        Panchang for a calendar day at a location
+        Checks the in-process LRU, then the database, and calculates on a miss.
+        The returned dict is a copy and may be modified by the caller.
+        """
+        lat_key, lon_key = location_key(lat, lon)
+        key = (day, lat_key, lon_key, AYANAMSA)
+
+        data = _memory_get(key)
+        if data is None:
+            row = self._row(day, lat_key, lon_key)
+            if row is not None and row.version == PANCHANG_CACHE_VERSION:
+                data = row.data
+            else:
+                data = self._calculate(day, lat, lon, city)
+                self._store(day, lat_key, lon_key, city, data)
+            _memory_put(key, data)
+
+        result = copy.deepcopy(data)
+        result.setdefault("location", {})["city"] = city
+        return result
+
+    def missing_days(self, start_date: date, days: int, lat: float, lon: float) -> list:
+        """Days in [start_date, start_date + days) not yet cached at the current version"""
+        lat_key, lon_key = location_key(lat, lon)
+        end_date = start_date + timedelta(days=days - 1)
+        cached = {
+            row.panchang_date
+            for row in self.db.query(PanchangDayCache.panchang_date)
+            .filter(
+                PanchangDayCache.panchang_date >= start_date,
+                PanchangDayCache.panchang_date <= end_date,
+                PanchangDayCache.lat_key == lat_key,
+                PanchangDayCache.lon_key == lon_key,
+                PanchangDayCache.ayanamsa == AYANAMSA,
+                PanchangDayCache.version == PANCHANG_CACHE_VERSION,
+            )
+            .all()
+        }
+        return [
+            start_date + timedelta(days=offset)
+            for offset in range(days)
+            if start_date + timedelta(days=offset) not in cached
+        ]
+
+    def prefill(
+        self,
+        start_date: date,
+        days: int = DEFAULT_PREFILL_DAYS,
+        lat: float = 12.9716,
+        lon: float = 77.5946,
+        city: str = "Bengaluru",
+    ) -> Dict:
+        """
+        Calculate and store every missing day of a rolling window
+
+        Returns:
+            Dict with counts of calculated and already cached days
+        """
+        missing = self.missing_days(start_date, days, lat, lon)
+        lat_key, lon_key = location_key(lat, lon)
+        for day in missing:
+            self._store(day, lat_key, lon_key, city, self._calculate(day, lat, lon, city))
+
+        return {
+            "start_date": start_date.isoformat(),
+            "days": days,
+            "calculated": len(missing),
+            "already_cached": days - len(missing),
+        }
+
+
+def prefill_panchang_cache_job(
+    start_date: date, days: int, lat: float, lon: float, city: str
+) -> None:
+    """Background task entry point - runs with its own database session"""
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        PanchangCacheService(db).prefill(start_date, days, lat, lon, city)
+    except Exception as e:
+        print(f"⚠️  Panchang cache prefill failed: {str(e)}")
+    finally:
+        db.close()
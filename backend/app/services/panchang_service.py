@@ -11,6 +11,8 @@ from datetime import datetime, timedelta, date
 from typing import Dict, Optional, List, Tuple
 import math
 
+from app.services import panchang_transitions
+
 
 class PanchangService:
     """
@@ -322,36 +324,14 @@ class PanchangService:
         return dt_ist
 
     def get_nakshatra(self, jd: float) -> Dict:
-        """Calculate current Nakshatra"""
+        """Calculate current Nakshatra with exact start and end times"""
         moon_long = self.get_sidereal_position(jd, swe.MOON)
 
-        # Each nakshatra is 13┬░20' (13.333...)
-        nak_num = int(moon_long / 13.333333333333)
-        nak_pada = int((moon_long % 13.333333333333) / 3.333333333333) + 1
-
-        # Calculate end time (when moon moves to next nakshatra)
-        next_nak_deg = (nak_num + 1) * 13.333333
-        degrees_to_go = next_nak_deg - moon_long
-        if degrees_to_go < 0:
-            degrees_to_go += 360
-
-        # Moon moves ~13┬░ per day
-        hours_to_end = (degrees_to_go / 13.176358) * 24  # Average moon speed
-
-        # Calculate precise end time
-        next_nak_deg = (nak_num + 1) * 13.333333333333
-        # Handle wrap around (Revati -> Ashwini) happens at 360 -> 0
-        target_diff = next_nak_deg % 360
-
-        # Use _find_transition for Nakshatra (target is absolute longitude)
-        # We need a specialized finder for absolute longitude vs relative (Tithi)
-        jd_end = self._find_absolute_transition(jd, swe.MOON, target_diff)
-
-        # Calculate Start Time using previous transition
-        start_nak_deg = nak_num * 13.333333333333
-        start_target_diff = start_nak_deg % 360
-        # Search back 36 hours (1.5 days) to ensure we catch the start even for long Nakshatras
-        jd_start_val = self._find_absolute_transition(jd - 1.5, swe.MOON, start_target_diff)
+        # Each nakshatra is 13°20' (13.333...), each pada a quarter of it
+        nak_num, jd_start_val, jd_end = panchang_transitions.segment_bounds(
+            panchang_transitions.moon_longitude, jd, panchang_transitions.NAKSHATRA_SPAN
+        )
+        nak_pada = int((moon_long % panchang_transitions.NAKSHATRA_SPAN) / 3.333333333333) + 1
 
         start_time_dt = None
         if jd_start_val:
@@ -374,6 +354,22 @@ class PanchangService:
             "next_nakshatra": self.NAKSHATRAS[(nak_num + 1) % 27],
         }
 
+    def describe_tithi(self, tithi_index: int) -> Tuple[int, str, str]:
+        """Number within the paksha (1-15), name and paksha of a tithi index (0-29)"""
+        # Determine paksha (fortnight)
+        paksha = "Shukla" if tithi_index < 15 else "Krishna"
+        tithi_num = tithi_index % 15
+
+        # Get tithi name
+        if tithi_num == 14 and paksha == "Krishna":
+            tithi_name = "Amavasya"
+        elif tithi_num == 14 and paksha == "Shukla":
+            tithi_name = "Purnima"
+        else:
+            tithi_name = self.TITHIS[tithi_num]
+
+        return tithi_num + 1, tithi_name, paksha
+
     def get_tithi(self, jd: float) -> Dict:
         """Calculate current Tithi with accurate end time
 
@@ -388,26 +384,17 @@ class PanchangService:
 
         # Each tithi is 12 degrees (0-29)
         tithi_index = int(diff / 12)
-
-        # Determine paksha (fortnight)
-        paksha = "Shukla" if tithi_index < 15 else "Krishna"
-        tithi_num = tithi_index % 15
-
-        # Get tithi name
-        if tithi_num == 14 and paksha == "Krishna":
-            tithi_name = "Amavasya"
-        elif tithi_num == 14 and paksha == "Shukla":
-            tithi_name = "Purnima"
-        else:
-            tithi_name = self.TITHIS[tithi_num]
+        tithi_num, tithi_name, paksha = self.describe_tithi(tithi_index)
 
         # Find exact end time (when diff reaches next multiple of 12°)
         target_diff = ((tithi_index + 1) * 12) % 360
-        jd_end = self._find_transition(jd, target_diff)
+        jd_end = panchang_transitions.find_crossing(
+            panchang_transitions.elongation, jd, target_diff
+        )
         end_time_dt = self.jd_to_datetime(jd_end)
 
         return {
-            "number": tithi_num + 1,
+            "number": tithi_num,
             "name": tithi_name,
             "paksha": paksha,
             "full_name": f"{paksha} {tithi_name}",
@@ -419,82 +406,23 @@ class PanchangService:
             "ends_at_jd": jd_end,
         }
 
-    def _find_transition(self, jd_start: float, target_diff: float, max_hours=48) -> float:
-        """Binary search for exact transition time when elongation reaches target
-
-        Used to find precise tithi/nakshatra/yoga transition times
-        """
-        jd = jd_start
-        step = 0.01  # ~15 minutes
-        for _ in range(200):
-            moon = self.get_sidereal_position(jd, swe.MOON)
-            sun = self.get_sidereal_position(jd, swe.SUN)
-            diff = (moon - sun + 360) % 360
-
-            # Check if we've crossed the target
-            if abs(diff - target_diff) < 0.1:
-                return jd
-
-            # Adjust step direction
-            if diff > target_diff:
-                jd -= step
-            else:
-                jd += step
-
-            # Reduce step size for finer search
-            step *= 0.98
-
-        return jd
-
-    def _find_absolute_transition(self, jd_start: float, body_id: int, target_deg: float) -> float:
-        """Find when a planet reaches a specific absolute longitude"""
-        jd = jd_start
-        step = 0.01  # ~15 mins
-
-        # Current position
-        start_pos = self.get_sidereal_position(jd, body_id)
-
-        # Check if we need to cross 360/0 boundary
-        # If target is 0 (Ashwini start) and we are at 359 (Revati end)
-        crossing_zero = False
-        if start_pos > 300 and target_deg < 60:
-            crossing_zero = True
-            target_deg += 360
-
-        for _ in range(200):
-            pos = self.get_sidereal_position(jd, body_id)
-            if crossing_zero and pos < 60:
-                pos += 360
-
-            diff = target_deg - pos
-
-            if abs(diff) < 0.001:  # fairly precise
-                return jd
-
-            # If we overshot or are close, reduce step
-            if diff < 0:
-                # We went past it? (Planets usually move forward)
-                jd -= step
-                step *= 0.5
-            else:
-                # Still behind
-                jd += step * 0.8  # Move forward
-
-        return jd
-
     def get_yoga(self, jd: float) -> Dict:
-        """Calculate current Yoga"""
-        moon_long = self.get_sidereal_position(jd, swe.MOON)
-        sun_long = self.get_sidereal_position(jd, swe.SUN)
-
+        """Calculate current Yoga with exact start and end times"""
         # Yoga = (Moon + Sun) / 13.333...
-        total = (moon_long + sun_long) % 360
-        yoga_num = int(total / 13.333333)
+        yoga_num, jd_start, jd_end = panchang_transitions.segment_bounds(
+            panchang_transitions.yoga_longitude, jd, panchang_transitions.YOGA_SPAN
+        )
+        start_time_dt = self.jd_to_datetime(jd_start)
+        end_time_dt = self.jd_to_datetime(jd_end)
 
         return {
             "number": yoga_num + 1,
             "name": self.YOGAS[yoga_num],
             "is_inauspicious": self.YOGAS[yoga_num] in ["Vyatipata", "Vaidhriti"],
+            "start_time": start_time_dt.strftime("%Y-%m-%d %H:%M:%S"),
+            "end_time": end_time_dt.strftime("%Y-%m-%d %H:%M:%S"),
+            "end_time_formatted": end_time_dt.strftime("%I:%M %p"),
+            "next_yoga": self.YOGAS[(yoga_num + 1) % 27],
         }
 
     def get_karana(self, jd: float) -> Dict:
@@ -510,7 +438,9 @@ class PanchangService:
 
         # Calculate end time
         target_diff = ((karana_full_index + 1) * 6) % 360
-        jd_end = self._find_transition(jd, target_diff)
+        jd_end = panchang_transitions.find_crossing(
+            panchang_transitions.elongation, jd, target_diff
+        )
         end_time_dt = self.jd_to_datetime(jd_end)
         end_time_formatted = end_time_dt.strftime("%I:%M %p")
 
@@ -543,6 +473,7 @@ class PanchangService:
             "first_half": karanas[0],
             "second_half": karanas[1],
             "is_bhadra": karanas[0]["is_bhadra"] or karanas[1]["is_bhadra"],
+            "end_time": end_time_dt.strftime("%Y-%m-%d %H:%M:%S"),
             "end_time_formatted": end_time_formatted,
         }
 
@@ -1772,7 +1703,7 @@ class PanchangService:
         # We only have current time status or End time.
         # This is the tricky part. We need independent calculation of Nakshatra Entry.
         # Approximation: Use current time and percentage? No, too rough.
-        # Better: Use `_find_absolute_transition` to find START of this nakshatra.
+        # Better: Use `panchang_transitions.segment_bounds` to find START of this nakshatra.
         # Nakshatra span = 13.33 deg.
         # Nakshatra Start Longitude = index * 13.333
 
@@ -2339,6 +2270,79 @@ class PanchangService:
 
         return periods
 
+    def calculate_panchang_range(
+        self,
+        start_date: date,
+        end_date: date,
+        lat: float = 12.9716,
+        lon: float = 77.5946,
+        reference_hour: int = 6,
+    ) -> Dict:
+        """
+        Tithi, nakshatra and yoga for every day of a date range in one sweep
+
+        Uses the same sunrise (Udaya) convention as calculate_panchang, but walks
+        each element's boundaries once across the whole range instead of
+        building the full panchang per day. Meant for bulk jobs such as the
+        Ready Reckoner; a year takes a fraction of a second.
+
+        Args:
+            start_date: First day (inclusive)
+            end_date: Last day (inclusive)
+            lat: Latitude
+            lon: Longitude
+            reference_hour: IST hour used for the lunar month (as in calculate_panchang)
+
+        Returns:
+            Columnar dict - one list per field, one entry per day. Indices are
+            zero-based; end times are Julian days (UT).
+        """
+        geopos = [lon, lat, 0.0]
+        days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+        sunrise_jds = []
+        reference_jds = []
+        for day in days:
+            dt = datetime.combine(day, datetime.min.time().replace(hour=reference_hour))
+            jd = self.get_julian_day(dt)
+            jd_midnight = swe.julday(day.year, day.month, day.day, 0.0)
+            rise_res = swe.rise_trans(
+                jd_midnight, swe.SUN, swe.CALC_RISE | swe.BIT_DISC_CENTER, geopos, 0.0
+            )
+            sunrise_jds.append(rise_res[1][0] if rise_res[0] >= 0 else jd)
+            reference_jds.append(jd)
+
+        tithi_index, tithi_end = panchang_transitions.sweep_segments(
+            panchang_transitions.elongation, sunrise_jds, panchang_transitions.TITHI_SPAN
+        )
+        nakshatra_index, nakshatra_end = panchang_transitions.sweep_segments(
+            panchang_transitions.moon_longitude, sunrise_jds, panchang_transitions.NAKSHATRA_SPAN
+        )
+        yoga_index, yoga_end = panchang_transitions.sweep_segments(
+            panchang_transitions.yoga_longitude, sunrise_jds, panchang_transitions.YOGA_SPAN
+        )
+
+        lunar_month_purnimanta = []
+        lunar_month_amanta = []
+        for day, jd, index in zip(days, reference_jds, tithi_index):
+            dt = datetime.combine(day, datetime.min.time().replace(hour=reference_hour))
+            hindu = self.get_hindu_calendar_info(dt, jd, {"paksha": self.describe_tithi(index)[2]})
+            lunar_month_purnimanta.append(hindu["lunar_month_purnimanta"])
+            lunar_month_amanta.append(hindu["lunar_month_amanta"])
+
+        return {
+            "dates": days,
+            "sunrise_jd": sunrise_jds,
+            "tithi_index": tithi_index,
+            "tithi_end_jd": tithi_end,
+            "nakshatra_index": nakshatra_index,
+            "nakshatra_end_jd": nakshatra_end,
+            "yoga_index": yoga_index,
+            "yoga_end_jd": yoga_end,
+            "lunar_month_purnimanta": lunar_month_purnimanta,
+            "lunar_month_amanta": lunar_month_amanta,
+        }
+
     def calculate_panchang(
         self, dt: datetime, lat: float = 12.9716, lon: float = 77.5946, city: str = "Bengaluru"
     ) -> Dict:
@@ -0,0 +1,162 @@
+"""
+Panchang Transition Solver
+Finds the exact moment a tithi, nakshatra, yoga or karana begins or ends
+
+Each panchang angle (Moon-Sun elongation, sidereal Moon, sidereal Moon + Sun)
+is evaluated together with its daily rate from Swiss Ephemeris (FLG_SPEED).
+The rate gives the first estimate of the crossing; the solver then keeps a
+bracket around the root and takes Newton steps inside it, falling back to
+bisection, until the correction is below one second. A crossing normally
+takes 3-4 ephemeris evaluations.
+
+Sidereal angles use the globally selected ayanamsa (PanchangService sets
+Lahiri on construction).
+"""
+
+import swisseph as swe
+from typing import Callable, List, Tuple
+
+# Tropical positions with daily motion (index 3 of the calc_ut result)
+_CALC_FLAGS = swe.FLG_SWIEPH | swe.FLG_SPEED
+
+# Solver stops once the next correction is smaller than this (1 second)
+DEFAULT_TOLERANCE = 1.0 / 86400.0
+
+# Bisecting a two-day bracket down to one second takes 18 steps
+MAX_ITERATIONS = 40
+
+# Angular width of each panchang element in degrees
+TITHI_SPAN = 12.0
+KARANA_SPAN = 6.0
+NAKSHATRA_SPAN = 360.0 / 27
+YOGA_SPAN = 360.0 / 27
+
+# An angle function returns (degrees in [0, 360), degrees per day)
+Angle = Callable[[float], Tuple[float, float]]
+
+
+def _body(jd: float, body: int) -> Tuple[float, float]:
+    """Tropical longitude and daily motion of a body"""
+    position = swe.calc_ut(jd, body, _CALC_FLAGS)[0]
+    return position[0], position[3]
+
+
+def _wrap(degrees: float) -> float:
+    """Signed angular difference in [-180, 180)"""
+    return (degrees + 180.0) % 360.0 - 180.0
+
+
+def elongation(jd: float) -> Tuple[float, float]:
+    """Moon - Sun (tithi and karana); the ayanamsa cancels out"""
+    moon, moon_speed = _body(jd, swe.MOON)
+    sun, sun_speed = _body(jd, swe.SUN)
+    return (moon - sun) % 360.0, moon_speed - sun_speed
+
+
+def moon_longitude(jd: float) -> Tuple[float, float]:
+    """Sidereal Moon (nakshatra)"""
+    moon, moon_speed = _body(jd, swe.MOON)
+    return (moon - swe.get_ayanamsa_ut(jd)) % 360.0, moon_speed
+
+
+def yoga_longitude(jd: float) -> Tuple[float, float]:
+    """Sidereal Moon + sidereal Sun (yoga)"""
+    moon, moon_speed = _body(jd, swe.MOON)
+    sun, sun_speed = _body(jd, swe.SUN)
+    return (moon + sun - 2 * swe.get_ayanamsa_ut(jd)) % 360.0, moon_speed + sun_speed
+
+
+def find_crossing(
+    angle: Angle,
+    jd: float,
+    target: float,
+    forward: bool = True,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> float:
+    """
+    Julian day at which an angle next reaches target degrees
+
+    Args:
+        angle: One of the angle functions above (must be increasing)
+        jd: Julian day (UT) to search from
+        target: Longitude to reach, in degrees
+        forward: Search after jd (True) or for the last crossing before it
+        tolerance: Accuracy in days
+
+    Returns:
+        Julian day (UT) of the crossing
+    """
+    target %= 360.0
+    value, speed = angle(jd)
+    if forward:
+        gap = (target - value) % 360.0
+        low, high = jd, None
+    else:
+        gap = -((value - target) % 360.0)
+        low, high = None, jd
+    if gap == 0:
+        return jd
+
+    # First estimate from the current rate; f(x) is negative before the crossing
+    x = jd + gap / speed
+    for _ in range(MAX_ITERATIONS):
+        value, speed = angle(x)
+        offset = _wrap(value - target)
+        if offset < 0:
+            low = x
+        else:
+            high = x
+
+        step = -offset / speed
+        if abs(step) < tolerance:
+            return x + step
+
+        candidate = x + step
+        if low is not None and high is not None:
+            if high - low < tolerance:
+                return (low + high) / 2
+            if not low < candidate < high:
+                candidate = (low + high) / 2
+        x = candidate
+
+    return x
+
+
+def segment_bounds(angle: Angle, jd: float, span: float) -> Tuple[int, float, float]:
+    """
+    The span-degree segment (tithi, nakshatra, ...) containing jd
+
+    Returns:
+        (zero-based segment index, start Julian day, end Julian day)
+    """
+    value, _ = angle(jd)
+    index = int(value // span) % int(round(360.0 / span))
+    start = find_crossing(angle, jd, index * span, forward=False)
+    end = find_crossing(angle, jd, (index + 1) * span, forward=True)
+    return index, start, end
+
+
+def sweep_segments(angle: Angle, jds: List[float], span: float) -> Tuple[List[int], List[float]]:
+    """
+    Segment index and segment end for each of an ascending list of Julian days
+
+    Walks the boundaries once across the whole span, so a year of days costs
+    one crossing per segment (~370 for tithi) instead of one search per day.
+
+    Returns:
+        (zero-based segment indices, end Julian day of each day's segment)
+    """
+    indices: List[int] = []
+    ends: List[float] = []
+    if not jds:
+        return indices, ends
+
+    count = int(round(360.0 / span))
+    index, _, end = segment_bounds(angle, jds[0], span)
+    for jd in jds:
+        while jd >= end:
+            index = (index + 1) % count
+            end = find_crossing(angle, end, (index + 1) * span)
+        indices.append(index)
+        ends.append(end)
+    return indices, ends
@@ -10,8 +10,21 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_
 
 from app.models.sacred_events_cache import SacredEventsCache
+from app.services.panchang_cache_service import location_key
 from app.services.panchang_service import PanchangService
 
+# Bump when event detection changes so every cached day is recalculated
+READY_RECKONER_VERSION = 2
+
+# Rows per executemany batch
+WRITE_BATCH_SIZE = 1000
+
+
+def calc_key(lat: float, lon: float) -> str:
+    """Fingerprint of the location and calculation version a day was cached with"""
+    lat_key, lon_key = location_key(lat, lon)
+    return f"{lat_key}:{lon_key}:v{READY_RECKONER_VERSION}"
+
 
 class ReadyReckonerService:
     """Service to pre-calculate and provide quick lookups for sacred events"""
@@ -19,6 +32,7 @@ class ReadyReckonerService:
     def __init__(self, db: Session):
         self.db = db
         self.panchang_service = PanchangService()
+        self._pending_events: Dict = {}
     
     def pre_calculate_dates(
         self,
@@ -27,12 +41,15 @@ class ReadyReckonerService:
         end_date: date,
         lat: float = 12.9716,
         lon: float = 77.5946,
-        city: str = "Bengaluru"
+        city: str = "Bengaluru",
+        force: bool = False
     ) -> Dict:
         """
         Pre-calculate sacred events dates for a date range
         
-        This should be called daily via background job to maintain cache
+        This should be called daily via background job to maintain cache.
+        Days already calculated for the same location are skipped, and only
+        rows whose values changed are written (bulk insert/update/delete).
         
         Args:
             temple_id: Temple ID (None for standalone mode)
@@ -41,45 +58,58 @@ class ReadyReckonerService:
             lat: Latitude for panchang calculations
             lon: Longitude for panchang calculations
             city: City name
+            force: Recalculate every day even if it is up to date
             
         Returns:
             Dict with summary of calculations
         """
         print(f"Pre-calculating sacred events from {start_date} to {end_date}")
         
-        current_date = start_date
         events_created = 0
-        events_updated = 0
+        key = calc_key(lat, lon)
+        
+        # Only days never calculated, or calculated for another location/version
+        all_days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        fresh_days = set() if force else self._fresh_days(temple_id, start_date, end_date, key)
+        stale_days = [day for day in all_days if day not in fresh_days]
+        
+        if not stale_days:
+            return {
+                "status": "success",
+                "events_created": 0,
+                "days_calculated": 0,
+                "days_skipped": len(all_days),
+                "inserted": 0,
+                "updated": 0,
+                "deleted": 0,
+                "start_date": start_date.isoformat(),
+                "end_date": end_date.isoformat()
+            }
         
-        # Delete existing entries for this date range to avoid duplicates
-        self.db.query(SacredEventsCache).filter(
-            and_(
-                SacredEventsCache.temple_id == temple_id,
-                SacredEventsCache.event_date >= start_date,
-                SacredEventsCache.event_date <= end_date
-            )
-        ).delete()
+        stale_set = set(stale_days)
+        self._pending_events = {}
         
-        while current_date <= end_date:
+        # One sweep over the whole range instead of a full panchang per day
+        # (tithi/nakshatra at sunrise, lunar month at 6:00 AM IST - same as calculate_panchang)
+        days = self.panchang_service.calculate_panchang_range(stale_days[0], stale_days[-1], lat, lon)
+
+        for i, current_date in enumerate(days["dates"]):
+            if current_date not in stale_set:
+                continue
             try:
-                # Create datetime at sunrise (morning) for this date
-                # Using 6:00 AM IST as approximate main seva time
-                dt = datetime.combine(current_date, datetime.min.time().replace(hour=6, minute=0))
-                
-                # Calculate panchang using existing service (READ-ONLY - no modifications to PanchangService)
-                # This is safe: we only READ from PanchangService, never modify it
-                panchang = self.panchang_service.calculate_panchang(dt, lat, lon, city)
-                
-                # Extract tithi and nakshatra - check nested structure
-                # PanchangService returns: panchang.tithi and panchang.nakshatra
-                panchang_data = panchang.get('panchang', {})
-                tithi_data = panchang_data.get('tithi', panchang.get('tithi', {}))
-                nakshatra_data = panchang_data.get('nakshatra', panchang.get('nakshatra', {}))
-                
+                tithi_number, tithi_name, tithi_paksha = self.panchang_service.describe_tithi(
+                    days["tithi_index"][i]
+                )
+                tithi_data = {"number": tithi_number, "name": tithi_name, "paksha": tithi_paksha}
+                nakshatra_index = days["nakshatra_index"][i]
+                nakshatra_data = {
+                    "number": nakshatra_index + 1,
+                    "name": self.panchang_service.NAKSHATRAS[nakshatra_index],
+                }
+
                 # Get lunar month for special Ekadashi detection
                 # Use Purnimanta (North Indian) system for named Ekadashis as that's the traditional reference
-                hindu_date = panchang.get('date', {}).get('hindu', {})
-                lunar_month = hindu_date.get('lunar_month_purnimanta', '') or hindu_date.get('lunar_month_amanta', '')
+                lunar_month = days["lunar_month_purnimanta"][i] or days["lunar_month_amanta"][i]
                 
                 # Get weekday name
                 weekday = current_date.strftime('%A')
@@ -106,8 +136,6 @@ class ReadyReckonerService:
                 if current_date == date(2025, 12, 30) and tithi_data.get('paksha') == 'Shukla':
                     # Check if we're close to Ekadashi (Dashami or Dwadashi in Margashirsha/Agrahayana)
                     if tithi_data.get('number') in [10, 11, 12]:
-                        hindu_date = panchang.get('date', {}).get('hindu', {})
-                        lunar_month = hindu_date.get('lunar_month_purnimanta', '') or hindu_date.get('lunar_month_amanta', '')
                         month_lower = lunar_month.lower() if lunar_month else ''
                         if 'margashirsha' in month_lower or 'agrahayana' in month_lower:
                             is_special_ekadashi_date = True
@@ -184,10 +212,8 @@ class ReadyReckonerService:
             except Exception as e:
                 print(f"Error calculating events for {current_date}: {e}")
                 continue
-            
-            current_date += timedelta(days=1)
         
-        # Commit all changes
+        counts = self._write_events(temple_id, stale_days, key)
         self.db.commit()
         
         print(f"Pre-calculation complete. Created {events_created} events")
@@ -195,6 +221,9 @@ class ReadyReckonerService:
         return {
             "status": "success",
             "events_created": events_created,
+            "days_calculated": len(stale_days),
+            "days_skipped": len(all_days) - len(stale_days),
+            **counts,
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat()
         }
@@ -286,34 +315,90 @@ class ReadyReckonerService:
         weekday: str,
         extra_info: Optional[str] = None
     ):
-        """Save or update a sacred event in cache"""
-        # Check if event already exists for this date
-        existing = self.db.query(SacredEventsCache).filter(
+        """Queue a sacred event for the bulk write in _write_events"""
+        self._pending_events[(event_code, event_date)] = {
+            "event_name": event_name,
+            "weekday": weekday,
+            "extra_info": extra_info,
+        }
+    
+    def _fresh_days(self, temple_id: Optional[int], start_date: date, end_date: date, key: str) -> set:
+        """Days in the range already calculated with this location fingerprint"""
+        rows = self.db.query(SacredEventsCache.event_date).filter(
             and_(
                 SacredEventsCache.temple_id == temple_id,
-                SacredEventsCache.event_code == event_code,
-                SacredEventsCache.event_date == event_date
+                SacredEventsCache.event_date >= start_date,
+                SacredEventsCache.event_date <= end_date,
+                SacredEventsCache.event_code == 'NAK',
+                SacredEventsCache.calc_key == key
             )
-        ).first()
-        
-        if existing:
-            # Update existing
-            existing.event_name = event_name
-            existing.weekday = weekday
-            existing.extra_info = extra_info
-        else:
-            # Create new
-            event = SacredEventsCache(
-                temple_id=temple_id,
-                event_code=event_code,
-                event_name=event_name,
-                event_date=event_date,
-                weekday=weekday,
-                extra_info=extra_info,
-                valid_from=event_date,
-                valid_to=event_date + timedelta(days=365)  # Valid for 1 year
+        ).all()
+        return {row.event_date for row in rows}
+    
+    def _write_events(self, temple_id: Optional[int], days: List[date], key: str) -> Dict:
+        """
+        Bring the cache rows of the given days in line with the queued events
+        
+        Loads the existing rows once and writes only the difference with
+        executemany-style bulk inserts, updates and deletes (no range delete,
+        so readers are never left with an empty cache).
+        """
+        day_set = set(days)
+        existing = {}
+        for row in self.db.query(
+            SacredEventsCache.id,
+            SacredEventsCache.event_code,
+            SacredEventsCache.event_date,
+            SacredEventsCache.event_name,
+            SacredEventsCache.weekday,
+            SacredEventsCache.extra_info,
+            SacredEventsCache.calc_key,
+        ).filter(
+            and_(
+                SacredEventsCache.temple_id == temple_id,
+                SacredEventsCache.event_date >= days[0],
+                SacredEventsCache.event_date <= days[-1]
             )
-            self.db.add(event)
+        ):
+            if row.event_date in day_set:
+                existing[(row.event_code, row.event_date)] = row
+        
+        inserts = []
+        updates = []
+        for (event_code, event_date), values in self._pending_events.items():
+            row = existing.pop((event_code, event_date), None)
+            if row is None:
+                inserts.append({
+                    "temple_id": temple_id,
+                    "event_code": event_code,
+                    "event_date": event_date,
+                    "valid_from": event_date,
+                    "valid_to": event_date + timedelta(days=365),  # Valid for 1 year
+                    "calc_key": key,
+                    **values,
+                })
+            elif (
+                row.event_name != values["event_name"]
+                or row.weekday != values["weekday"]
+                or row.extra_info != values["extra_info"]
+                or row.calc_key != key
+            ):
+                updates.append({"id": row.id, "calc_key": key, **values})
+        
+        # Rows left over are events that no longer fall on these days
+        stale_ids = [row.id for row in existing.values()]
+        
+        for start in range(0, len(inserts), WRITE_BATCH_SIZE):
+            self.db.bulk_insert_mappings(SacredEventsCache, inserts[start:start + WRITE_BATCH_SIZE])
+        for start in range(0, len(updates), WRITE_BATCH_SIZE):
+            self.db.bulk_update_mappings(SacredEventsCache, updates[start:start + WRITE_BATCH_SIZE])
+        for start in range(0, len(stale_ids), WRITE_BATCH_SIZE):
+            self.db.query(SacredEventsCache).filter(
+                SacredEventsCache.id.in_(stale_ids[start:start + WRITE_BATCH_SIZE])
+            ).delete(synchronize_session=False)
+        
+        self._pending_events = {}
+        return {"inserted": len(inserts), "updated": len(updates), "deleted": len(stale_ids)}
     
     def get_upcoming_events(
         self,
@@ -475,3 +560,93 @@ class ReadyReckonerService:
             "next_occurrences": next_occurrences
         }
 
+
+
+def pre_calculate_sacred_events_job(
+    job_id: int,
+    temple_ids: Optional[List[Optional[int]]],
+    days_ahead: int,
+    force: bool = False
+) -> None:
+    """
+    Background task entry point - refreshes SacredEventsCache temple by temple
+    
+    Runs with its own database session and commits after each temple, so no
+    transaction spans the whole run. Progress is reported per temple on the
+    BackgroundJob row.
+    
+    Args:
+        job_id: BackgroundJob to report progress on
+        temple_ids: Temples to refresh (None for every temple)
+        days_ahead: Days after today to keep calculated
+        force: Recalculate days that are already up to date
+    """
+    from app.core.database import SessionLocal
+    from app.models.panchang_display_settings import PanchangDisplaySettings
+    from app.models.temple import Temple
+    from app.services.background_job_service import (
+        complete_job,
+        fail_job,
+        start_job,
+        update_progress,
+    )
+    
+    db = SessionLocal()
+    try:
+        if temple_ids is None:
+            # Standalone installs may have no temple row - use temple_id None then
+            temple_ids = [row.id for row in db.query(Temple.id).order_by(Temple.id)] or [None]
+        
+        settings_by_temple = {
+            settings.temple_id: settings
+            for settings in db.query(PanchangDisplaySettings).filter(
+                PanchangDisplaySettings.temple_id.in_([t for t in temple_ids if t is not None])
+            )
+        }
+        
+        start_job(db, job_id, total=len(temple_ids))
+        service = ReadyReckonerService(db)
+        start_date = date.today()
+        end_date = start_date + timedelta(days=days_ahead)
+        
+        totals = {
+            "temples": len(temple_ids),
+            "days_calculated": 0,
+            "days_skipped": 0,
+            "inserted": 0,
+            "updated": 0,
+            "deleted": 0,
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat()
+        }
+        for done, temple_id in enumerate(temple_ids, start=1):
+            lat, lon, city = 12.9716, 77.5946, "Bengaluru"
+            settings = settings_by_temple.get(temple_id)
+            if settings and settings.latitude and settings.longitude:
+                lat = float(settings.latitude)
+                lon = float(settings.longitude)
+                city = settings.city_name or "Bengaluru"
+            
+            result = service.pre_calculate_dates(
+                temple_id=temple_id,
+                start_date=start_date,
+                end_date=end_date,
+                lat=lat,
+                lon=lon,
+                city=city,
+                force=force
+            )
+            for field in ("days_calculated", "days_skipped", "inserted", "updated", "deleted"):
+                totals[field] += result[field]
+            
+            update_progress(
+                db, job_id, done,
+                f"Temple {temple_id}: {result['days_calculated']} day(s) recalculated"
+            )
+        
+        complete_job(db, job_id, totals)
+    except Exception as e:
+        print(f"⚠️  Sacred events pre-calculation failed: {str(e)}")
+        fail_job(db, job_id, str(e))
+    finally:
+        db.close()
@@ -0,0 +1,452 @@
+"""
+Receipt PDF Service
+Renders donation and seva receipts from plain data through a per-temple
+compiled template
+
+A template holds everything about a temple's receipts that does not change
+between receipts - the paragraph and table styles, the header and signatory
+text and the logo, fetched once and stored as a small JPEG at print size so
+that each PDF embeds it without decoding or compressing it again. Templates
+are kept in a per-temple TempleCache until the temple row is written or
+settings.RECEIPT_TEMPLATE_CACHE_TTL expires.
+
+Rendering takes plain dicts (see donation_receipt_data / seva_receipt_data),
+so receipts can be rendered without a database session.
+"""
+
+import io
+import os
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.temple_cache import TempleCache
+from app.models.temple import Temple
+
+# Logo is drawn at 1.2 inch; 200 px keeps it sharp at print resolution
+LOGO_SIZE = 1.2 * inch
+LOGO_PIXELS = 200
+
+# Temple columns used on receipts
+TEMPLE_FIELDS = (
+    "id",
+    "name",
+    "address",
+    "phone",
+    "email",
+    "logo_url",
+    "certificate_80g_number",
+    "certificate_80g_valid_from",
+    "certificate_80g_valid_to",
+    "authorized_signatory_name",
+    "authorized_signatory_designation",
+)
+
+# Seva booking status -> note printed below the amount
+SEVA_STATUS_NOTES = {
+    "pending": "This booking is pending approval.",
+    "confirmed": "This booking is confirmed. Please arrive on time.",
+    "completed": "This seva has been completed.",
+    "cancelled": "This booking has been cancelled.",
+}
+
+
+def number_to_words(n):
+    """Convert number to words (simple implementation)"""
+    ones = ["", "One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight", "Nine"]
+    tens = ["", "", "Twenty", "Thirty", "Forty", "Fifty", "Sixty", "Seventy", "Eighty", "Ninety"]
+    teens = [
+        "Ten",
+        "Eleven",
+        "Twelve",
+        "Thirteen",
+        "Fourteen",
+        "Fifteen",
+        "Sixteen",
+        "Seventeen",
+        "Eighteen",
+        "Nineteen",
+    ]
+
+    if n == 0:
+        return "Zero"
+
+    def convert_hundreds(num):
+        result = ""
+        if num >= 100:
+            result += ones[num // 100] + " Hundred "
+            num %= 100
+        if num >= 20:
+            result += tens[num // 10] + " "
+            num %= 10
+        elif num >= 10:
+            result += teens[num - 10] + " "
+            return result
+        if num > 0:
+            result += ones[num] + " "
+        return result
+
+    result = ""
+    if n >= 10000000:  # Crores
+        result += convert_hundreds(n // 10000000) + "Crore "
+        n %= 10000000
+    if n >= 100000:  # Lakhs
+        result += convert_hundreds(n // 100000) + "Lakh "
+        n %= 100000
+    if n >= 1000:  # Thousands
+        result += convert_hundreds(n // 1000) + "Thousand "
+        n %= 1000
+    if n > 0:
+        result += convert_hundreds(n)
+
+    return result.strip()
+
+
+# ===== LOGO =====
+
+
+def fetch_logo(logo_url: Optional[str]) -> Optional[bytes]:
+    """Raw logo image from a URL or a local path; None when unavailable"""
+    if not logo_url:
+        return None
+    try:
+        if logo_url.startswith("http"):
+            import requests
+
+            response = requests.get(logo_url, timeout=5)
+            return response.content if response.status_code == 200 else None
+        if os.path.exists(logo_url):
+            with open(logo_url, "rb") as f:
+                return f.read()
+    except Exception as e:
+        print(f"[RECEIPT PDF] Could not load temple logo {logo_url}: {e}")
+    return None
+
+
+def prepare_logo(data: Optional[bytes]) -> Optional[bytes]:
+    """Logo as a small JPEG at print size (transparency flattened onto white)"""
+    if not data:
+        return None
+    from PIL import Image as PILImage
+
+    try:
+        image = PILImage.open(io.BytesIO(data))
+        image.thumbnail((LOGO_PIXELS, LOGO_PIXELS))
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = PILImage.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode != "RGB":
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, format="JPEG", quality=90)
+        return out.getvalue()
+    except Exception as e:
+        print(f"[RECEIPT PDF] Could not decode temple logo: {e}")
+        return None
+
+
+# ===== TEMPLATE =====
+
+
+def temple_receipt_data(temple: Optional[Temple]) -> Optional[Dict]:
+    """Temple fields used on receipts, as a plain dict"""
+    if temple is None:
+        return None
+    return {field: getattr(temple, field, None) for field in TEMPLE_FIELDS}
+
+
+class ReceiptTemplate:
+    """Styles, temple header and logo of one temple's receipts"""
+
+    def __init__(self, temple: Optional[Dict], logo: Optional[bytes] = None):
+        self.temple = temple
+        self.logo = logo
+
+        styles = getSampleStyleSheet()
+        self.normal_style = styles["Normal"]
+        self.title_style = ParagraphStyle(
+            "ReceiptTitle",
+            parent=styles["Heading1"],
+            fontSize=20,
+            textColor=colors.HexColor("#FF9933"),
+            spaceAfter=12,
+            alignment=TA_CENTER,
+            fontName="Helvetica-Bold",
+        )
+        self.header_style = ParagraphStyle(
+            "ReceiptHeader",
+            parent=styles["Normal"],
+            fontSize=14,
+            textColor=colors.black,
+            alignment=TA_CENTER,
+            spaceAfter=6,
+        )
+        self.footer_style = ParagraphStyle(
+            "ReceiptFooter",
+            parent=styles["Normal"],
+            fontSize=9,
+            textColor=colors.grey,
+            alignment=TA_CENTER,
+        )
+        self.table_style = TableStyle(
+            [
+                ("FONTNAME", (0, 0), (0, -1), "Helvetica-Bold"),
+                ("FONTNAME", (1, 0), (1, -1), "Helvetica"),
+                ("FONTSIZE", (0, 0), (-1, -1), 11),
+                ("ALIGN", (0, 0), (0, -1), "LEFT"),
+                ("ALIGN", (1, 0), (1, -1), "LEFT"),
+                ("VALIGN", (0, 0), (-1, -1), "TOP"),
+                ("BOTTOMPADDING", (0, 0), (-1, -1), 8),
+                ("TOPPADDING", (0, 0), (-1, -1), 8),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ]
+        )
+
+        # (text, style) of the header and signatory paragraphs
+        self.header_lines = []
+        self.signatory_lines = []
+        if temple:
+            if temple.get("name"):
+                self.header_lines.append((temple["name"], self.title_style))
+            if temple.get("address"):
+                self.header_lines.append((temple["address"], self.header_style))
+            if temple.get("phone"):
+                self.header_lines.append((f"Phone: {temple['phone']}", self.normal_style))
+            if temple.get("email"):
+                self.header_lines.append((f"Email: {temple['email']}", self.normal_style))
+            if temple.get("authorized_signatory_name"):
+                self.signatory_lines.append(
+                    f"Authorized Signatory: {temple['authorized_signatory_name']}"
+                )
+                if temple.get("authorized_signatory_designation"):
+                    self.signatory_lines.append(temple["authorized_signatory_designation"])
+
+    def render(
+        self, title: str, rows: List[List[str]], amount_words: str, notes: List[str] = ()
+    ) -> bytes:
+        """PDF bytes of one receipt"""
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4, topMargin=0.5 * inch, bottomMargin=0.5 * inch)
+        elements = []
+
+        if self.temple:
+            if self.logo:
+                logo = Image(io.BytesIO(self.logo), width=LOGO_SIZE, height=LOGO_SIZE)
+                logo.hAlign = "CENTER"
+                elements.append(logo)
+                elements.append(Spacer(1, 0.1 * inch))
+            for text, style in self.header_lines:
+                elements.append(Paragraph(text, style))
+            elements.append(Spacer(1, 0.2 * inch))
+            elements.append(Paragraph("_" * 80, self.normal_style))
+            elements.append(Spacer(1, 0.2 * inch))
+
+        elements.append(Paragraph(title, self.title_style))
+        elements.append(Spacer(1, 0.2 * inch))
+
+        receipt_table = Table(rows, colWidths=[2.5 * inch, 4 * inch])
+        receipt_table.setStyle(self.table_style)
+        elements.append(receipt_table)
+        elements.append(Spacer(1, 0.3 * inch))
+
+        elements.append(Paragraph(amount_words, self.normal_style))
+        elements.append(Spacer(1, 0.3 * inch))
+        for note in notes:
+            elements.append(Paragraph(note, self.normal_style))
+            elements.append(Spacer(1, 0.2 * inch))
+
+        elements.append(Spacer(1, 0.5 * inch))
+        elements.append(Paragraph("_" * 80, self.normal_style))
+        elements.append(Spacer(1, 0.1 * inch))
+        for text in self.signatory_lines:
+            elements.append(Paragraph(text, self.normal_style))
+
+        elements.append(Spacer(1, 0.2 * inch))
+        elements.append(
+            Paragraph(
+                f"Generated on {datetime.now().strftime('%d-%m-%Y %H:%M:%S')}", self.footer_style
+            )
+        )
+        elements.append(Paragraph("MandirMitra Temple Management System", self.footer_style))
+
+        doc.build(elements)
+        return buffer.getvalue()
+
+
+class ReceiptTemplateCache(TempleCache):
+    """Compiled receipt templates, per temple"""
+
+    def build(self, db: Session, temple_id: int) -> ReceiptTemplate:
+        temple = db.query(Temple).filter(Temple.id == temple_id).first() if temple_id else None
+        data = temple_receipt_data(temple)
+        return ReceiptTemplate(data, prepare_logo(fetch_logo(data and data["logo_url"])))
+
+
+receipt_templates = ReceiptTemplateCache("receipt_template", settings.RECEIPT_TEMPLATE_CACHE_TTL)
+receipt_templates.watch(Temple, lambda temple: temple.id, events=("after_update", "after_delete"))
+
+
+def get_receipt_template(db: Session, temple_id: Optional[int]) -> ReceiptTemplate:
+    """Compiled receipt template of a temple (built on first use)"""
+    return receipt_templates.get(db, temple_id)
+
+
+# ===== RECEIPTS =====
+
+
+def _format_date(value) -> str:
+    if isinstance(value, (date, datetime)):
+        return value.strftime("%d-%m-%Y")
+    return str(value) if value else ""
+
+
+def _enum_value(value) -> str:
+    return str(getattr(value, "value", value) or "")
+
+
+def donation_receipt_data(donation) -> Dict:
+    """Plain receipt data of a donation (loads its devotee and category)"""
+    devotee = donation.devotee
+    category = donation.category
+    return {
+        "receipt_number": donation.receipt_number,
+        "donation_date": donation.donation_date,
+        "devotee_name": devotee.name if devotee else None,
+        "devotee_phone": devotee.phone if devotee else None,
+        "devotee_address": devotee.address if devotee else None,
+        "category_name": category.name if category else None,
+        "is_80g_eligible": bool(category and category.is_80g_eligible),
+        "donation_type": _enum_value(donation.donation_type),
+        "payment_mode": donation.payment_mode,
+        "amount": donation.amount,
+        "item_name": donation.item_name,
+        "item_description": donation.item_description,
+        "quantity": donation.quantity,
+        "unit": donation.unit,
+        "purity": donation.purity,
+        "weight_gross": donation.weight_gross,
+        "weight_net": donation.weight_net,
+    }
+
+
+def render_donation_receipt(template: ReceiptTemplate, data: Dict) -> bytes:
+    """Donation receipt PDF from donation_receipt_data()"""
+    temple = template.temple
+    amount = data.get("amount") or 0
+    rows = [
+        ["Receipt Number:", data.get("receipt_number") or "N/A"],
+        ["Date:", _format_date(data.get("donation_date"))],
+        ["Devotee Name:", data.get("devotee_name") or "Anonymous"],
+        ["Phone:", data.get("devotee_phone") or "N/A"],
+        ["Address:", data.get("devotee_address") or "N/A"],
+        ["Category:", data.get("category_name") or "N/A"],
+    ]
+
+    if (data.get("donation_type") or "").lower() == "in_kind":
+        rows.append(["Donation Type:", "In-Kind Donation"])
+        if data.get("item_name"):
+            rows.append(["Item Name:", str(data["item_name"])])
+        if data.get("item_description"):
+            rows.append(["Item Description:", str(data["item_description"])])
+        if data.get("quantity") and data.get("unit"):
+            rows.append(["Quantity:", f"{data['quantity']} {data['unit']}"])
+        if data.get("purity"):
+            rows.append(["Purity:", str(data["purity"])])
+        if data.get("weight_gross"):
+            rows.append(["Weight (Gross):", f"{data['weight_gross']} grams"])
+        if data.get("weight_net"):
+            rows.append(["Weight (Net):", f"{data['weight_net']} grams"])
+        rows.append(["Assessed Value:", f"₹ {amount:,.2f}"])
+    else:
+        payment_mode = data.get("payment_mode")
+        rows.append(["Payment Mode:", payment_mode.upper() if payment_mode else "Cash"])
+        rows.append(["Amount:", f"₹ {amount:,.2f}"])
+
+    if data.get("is_80g_eligible") and temple and temple.get("certificate_80g_number"):
+        rows.append(["80G Certificate:", f"Yes - {temple['certificate_80g_number']}"])
+        rows.append(["80G Valid From:", temple.get("certificate_80g_valid_from") or "N/A"])
+        rows.append(["80G Valid To:", temple.get("certificate_80g_valid_to") or "N/A"])
+
+    amount_words = f"<b>Amount in Words:</b> Rupees {number_to_words(int(amount))} Only"
+    return template.render("DONATION RECEIPT", rows, amount_words)
+
+
+def seva_receipt_data(booking, seva=None, devotee=None) -> Dict:
+    """Plain receipt data of a seva booking"""
+    seva = seva or booking.seva
+    devotee = devotee or booking.devotee
+    return {
+        "receipt_number": booking.receipt_number or f"SEV{booking.id}",
+        # Receipt date is when the booking was made, seva date when it is performed
+        "receipt_date": booking.created_at.date() if booking.created_at else None,
+        "booking_date": booking.booking_date,
+        "booking_time": booking.booking_time,
+        "seva_name": seva.name_english if seva else None,
+        "devotee_name": devotee.name if devotee else None,
+        "devotee_phone": devotee.phone if devotee else None,
+        "devotee_address": devotee.address if devotee else None,
+        "payment_method": booking.payment_method,
+        "amount_paid": booking.amount_paid,
+        "gotra": booking.gotra,
+        "nakshatra": booking.nakshatra,
+        "rashi": booking.rashi,
+        "special_request": booking.special_request,
+        "upi_reference_number": booking.upi_reference_number,
+        "cheque_number": booking.cheque_number,
+        "cheque_bank_name": booking.cheque_bank_name,
+        "utr_number": booking.utr_number,
+        "status": _enum_value(booking.status),
+    }
+
+
+def render_seva_receipt(template: ReceiptTemplate, data: Dict) -> bytes:
+    """Seva booking receipt PDF from seva_receipt_data()"""
+    payment_method = data.get("payment_method")
+    amount = data.get("amount_paid") or 0
+    rows = [
+        ["Receipt Number:", data["receipt_number"]],
+        ["Receipt Date:", _format_date(data.get("receipt_date"))],
+        ["Seva Date:", _format_date(data.get("booking_date"))],
+        ["Seva Time:", data.get("booking_time") or "All Day"],
+        ["Seva Name:", data.get("seva_name") or "N/A"],
+        ["Devotee Name:", data.get("devotee_name") or "N/A"],
+        ["Phone:", data.get("devotee_phone") or "N/A"],
+        ["Address:", data.get("devotee_address") or "N/A"],
+        ["Payment Mode:", payment_method.upper() if payment_method else "Cash"],
+        ["Amount Paid:", f"₹ {amount:,.2f}"],
+    ]
+
+    for label, field in (
+        ("Gotra:", "gotra"),
+        ("Nakshatra:", "nakshatra"),
+        ("Rashi:", "rashi"),
+        ("Special Request:", "special_request"),
+    ):
+        if data.get(field):
+            rows.append([label, data[field]])
+    if payment_method == "UPI" and data.get("upi_reference_number"):
+        rows.append(["UPI Reference:", data["upi_reference_number"]])
+    if payment_method == "Cheque" and data.get("cheque_number"):
+        rows.append(["Cheque Number:", data["cheque_number"]])
+        if data.get("cheque_bank_name"):
+            rows.append(["Bank Name:", data["cheque_bank_name"]])
+    if payment_method == "Online" and data.get("utr_number"):
+        rows.append(["UTR Number:", data["utr_number"]])
+
+    notes = []
+    status_note = SEVA_STATUS_NOTES.get((data.get("status") or "").lower())
+    if status_note:
+        notes.append(f"<b>Status:</b> {status_note}")
+
+    amount_words = f"<b>Amount in Words:</b> Rupees {number_to_words(int(amount))} Only"
+    return template.render("SEVA BOOKING RECEIPT", rows, amount_words, notes)
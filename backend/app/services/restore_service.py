@@ -0,0 +1,430 @@
+"""
+Restore Service
+Loads backup archives written by backup_service back into the database
+
+Archive members are read as streams, never whole. Tables are loaded in
+foreign key order: tables whose parents are all loaded form a level, and
+the tables of a level are loaded in parallel (settings.RESTORE_WORKERS
+connections; SQLite loads one table at a time). Each table is written with
+multi-row INSERTs of BATCH_ROWS rows and committed as a whole, so a table
+that fails is left as it was and reported without stopping the others.
+Rows are upserted by primary key, which is what lets a chain of incremental
+backups be restored one archive after the other.
+
+Afterwards PostgreSQL id sequences are moved past the restored ids, and
+everything the Session flush hooks maintain (balance snapshots, rollups,
+devotee stats and search keys) is rebuilt, since restored rows bypass the
+hooks. Number counters are dropped so they are seeded again from the
+highest restored or newer number.
+
+A dry run only verifies the archive - every member's SHA-256 and row count
+against the manifest, and that the tables exist - without writing anything.
+
+Legacy single-file JSON backups are still accepted; they are loaded the
+same way, but have no checksums and are read into memory.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import Date, DateTime, LargeBinary, MetaData, Numeric, Table, Time, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.backup_service import MANIFEST_NAME
+
+RESTORE_JOB_TYPE = "database_restore"
+
+# Rows per INSERT
+BATCH_ROWS = 1000
+
+# Rows between checksum progress reports of a dry run
+VERIFY_PROGRESS_ROWS = 10000
+
+
+class RestoreError(Exception):
+    """The backup file cannot be restored"""
+
+
+# ===== SOURCES =====
+
+
+class ArchiveSource:
+    """Tables of a ZIP backup archive, read member by member"""
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with zipfile.ZipFile(path) as archive:
+                self.manifest = json.loads(archive.read(MANIFEST_NAME))
+        except (zipfile.BadZipFile, KeyError, ValueError) as e:
+            raise RestoreError(f"Not a backup archive: {e}")
+        self.tables = self.manifest["tables"]
+
+    def row_count(self, table_name: str) -> int:
+        return self.tables[table_name]["row_count"]
+
+    def columns(self, table_name: str) -> List[str]:
+        return self.tables[table_name]["columns"]
+
+    def rows(self, table_name: str) -> Iterator[List]:
+        # Own handle per call - tables are read from several threads
+        with zipfile.ZipFile(self.path) as archive:
+            with archive.open(self.tables[table_name]["file"]) as member:
+                for line in member:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def verify(
+        self, table_name: str, on_rows: Optional[Callable[[int], None]] = None
+    ) -> Optional[str]:
+        """Problem with a table's member (checksum, row count), None when intact"""
+        entry = self.tables[table_name]
+        digest = hashlib.sha256()
+        count = 0
+        with zipfile.ZipFile(self.path) as archive:
+            with archive.open(entry["file"]) as member:
+                for line in member:
+                    digest.update(line)
+                    count += 1
+                    if on_rows and count % VERIFY_PROGRESS_ROWS == 0:
+                        on_rows(VERIFY_PROGRESS_ROWS)
+        if on_rows:
+            on_rows(count % VERIFY_PROGRESS_ROWS)
+        if digest.hexdigest() != entry["sha256"]:
+            return "checksum mismatch"
+        if count != entry["row_count"]:
+            return f"{count} rows, manifest says {entry['row_count']}"
+        return None
+
+
+class LegacyJsonSource:
+    """Tables of a single-file JSON backup (the format before archives)"""
+
+    def __init__(self, path: str):
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except ValueError as e:
+            raise RestoreError(f"Invalid JSON file format: {e}")
+        if "tables" not in data:
+            raise RestoreError("Invalid backup file format")
+        self.tables = data["tables"]
+        self.manifest = {"backup_type": "legacy", "created_at": data.get("backup_timestamp")}
+
+    def row_count(self, table_name: str) -> int:
+        return len(self.tables[table_name]["rows"])
+
+    def columns(self, table_name: str) -> List[str]:
+        return self.tables[table_name]["columns"]
+
+    def rows(self, table_name: str) -> Iterator[List]:
+        columns = self.columns(table_name)
+        for row in self.tables[table_name]["rows"]:
+            yield [row.get(column) for column in columns]
+
+    def verify(
+        self, table_name: str, on_rows: Optional[Callable[[int], None]] = None
+    ) -> Optional[str]:
+        if on_rows:
+            on_rows(self.row_count(table_name))
+        return None
+
+
+def open_backup(path: str):
+    """Source for a backup file - ZIP archive or legacy JSON"""
+    if path.endswith(".json"):
+        return LegacyJsonSource(path)
+    return ArchiveSource(path)
+
+
+# ===== VALUES =====
+
+
+def python_value(column, value):
+    """JSON value of a backup row back in the column's Python type"""
+    if value is None or not isinstance(value, str):
+        return value
+    column_type = column.type
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, Date):
+        return date.fromisoformat(value[:10])
+    if isinstance(column_type, Time):
+        return time.fromisoformat(value)
+    if isinstance(column_type, Numeric) and getattr(column_type, "asdecimal", False):
+        return Decimal(value)
+    if isinstance(column_type, LargeBinary):
+        return base64.b64decode(value)
+    return value
+
+
+def _upsert(table: Table, dialect_name: str):
+    """INSERT of the table that overwrites rows with the same primary key"""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return table.insert()
+
+    stmt = insert(table)
+    keys = [column.name for column in table.primary_key.columns]
+    if not keys:
+        return stmt.on_conflict_do_nothing()
+    updates = {c.name: stmt.excluded[c.name] for c in table.columns if c.name not in keys}
+    if not updates:
+        return stmt.on_conflict_do_nothing(index_elements=keys)
+    return stmt.on_conflict_do_update(index_elements=keys, set_=updates)
+
+
+# ===== LOADING =====
+
+
+def load_levels(tables: List[Table]) -> List[List[Table]]:
+    """
+    Tables grouped so that each table's parents are in an earlier group
+
+    tables must be in foreign key order (MetaData.sorted_tables);
+    self-references are ignored.
+    """
+    names = {table.name for table in tables}
+    level_of: Dict[str, int] = {}
+    levels: List[List[Table]] = []
+    for table in tables:
+        parents = {
+            fk.column.table.name
+            for fk in table.foreign_keys
+            if fk.column.table.name in names and fk.column.table.name != table.name
+        }
+        level = max((level_of[parent] + 1 for parent in parents if parent in level_of), default=0)
+        level_of[table.name] = level
+        if level == len(levels):
+            levels.append([])
+        levels[level].append(table)
+    return levels
+
+
+def load_table(
+    db: Session,
+    table: Table,
+    source,
+    batch_rows: int = BATCH_ROWS,
+    on_rows: Optional[Callable[[int], None]] = None,
+) -> int:
+    """
+    Upsert every row of a table from the source in batches, in one transaction
+
+    Columns of the backup that the table no longer has are dropped.
+
+    Returns:
+        Rows written
+    """
+    columns = source.columns(table.name)
+    kept = [(position, table.c[name]) for position, name in enumerate(columns) if name in table.c]
+    stmt = _upsert(table, db.get_bind().dialect.name)
+    written = 0
+    try:
+        batch = []
+        for values in source.rows(table.name):
+            batch.append(
+                {column.name: python_value(column, values[position]) for position, column in kept}
+            )
+            if len(batch) >= batch_rows:
+                db.execute(stmt, batch)
+                written += len(batch)
+                if on_rows:
+                    on_rows(len(batch))
+                batch = []
+        if batch:
+            db.execute(stmt, batch)
+            written += len(batch)
+            if on_rows:
+                on_rows(len(batch))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return written
+
+
+def reset_sequences(db: Session, tables: List[Table]) -> None:
+    """Move PostgreSQL id sequences past the restored ids"""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for table in tables:
+        if "id" not in table.c:
+            continue
+        db.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                f"COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {table.name}"
+            )
+        )
+    db.commit()
+
+
+def rebuild_derived_data(db: Session) -> None:
+    """Recompute the tables the flush hooks keep current from the restored rows"""
+    from app.models.devotee_stats import DevoteeStats
+    from app.models.hundi_rollup import HundiMonthlyDenominationTotal
+    from app.services.account_balance_service import rebuild_account_balance_snapshots
+    from app.services.birthday_service import backfill_birth_month_day
+    from app.services.dashboard_rollup_service import rebuild_dashboard_rollups
+    from app.services.devotee_search_service import rebuild_search_index
+    from app.services.devotee_stats_service import rebuild_devotee_stats
+    from app.services.hundi_report_service import rebuild_hundi_rollup
+    from app.services.numbering_service import reset_number_sequences
+
+    rebuild_account_balance_snapshots(db)
+    rebuild_dashboard_rollups(db)
+    rebuild_search_index(db)
+    backfill_birth_month_day(db)
+    reset_number_sequences(db)
+
+    # Disabled tables are emptied instead, so their startup check rebuilds them once enabled
+    if settings.DEVOTEE_STATS_ENABLED:
+        rebuild_devotee_stats(db)
+    else:
+        db.query(DevoteeStats).delete(synchronize_session=False)
+    if settings.HUNDI_MONTHLY_ROLLUP_ENABLED:
+        rebuild_hundi_rollup(db)
+    else:
+        db.query(HundiMonthlyDenominationTotal).delete(synchronize_session=False)
+    db.commit()
+
+
+def restore_backup(
+    db: Session,
+    path: str,
+    dry_run: bool = False,
+    workers: Optional[int] = None,
+    session_factory: Optional[Callable[[], Session]] = None,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> Dict:
+    """
+    Verify a backup file and, unless dry_run, load it and rebuild derived data
+
+    Args:
+        workers: Tables loaded at the same time (default settings.RESTORE_WORKERS)
+        session_factory: Opens a session per parallel table load (needed when workers > 1)
+        on_progress: Called with the number of rows processed so far
+
+    Returns:
+        {"dry_run", "backup_type", "tables": {name: rows}, "total_records",
+         "errors": {table: error}, "skipped_tables": [...]}
+    """
+    source = open_backup(path)
+    metadata = MetaData()
+    metadata.reflect(bind=db.connection())
+    tables = [table for table in metadata.sorted_tables if table.name in source.tables]
+    skipped = sorted(set(source.tables) - {table.name for table in tables})
+
+    lock = threading.Lock()
+    processed = 0
+
+    def rows_done(count: int) -> None:
+        nonlocal processed
+        with lock:
+            processed += count
+            if on_progress:
+                on_progress(processed)
+
+    errors: Dict[str, str] = {}
+    if dry_run:
+        for table in tables:
+            problem = source.verify(table.name, rows_done)
+            if problem:
+                errors[table.name] = problem
+        return {
+            "dry_run": True,
+            "backup_type": source.manifest.get("backup_type"),
+            "tables": {table.name: source.row_count(table.name) for table in tables},
+            "total_records": sum(source.row_count(table.name) for table in tables),
+            "errors": errors,
+            "skipped_tables": skipped,
+        }
+
+    if workers is None:
+        workers = settings.RESTORE_WORKERS
+    if db.get_bind().dialect.name == "sqlite" or session_factory is None:
+        # SQLite has one writer at a time
+        workers = 1
+    # The reflection's transaction must not hold locks while the tables load
+    db.commit()
+
+    loaded: Dict[str, int] = {}
+
+    def load(table: Table) -> None:
+        session = session_factory() if workers > 1 else db
+        try:
+            loaded[table.name] = load_table(session, table, source, on_rows=rows_done)
+        except Exception as e:
+            errors[table.name] = str(e)
+        finally:
+            if session is not db:
+                session.close()
+
+    for level in load_levels(tables):
+        if workers > 1 and len(level) > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(level))) as pool:
+                list(pool.map(load, level))
+        else:
+            for table in level:
+                load(table)
+
+    reset_sequences(db, [table for table in tables if table.name in loaded])
+    rebuild_derived_data(db)
+    return {
+        "dry_run": False,
+        "backup_type": source.manifest.get("backup_type"),
+        "tables": loaded,
+        "total_records": sum(loaded.values()),
+        "errors": errors,
+        "skipped_tables": skipped,
+    }
+
+
+def restore_job(job_id: int, path: str, dry_run: bool, remove_after: bool = False) -> None:
+    """Background task entry point - verifies and restores a backup file"""
+    from app.core.database import SessionLocal
+    from app.services.background_job_service import (
+        complete_job,
+        fail_job,
+        start_job,
+        update_progress,
+    )
+
+    db = SessionLocal()
+    jobs = SessionLocal()
+    try:
+        source = open_backup(path)
+        start_job(jobs, job_id, total=sum(source.row_count(name) for name in source.tables))
+
+        def progress(processed: int) -> None:
+            update_progress(
+                jobs, job_id, processed, f"{processed} rows {'verified' if dry_run else 'restored'}"
+            )
+
+        result = restore_backup(
+            db, path, dry_run, session_factory=SessionLocal, on_progress=progress
+        )
+        result["restored_at"] = datetime.now().isoformat()
+        complete_job(jobs, job_id, result)
+    except Exception as e:
+        print(f"⚠️  Database restore failed: {str(e)}")
+        db.rollback()
+        fail_job(jobs, job_id, str(e))
+    finally:
+        db.close()
+        jobs.close()
+        if remove_after and os.path.exists(path):
+            os.remove(path)
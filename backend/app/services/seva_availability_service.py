@@ -0,0 +1,225 @@
+"""
+Seva Availability Service
+Booking calendars for one or many sevas from a single grouped query
+
+A seva's availability rule (daily, weekday, weekend, specific day, except
+days) is compiled once into a 7-bit weekday mask, and the active bookings
+of the whole window are counted in one GROUP BY (seva_id, booking_date).
+The calendar is then built in one pass over the days without further
+queries.
+"""
+
+import calendar
+import json
+from collections import namedtuple
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.seva import SevaBooking, SevaBookingStatus
+
+DAY_NAMES = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+# Bookings that hold a slot
+ACTIVE_BOOKING_STATUSES = [SevaBookingStatus.PENDING, SevaBookingStatus.CONFIRMED]
+
+# Slots shown when a seva has no max_bookings_per_day
+UNLIMITED_SLOTS = 999
+
+# Weekday masks - bit n is day n (0=Sunday, 6=Saturday)
+ALL_DAYS = 0b1111111
+WEEKDAYS = 0b0111110
+WEEKEND = 0b1000001
+
+SevaRule = namedtuple(
+    "SevaRule",
+    ["seva_id", "name", "availability", "mask", "max_slots", "advance_booking_days", "time_slot"],
+)
+
+
+def day_number(day: date) -> int:
+    """Day of week as stored on sevas (0=Sunday, 6=Saturday)"""
+    return (day.weekday() + 1) % 7
+
+
+def availability_type(seva) -> str:
+    """Lower-case availability of a Seva or SevaProxy"""
+    value = getattr(seva.availability, "value", seva.availability)
+    return str(value).lower() if value else "daily"
+
+
+def except_days_of(seva) -> List[int]:
+    """Excluded days from except_days (JSON or list) plus the legacy except_day"""
+    days = getattr(seva, "except_days", None) or []
+    if isinstance(days, str):
+        try:
+            days = json.loads(days)
+        except json.JSONDecodeError:
+            days = []
+    days = [int(d) for d in days]
+    legacy = getattr(seva, "except_day", None)
+    if legacy is not None and legacy not in days:
+        days.append(legacy)
+    return days
+
+
+def weekday_mask(seva) -> int:
+    """Days of the week on which the seva is performed, as a bit mask"""
+    kind = availability_type(seva)
+    if kind == "specific_day":
+        if seva.specific_day is None:
+            return 0
+        return 1 << seva.specific_day
+    if kind == "except_day":
+        mask = ALL_DAYS
+        for day in except_days_of(seva):
+            if 0 <= day <= 6:
+                mask &= ~(1 << day)
+        return mask
+    if kind == "weekday":
+        return WEEKDAYS
+    if kind == "weekend":
+        return WEEKEND
+    # 'daily' and 'festival_only' are always available (subject to max bookings)
+    return ALL_DAYS
+
+
+def compile_rule(seva) -> SevaRule:
+    """Everything the calendar needs from a seva, resolved once"""
+    return SevaRule(
+        seva_id=seva.id,
+        name=seva.name_english,
+        availability=availability_type(seva),
+        mask=weekday_mask(seva),
+        max_slots=seva.max_bookings_per_day or UNLIMITED_SLOTS,
+        advance_booking_days=seva.advance_booking_days,
+        time_slot=seva.time_slot,
+    )
+
+
+def booking_counts(
+    db: Session, seva_ids: Iterable[int], start: date, end: date
+) -> Dict[Tuple[int, date], int]:
+    """Active bookings per (seva_id, booking_date) between start and end, in one query"""
+    seva_ids = list(seva_ids)
+    if not seva_ids:
+        return {}
+    rows = (
+        db.query(SevaBooking.seva_id, SevaBooking.booking_date, func.count(SevaBooking.id))
+        .filter(
+            SevaBooking.seva_id.in_(seva_ids),
+            SevaBooking.booking_date >= start,
+            SevaBooking.booking_date <= end,
+            SevaBooking.status.in_(ACTIVE_BOOKING_STATUSES),
+        )
+        .group_by(SevaBooking.seva_id, SevaBooking.booking_date)
+    )
+    return {(seva_id, booking_date): count for seva_id, booking_date, count in rows}
+
+
+def _bookable_until(rule: SevaRule, today: date) -> Optional[date]:
+    if rule.advance_booking_days is None:
+        return None
+    return today + timedelta(days=rule.advance_booking_days)
+
+
+def available_dates(
+    rule: SevaRule,
+    counts: Dict[Tuple[int, date], int],
+    start: date,
+    end: date,
+    today: Optional[date] = None,
+) -> List[Dict]:
+    """Days between start and end on which the seva is performed and can be booked"""
+    today = today or date.today()
+    last = _bookable_until(rule, today)
+    if last is not None:
+        end = min(end, last)
+
+    dates = []
+    day = start
+    while day <= end:
+        weekday = day_number(day)
+        if rule.mask >> weekday & 1:
+            booked = counts.get((rule.seva_id, day), 0)
+            slots = max(0, rule.max_slots - booked)
+            dates.append(
+                {
+                    "date": day.isoformat(),
+                    "day_of_week": DAY_NAMES[weekday],
+                    "day_number": weekday,
+                    "available_slots": slots,
+                    "max_slots": rule.max_slots,
+                    "booked_slots": booked,
+                    "is_available": slots > 0,
+                    "time_slot": rule.time_slot,
+                }
+            )
+        day += timedelta(days=1)
+    return dates
+
+
+def seva_calendar(
+    db: Session, seva, weeks_ahead: int = 12, today: Optional[date] = None
+) -> List[Dict]:
+    """Available booking dates of one seva from today for weeks_ahead weeks"""
+    today = today or date.today()
+    end = today + timedelta(weeks=weeks_ahead)
+    rule = compile_rule(seva)
+    return available_dates(rule, booking_counts(db, [rule.seva_id], today, end), today, end, today)
+
+
+def month_grid(
+    db: Session, sevas: Iterable, year: int, month: int, today: Optional[date] = None
+) -> Dict:
+    """
+    Availability of many sevas over one calendar month
+
+    Every seva gets one entry per day of the month so the counter can show a
+    seva x day grid; days the seva is not performed, days in the past and
+    days beyond its advance booking window are not bookable.
+    """
+    today = today or date.today()
+    first = date(year, month, 1)
+    days = [first + timedelta(days=i) for i in range(calendar.monthrange(year, month)[1])]
+    rules = [compile_rule(seva) for seva in sevas]
+    counts = booking_counts(db, [rule.seva_id for rule in rules], days[0], days[-1])
+
+    grid = []
+    for rule in rules:
+        last = _bookable_until(rule, today)
+        cells = []
+        for day in days:
+            booked = counts.get((rule.seva_id, day), 0)
+            performed = bool(rule.mask >> day_number(day) & 1)
+            bookable = performed and day >= today and (last is None or day <= last)
+            slots = max(0, rule.max_slots - booked) if bookable else 0
+            cells.append(
+                {
+                    "date": day.isoformat(),
+                    "is_performed": performed,
+                    "booked_slots": booked,
+                    "available_slots": slots,
+                    "is_available": slots > 0,
+                }
+            )
+        grid.append(
+            {
+                "seva_id": rule.seva_id,
+                "seva_name": rule.name,
+                "availability_type": rule.availability,
+                "time_slot": rule.time_slot,
+                "max_slots": rule.max_slots,
+                "days": cells,
+            }
+        )
+
+    return {
+        "year": year,
+        "month": month,
+        "dates": [day.isoformat() for day in days],
+        "day_numbers": [day_number(day) for day in days],
+        "sevas": grid,
+    }
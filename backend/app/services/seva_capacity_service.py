@@ -0,0 +1,110 @@
+"""
+Seva Capacity Service
+Claims and releases seva slots through per-(seva, date) counter rows
+
+A booking claims its slot with one conditional UPDATE
+
+    UPDATE seva_day_capacity SET booked = booked + 1
+    WHERE seva_id = :seva AND booking_date = :day AND booked < :max
+
+which the database applies atomically - on PostgreSQL the row lock it takes
+makes a concurrent counter wait and re-check `booked < max`, on SQLite the
+write lock serialises it - so two counters can never take the last slot.
+The lock is held until the booking transaction commits or rolls back, and a
+rolled back booking gives its slot back with it.
+
+Counter rows are created on first use, seeded with the pending and
+confirmed bookings already on that date.
+"""
+
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.core.db_utils import insert_or_ignore
+from app.models.seva import Seva, SevaBooking, SevaBookingStatus, SevaDayCapacity
+
+# Bookings that hold a slot
+SLOT_HOLDING_STATUSES = (SevaBookingStatus.PENDING, SevaBookingStatus.CONFIRMED)
+
+
+def holds_slot(status) -> bool:
+    return status in SLOT_HOLDING_STATUSES
+
+
+def _counter(seva_id: int, day: date):
+    return (SevaDayCapacity.seva_id == seva_id, SevaDayCapacity.booking_date == day)
+
+
+def _claim(db: Session, seva_id: int, day: date, max_per_day: Optional[int]) -> bool:
+    stmt = update(SevaDayCapacity).where(*_counter(seva_id, day))
+    if max_per_day:
+        stmt = stmt.where(SevaDayCapacity.booked < max_per_day)
+    stmt = stmt.values(booked=SevaDayCapacity.booked + 1, updated_at=datetime.utcnow())
+    return db.execute(stmt.execution_options(synchronize_session=False)).rowcount > 0
+
+
+def booked_slots(db: Session, seva_id: int, day: date) -> Optional[int]:
+    """Slots held on the counter row, None if the date has no row yet"""
+    row = db.query(SevaDayCapacity.booked).filter(*_counter(seva_id, day)).first()
+    return row.booked if row else None
+
+
+def _seed(db: Session, seva_id: int, day: date) -> None:
+    """Create the counter row from the bookings already on that date"""
+    booked = (
+        db.query(func.count(SevaBooking.id))
+        .filter(
+            SevaBooking.seva_id == seva_id,
+            SevaBooking.booking_date == day,
+            SevaBooking.status.in_(SLOT_HOLDING_STATUSES),
+        )
+        .scalar()
+    )
+    values = {
+        "seva_id": seva_id,
+        "booking_date": day,
+        "booked": booked,
+        "updated_at": datetime.utcnow(),
+    }
+
+    # Another counter may seed the same date at the same moment - keep theirs
+    insert_or_ignore(db, SevaDayCapacity.__table__, values, ["seva_id", "booking_date"])
+
+
+def reserve_slot(db: Session, seva_id: int, day: date, max_per_day: Optional[int] = None) -> bool:
+    """
+    Claim one slot of a seva on a date; False when the date is full
+
+    max_per_day of None (or 0) means unlimited - the slot is still counted.
+    Part of the caller's transaction; nothing is committed here.
+    """
+    if _claim(db, seva_id, day, max_per_day):
+        return True
+    if booked_slots(db, seva_id, day) is not None:
+        return False
+    _seed(db, seva_id, day)
+    return _claim(db, seva_id, day, max_per_day)
+
+
+def reserve_seva_slot(db: Session, seva_id: int, day: date) -> bool:
+    """
+    reserve_slot() against the seva's own max_bookings_per_day
+    Raises ValueError when the seva does not exist.
+    """
+    seva = db.query(Seva.max_bookings_per_day).filter(Seva.id == seva_id).first()
+    if seva is None:
+        raise ValueError(f"Seva {seva_id} not found")
+    return reserve_slot(db, seva_id, day, seva.max_bookings_per_day)
+
+
+def release_slot(db: Session, seva_id: int, day: date) -> None:
+    """Give back a slot (cancellation, or the old date of a reschedule)"""
+    db.execute(
+        update(SevaDayCapacity)
+        .where(*_counter(seva_id, day), SevaDayCapacity.booked > 0)
+        .values(booked=SevaDayCapacity.booked - 1, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,52 @@
+"""
+Migration Script: Add account_balance_snapshots table
+Creates the per-account, per-day balance snapshot table (day totals and
+running totals) and backfills it from posted journal lines.
+Safe to re-run (snapshots are rebuilt).
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.core.database import engine, SessionLocal, column_exists
+from app.models.accounting import AccountBalanceSnapshot
+from app.services.account_balance_service import rebuild_account_balance_snapshots
+
+
+def run_migration():
+    """Create account_balance_snapshots and rebuild it from posted journal entries"""
+    print("Running migration: Add account_balance_snapshots table...")
+
+    AccountBalanceSnapshot.__table__.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        # Running-total columns were added after the first version of the table
+        for column in ("cumulative_debit", "cumulative_credit"):
+            if not column_exists(db, "account_balance_snapshots", column):
+                db.execute(
+                    text(
+                        f"ALTER TABLE account_balance_snapshots "
+                        f"ADD COLUMN {column} FLOAT NOT NULL DEFAULT 0"
+                    )
+                )
+        db.commit()
+
+        rows = rebuild_account_balance_snapshots(db)
+        print("Migration completed successfully!")
+        print(f"   - Snapshot rows written: {rows}")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_migration()
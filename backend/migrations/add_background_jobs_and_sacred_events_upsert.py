@@ -0,0 +1,83 @@
+"""
+Migration Script: Background jobs and sacred events bulk upsert
+- Creates the background_jobs table (status/progress of long-running jobs)
+- Adds sacred_events_cache.calc_key (location fingerprint of each cached day)
+- Removes duplicate sacred events and adds the unique
+  (temple_id, event_code, event_date) constraint used by the bulk writer
+Safe to re-run.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.core.database import engine, SessionLocal, column_exists, db_url
+from app.models.temple import Temple  # Referenced by the foreign keys below
+from app.models.user import User
+from app.models.background_job import BackgroundJob
+from app.models.sacred_events_cache import SacredEventsCache
+
+
+def run_migration():
+    """Create background_jobs and prepare sacred_events_cache for bulk upserts"""
+    print("Running migration: Background jobs and sacred events bulk upsert...")
+
+    BackgroundJob.__table__.create(bind=engine, checkfirst=True)
+    is_sqlite = db_url.startswith("sqlite")
+
+    db = SessionLocal()
+    try:
+        if is_sqlite:
+            # Older SQLite tables were created with a BIGINT primary key, which
+            # SQLite does not auto-increment. The table is only a cache, so it
+            # is recreated and refilled by the next pre-calculation.
+            columns = db.execute(text("PRAGMA table_info(sacred_events_cache)")).fetchall()
+            id_type = next((row[2] for row in columns if row[1] == "id"), None)
+            if id_type and id_type.upper() != "INTEGER":
+                db.execute(text("DROP TABLE sacred_events_cache"))
+                db.commit()
+                print("   - Recreated sacred_events_cache (INTEGER primary key)")
+
+        SacredEventsCache.__table__.create(bind=engine, checkfirst=True)
+
+        if not column_exists(db, "sacred_events_cache", "calc_key"):
+            db.execute(text("ALTER TABLE sacred_events_cache ADD COLUMN calc_key VARCHAR(40)"))
+            print("   - Added sacred_events_cache.calc_key")
+
+        # Keep the newest row of any duplicated event
+        removed = db.execute(
+            text(
+                """
+                DELETE FROM sacred_events_cache
+                WHERE id NOT IN (
+                    SELECT MAX(id) FROM sacred_events_cache
+                    GROUP BY temple_id, event_code, event_date
+                )
+                """
+            )
+        ).rowcount
+        if removed:
+            print(f"   - Removed {removed} duplicate sacred event(s)")
+
+        db.execute(
+            text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_sacred_events_cache_event "
+                "ON sacred_events_cache (temple_id, event_code, event_date)"
+            )
+        )
+        db.commit()
+        print("Migration completed successfully!")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,45 @@
+"""
+Migration Script: Add donation_daily_totals and seva_daily_totals tables
+Creates the per-temple, per-day dashboard rollups and backfills them from
+donations and seva bookings.
+Safe to re-run (rollups are rebuilt).
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import engine, SessionLocal
+from app.models.temple import Temple
+from app.models.user import User
+from app.models.devotee import Devotee
+from app.models.donation import Donation
+from app.models.seva import Seva, SevaBooking
+from app.models.dashboard_rollup import DonationDailyTotal, SevaDailyTotal
+from app.services.dashboard_rollup_service import rebuild_dashboard_rollups
+
+
+def run_migration():
+    """Create the dashboard rollup tables and rebuild them"""
+    print("Running migration: Add dashboard rollup tables...")
+
+    DonationDailyTotal.__table__.create(bind=engine, checkfirst=True)
+    SevaDailyTotal.__table__.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_dashboard_rollups(db)
+        print("Migration completed successfully!")
+        print(f"   - Rollup rows written: {rows}")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_migration()
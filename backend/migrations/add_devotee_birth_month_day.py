@@ -0,0 +1,49 @@
+"""
+Migration Script: Add devotees.birth_month_day
+Indexed month-day ordinal (month * 100 + day) of date_of_birth, used by the
+upcoming birthdays lookup, and backfills it for existing devotees.
+Safe to re-run.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal, column_exists
+from app.services.birthday_service import backfill_birth_month_day
+
+
+def run_migration():
+    """Add the birth_month_day column and index, then backfill it"""
+    print("Running migration: Add devotees.birth_month_day...")
+
+    db = SessionLocal()
+    try:
+        if not column_exists(db, "devotees", "birth_month_day"):
+            db.execute(text("ALTER TABLE devotees ADD COLUMN birth_month_day INTEGER"))
+            print("   - Added devotees.birth_month_day")
+        db.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_devotees_birth_month_day "
+                "ON devotees (birth_month_day)"
+            )
+        )
+        db.commit()
+
+        updated = backfill_birth_month_day(db)
+        print("Migration completed successfully!")
+        print(f"   - Devotees backfilled: {updated}")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,33 @@
+"""
+Migration Script: Add devotee_match_keys and devotee_duplicate_groups tables
+Blocking keys and stored candidate groups used by the devotee duplicate scan.
+The first scan (POST /api/v1/devotees/duplicates/scan) fills both tables.
+Safe to re-run.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import engine
+from app.models.temple import Temple
+from app.models.devotee import Devotee  # Referenced by devotee_match_keys
+from app.models.devotee_duplicate import DevoteeMatchKey, DevoteeDuplicateGroup
+
+
+def run_migration():
+    """Create the devotee duplicate detection tables"""
+    print("Running migration: Add devotee duplicate detection tables...")
+    try:
+        DevoteeMatchKey.__table__.create(bind=engine, checkfirst=True)
+        DevoteeDuplicateGroup.__table__.create(bind=engine, checkfirst=True)
+        print("Migration completed successfully!")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    run_migration()
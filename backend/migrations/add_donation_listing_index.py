@@ -0,0 +1,41 @@
+"""
+Migration Script: Add the donations (temple_id, donation_date, id) index
+Used by the keyset-paginated donation listing and the donation exports.
+Safe to re-run.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+
+from app.core.database import SessionLocal
+
+
+def run_migration():
+    """Create the donation listing index"""
+    print("Running migration: Add donation listing index...")
+
+    db = SessionLocal()
+    try:
+        db.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS ix_donations_temple_date_id "
+                "ON donations (temple_id, donation_date, id)"
+            )
+        )
+        db.commit()
+        print("Migration completed successfully!")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,43 @@
+"""
+Migration Script: Add hundi_monthly_denomination_totals table
+Creates the per-temple, per-month hundi denomination rollup and backfills it
+from the denomination counts.
+Set HUNDI_MONTHLY_ROLLUP_ENABLED=true to keep it current and report from it.
+Safe to re-run (the rollup is rebuilt).
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import engine, SessionLocal
+from app.models.temple import Temple
+from app.models.user import User
+from app.models.hundi import HundiOpening, HundiDenominationCount
+from app.models.hundi_rollup import HundiMonthlyDenominationTotal
+from app.services.hundi_report_service import rebuild_hundi_rollup
+
+
+def run_migration():
+    """Create the monthly hundi rollup table and rebuild it"""
+    print("Running migration: Add monthly hundi rollup table...")
+
+    HundiMonthlyDenominationTotal.__table__.create(bind=engine, checkfirst=True)
+
+    db = SessionLocal()
+    try:
+        rows = rebuild_hundi_rollup(db)
+        print("Migration completed successfully!")
+        print(f"   - Rollup rows written: {rows}")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,31 @@
+"""
+Migration Script: Add number_sequences table
+Counters for receipt, voucher and journal entry numbers. Each counter row
+is created on first use from the highest number already issued in its
+series, so no backfill is needed.
+Safe to re-run.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import engine
+from app.models.number_sequence import NumberSequence
+
+
+def run_migration():
+    """Create the number_sequences table"""
+    print("Running migration: Add number_sequences table...")
+    try:
+        NumberSequence.__table__.create(bind=engine, checkfirst=True)
+        print("Migration completed successfully!")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    run_migration()
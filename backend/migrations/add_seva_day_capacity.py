@@ -0,0 +1,31 @@
+"""
+Migration Script: Add seva_day_capacity table
+Per-(seva, date) slot counters claimed atomically by seva bookings.
+Rows are created on first use from the existing bookings, so no backfill
+is needed.
+Safe to re-run.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import engine
+from app.models.seva import Seva, SevaDayCapacity  # Seva is referenced by the foreign key
+
+
+def run_migration():
+    """Create the seva_day_capacity table"""
+    print("Running migration: Add seva_day_capacity table...")
+    try:
+        SevaDayCapacity.__table__.create(bind=engine, checkfirst=True)
+        print("Migration completed successfully!")
+    except Exception as e:
+        print(f"Migration failed: {e}")
+        raise
+
+
+if __name__ == "__main__":
+    run_migration()
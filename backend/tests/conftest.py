@@ -15,6 +15,7 @@ from app.core.database import Base, get_db
 from app.core.security import get_password_hash
 from app.main import app
 from app.models.user import User
+from app.services.journal_posting_service import account_codes
 
 
 # Use in-memory SQLite for fast testing
@@ -64,6 +65,8 @@ def db_session(engine) -> Generator[Session, None, None]:
     session.close()
     transaction.rollback()
     connection.close()
+    # The rollback happens below the session, so the account code cache misses it
+    account_codes.invalidate()
 
 
 @pytest.fixture(scope="function")
@@ -358,6 +361,17 @@ def authenticated_client(client, test_user, chart_of_accounts):
     return client
 
 
+
+@pytest.fixture
+def job_sessions(db_session, monkeypatch):
+    """
+    Bind the sessions background jobs open themselves to the test connection.
+
+    Jobs create their own session through app.core.database.SessionLocal.
+    """
+    monkeypatch.setattr("app.core.database.SessionLocal", sessionmaker(bind=db_session.get_bind()))
+
+
 # Performance optimization: Mark slow tests
 def pytest_configure(config):
     """Configure custom markers"""
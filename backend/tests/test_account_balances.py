@@ -0,0 +1,301 @@
+"""
+Account Balance Snapshot Tests
+Tests that daily balance snapshots follow journal posting, cancellation and edits
+"""
+
+import io
+import pytest
+from datetime import date, datetime
+
+from app.models.accounting import (
+    Account,
+    AccountBalanceSnapshot,
+    JournalEntry,
+    JournalEntryStatus,
+    JournalLine,
+)
+from app.services.account_balance_service import (
+    get_account_balances,
+    get_balance_before,
+    get_balance_through,
+    get_period_balances,
+    iter_journal_lines,
+    rebuild_account_balance_snapshots,
+)
+
+
+def _accounts(db_session, temple_id):
+    cash = (
+        db_session.query(Account)
+        .filter(Account.temple_id == temple_id, Account.account_code == "A101")
+        .first()
+    )
+    income = (
+        db_session.query(Account)
+        .filter(Account.temple_id == temple_id, Account.account_code == "D100")
+        .first()
+    )
+    return cash, income
+
+
+def _entry(db_session, user, number, amount, entry_date, status=JournalEntryStatus.POSTED):
+    cash, income = _accounts(db_session, user.temple_id)
+    entry = JournalEntry(
+        entry_number=number,
+        entry_date=entry_date,
+        narration=f"Test entry {number}",
+        temple_id=user.temple_id,
+        total_amount=amount,
+        status=status,
+        created_by=user.id,
+    )
+    db_session.add(entry)
+    db_session.flush()
+    db_session.add_all(
+        [
+            JournalLine(
+                journal_entry_id=entry.id, account_id=cash.id, debit_amount=amount, credit_amount=0
+            ),
+            JournalLine(
+                journal_entry_id=entry.id,
+                account_id=income.id,
+                debit_amount=0,
+                credit_amount=amount,
+            ),
+        ]
+    )
+    db_session.commit()
+    return entry
+
+
+@pytest.mark.unit
+@pytest.mark.accounting
+class TestAccountBalanceSnapshots:
+    """Tests for the snapshot flush hook and grouped balance reads"""
+
+    def test_posted_entry_updates_snapshot(self, db_session, test_user, chart_of_accounts):
+        cash, income = _accounts(db_session, test_user.temple_id)
+        _entry(db_session, test_user, "JE/T/0001", 500.0, datetime(2024, 4, 1, 10, 30))
+        _entry(db_session, test_user, "JE/T/0002", 250.0, datetime(2024, 4, 1, 15, 0))
+
+        rows = (
+            db_session.query(AccountBalanceSnapshot)
+            .filter(AccountBalanceSnapshot.account_id == cash.id)
+            .all()
+        )
+        assert len(rows) == 1
+        assert rows[0].balance_date == date(2024, 4, 1)
+        assert rows[0].debit_total == 750.0
+
+        balances = get_account_balances(db_session, test_user.temple_id, date(2024, 4, 30))
+        assert balances[cash.id] == (750.0, 0.0)
+        assert balances[income.id] == (0.0, 750.0)
+
+    def test_as_of_date_excludes_later_days(self, db_session, test_user, chart_of_accounts):
+        cash, _ = _accounts(db_session, test_user.temple_id)
+        _entry(db_session, test_user, "JE/T/0003", 100.0, datetime(2024, 4, 1))
+        _entry(db_session, test_user, "JE/T/0004", 300.0, datetime(2024, 4, 5))
+
+        balances = get_account_balances(db_session, test_user.temple_id, date(2024, 4, 4))
+        assert balances[cash.id] == (100.0, 0.0)
+
+    def test_draft_entry_counts_only_when_posted(self, db_session, test_user, chart_of_accounts):
+        cash, _ = _accounts(db_session, test_user.temple_id)
+        entry = _entry(
+            db_session,
+            test_user,
+            "JE/T/0005",
+            400.0,
+            datetime(2024, 5, 1),
+            JournalEntryStatus.DRAFT,
+        )
+        assert get_account_balances(db_session, test_user.temple_id, date(2024, 5, 31)) == {}
+
+        entry.status = JournalEntryStatus.POSTED
+        db_session.commit()
+        balances = get_account_balances(db_session, test_user.temple_id, date(2024, 5, 31))
+        assert balances[cash.id] == (400.0, 0.0)
+
+    def test_cancelled_entry_is_removed(self, db_session, test_user, chart_of_accounts):
+        cash, _ = _accounts(db_session, test_user.temple_id)
+        entry = _entry(db_session, test_user, "JE/T/0006", 900.0, datetime(2024, 6, 1))
+
+        # Expired attributes after commit must still be handled correctly
+        entry.status = JournalEntryStatus.CANCELLED
+        db_session.commit()
+
+        balances = get_account_balances(db_session, test_user.temple_id, date(2024, 6, 30))
+        assert balances.get(cash.id, (0.0, 0.0)) == (0.0, 0.0)
+
+    def test_rebuild_matches_incremental(self, db_session, test_user, chart_of_accounts):
+        _entry(db_session, test_user, "JE/T/0007", 120.0, datetime(2024, 7, 1))
+        _entry(db_session, test_user, "JE/T/0008", 80.0, datetime(2024, 7, 2))
+        before = get_account_balances(db_session, test_user.temple_id, date(2024, 7, 31))
+
+        rebuild_account_balance_snapshots(db_session, test_user.temple_id)
+        after = get_account_balances(db_session, test_user.temple_id, date(2024, 7, 31))
+        assert before == after
+
+    def test_running_totals_follow_backdated_entries(
+        self, db_session, test_user, chart_of_accounts
+    ):
+        cash, _ = _accounts(db_session, test_user.temple_id)
+        _entry(db_session, test_user, "JE/T/0009", 100.0, datetime(2024, 8, 1))
+        _entry(db_session, test_user, "JE/T/0010", 200.0, datetime(2024, 8, 10))
+        # Back-dated entry must raise the running totals of later days
+        _entry(db_session, test_user, "JE/T/0011", 50.0, datetime(2024, 8, 5))
+
+        assert get_balance_before(db_session, cash.id, date(2024, 8, 1)) == (0.0, 0.0)
+        assert get_balance_before(db_session, cash.id, date(2024, 8, 6)) == (150.0, 0.0)
+        assert get_balance_through(db_session, cash.id, date(2024, 8, 10)) == (350.0, 0.0)
+
+        rebuild_account_balance_snapshots(db_session, test_user.temple_id)
+        assert get_balance_through(db_session, cash.id, date(2024, 8, 10)) == (350.0, 0.0)
+
+
+@pytest.mark.accounting
+@pytest.mark.api
+class TestAccountLedger:
+    """Tests for the snapshot-backed, keyset-paged account ledger"""
+
+    def test_ledger_pages_with_cursor(self, authenticated_client, db_session, test_user):
+        cash, _ = _accounts(db_session, test_user.temple_id)
+        _entry(db_session, test_user, "JE/T/0101", 1000.0, datetime(2024, 9, 1))
+        for day in range(2, 7):
+            _entry(db_session, test_user, f"JE/T/01{day:02d}", 10.0 * day, datetime(2024, 9, day))
+
+        url = f"/api/v1/journal-entries/reports/ledger/{cash.id}"
+        params = {"from_date": "2024-09-02", "to_date": "2024-09-06"}
+
+        full = authenticated_client.get(url, params=params).json()
+        assert full["opening_balance"] == 1000.0
+        assert full["closing_balance"] == 1200.0
+        assert len(full["entries"]) == 5
+
+        first = authenticated_client.get(url, params={**params, "limit": 3}).json()
+        assert len(first["entries"]) == 3
+        assert first["next_cursor"]
+
+        second = authenticated_client.get(
+            url, params={**params, "limit": 3, "cursor": first["next_cursor"]}
+        ).json()
+        assert len(second["entries"]) == 2
+        assert second["next_cursor"] is None
+        assert [e["running_balance"] for e in first["entries"] + second["entries"]] == [
+            e["running_balance"] for e in full["entries"]
+        ]
+
+
+@pytest.mark.accounting
+@pytest.mark.api
+class TestCashBankBooks:
+    """Tests for snapshot-backed opening/closing balances in Day, Cash and Bank Book"""
+
+    def test_period_balances_for_account_set(self, db_session, test_user, chart_of_accounts):
+        cash, income = _accounts(db_session, test_user.temple_id)
+        _entry(db_session, test_user, "JE/T/0201", 100.0, datetime(2024, 10, 1))
+        _entry(db_session, test_user, "JE/T/0202", 40.0, datetime(2024, 10, 2))
+        _entry(db_session, test_user, "JE/T/0203", 60.0, datetime(2024, 10, 3))
+
+        balances = get_period_balances(
+            db_session, [cash, income], date(2024, 10, 2), date(2024, 10, 2)
+        )
+        assert balances[cash.id] == (100.0, 140.0)
+        assert balances[income.id] == (-100.0, -140.0)
+
+    def test_cash_book_balances(self, authenticated_client, db_session, test_user):
+        _entry(db_session, test_user, "JE/T/0301", 500.0, datetime(2024, 11, 1))
+        _entry(db_session, test_user, "JE/T/0302", 75.0, datetime(2024, 11, 2))
+
+        response = authenticated_client.get(
+            "/api/v1/journal-entries/reports/cash-book",
+            params={"from_date": "2024-11-02", "to_date": "2024-11-30"},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["opening_balance"] == 500.0
+        assert data["closing_balance"] == 575.0
+        assert data["total_receipts"] == 75.0
+
+    def test_day_book_opening_balance(self, authenticated_client, db_session, test_user):
+        _entry(db_session, test_user, "JE/T/0401", 300.0, datetime(2024, 12, 1))
+        _entry(db_session, test_user, "JE/T/0402", 20.0, datetime(2024, 12, 2))
+
+        response = authenticated_client.get(
+            "/api/v1/journal-entries/reports/day-book", params={"date": "2024-12-02"}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["opening_balance"] == 300.0
+        assert len(data["receipts"]) == 2  # Cash debit and income credit lines
+
+    def test_journal_lines_keyset_batches(self, db_session, test_user, chart_of_accounts):
+        cash, _ = _accounts(db_session, test_user.temple_id)
+        for i in range(5):
+            _entry(db_session, test_user, f"JE/T/06{i:02d}", 10.0 + i, datetime(2025, 1, 1, 9))
+
+        lines = list(
+            iter_journal_lines(
+                db_session,
+                test_user.temple_id,
+                date(2025, 1, 1),
+                date(2025, 1, 1),
+                [cash.id],
+                batch_size=2,
+            )
+        )
+        assert [line.entry_number for line in lines] == [f"JE/T/06{i:02d}" for i in range(5)]
+        assert all(line.account_name == cash.account_name for line in lines)
+
+    def test_cash_book_export_streams_running_balance(
+        self, authenticated_client, db_session, test_user
+    ):
+        from app.api.journal_entries import build_cash_book_export
+        from app.services.export_service import write_export
+
+        _entry(db_session, test_user, "JE/T/0701", 500.0, datetime(2025, 2, 1))
+        _entry(db_session, test_user, "JE/T/0702", 75.0, datetime(2025, 2, 2))
+        _entry(db_session, test_user, "JE/T/0703", 25.0, datetime(2025, 2, 3))
+
+        report = build_cash_book_export(db_session, test_user, "2025-02-02", "2025-02-03")
+        out = io.BytesIO()
+        assert write_export(report, "csv", out) == 2
+        lines = out.getvalue().decode("utf-8-sig").splitlines()
+        assert lines[1] == "Opening Balance: 500.00"
+        assert lines[4].startswith("2025-02-02,JE/T/0702,Test entry JE/T/0702,75.00,0.00,575.00")
+        assert lines[5].startswith("2025-02-03,JE/T/0703,Test entry JE/T/0703,25.00,0.00,600.00")
+        assert lines[6] == ",,Totals,100.00,0.00,,"
+        assert lines[8] == "Closing Balance: 600.00"
+
+
+@pytest.mark.accounting
+@pytest.mark.api
+class TestBalanceSheet:
+    """Tests for snapshot-backed account balances in the Balance Sheet"""
+
+    def test_balance_sheet_current_and_previous_year(
+        self, authenticated_client, db_session, test_user
+    ):
+        _entry(db_session, test_user, "JE/T/0501", 1000.0, datetime(2023, 6, 1))
+        _entry(db_session, test_user, "JE/T/0502", 250.0, datetime(2024, 6, 1))
+        _entry(db_session, test_user, "JE/T/0503", 999.0, datetime(2024, 7, 1))
+
+        # The balance sheet groups assets by Schedule III code ranges
+        cash, _ = _accounts(db_session, test_user.temple_id)
+        cash.account_code = "11001"
+        db_session.commit()
+
+        response = authenticated_client.get(
+            "/api/v1/journal-entries/reports/balance-sheet",
+            params={"as_of_date": "2024-06-30", "include_previous_year": True},
+        )
+        assert response.status_code == 200
+        data = response.json()
+        cash = {
+            acc["account_code"]: acc
+            for group in data["current_assets"]
+            for acc in group["accounts"]
+        }["11001"]
+        assert cash["current_year"] == 1250.0
+        assert cash["previous_year"] == 1000.0
+        assert data["total_assets"] == 1250.0
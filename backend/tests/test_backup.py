@@ -0,0 +1,69 @@
+"""
+Backup Tests
+Tests the streamed backup archives, their manifests and incremental backups
+"""
+
+import hashlib
+import json
+import pytest
+import zipfile
+
+from app.models.devotee import Devotee
+from app.services.backup_service import (
+    MANIFEST_NAME,
+    json_value,
+    read_manifest,
+    write_backup,
+)
+
+
+@pytest.mark.unit
+class TestBackupArchive:
+    """Tests for write_backup"""
+
+    def test_full_backup_streams_every_table(self, db_session, test_user, tmp_path):
+        path = str(tmp_path / "full.zip")
+        progress = []
+        manifest = write_backup(
+            db_session,
+            path,
+            created_by="admin",
+            on_progress=lambda done, total: progress.append(done),
+        )
+
+        assert manifest["backup_type"] == "full"
+        tables = manifest["tables"]
+        assert "background_jobs" not in tables
+        # Parents before children - the order a restore loads them in
+        assert list(tables).index("temples") < list(tables).index("users")
+        assert progress == list(range(1, len(tables) + 1))
+        assert read_manifest(path) == manifest
+
+        users = tables["users"]
+        assert users["row_count"] == 1
+        assert users["high_water"]["id"] == test_user.id
+        with zipfile.ZipFile(path) as archive:
+            data = archive.read(users["file"])
+            assert set(archive.namelist()) == {MANIFEST_NAME} | {t["file"] for t in tables.values()}
+        assert hashlib.sha256(data).hexdigest() == users["sha256"]
+        row = dict(zip(users["columns"], json.loads(data.splitlines()[0])))
+        assert row["email"] == "testuser@example.com"
+
+    def test_incremental_backup_writes_new_rows_only(self, db_session, test_user, tmp_path):
+        base = write_backup(db_session, str(tmp_path / "full.zip"))
+        db_session.add(Devotee(temple_id=test_user.temple_id, name="Gowri", phone="9845000050"))
+        db_session.commit()
+
+        manifest = write_backup(db_session, str(tmp_path / "incremental.zip"), base)
+        assert manifest["backup_type"] == "incremental"
+        assert manifest["tables"]["devotees"]["row_count"] == 1
+        assert manifest["tables"]["users"]["row_count"] == 0
+        assert manifest["tables"]["users"]["high_water"] == base["tables"]["users"]["high_water"]
+
+    def test_json_values(self):
+        from datetime import date
+        from decimal import Decimal
+
+        assert json_value(date(2025, 4, 1)) == "2025-04-01"
+        assert json_value(Decimal("10.50")) == "10.50"
+        assert json_value(b"\x00\x01") == "AAE="
@@ -0,0 +1,124 @@
+"""
+80G Certificate Tests
+Tests the bulk 80G certificate job and its ZIP / merged PDF output
+"""
+
+import pytest
+import zipfile
+from datetime import date
+
+from app.models.devotee import Devotee
+from app.models.donation import Donation, DonationCategory
+from app.services import certificate_80g_service
+from app.services.certificate_80g_service import (
+    eligible_donation_ids,
+    temple_certificate_data,
+    write_certificates,
+)
+
+
+@pytest.fixture
+def donations(db_session, test_user):
+    """Three 80G donations (one cancelled) and one non-80G donation"""
+    temple_id = test_user.temple_id
+    devotee = Devotee(
+        temple_id=temple_id, name="Lakshmi", phone="9845000040", address="2 Main Road"
+    )
+    eligible = DonationCategory(temple_id=temple_id, name="Annadanam", is_80g_eligible=True)
+    not_eligible = DonationCategory(temple_id=temple_id, name="Pooja", is_80g_eligible=False)
+    db_session.add_all([devotee, eligible, not_eligible])
+    db_session.flush()
+
+    rows = [
+        ("DON-80G-1", eligible, 5000.0, False),
+        ("DON-80G-2", eligible, 1200.0, False),
+        ("DON-80G-3", eligible, 700.0, True),
+        ("DON-80G-4", not_eligible, 300.0, False),
+    ]
+    items = [
+        Donation(
+            temple_id=temple_id,
+            devotee_id=devotee.id,
+            category_id=category.id,
+            receipt_number=receipt,
+            amount=amount,
+            payment_mode="Cash",
+            donation_date=date(2025, 1, 10),
+            financial_year="2024-25",
+            is_cancelled=cancelled,
+        )
+        for receipt, category, amount, cancelled in rows
+    ]
+    db_session.add_all(items)
+    db_session.commit()
+    return [item.id for item in items]
+
+
+@pytest.mark.unit
+class TestBulkCertificates:
+    """Tests for selecting and writing bulk 80G certificates"""
+
+    def test_only_active_80g_donations_are_selected(self, db_session, test_user, donations):
+        assert eligible_donation_ids(db_session, test_user.temple_id, donations) == donations[:2]
+        assert (
+            eligible_donation_ids(db_session, test_user.temple_id, None, "2024-25") == donations[:2]
+        )
+        assert eligible_donation_ids(db_session, test_user.temple_id, None, "2023-24") == []
+
+    def test_zip_has_one_pdf_per_certificate(self, db_session, test_user, donations, tmp_path):
+        path = str(tmp_path / "certificates.zip")
+        progress = []
+        count = write_certificates(
+            db_session,
+            path,
+            donations[:2],
+            temple_certificate_data(None),
+            "zip",
+            chunk_size=1,
+            on_progress=progress.append,
+        )
+        assert count == 2
+        assert progress == [1, 2]
+        with zipfile.ZipFile(path) as archive:
+            names = archive.namelist()
+            assert names == ["80g_certificate_DON-80G-1.pdf", "80g_certificate_DON-80G-2.pdf"]
+            assert archive.read(names[0]).startswith(b"%PDF")
+
+    def test_merged_pdf(self, db_session, test_user, donations, tmp_path):
+        path = tmp_path / "certificates.pdf"
+        count = write_certificates(
+            db_session, str(path), donations[:2], temple_certificate_data(None), "pdf"
+        )
+        assert count == 2
+        assert path.read_bytes().startswith(b"%PDF")
+
+    def test_endpoint_runs_job(
+        self, authenticated_client, donations, job_sessions, tmp_path, monkeypatch
+    ):
+        monkeypatch.setattr(
+            certificate_80g_service.settings, "UPLOAD_DIR", str(tmp_path / "uploads")
+        )
+        monkeypatch.setattr(certificate_80g_service.settings, "CERTIFICATE_PROCESSES", 1)
+
+        response = authenticated_client.post(
+            "/api/v1/donations/bulk-80g-certificates", params={"financial_year": "2024-25"}
+        )
+        assert response.status_code == 200
+        assert response.json()["donation_count"] == 2
+        job_id = response.json()["job_id"]
+
+        job = authenticated_client.get(f"/api/v1/donations/bulk-80g-certificates/{job_id}").json()
+        assert job["status"] == "completed"
+        assert job["result"]["certificate_count"] == 2
+
+        download = authenticated_client.get(
+            f"/api/v1/donations/bulk-80g-certificates/{job_id}/download"
+        )
+        assert download.status_code == 200
+        assert download.headers["content-type"] == "application/zip"
+
+    def test_endpoint_without_eligible_donations(self, authenticated_client, donations):
+        response = authenticated_client.post(
+            "/api/v1/donations/bulk-80g-certificates", params={"donation_ids": [donations[3]]}
+        )
+        assert response.status_code == 400
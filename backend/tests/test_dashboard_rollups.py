@@ -0,0 +1,164 @@
+"""
+Dashboard Rollup Tests
+Tests that daily donation/seva totals follow creation, cancellation and edits
+"""
+
+import pytest
+from datetime import date, datetime
+
+from app.models.dashboard_rollup import DonationDailyTotal, SevaDailyTotal
+from app.models.devotee import Devotee
+from app.models.donation import Donation, DonationCategory
+from app.models.seva import Seva, SevaBooking, SevaBookingStatus, SevaCategory
+from app.services.dashboard_rollup_service import (
+    get_dashboard_stats,
+    invalidate_dashboard_cache,
+    rebuild_dashboard_rollups,
+)
+
+TODAY = date(2024, 11, 15)
+
+
+@pytest.fixture(autouse=True)
+def clear_stats_cache():
+    invalidate_dashboard_cache()
+    yield
+    invalidate_dashboard_cache()
+
+
+@pytest.fixture
+def donor(db_session, test_user):
+    devotee = Devotee(name="Rollup Donor", phone="9000000001", temple_id=test_user.temple_id)
+    category = DonationCategory(name="General", temple_id=test_user.temple_id)
+    db_session.add_all([devotee, category])
+    db_session.commit()
+    return devotee, category
+
+
+def _donation(db_session, user, donor, number, amount, day):
+    devotee, category = donor
+    donation = Donation(
+        temple_id=user.temple_id,
+        devotee_id=devotee.id,
+        category_id=category.id,
+        receipt_number=f"RCP/T/{number}",
+        amount=amount,
+        donation_date=day,
+    )
+    db_session.add(donation)
+    db_session.commit()
+    return donation
+
+
+def _booking(db_session, donor, amount, created_at):
+    devotee, _ = donor
+    seva = db_session.query(Seva).filter(Seva.name_english == "Rollup Seva").first()
+    if seva is None:
+        seva = Seva(name_english="Rollup Seva", category=SevaCategory.SEVA, amount=amount)
+        db_session.add(seva)
+        db_session.flush()
+    booking = SevaBooking(
+        seva_id=seva.id,
+        devotee_id=devotee.id,
+        booking_date=created_at.date(),
+        amount_paid=amount,
+        status=SevaBookingStatus.CONFIRMED,
+        created_at=created_at,
+    )
+    db_session.add(booking)
+    db_session.commit()
+    return booking
+
+
+@pytest.mark.unit
+@pytest.mark.dashboard
+class TestDashboardRollups:
+    """Tests for the donation/seva rollup flush hook"""
+
+    def test_donations_roll_up_by_day(self, db_session, test_user, donor):
+        _donation(db_session, test_user, donor, "0001", 100.0, TODAY)
+        _donation(db_session, test_user, donor, "0002", 50.0, TODAY)
+
+        row = (
+            db_session.query(DonationDailyTotal)
+            .filter(DonationDailyTotal.temple_id == test_user.temple_id)
+            .one()
+        )
+        assert (row.total_date, row.amount, row.count) == (TODAY, 150.0, 2)
+
+    def test_cancelled_donation_is_removed(self, db_session, test_user, donor):
+        donation = _donation(db_session, test_user, donor, "0003", 500.0, TODAY)
+        donation.is_cancelled = True
+        db_session.commit()
+
+        stats = get_dashboard_stats(db_session, test_user.temple_id, TODAY)
+        assert stats["donations"]["today"] == {"amount": 0.0, "count": 0}
+
+    def test_sevas_are_scoped_to_devotee_temple(self, db_session, test_user, donor):
+        _booking(db_session, donor, 251.0, datetime(2024, 11, 15, 9, 0))
+        booking = _booking(db_session, donor, 101.0, datetime(2024, 11, 2, 9, 0))
+
+        stats = get_dashboard_stats(db_session, test_user.temple_id, TODAY)
+        assert stats["sevas"]["today"] == {"amount": 251.0, "count": 1}
+        assert stats["sevas"]["month"] == {"amount": 352.0, "count": 2}
+        assert (
+            get_dashboard_stats(db_session, test_user.temple_id + 1, TODAY)["sevas"]["month"][
+                "count"
+            ]
+            == 0
+        )
+
+        booking.status = SevaBookingStatus.CANCELLED
+        db_session.commit()
+        stats = get_dashboard_stats(db_session, test_user.temple_id, TODAY)
+        assert stats["sevas"]["month"] == {"amount": 251.0, "count": 1}
+
+    def test_seva_falls_back_to_booking_user_temple(self, db_session, test_user):
+        devotee = Devotee(name="No Temple", phone="9000000002")
+        seva = Seva(name_english="User Seva", category=SevaCategory.SEVA, amount=11)
+        db_session.add_all([devotee, seva])
+        db_session.flush()
+        db_session.add(
+            SevaBooking(
+                seva_id=seva.id,
+                devotee_id=devotee.id,
+                user_id=test_user.id,
+                booking_date=TODAY,
+                amount_paid=11,
+                status=SevaBookingStatus.CONFIRMED,
+                created_at=datetime(2024, 11, 15, 7, 0),
+            )
+        )
+        db_session.commit()
+
+        stats = get_dashboard_stats(db_session, test_user.temple_id, TODAY)
+        assert stats["sevas"]["today"] == {"amount": 11.0, "count": 1}
+
+    def test_month_and_financial_year_windows(self, db_session, test_user, donor):
+        _donation(db_session, test_user, donor, "0004", 10.0, date(2024, 3, 31))  # previous FY
+        _donation(db_session, test_user, donor, "0005", 20.0, date(2024, 4, 1))
+        _donation(db_session, test_user, donor, "0006", 30.0, date(2024, 11, 1))
+        _donation(db_session, test_user, donor, "0007", 40.0, TODAY)
+
+        stats = get_dashboard_stats(db_session, test_user.temple_id, TODAY)
+        assert stats["donations"]["today"] == {"amount": 40.0, "count": 1}
+        assert stats["donations"]["month"] == {"amount": 70.0, "count": 2}
+        assert stats["donations"]["year"] == {"amount": 90.0, "count": 3}
+        assert stats["period"]["year_start"] == "2024-04-01"
+
+    def test_rebuild_matches_incremental(self, db_session, test_user, donor):
+        _donation(db_session, test_user, donor, "0008", 75.0, TODAY)
+        _booking(db_session, donor, 25.0, datetime(2024, 11, 15, 8, 0))
+        before = get_dashboard_stats(db_session, test_user.temple_id, TODAY)
+
+        rebuild_dashboard_rollups(db_session)
+        after = get_dashboard_stats(db_session, test_user.temple_id, TODAY)
+        assert before == after
+        assert db_session.query(SevaDailyTotal).count() == 1
+
+    def test_stats_endpoint(self, authenticated_client):
+        response = authenticated_client.get("/api/v1/dashboard/stats")
+        assert response.status_code == 200
+        data = response.json()
+        assert set(data) == {"donations", "sevas", "period"}
+        assert set(data["donations"]) == {"today", "month", "year"}
@@ -0,0 +1,89 @@
+"""
+Devotee Birthday Tests
+Tests the month-day ordinal column and the wrap-around birthday lookup
+"""
+
+import pytest
+from datetime import date
+
+from app.models.devotee import Devotee
+from app.services.birthday_service import (
+    backfill_birth_month_day,
+    birthday_ranges,
+    upcoming_birthdays_query,
+)
+
+
+@pytest.fixture
+def birthday_devotees(db_session, test_user):
+    births = {
+        "Jan": date(1980, 1, 3),
+        "Feb29": date(1984, 2, 29),
+        "Mar": date(1975, 3, 1),
+        "Dec": date(1990, 12, 30),
+        "Jun": date(1960, 6, 15),
+    }
+    for i, (name, born) in enumerate(births.items()):
+        db_session.add(
+            Devotee(
+                name=name,
+                phone=f"90000001{i:02d}",
+                date_of_birth=born,
+                temple_id=test_user.temple_id,
+            )
+        )
+    db_session.add(Devotee(name="Unknown", phone="9000000199", temple_id=test_user.temple_id))
+    db_session.commit()
+
+
+def _names(db_session, test_user, days, today):
+    return [d.name for d in upcoming_birthdays_query(db_session, test_user.temple_id, days, today)]
+
+
+@pytest.mark.unit
+class TestBirthdayLookup:
+    """Tests for the month-day ordinal birthday lookup"""
+
+    def test_ordinal_follows_date_of_birth(self, db_session, test_user):
+        devotee = Devotee(name="Ordinal", phone="9000000200", date_of_birth=date(1970, 8, 15))
+        assert devotee.birth_month_day == 815
+        devotee.date_of_birth = None
+        assert devotee.birth_month_day is None
+
+    def test_ranges(self):
+        assert birthday_ranges(date(2024, 5, 1), 10) == [(501, 511)]
+        assert birthday_ranges(date(2024, 12, 25), 10) == [(1225, 1231), (101, 104)]
+        assert birthday_ranges(date(2025, 2, 20), 8) == [(220, 229)]  # 28 Feb also covers 29 Feb
+        assert birthday_ranges(date(2024, 2, 20), 8) == [(220, 228)]
+        assert birthday_ranges(date(2024, 1, 1), 365) is None
+
+    def test_window_wraps_across_year_end(self, db_session, test_user, birthday_devotees):
+        assert _names(db_session, test_user, 10, date(2024, 12, 28)) == ["Dec", "Jan"]
+
+    def test_feb_29_in_non_leap_year(self, db_session, test_user, birthday_devotees):
+        assert _names(db_session, test_user, 0, date(2025, 2, 28)) == ["Feb29"]
+        assert _names(db_session, test_user, 1, date(2025, 2, 28)) == ["Feb29", "Mar"]
+        assert _names(db_session, test_user, 0, date(2024, 2, 29)) == ["Feb29"]
+
+    def test_whole_year_is_ordered_from_today(self, db_session, test_user, birthday_devotees):
+        assert _names(db_session, test_user, 366, date(2024, 3, 1)) == [
+            "Mar",
+            "Jun",
+            "Dec",
+            "Jan",
+            "Feb29",
+        ]
+
+    def test_backfill(self, db_session, test_user, birthday_devotees):
+        db_session.query(Devotee).update({Devotee.birth_month_day: None})
+        db_session.commit()
+
+        assert backfill_birth_month_day(db_session) == 5
+        assert _names(db_session, test_user, 10, date(2024, 12, 28)) == ["Dec", "Jan"]
+
+    def test_birthdays_endpoint_pages(self, authenticated_client, birthday_devotees):
+        response = authenticated_client.get(
+            "/api/v1/devotees/birthdays", params={"days": 366, "limit": 2}
+        )
+        assert response.status_code == 200
+        assert len(response.json()) == 2
@@ -0,0 +1,153 @@
+"""
+Devotee Duplicate Detection Tests
+Tests blocking, scoring and the incremental duplicate scan job
+"""
+
+import pytest
+
+from app.models.devotee import Devotee
+from app.models.devotee_duplicate import DevoteeDuplicateGroup, DuplicateGroupStatus
+from app.services.background_job_service import create_job
+from app.services.devotee_dedup_service import (
+    DEDUP_JOB_TYPE,
+    devotee_dedup_job,
+    find_duplicate_groups,
+    normalize_name,
+    normalize_phone,
+)
+
+
+@pytest.fixture
+def devotees(db_session, test_user):
+    rows = [
+        ("Ramesh Kumar", "9845012345", None, "Bengaluru"),
+        ("Mr. Ramesh Kumaar", "+91 98450 12346", None, "Bengaluru"),  # fuzzy name, same city
+        ("Ramesh Rao", "9845099999", None, "Bengaluru"),  # same first name only
+        ("Lakshmi Devi", "09845077777", "lakshmi@example.com", "Mysuru"),
+        ("L. Devi", "9845077778", "LAKSHMI@example.com ", "Udupi"),  # same email
+        ("Suresh", "+919845055555", None, None),
+        ("Suresh N", "9845055555", None, None),  # same phone once normalized
+    ]
+    created = []
+    for name, phone, email, city in rows:
+        devotee = Devotee(
+            name=name, phone=phone, email=email, city=city, temple_id=test_user.temple_id
+        )
+        db_session.add(devotee)
+        created.append(devotee)
+    db_session.commit()
+    return created
+
+
+def _run_scan(db_session, test_user, **kwargs):
+    job = create_job(db_session, DEDUP_JOB_TYPE, temple_id=test_user.temple_id)
+    devotee_dedup_job(job.id, test_user.temple_id, **kwargs)
+    db_session.expire_all()
+    return job
+
+
+def _open_groups(db_session):
+    return {
+        tuple(group.devotee_ids)
+        for group in db_session.query(DevoteeDuplicateGroup).filter(
+            DevoteeDuplicateGroup.status == DuplicateGroupStatus.OPEN
+        )
+    }
+
+
+@pytest.mark.unit
+class TestDuplicateMatching:
+    """Tests for normalization, blocking and scoring"""
+
+    def test_normalization(self):
+        assert normalize_phone("+91 98450-12345") == "9845012345"
+        assert normalize_phone("0000000000") is None
+        assert normalize_name("Smt. Lakshmi  DEVI") == "lakshmi devi"
+
+    def test_groups_by_phone_email_and_name(self, db_session, test_user, devotees):
+        ids = [d.id for d in devotees]
+        groups = find_duplicate_groups(db_session, test_user.temple_id, 0.8)
+
+        found = {tuple(g["devotee_ids"]): g for g in groups}
+        assert set(found) == {(ids[0], ids[1]), (ids[3], ids[4]), (ids[5], ids[6])}
+        assert found[(ids[5], ids[6])]["reasons"] == ["phone"]
+        assert found[(ids[3], ids[4])]["reasons"] == ["email"]
+        assert found[(ids[0], ids[1])]["reasons"] == ["name_city"]
+
+    def test_threshold_is_applied(self, db_session, test_user, devotees):
+        groups = find_duplicate_groups(db_session, test_user.temple_id, 0.99)
+        assert [g["reasons"] for g in groups] == [["phone"]]
+
+    def test_duplicates_endpoint(self, authenticated_client, devotees):
+        response = authenticated_client.get(
+            "/api/v1/devotees/duplicates", params={"threshold": 0.9}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 3
+        assert all(group["count"] == 2 and len(group["group"]) == 2 for group in data)
+
+
+@pytest.mark.integration
+class TestDuplicateScanJob:
+    """Tests for the stored, incremental duplicate scan"""
+
+    def test_full_then_incremental_scan(self, db_session, test_user, devotees, job_sessions):
+        ids = [d.id for d in devotees]
+        _run_scan(db_session, test_user)
+        assert len(_open_groups(db_session)) == 3
+
+        # A new devotee joins an existing group; unchanged groups are kept
+        kept = (
+            db_session.query(DevoteeDuplicateGroup)
+            .filter(DevoteeDuplicateGroup.devotee_ids == [ids[3], ids[4]])
+            .first()
+        )
+        newcomer = Devotee(
+            name="Suresh Naidu",
+            phone="98450 55555 ",
+            temple_id=test_user.temple_id,
+        )
+        db_session.add(newcomer)
+        db_session.commit()
+
+        job = _run_scan(db_session, test_user)
+        assert job.result["incremental"] is True
+        assert job.result["devotees_rekeyed"] == 1
+        assert _open_groups(db_session) == {
+            (ids[0], ids[1]),
+            (ids[3], ids[4]),
+            (ids[5], ids[6], newcomer.id),
+        }
+        assert db_session.get(DevoteeDuplicateGroup, kept.id) is not None
+
+    def test_dismissed_group_is_not_raised_again(
+        self, db_session, test_user, devotees, job_sessions
+    ):
+        _run_scan(db_session, test_user)
+        group = db_session.query(DevoteeDuplicateGroup).first()
+        group.status = DuplicateGroupStatus.DISMISSED
+        db_session.commit()
+
+        _run_scan(db_session, test_user, full=True)
+        assert len(_open_groups(db_session)) == 2
+        assert tuple(group.devotee_ids) not in _open_groups(db_session)
+
+    def test_scan_endpoint_and_merge(
+        self, authenticated_client, db_session, devotees, job_sessions
+    ):
+        response = authenticated_client.post("/api/v1/devotees/duplicates/scan")
+        assert response.status_code == 200
+        job_id = response.json()["job_id"]
+        status_response = authenticated_client.get(f"/api/v1/devotees/duplicates/scan/{job_id}")
+        assert status_response.json()["status"] == "completed"
+
+        groups = authenticated_client.get("/api/v1/devotees/duplicates/groups").json()
+        assert len(groups) == 3
+        primary, duplicate = groups[0]["group"]
+        merge = authenticated_client.post(
+            "/api/v1/devotees/merge",
+            params={"primary_id": primary["id"], "duplicate_ids": [duplicate["id"]]},
+        )
+        assert merge.status_code == 200
+        assert len(authenticated_client.get("/api/v1/devotees/duplicates/groups").json()) == 2
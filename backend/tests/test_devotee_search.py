@@ -0,0 +1,153 @@
+"""
+Devotee Search Tests
+Tests the devotee search index, its matching rules and the tag table
+"""
+
+import json
+import pytest
+
+from app.models.devotee import Devotee
+from app.models.devotee_search import DevoteeSearchIndex, DevoteeTag
+from app.services import devotee_search_service
+from app.services.devotee_search_service import (
+    VIP_TAGS,
+    apply_search,
+    apply_tag_filter,
+    ensure_devotee_search_index,
+    ensure_search_backend,
+    phonetic_key,
+    search_keys,
+    transliterate,
+)
+
+
+@pytest.fixture
+def devotees(db_session, test_user):
+    """Devotees with Latin and Kannada names, tags and phone numbers"""
+    rows = [
+        Devotee(
+            temple_id=test_user.temple_id,
+            name="Srinivas Rao",
+            phone="9845011223",
+            email="srinivas.rao@example.com",
+            tags=json.dumps(["VIP"]),
+        ),
+        Devotee(
+            temple_id=test_user.temple_id,
+            name="ಲಕ್ಷ್ಮೀ ದೇವಿ",
+            phone="9845044556",
+            tags=json.dumps(["Volunteer"]),
+        ),
+        Devotee(temple_id=test_user.temple_id, name="Ramesh Kumar", phone="9845077889"),
+    ]
+    db_session.add_all(rows)
+    db_session.commit()
+    return rows
+
+
+@pytest.fixture
+def fts_backend(db_session, devotees):
+    """
+    The SQLite FTS5 table the startup check creates, made after the devotees
+    so it is created inside the test transaction and rolled back with it
+    """
+    if ensure_search_backend(db_session) != "fts5":
+        pytest.skip("SQLite built without FTS5")
+    yield
+    db_session.rollback()
+    db_session.connection().info.pop(devotee_search_service._FTS_READY_KEY, None)
+
+
+def _search(db_session, term):
+    names = apply_search(db_session.query(Devotee.name), db_session, term).order_by(Devotee.id)
+    return [name for (name,) in names]
+
+
+@pytest.mark.unit
+class TestSearchKeys:
+    """Tests for the normalization helpers"""
+
+    def test_kannada_transliteration(self):
+        assert transliterate("ಶ್ರೀನಿವಾಸ") == "shriinivaasa"
+        assert transliterate("Ramesh") == "Ramesh"
+
+    def test_phonetic_key_folds_spellings(self):
+        codes = {
+            phonetic_key(word) for word in ("srinivas", "shreenivaas", transliterate("ಶ್ರೀನಿವಾಸ"))
+        }
+        assert codes == {"srnvs"}
+
+    def test_search_keys(self):
+        keys = search_keys("Mr. Srinivas Rao", None, "s.rao@example.com", "+91 98450 11223")
+        assert keys["name_text"].split()[:2] == ["srinivas", "rao"]
+        assert "srnvs" in keys["phonetic_text"].split()
+        assert keys["phone_key"] == "9845011223"
+        assert keys["phone_reversed"] == "3221105489"
+
+
+@pytest.mark.unit
+class TestSearchIndex:
+    """Tests for index maintenance and the LIKE fallback"""
+
+    def test_flush_hook_indexes_devotees_and_tags(self, db_session, devotees):
+        assert db_session.query(DevoteeSearchIndex).count() == 3
+        assert [
+            t.tag for t in db_session.query(DevoteeTag).filter_by(devotee_id=devotees[0].id)
+        ] == ["VIP"]
+
+        devotees[0].tags = json.dumps(["Patron", "Trustee"])
+        devotees[2].name = "Ramesh Bhat"
+        db_session.commit()
+        tags = {t.tag for t in db_session.query(DevoteeTag).filter_by(devotee_id=devotees[0].id)}
+        assert tags == {"Patron", "Trustee"}
+        assert _search(db_session, "bhat") == ["Ramesh Bhat"]
+
+        db_session.delete(devotees[2])
+        db_session.commit()
+        assert db_session.query(DevoteeSearchIndex).count() == 2
+
+    def test_matching(self, db_session, devotees):
+        assert _search(db_session, "sri") == ["Srinivas Rao"]
+        assert _search(db_session, "Shreenivaas") == ["Srinivas Rao"]
+        assert _search(db_session, "ಶ್ರೀನಿವಾಸ") == ["Srinivas Rao"]
+        assert _search(db_session, "lakshmi") == ["ಲಕ್ಷ್ಮೀ ದೇವಿ"]
+        assert _search(db_session, "98450445") == ["ಲಕ್ಷ್ಮೀ ದೇವಿ"]
+        assert _search(db_session, "7889") == ["Ramesh Kumar"]
+        assert _search(db_session, "example") == ["Srinivas Rao"]
+        assert _search(db_session, "kumar ram") == ["Ramesh Kumar"]
+        assert _search(db_session, "ram rao") == []
+
+    def test_tag_filter(self, db_session, devotees):
+        vip = apply_tag_filter(db_session.query(Devotee), VIP_TAGS).all()
+        assert [d.id for d in vip] == [devotees[0].id]
+
+    def test_list_endpoint(self, authenticated_client, devotees):
+        response = authenticated_client.get("/api/v1/devotees/", params={"search": "srinivas"})
+        assert response.status_code == 200
+        assert [d["name"] for d in response.json()] == ["Srinivas Rao"]
+
+        response = authenticated_client.get("/api/v1/devotees/", params={"is_vip": True})
+        assert [d["name"] for d in response.json()] == ["Srinivas Rao"]
+
+
+@pytest.mark.unit
+class TestFtsBackend:
+    """Tests for searches through the SQLite FTS5 table"""
+
+    def test_fts_search(self, db_session, test_user, fts_backend):
+        ensure_devotee_search_index(db_session)
+        db_session.add(Devotee(temple_id=test_user.temple_id, name="Shridhar", phone="9845099001"))
+        db_session.commit()
+
+        assert _search(db_session, "sri") == ["Srinivas Rao"]
+        assert _search(db_session, "shri") == ["Shridhar"]
+        assert _search(db_session, "shrinivas") == ["Srinivas Rao"]
+        assert _search(db_session, "ದೇವಿ") == ["ಲಕ್ಷ್ಮೀ ದೇವಿ"]
+        assert _search(db_session, "kumar ram") == ["Ramesh Kumar"]
+
+    def test_startup_backfills_fts(self, db_session, fts_backend):
+        # Devotees indexed before the FTS5 table existed
+        assert _search(db_session, "sri") == []
+        assert ensure_devotee_search_index(db_session)
+        assert _search(db_session, "sri") == ["Srinivas Rao"]
+        assert not ensure_devotee_search_index(db_session)
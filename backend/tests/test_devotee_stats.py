@@ -0,0 +1,115 @@
+"""
+Devotee Stats Tests
+Tests the grouped devotee list figures and the devotee_stats summary table
+"""
+
+import pytest
+from datetime import date
+from sqlalchemy import event
+
+from app.models.devotee import Devotee
+from app.models.devotee_stats import DevoteeStats
+from app.models.donation import Donation, DonationCategory
+from app.services import devotee_stats_service
+from app.services.devotee_stats_service import devotee_list_stats, rebuild_devotee_stats
+
+
+@pytest.fixture
+def family(db_session, test_user):
+    """A family head with two members; the head has two donations"""
+    temple_id = test_user.temple_id
+    head = Devotee(temple_id=temple_id, name="Ramesh", phone="9845000070")
+    db_session.add(head)
+    db_session.flush()
+    members = [
+        Devotee(temple_id=temple_id, name=name, phone=phone, family_head_id=head.id)
+        for name, phone in (("Sita", "9845000071"), ("Ravi", "9845000072"))
+    ]
+    category = DonationCategory(temple_id=temple_id, name="Annadanam")
+    db_session.add_all(members + [category])
+    db_session.flush()
+    db_session.add_all(
+        [
+            _donation(head, category, "DS-1", 500.0, date(2025, 1, 5)),
+            _donation(head, category, "DS-2", 250.0, date(2025, 3, 1)),
+        ]
+    )
+    db_session.commit()
+    return head, members, category
+
+
+def _donation(devotee, category, receipt, amount, day):
+    return Donation(
+        temple_id=devotee.temple_id,
+        devotee_id=devotee.id,
+        category_id=category.id,
+        receipt_number=receipt,
+        amount=amount,
+        payment_mode="Cash",
+        donation_date=day,
+    )
+
+
+@pytest.mark.unit
+class TestDevoteeListStats:
+    """Tests for devotee_list_stats"""
+
+    def test_page_figures_in_a_few_queries(self, db_session, family):
+        head, members, _ = family
+        db_session.refresh(head)  # Reload the rows the fixture's commit expired
+        for member in members:
+            db_session.refresh(member)
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            stats = devotee_list_stats(db_session, [head] + members)
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        assert len(statements) <= 4
+        assert stats[head.id]["family_members_count"] == 2
+        assert stats[head.id]["total_donations"] == 750.0
+        assert stats[head.id]["donation_count"] == 2
+        assert stats[head.id]["last_visit_date"] == date(2025, 3, 1)
+        assert stats[members[0].id]["family_head_name"] == "Ramesh"
+        assert stats[members[0].id]["donation_count"] == 0
+
+    def test_list_endpoint(self, authenticated_client, family):
+        response = authenticated_client.get("/api/v1/devotees/", params={"search": "Ramesh"})
+        assert response.status_code == 200
+        data = response.json()[0]
+        assert data["family_members_count"] == 2
+        assert data["total_donations"] == 750.0
+
+
+@pytest.mark.unit
+class TestDevoteeStatsTable:
+    """Tests for the devotee_stats summary table"""
+
+    def test_flush_hook_keeps_stats_current(self, db_session, family, monkeypatch):
+        monkeypatch.setattr(devotee_stats_service.settings, "DEVOTEE_STATS_ENABLED", True)
+        head, members, category = family
+        assert rebuild_devotee_stats(db_session) == 1
+
+        db_session.add(_donation(head, category, "DS-3", 100.0, date(2025, 4, 1)))
+        db_session.commit()
+        row = db_session.get(DevoteeStats, head.id)
+        db_session.refresh(row)
+        assert (row.donation_total, row.donation_count) == (850.0, 3)
+        assert row.last_visit_date == date(2025, 4, 1)
+
+        # Moving a donation to another devotee updates both
+        donation = db_session.query(Donation).filter(Donation.receipt_number == "DS-3").one()
+        donation.devotee_id = members[0].id
+        db_session.commit()
+        db_session.expire_all()
+        assert db_session.get(DevoteeStats, head.id).donation_count == 2
+        assert db_session.get(DevoteeStats, members[0].id).donation_total == 100.0
+
+        stats = devotee_list_stats(db_session, [head, members[0]])
+        assert stats[members[0].id]["donation_count"] == 1
@@ -0,0 +1,216 @@
+"""
+Donation Import Tests
+Tests the streaming, chunked bulk donation import and its background job
+"""
+
+import csv
+import pytest
+from datetime import date
+from openpyxl import Workbook
+from sqlalchemy.orm import Session
+
+from app.models.accounting import (
+    Account,
+    AccountSubType,
+    AccountType,
+    AccountBalanceSnapshot,
+    JournalEntry,
+    JournalLine,
+)
+from app.models.devotee import Devotee
+from app.models.donation import Donation, DonationCategory
+from app.services import donation_import_service
+from app.services.donation_import_service import (
+    import_donations,
+    iter_rows,
+    parse_row,
+)
+
+HEADER = ["devotee_name", "devotee_phone", "amount", "category", "payment_mode", "city", "notes"]
+
+
+@pytest.fixture
+def import_accounts(db_session, test_user, chart_of_accounts):
+    """Cash in hand and general donation accounts the import posts to"""
+    accounts = [
+        Account(
+            temple_id=test_user.temple_id,
+            account_code="11001",
+            account_name="Cash in Hand - Counter",
+            account_type=AccountType.ASSET,
+            account_subtype=AccountSubType.CASH_BANK,
+        ),
+        Account(
+            temple_id=test_user.temple_id,
+            account_code="44001",
+            account_name="General Donations",
+            account_type=AccountType.INCOME,
+            account_subtype=AccountSubType.DONATION_INCOME,
+        ),
+    ]
+    db_session.add_all(accounts)
+    db_session.commit()
+    return accounts
+
+
+def _write_csv(path, rows, header=HEADER):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+@pytest.mark.unit
+class TestReading:
+    """Tests for row streaming and validation"""
+
+    def test_excel_rows_are_read_only_streamed(self, tmp_path):
+        wb = Workbook()
+        ws = wb.active
+        ws.append(HEADER)
+        ws.append(["Lakshmi", 9845000001, 501.0, "Annadana", "Cash", None, None])
+        ws.append([None] * len(HEADER))
+        ws.append(["Gopal", "+91 98450-00002", "1,001", None, "UPI", "Mysuru", "Year end"])
+        path = str(tmp_path / "donations.xlsx")
+        wb.save(path)
+
+        rows = list(iter_rows(path))
+        assert [row_num for row_num, _ in rows] == [2, 4]
+        assert rows[0][1]["devotee_phone"] == "9845000001"
+        assert parse_row(rows[1][1])["devotee_phone"] == "9845000002"
+        assert parse_row(rows[1][1])["amount"] == 1001
+
+    def test_invalid_rows(self):
+        with pytest.raises(ValueError, match="Missing required fields"):
+            parse_row({"devotee_name": "No Phone", "amount": "10"})
+        with pytest.raises(ValueError, match="Invalid amount"):
+            parse_row({"devotee_name": "A", "devotee_phone": "9845000003", "amount": "ten"})
+        with pytest.raises(ValueError, match="donation_date"):
+            parse_row(
+                {
+                    "devotee_name": "A",
+                    "devotee_phone": "1",
+                    "amount": "1",
+                    "donation_date": "31/03/2025",
+                }
+            )
+
+
+@pytest.mark.integration
+class TestDonationImport:
+    """Tests for the chunked import"""
+
+    def test_import_posts_donations_and_journal_entries(
+        self, db_session, test_user, import_accounts, tmp_path
+    ):
+        existing = Devotee(name="Known Devotee", phone="9845000010", temple_id=test_user.temple_id)
+        db_session.add(existing)
+        db_session.commit()
+
+        rows = [
+            [f"Devotee {i}", f"98450{i:05d}", 100 + i, "Annadana", "Cash", "", ""] for i in range(7)
+        ]
+        rows.append(["Known Devotee", "9845000010", 250, "Annadana", "Cash", "", ""])
+        path = _write_csv(tmp_path / "donations.csv", rows)
+
+        progress = []
+        result = import_donations(
+            db_session,
+            path,
+            test_user.temple_id,
+            test_user.id,
+            chunk_size=3,
+            on_progress=lambda processed, imported: progress.append((processed, imported)),
+        )
+
+        assert result["success_count"] == 8
+        assert result["errors"] == []
+        assert progress == [(3, 3), (6, 6), (8, 8)]
+
+        donations = db_session.query(Donation).order_by(Donation.id).all()
+        assert len({d.receipt_number for d in donations}) == 8
+        assert donations[-1].devotee_id == existing.id
+        assert db_session.query(DonationCategory).filter_by(name="Annadana").count() == 1
+
+        entries = db_session.query(JournalEntry).all()
+        assert sorted(e.reference_id for e in entries) == [d.id for d in donations]
+        assert db_session.query(JournalLine).count() == 16
+        # Flush hooks still maintain the balance snapshots
+        cash = import_accounts[0]
+        snapshot = db_session.query(AccountBalanceSnapshot).filter_by(account_id=cash.id).one()
+        assert snapshot.debit_total == sum(d.amount for d in donations)
+
+    def test_row_errors_and_duplicates(self, db_session, test_user, import_accounts, tmp_path):
+        rows = [
+            ["Asha", "9845000020", 100, "", "Cash", "", ""],
+            ["", "9845000021", 100, "", "Cash", "", ""],
+            ["Asha", "9845000020", 100, "", "Cash", "", ""],  # same devotee, amount and day
+            ["Ravi", "9845000022", -100, "", "Cash", "", ""],
+            ["Ravi", "9845000022", 150, "", "Cash", "", ""],
+        ]
+        path = _write_csv(tmp_path / "donations.csv", rows)
+
+        result = import_donations(
+            db_session, path, test_user.temple_id, test_user.id, chunk_size=10
+        )
+
+        assert result["success_count"] == 2
+        assert [row_num for row_num, _ in result["errors"]] == [3, 4, 5]
+        assert "Possible duplicate" in result["errors"][1][1]
+        assert db_session.query(Donation).count() == 2
+
+    def test_failing_chunk_is_retried_row_by_row(
+        self, db_session, test_user, import_accounts, tmp_path, monkeypatch
+    ):
+        rows = [[f"Devotee {i}", f"98450{i:05d}", 100, "", "Cash", "", ""] for i in range(4)]
+        path = _write_csv(tmp_path / "donations.csv", rows)
+
+        real_import_chunk = donation_import_service.import_chunk
+
+        def flaky_import_chunk(db, chunk, *args):
+            if any(row_num == 3 for row_num, _ in chunk):
+                raise RuntimeError("database error")
+            return real_import_chunk(db, chunk, *args)
+
+        monkeypatch.setattr(donation_import_service, "import_chunk", flaky_import_chunk)
+        # Rollbacks of the import must not undo the test's own fixtures
+        with Session(bind=db_session.get_bind(), join_transaction_mode="create_savepoint") as db:
+            result = import_donations(db, path, test_user.temple_id, test_user.id, chunk_size=4)
+
+        assert result["success_count"] == 3
+        assert result["errors"] == [(3, "database error")]
+        assert db_session.query(Donation).count() == 3
+
+    def test_import_endpoint_runs_job(
+        self, authenticated_client, db_session, import_accounts, job_sessions, tmp_path, monkeypatch
+    ):
+        monkeypatch.setattr(
+            donation_import_service.settings, "UPLOAD_DIR", str(tmp_path / "uploads")
+        )
+        rows = [
+            ["Meera", "9845000030", 100, "Pooja", "Cash", "", ""],
+            ["", "9845000031", 100, "Pooja", "Cash", "", ""],
+        ]
+        path = _write_csv(tmp_path / "upload.csv", rows)
+        with open(path, "rb") as f:
+            response = authenticated_client.post(
+                "/api/v1/donations/bulk-import", files={"file": ("upload.csv", f, "text/csv")}
+            )
+        assert response.status_code == 200
+        job_id = response.json()["job_id"]
+
+        status_response = authenticated_client.get(f"/api/v1/donations/bulk-import/{job_id}")
+        job = status_response.json()
+        assert job["status"] == "completed"
+        assert job["result"]["success_count"] == 1
+        assert job["result"]["errors"] == [
+            "Row 3: Missing required fields (devotee_name, devotee_phone, amount)"
+        ]
+
+        report = authenticated_client.get(f"/api/v1/donations/bulk-import/{job_id}/errors")
+        assert report.status_code == 200
+        assert report.text.splitlines()[1].startswith("3,")
+        assert (
+            db_session.query(Donation).filter(Donation.donation_date == date.today()).count() == 1
+        )
@@ -0,0 +1,143 @@
+"""
+Donation Listing Tests
+Tests the temple-scoped, keyset-paginated donation query layer
+"""
+
+import pytest
+from datetime import date
+from sqlalchemy import event
+
+from app.models.devotee import Devotee
+from app.models.donation import Donation, DonationCategory
+from app.models.temple import Temple
+from app.services.donation_query_service import (
+    decode_cursor,
+    donation_query,
+    iter_donations,
+    keyset_page,
+)
+
+
+@pytest.fixture
+def donations(db_session, test_user):
+    """Seven donations over three days, plus one of another temple"""
+    other = Temple(name="Other Temple", slug="other-temple")
+    db_session.add(other)
+    db_session.flush()
+    devotee = Devotee(temple_id=test_user.temple_id, name="Gowri", phone="9845000090")
+    category = DonationCategory(temple_id=test_user.temple_id, name="General")
+    db_session.add_all([devotee, category])
+    db_session.flush()
+
+    days = [date(2025, 1, 1)] * 2 + [date(2025, 1, 2)] * 3 + [date(2025, 1, 3)] * 2
+    rows = [
+        Donation(
+            temple_id=test_user.temple_id,
+            devotee_id=devotee.id,
+            category_id=category.id,
+            receipt_number=f"DL-{n}",
+            amount=100.0 * (n + 1),
+            payment_mode="Cash",
+            donation_date=day,
+        )
+        for n, day in enumerate(days)
+    ]
+    rows.append(
+        Donation(
+            temple_id=other.id,
+            devotee_id=devotee.id,
+            category_id=category.id,
+            receipt_number="DL-OTHER",
+            amount=1.0,
+            payment_mode="Cash",
+            donation_date=date(2025, 1, 2),
+        )
+    )
+    db_session.add_all(rows)
+    db_session.commit()
+    return rows[:-1]
+
+
+def _expected_order(donations):
+    return [
+        d.receipt_number
+        for d in sorted(donations, key=lambda d: (d.donation_date, d.id), reverse=True)
+    ]
+
+
+@pytest.mark.unit
+class TestDonationQuery:
+    """Tests for donation_query, keyset_page and iter_donations"""
+
+    def test_keyset_pages_cover_the_range_once(self, db_session, test_user, donations):
+        query = donation_query(db_session, test_user.temple_id)
+        seen, cursor = [], None
+        while True:
+            page, cursor = keyset_page(query, 3, cursor)
+            seen.extend(d.receipt_number for d in page)
+            if cursor is None:
+                break
+            assert decode_cursor(cursor)[0] <= date(2025, 1, 3)
+        assert seen == _expected_order(donations)
+
+    def test_filters(self, db_session, test_user, donations):
+        query = donation_query(db_session, test_user.temple_id, on_date="2025-01-02")
+        assert {d.receipt_number for d in query} == {"DL-2", "DL-3", "DL-4"}
+
+        query = donation_query(db_session, test_user.temple_id, date_from="2025-01-03")
+        assert {d.receipt_number for d in query} == {"DL-5", "DL-6"}
+
+        with pytest.raises(ValueError):
+            donation_query(db_session, test_user.temple_id, date_to="02/01/2025")
+
+    def test_iteration_eager_loads_relations(self, db_session, test_user, donations):
+        temple_id = test_user.temple_id
+        db_session.expire_all()
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            rows = [
+                (d.receipt_number, d.devotee.name, d.category.name)
+                for d in iter_donations(donation_query(db_session, temple_id), batch_size=3)
+            ]
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        assert [receipt for receipt, _, _ in rows] == _expected_order(donations)
+        assert {(devotee, category) for _, devotee, category in rows} == {("Gowri", "General")}
+        assert len(statements) == 3  # One per batch
+
+
+@pytest.mark.unit
+class TestDonationListEndpoint:
+    """Tests for GET /api/v1/donations/ paging"""
+
+    def test_cursor_header(self, authenticated_client, donations):
+        response = authenticated_client.get("/api/v1/donations/", params={"limit": 4})
+        assert response.status_code == 200
+        first = [d["receipt_number"] for d in response.json()]
+        cursor = response.headers["X-Next-Cursor"]
+
+        response = authenticated_client.get(
+            "/api/v1/donations/", params={"limit": 4, "cursor": cursor}
+        )
+        second = [d["receipt_number"] for d in response.json()]
+        assert "X-Next-Cursor" not in response.headers
+        assert first + second == _expected_order(donations)
+
+    def test_invalid_cursor(self, authenticated_client, donations):
+        response = authenticated_client.get("/api/v1/donations/", params={"cursor": "yesterday"})
+        assert response.status_code == 400
+
+    def test_excel_export(self, authenticated_client, donations):
+        response = authenticated_client.get(
+            "/api/v1/donations/export/excel",
+            params={"date_from": "2025-01-01", "date_to": "2025-01-03"},
+        )
+        assert response.status_code == 200
+        assert response.content[:2] == b"PK"
@@ -0,0 +1,163 @@
+"""
+Export Service Tests
+Tests the shared Excel / PDF / CSV export engine and background exports
+"""
+
+import io
+import pytest
+from datetime import date
+from openpyxl import load_workbook
+
+from app.models.devotee import Devotee
+from app.models.donation import Donation, DonationCategory
+from app.services import export_service
+from app.services.export_service import (
+    ExportColumn,
+    ExportReport,
+    ExportSection,
+    write_export,
+)
+
+
+def _report(count=5):
+    """Synthetic report whose rows are generated (and totalled) while written"""
+    summary = {"total": 0.0}
+
+    def rows():
+        for n in range(count):
+            summary["total"] += 10.0 * n
+            yield [f"R-{n}", date(2025, 1, 1), "Narration " * 20, 10.0 * n]
+
+    return ExportReport(
+        title="Test Report",
+        filename="test_report",
+        header_lines=["Period: 2025-01-01 to 2025-01-31"],
+        sections=[
+            ExportSection(
+                [
+                    ExportColumn("Receipt", 12),
+                    ExportColumn("Date", 12, "date"),
+                    ExportColumn("Narration", 40),
+                    ExportColumn("Amount", 12, "amount"),
+                ],
+                rows(),
+                title="RECEIPTS",
+                totals=lambda: ["", "", "Total", summary["total"]],
+            )
+        ],
+        footer_lines=["Closing Balance: 0.00"],
+    )
+
+
+@pytest.fixture
+def export_dir(monkeypatch, tmp_path):
+    """Write export files under the test's temporary directory"""
+    monkeypatch.setattr(export_service.settings, "UPLOAD_DIR", str(tmp_path / "uploads"))
+
+
+@pytest.fixture
+def donations(db_session, test_user):
+    devotee = Devotee(temple_id=test_user.temple_id, name="Gowri", phone="9845000090")
+    category = DonationCategory(temple_id=test_user.temple_id, name="General")
+    db_session.add_all([devotee, category])
+    db_session.flush()
+    rows = [
+        Donation(
+            temple_id=test_user.temple_id,
+            devotee_id=devotee.id,
+            category_id=category.id,
+            receipt_number=f"EX-{n}",
+            amount=100.0,
+            payment_mode="Cash",
+            donation_date=date(2025, 1, 1 + n),
+        )
+        for n in range(3)
+    ]
+    db_session.add_all(rows)
+    db_session.commit()
+    return rows
+
+
+@pytest.mark.unit
+class TestExportEngine:
+    """Tests for write_export in each format"""
+
+    def test_excel(self):
+        out = io.BytesIO()
+        assert write_export(_report(), "excel", out) == 5
+
+        ws = load_workbook(io.BytesIO(out.getvalue())).active
+        rows = [row for row in ws.values if any(v is not None for v in row)]
+        assert rows[0][0] == "Test Report"
+        assert list(rows[3]) == ["Receipt", "Date", "Narration", "Amount"]
+        assert rows[4][0] == "R-0"
+        assert list(rows[-2])[2:] == ["Total", 100]
+        assert rows[-1][0] == "Closing Balance: 0.00"
+
+    def test_pdf_pages_and_progress(self, monkeypatch):
+        monkeypatch.setattr(export_service, "PROGRESS_EVERY", 50)
+        progress = []
+        out = io.BytesIO()
+        assert write_export(_report(200), "pdf", out, on_progress=progress.append) == 200
+        assert out.getvalue()[:4] == b"%PDF"
+        assert out.getvalue().count(b"/Type /Page\n") > 1
+        assert progress == [50, 100, 150, 200]
+
+    def test_csv(self):
+        out = io.BytesIO()
+        write_export(_report(2), "csv", out)
+        lines = out.getvalue().decode("utf-8-sig").splitlines()
+        assert lines[0] == "Test Report"
+        assert lines[4].startswith("Receipt,Date,Narration,Amount")
+        assert lines[5].startswith("R-0,2025-01-01,")
+        assert lines[7] == ",,Total,10.00"
+
+
+@pytest.mark.unit
+class TestExportEndpoints:
+    """Tests for synchronous and background exports"""
+
+    def test_donation_export_formats(self, authenticated_client, donations):
+        params = {"date_from": "2025-01-01", "date_to": "2025-01-03"}
+        response = authenticated_client.get("/api/v1/donations/export/pdf", params=params)
+        assert response.status_code == 200
+        assert response.content[:4] == b"%PDF"
+        assert (
+            "filename=donations_2025-01-01_2025-01-03.pdf"
+            in response.headers["content-disposition"]
+        )
+
+        response = authenticated_client.get(
+            "/api/v1/donations/export/excel", params={"date_from": "01/01/2025"}
+        )
+        assert response.status_code == 400
+
+    def test_background_export(self, authenticated_client, donations, job_sessions, export_dir):
+        response = authenticated_client.post(
+            "/api/v1/exports/donations",
+            json={"format": "csv", "params": {"date_from": "2025-01-01", "date_to": "2025-01-03"}},
+        )
+        assert response.status_code == 200
+        job_id = response.json()["job_id"]
+
+        job = authenticated_client.get(f"/api/v1/exports/{job_id}").json()
+        assert job["status"] == "completed"
+        assert job["result"]["rows"] == 3
+        assert job["result"]["download_url"] == f"/api/v1/exports/{job_id}/download"
+
+        download = authenticated_client.get(job["result"]["download_url"])
+        assert download.status_code == 200
+        text = download.content.decode("utf-8-sig")
+        assert "EX-2" in text and "3 donations" in text
+
+    def test_background_export_validation(self, authenticated_client):
+        response = authenticated_client.post("/api/v1/exports/no_such_report", json={})
+        assert response.status_code == 404
+
+        response = authenticated_client.post("/api/v1/exports/cash_book", json={"format": "docx"})
+        assert response.status_code == 400
+
+        response = authenticated_client.post(
+            "/api/v1/exports/cash_book", json={"params": {"from": "2025-01-01"}}
+        )
+        assert response.status_code == 400
@@ -0,0 +1,199 @@
+"""
+Hundi Report Tests
+Tests the grouped hundi report queries and the monthly denomination rollup
+"""
+
+import pytest
+from datetime import date
+from sqlalchemy import event
+
+from app.api.hundi import get_hundi_report
+from app.models.hundi import HundiDenominationCount, HundiOpening, HundiStatus
+from app.models.hundi_rollup import HundiMonthlyDenominationTotal
+from app.services import hundi_report_service
+from app.services.hundi_report_service import (
+    hundi_report,
+    rebuild_hundi_rollup,
+    split_range,
+)
+
+
+def _counts(*denominations):
+    return [
+        HundiDenominationCount(
+            denomination_value=value,
+            denomination_type=kind,
+            quantity=quantity,
+            total_amount=value * quantity,
+        )
+        for value, kind, quantity in denominations
+    ]
+
+
+@pytest.fixture
+def openings(db_session, test_user):
+    """Two hundis opened in April, May and June 2025"""
+    rows = [
+        HundiOpening(
+            temple_id=test_user.temple_id,
+            hundi_code=code,
+            hundi_name=f"Hundi {code}",
+            scheduled_date=day,
+            status=HundiStatus.DEPOSITED if deposited else HundiStatus.VERIFIED,
+            total_amount=sum(c.total_amount for c in counts),
+            bank_deposit_amount=deposited,
+            denomination_counts=counts,
+        )
+        for code, day, deposited, counts in [
+            ("H-1", date(2025, 4, 20), 1000.0, _counts((500, "note", 2))),
+            ("H-1", date(2025, 5, 4), None, _counts((500, "note", 1), (10, "coin", 30))),
+            ("H-2", date(2025, 5, 4), 200.0, _counts((100, "note", 2))),
+            ("H-2", date(2025, 6, 8), None, _counts((100, "note", 3), (10, "coin", 5))),
+        ]
+    ]
+    db_session.add_all(rows)
+    db_session.commit()
+    return rows
+
+
+def _summary(report):
+    return {
+        (d["denomination_value"], d["denomination_type"]): (d["total_quantity"], d["total_amount"])
+        for d in report["denomination_wise_summary"]
+    }
+
+
+@pytest.mark.unit
+class TestHundiReport:
+    """Tests for hundi_report"""
+
+    def test_grouped_figures(self, db_session, test_user, openings):
+        temple_id = test_user.temple_id
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            report = hundi_report(db_session, temple_id, date(2025, 4, 1), date(2025, 6, 30))
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+
+        assert len(statements) == 3
+        assert report["total_openings"] == 4
+        assert report["total_amount"] == 2350.0
+        assert report["total_deposited"] == 1200.0
+        assert report["total_pending"] == 1150.0
+        assert report["hundi_wise_breakdown"] == [
+            {"hundi_code": "H-1", "count": 2, "amount": 1800.0, "deposited": 1000.0},
+            {"hundi_code": "H-2", "count": 2, "amount": 550.0, "deposited": 200.0},
+        ]
+        assert [(d["date"], d["count"]) for d in report["daily_breakdown"]] == [
+            ("2025-04-20", 1),
+            ("2025-05-04", 2),
+            ("2025-06-08", 1),
+        ]
+        assert _summary(report) == {
+            (500, "note"): (3, 1500.0),
+            (100, "note"): (5, 500.0),
+            (10, "coin"): (35, 350.0),
+        }
+
+    def test_filters(self, db_session, test_user, openings):
+        report = hundi_report(
+            db_session, test_user.temple_id, date(2025, 5, 1), date(2025, 6, 30), hundi_code="H-2"
+        )
+        assert report["total_openings"] == 2
+        assert _summary(report) == {(100, "note"): (5, 500.0), (10, "coin"): (5, 50.0)}
+
+    def test_endpoint(self, db_session, test_user, openings):
+        response = get_hundi_report(
+            date(2025, 4, 1), date(2025, 4, 30), None, db_session, test_user
+        )
+        assert response.total_openings == 1
+        assert response.denomination_wise_summary[0]["total_quantity"] == 2
+
+
+@pytest.mark.unit
+class TestHundiMonthlyRollup:
+    """Tests for the monthly denomination rollup"""
+
+    @pytest.fixture(autouse=True)
+    def rollup_enabled(self, monkeypatch):
+        monkeypatch.setattr(hundi_report_service.settings, "HUNDI_MONTHLY_ROLLUP_ENABLED", True)
+
+    def test_split_range(self):
+        assert split_range(date(2025, 4, 1), date(2026, 3, 31)) == (
+            (date(2025, 4, 1), date(2026, 4, 1)),
+            [],
+        )
+        assert split_range(date(2025, 4, 15), date(2025, 7, 10)) == (
+            (date(2025, 5, 1), date(2025, 7, 1)),
+            [(date(2025, 4, 15), date(2025, 4, 30)), (date(2025, 7, 1), date(2025, 7, 10))],
+        )
+        assert split_range(date(2025, 4, 15), date(2025, 4, 20)) == (
+            None,
+            [(date(2025, 4, 15), date(2025, 4, 20))],
+        )
+
+    def test_flush_hook_keeps_rollup_current(self, db_session, test_user, openings):
+        rows = db_session.query(HundiMonthlyDenominationTotal).filter_by(month=date(2025, 5, 1))
+        assert {(r.hundi_code, r.denomination_value, r.quantity) for r in rows} == {
+            ("H-1", 500, 1),
+            ("H-1", 10, 30),
+            ("H-2", 100, 2),
+        }
+
+        # Recount as complete-counting does: bulk delete, then add the new counts
+        opening = openings[2]
+        db_session.query(HundiDenominationCount).filter(
+            HundiDenominationCount.hundi_opening_id == opening.id
+        ).delete()
+        db_session.add_all(
+            HundiDenominationCount(hundi_opening_id=opening.id, **values)
+            for values in (
+                dict(
+                    denomination_value=100, denomination_type="note", quantity=1, total_amount=100
+                ),
+                dict(denomination_value=50, denomination_type="note", quantity=4, total_amount=200),
+            )
+        )
+        # Moving an opening to another month moves its counts
+        openings[3].scheduled_date = date(2025, 5, 25)
+        db_session.commit()
+
+        rows = db_session.query(HundiMonthlyDenominationTotal).filter_by(hundi_code="H-2")
+        assert {(r.month, r.denomination_value, r.quantity) for r in rows} == {
+            (date(2025, 5, 1), 100, 4),
+            (date(2025, 5, 1), 50, 4),
+            (date(2025, 5, 1), 10, 5),
+        }
+
+        db_session.delete(openings[0])
+        db_session.commit()
+        assert (
+            not db_session.query(HundiMonthlyDenominationTotal)
+            .filter_by(month=date(2025, 4, 1))
+            .count()
+        )
+
+    def test_report_reads_whole_months_from_rollup(self, db_session, test_user, openings):
+        assert rebuild_hundi_rollup(db_session) == 6
+        ranges = [
+            (date(2025, 4, 1), date(2025, 6, 30)),
+            (date(2025, 4, 21), date(2025, 6, 8)),
+            (date(2025, 5, 4), date(2025, 5, 4)),
+        ]
+        for from_date, to_date in ranges:
+            report = hundi_report(db_session, test_user.temple_id, from_date, to_date)
+            hundi_report_service.settings.HUNDI_MONTHLY_ROLLUP_ENABLED = False
+            expected = hundi_report(db_session, test_user.temple_id, from_date, to_date)
+            hundi_report_service.settings.HUNDI_MONTHLY_ROLLUP_ENABLED = True
+            assert report == expected
+
+        # Whole months are read from the rollup, not the counts
+        db_session.query(HundiMonthlyDenominationTotal).filter_by(month=date(2025, 5, 1)).delete()
+        report = hundi_report(db_session, test_user.temple_id, date(2025, 5, 1), date(2025, 5, 31))
+        assert report["denomination_wise_summary"] == []
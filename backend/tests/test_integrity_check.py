@@ -0,0 +1,117 @@
+"""
+Integrity Check Tests
+Tests checkpointed, incremental verification of the journal entry hash chain
+"""
+
+import pytest
+from datetime import datetime
+from sqlalchemy import text
+
+from app.core import integrity_check
+from app.core.integrity_check import verify_database_integrity
+from app.models.accounting import JournalEntry, JournalEntryStatus
+from app.models.integrity_checkpoint import IntegrityCheckpoint
+
+
+@pytest.fixture
+def hash_column(db_session):
+    """The integrity_hash column the migration script adds"""
+    db_session.execute(text("ALTER TABLE journal_entries ADD COLUMN integrity_hash VARCHAR(64)"))
+    yield
+    db_session.rollback()
+    try:
+        db_session.execute(text("ALTER TABLE journal_entries DROP COLUMN integrity_hash"))
+    except Exception:
+        pass  # Dropped with the test transaction
+
+
+def _add_entries(db_session, user, numbers):
+    db_session.add_all(
+        [
+            JournalEntry(
+                entry_number=f"JE/2025/{number:04d}",
+                entry_date=datetime(2025, 1, 1),
+                narration=f"Entry {number}",
+                temple_id=user.temple_id,
+                total_amount=100.0 * number,
+                status=JournalEntryStatus.POSTED,
+                created_by=user.id,
+                created_at=datetime(2025, 1, 1, 10, 0),
+            )
+            for number in numbers
+        ]
+    )
+    db_session.commit()
+
+
+@pytest.mark.unit
+class TestIncrementalIntegrity:
+    """Tests for verify_database_integrity with checkpoints"""
+
+    def test_without_hash_column(self, db_session):
+        is_valid, message = verify_database_integrity(db_session)
+        assert is_valid
+        assert "not yet added" in message
+
+    def test_startup_only_hashes_new_entries(self, db_session, test_user, hash_column, monkeypatch):
+        _add_entries(db_session, test_user, range(1, 6))
+        is_valid, message = verify_database_integrity(db_session)
+        assert is_valid, message
+        assert "5 transactions checked" in message
+        assert db_session.query(IntegrityCheckpoint).count() == 1
+
+        _add_entries(db_session, test_user, [6, 7])
+        hashed = []
+        real_hash = integrity_check.calculate_integrity_hash
+
+        def counting_hash(entry, previous_hash=integrity_check.INITIAL_HASH):
+            hashed.append(entry.id)
+            return real_hash(entry, previous_hash)
+
+        monkeypatch.setattr(integrity_check, "calculate_integrity_hash", counting_hash)
+        is_valid, message = verify_database_integrity(db_session)
+        assert is_valid, message
+        assert len(hashed) == 2
+        assert "2 new transactions checked, 5 verified earlier" in message
+
+    def test_full_verification_finds_old_tampering(self, db_session, test_user, hash_column):
+        _add_entries(db_session, test_user, range(1, 6))
+        assert verify_database_integrity(db_session)[0]
+
+        first = db_session.query(JournalEntry).order_by(JournalEntry.id).first()
+        db_session.execute(
+            text("UPDATE journal_entries SET narration = 'Edited' WHERE id = :id"), {"id": first.id}
+        )
+        db_session.commit()
+
+        # Before the checkpoint - not rehashed at startup
+        assert verify_database_integrity(db_session)[0]
+        is_valid, message = verify_database_integrity(db_session, full=True)
+        assert not is_valid
+        assert "TAMPERING DETECTED" in message
+
+    def test_forged_checkpoint_is_ignored(self, db_session, test_user, hash_column):
+        _add_entries(db_session, test_user, range(1, 4))
+        assert verify_database_integrity(db_session)[0]
+        checkpoint = db_session.query(IntegrityCheckpoint).one()
+        checkpoint.entries_verified = 1000
+        db_session.commit()
+
+        assert integrity_check.latest_checkpoint(db_session) is None
+        is_valid, message = verify_database_integrity(db_session)
+        assert is_valid
+        assert "3 transactions checked" in message
+
+    def test_checkpointed_entry_changed(self, db_session, test_user, hash_column):
+        _add_entries(db_session, test_user, range(1, 4))
+        assert verify_database_integrity(db_session)[0]
+        db_session.execute(
+            text(
+                "UPDATE journal_entries SET integrity_hash = 'x' WHERE id = (SELECT MAX(id) FROM journal_entries)"
+            )
+        )
+        db_session.commit()
+
+        is_valid, message = verify_database_integrity(db_session)
+        assert not is_valid
+        assert "TAMPERING DETECTED" in message
@@ -0,0 +1,210 @@
+"""
+Journal Posting Tests
+Tests the account code cache and batched journal posting
+"""
+
+import pytest
+from datetime import date, datetime
+from sqlalchemy import insert
+
+from app.models.accounting import (
+    Account,
+    AccountBalanceSnapshot,
+    AccountSubType,
+    AccountType,
+    JournalEntry,
+    JournalEntryStatus,
+    JournalLine,
+    TransactionType,
+)
+from app.services.journal_posting_service import (
+    account_codes,
+    get_account_by_code,
+    post_journal_batch,
+)
+
+
+@pytest.fixture
+def posting_accounts(db_session, test_user, chart_of_accounts):
+    """Cash, bank and donation income accounts by code"""
+    accounts = {
+        code: Account(
+            temple_id=test_user.temple_id,
+            account_code=code,
+            account_name=name,
+            account_type=account_type,
+            account_subtype=subtype,
+        )
+        for code, name, account_type, subtype in [
+            ("11001", "Cash in Hand - Counter", AccountType.ASSET, AccountSubType.CASH_BANK),
+            ("12001", "Bank - UPI", AccountType.ASSET, AccountSubType.CASH_BANK),
+            ("44001", "General Donations", AccountType.INCOME, AccountSubType.DONATION_INCOME),
+        ]
+    }
+    db_session.add_all(accounts.values())
+    db_session.commit()
+    return accounts
+
+
+def _receipt(user, amount, debit_code="11001", payment_mode="CASH", day=date(2025, 4, 2), ref=None):
+    return {
+        "temple_id": user.temple_id,
+        "entry_date": day,
+        "narration": f"Receipt {ref}",
+        "reference_type": TransactionType.DONATION,
+        "reference_id": ref,
+        "payment_mode": payment_mode,
+        "created_by": user.id,
+        "lines": [
+            {"account_code": debit_code, "debit_amount": amount, "description": "Received"},
+            {"account_code": "44001", "credit_amount": amount, "description": "Donation income"},
+        ],
+    }
+
+
+@pytest.mark.unit
+class TestAccountCodeCache:
+    """Tests for the per-temple account code cache"""
+
+    def test_codes_are_cached_until_an_account_is_written(
+        self, db_session, test_user, posting_accounts
+    ):
+        temple_id = test_user.temple_id
+        cash = get_account_by_code(db_session, temple_id, "11001")
+        assert cash is posting_accounts["11001"]
+        assert get_account_by_code(db_session, temple_id, "99999") is None
+
+        # Written without the ORM - the cache does not see it
+        db_session.execute(
+            insert(Account).values(
+                temple_id=temple_id,
+                account_code="99999",
+                account_name="Unseen",
+                account_type=AccountType.EXPENSE,
+            )
+        )
+        assert account_codes.account_id(db_session, temple_id, "99999") is None
+
+        # Any account written through the session drops the temple's codes
+        cash.account_name = "Cash Counter"
+        db_session.commit()
+        assert account_codes.account_id(db_session, temple_id, "99999") is not None
+
+    def test_rolled_back_accounts_are_forgotten(self, db_session, test_user, posting_accounts):
+        temple_id = test_user.temple_id
+        nested = db_session.begin_nested()
+        db_session.add(
+            Account(
+                temple_id=temple_id,
+                account_code="55001",
+                account_name="Temporary",
+                account_type=AccountType.EXPENSE,
+            )
+        )
+        db_session.flush()
+        assert get_account_by_code(db_session, temple_id, "55001") is not None
+        nested.rollback()
+        assert get_account_by_code(db_session, temple_id, "55001") is None
+
+
+@pytest.mark.integration
+class TestPostJournalBatch:
+    """Tests for post_journal_batch"""
+
+    def test_batch_is_posted(self, db_session, test_user, posting_accounts):
+        postings = [_receipt(test_user, 100 + i, ref=i) for i in range(5)]
+
+        entry_ids = post_journal_batch(db_session, postings)
+        db_session.commit()
+
+        entries = db_session.query(JournalEntry).order_by(JournalEntry.id).all()
+        assert [e.id for e in entries] == entry_ids
+        assert [e.entry_number for e in entries] == [f"JE/2025/{n:04d}" for n in range(1, 6)]
+        assert [e.reference_id for e in entries] == list(range(5))
+        assert all(e.status == JournalEntryStatus.POSTED for e in entries)
+        assert entries[0].total_amount == 100
+        assert db_session.query(JournalLine).count() == 10
+
+        cash = posting_accounts["11001"]
+        snapshot = db_session.query(AccountBalanceSnapshot).filter_by(account_id=cash.id).one()
+        assert snapshot.balance_date == date(2025, 4, 2)
+        assert snapshot.debit_total == 510
+
+    def test_invalid_postings(self, db_session, test_user, posting_accounts):
+        unknown = _receipt(test_user, 100, debit_code="19999")
+        with pytest.raises(ValueError, match="Account 19999 not found"):
+            post_journal_batch(db_session, [unknown])
+
+        unbalanced = _receipt(test_user, 100)
+        unbalanced["lines"][1]["credit_amount"] = 90
+        with pytest.raises(ValueError, match="Unbalanced"):
+            post_journal_batch(db_session, [unbalanced])
+
+        foreign = Account(
+            temple_id=test_user.temple_id + 1,
+            account_code="11091",
+            account_name="Other temple cash",
+            account_type=AccountType.ASSET,
+        )
+        db_session.add(foreign)
+        db_session.flush()
+        posting = _receipt(test_user, 100)
+        posting["lines"][0] = {"account_id": foreign.id, "debit_amount": 100}
+        with pytest.raises(ValueError, match="does not belong"):
+            post_journal_batch(db_session, [posting])
+        assert db_session.query(JournalEntry).count() == 0
+
+    def test_counter_receipts_are_consolidated(self, db_session, test_user, posting_accounts):
+        postings = [
+            _receipt(test_user, 100, ref=1),
+            _receipt(test_user, 50, debit_code="12001", payment_mode="UPI", ref=2),
+            _receipt(test_user, 200, ref=3),
+            _receipt(test_user, 75, payment_mode=None, ref=4),
+            _receipt(test_user, 25, ref=5, day=date(2025, 4, 3)),
+            _receipt(test_user, 300, payment_mode="cash", ref=6),
+        ]
+
+        entry_ids = post_journal_batch(db_session, postings, consolidate=True)
+
+        # Cash receipts of 2 April share one voucher, everything else stands alone
+        assert entry_ids[0] == entry_ids[2] == entry_ids[5]
+        assert len(set(entry_ids)) == 4
+        summary = db_session.get(JournalEntry, entry_ids[0])
+        assert summary.total_amount == 600
+        assert summary.reference_id is None
+        assert summary.narration == "Counter receipts - CASH - 02-04-2025 (3 receipts)"
+        assert summary.entry_date == datetime(2025, 4, 2)
+        lines = {
+            line.account_id: (line.debit_amount, line.credit_amount)
+            for line in db_session.query(JournalLine).filter_by(journal_entry_id=summary.id)
+        }
+        assert lines == {
+            posting_accounts["11001"].id: (600, 0),
+            posting_accounts["44001"].id: (0, 600),
+        }
+        assert db_session.get(JournalEntry, entry_ids[3]).reference_id == 4
+
+    def test_batch_endpoint(self, authenticated_client, db_session, posting_accounts):
+        entry = {
+            "entry_date": "2025-04-02T10:00:00",
+            "narration": "Hundi counter receipt",
+            "payment_mode": "CASH",
+            "journal_lines": [
+                {"account_code": "11001", "debit_amount": 100},
+                {"account_code": "44001", "credit_amount": 100},
+            ],
+        }
+        response = authenticated_client.post(
+            "/api/v1/journal-entries/batch",
+            json={"entries": [entry, entry], "consolidate_counter_receipts": True},
+        )
+        assert response.status_code == 200
+        assert response.json()["entries_created"] == 1
+        assert db_session.query(JournalEntry).count() == 1
+
+        entry["journal_lines"][0]["account_code"] = "19999"
+        response = authenticated_client.post(
+            "/api/v1/journal-entries/batch", json={"entries": [entry]}
+        )
+        assert response.status_code == 400
+        assert "Account 19999 not found" in response.json()["detail"]
@@ -0,0 +1,149 @@
+"""
+Numbering Tests
+Tests the number_sequences counters behind receipt and journal entry numbers
+"""
+
+import pytest
+import threading
+from datetime import date, datetime
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.accounting import JournalEntry
+from app.models.number_sequence import NumberSequence
+from app.services import numbering_service
+from app.services.numbering_service import (
+    NumberBlockAllocator,
+    allocate,
+    financial_year,
+    max_suffix,
+    next_journal_entry_number,
+    next_seva_receipt_number,
+)
+
+
+def _journal_entry(temple_id, entry_number, user):
+    return JournalEntry(
+        temple_id=temple_id,
+        entry_number=entry_number,
+        entry_date=datetime(2025, 1, 1),
+        narration="Seeded entry",
+        total_amount=0,
+        created_by=user.id,
+    )
+
+
+@pytest.mark.unit
+class TestNumberSequences:
+    """Tests for allocate and the document number helpers"""
+
+    def test_numbers_are_sequential(self, db_session):
+        assert [allocate(db_session, 1, "JE", 2025) for _ in range(3)] == [1, 2, 3]
+        assert allocate(db_session, 1, "JE", 2025, count=10) == 4
+        assert allocate(db_session, 1, "JE", 2025) == 14
+
+    def test_counters_are_per_temple_and_period(self, db_session):
+        allocate(db_session, 1, "JE", 2025)
+        allocate(db_session, 1, "JE", 2025)
+        assert allocate(db_session, 1, "JE", 2026) == 1
+        assert allocate(db_session, 2, "JE", 2025) == 1
+        assert allocate(db_session, None, "JE", 2025) == 1
+        assert db_session.query(NumberSequence).count() == 4
+
+    def test_counter_is_seeded_once(self, db_session):
+        calls = []
+
+        def seed(db):
+            calls.append(1)
+            return 41
+
+        assert allocate(db_session, 1, "DONATION", 2025, seed=seed) == 42
+        assert allocate(db_session, 1, "DONATION", 2025, seed=seed) == 43
+        assert len(calls) == 1
+
+    def test_journal_numbers_continue_existing_entries(self, db_session, test_user):
+        db_session.add_all(
+            [
+                _journal_entry(1, "JE/2025/0007", test_user),
+                _journal_entry(1, "JE/2025/0012", test_user),
+                _journal_entry(2, "JE/2025/0099", test_user),
+            ]
+        )
+        db_session.commit()
+
+        assert next_journal_entry_number(db_session, 1, 2025) == "JE/2025/0013"
+        assert next_journal_entry_number(db_session, 1, 2025) == "JE/2025/0014"
+        assert next_journal_entry_number(db_session, 3, 2025) == "JE/2025/0001"
+
+    def test_seva_receipts(self, db_session):
+        assert next_seva_receipt_number(db_session) == "SEV000001"
+        assert next_seva_receipt_number(db_session) == "SEV000002"
+
+    def test_helpers(self):
+        assert max_suffix(["JE/2025/0003", "JE/2025/x", None, "JE/2025/0010"], "JE/2025/") == 10
+        assert max_suffix(["SEV000004", "SEV202512180951133"], "SEV", max_digits=6) == 4
+        assert financial_year(date(2025, 3, 31)) == "2024-25"
+        assert financial_year(date(2025, 4, 1)) == "2025-26"
+
+
+@pytest.mark.unit
+class TestNumberBlocks:
+    """Tests against a file database - rollbacks, worker blocks and concurrency"""
+
+    @pytest.fixture
+    def file_sessions(self, tmp_path):
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'numbers.db'}",
+            connect_args={"timeout": 30, "check_same_thread": False},
+        )
+        Base.metadata.create_all(bind=engine)
+        yield sessionmaker(bind=engine)
+        engine.dispose()
+
+    def test_rollback_returns_number(self, file_sessions):
+        with file_sessions() as db:
+            allocate(db, 1, "JE", 2025)
+            db.commit()
+            assert allocate(db, 1, "JE", 2025) == 2
+            db.rollback()
+            assert allocate(db, 1, "JE", 2025) == 2
+
+    def test_blocks_are_handed_out_from_memory(self, file_sessions):
+        allocator = NumberBlockAllocator(5, file_sessions)
+        assert [allocator.next(1, "JE", 2025) for _ in range(7)] == [1, 2, 3, 4, 5, 6, 7]
+
+        # A second worker gets its own block
+        other = NumberBlockAllocator(5, file_sessions)
+        assert other.next(1, "JE", 2025) == 11
+        with file_sessions() as db:
+            assert db.query(NumberSequence.last_value).scalar() == 15
+
+    def test_next_number_uses_blocks_when_configured(self, db_session, file_sessions, monkeypatch):
+        monkeypatch.setattr(
+            numbering_service, "block_allocator", NumberBlockAllocator(3, file_sessions)
+        )
+        assert numbering_service.next_number(db_session, 1, "JE", 2025) == 1
+        assert numbering_service.next_number(db_session, 1, "JE", 2025) == 2
+        # Reserved in the allocator's own committed session, not the caller's
+        assert db_session.query(NumberSequence).count() == 0
+
+    def test_concurrent_allocation_has_no_duplicates(self, file_sessions):
+        numbers = []
+        barrier = threading.Barrier(8)
+
+        def worker():
+            with file_sessions() as db:
+                barrier.wait()
+                for _ in range(5):
+                    numbers.append(next_journal_entry_number(db, 1, 2025))
+                    db.commit()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(numbers) == 40
+        assert sorted(numbers) == [f"JE/2025/{n:04d}" for n in range(1, 41)]
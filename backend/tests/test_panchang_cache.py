@@ -0,0 +1,101 @@
+"""
+Panchang Cache Tests
+Tests for the per-location panchang day cache and its in-process LRU
+"""
+
+import pytest
+from datetime import date
+from unittest.mock import Mock
+
+from app.models.panchang_cache import PanchangDayCache
+from app.services.panchang_cache_service import (
+    PANCHANG_CACHE_VERSION,
+    PanchangCacheService,
+    clear_memory_cache,
+    location_key,
+)
+
+
+@pytest.fixture
+def fake_panchang_service():
+    """PanchangService stand-in that records calculations"""
+    service = Mock()
+    service.calculate_panchang.side_effect = lambda dt, lat, lon, city: {
+        "date": {"gregorian": {"date": dt.date().isoformat()}},
+        "location": {"city": city, "latitude": lat, "longitude": lon},
+    }
+    return service
+
+
+@pytest.fixture(autouse=True)
+def empty_memory_cache():
+    clear_memory_cache()
+    yield
+    clear_memory_cache()
+
+
+@pytest.mark.unit
+@pytest.mark.panchang
+class TestPanchangCache:
+    """Tests for PanchangCacheService"""
+
+    def test_location_key_rounds_to_hundredth(self):
+        assert location_key(12.97161, 77.59459) == (1297, 7759)
+        assert location_key(12.9716, 77.5946) == location_key(12.9749, 77.5901)
+
+    def test_day_calculated_once(self, db_session, fake_panchang_service):
+        service = PanchangCacheService(db_session, fake_panchang_service)
+
+        first = service.get_day(date(2025, 1, 15), 12.9716, 77.5946, "Bengaluru")
+        second = service.get_day(date(2025, 1, 15), 12.9716, 77.5946, "Bengaluru")
+
+        assert first == second
+        assert fake_panchang_service.calculate_panchang.call_count == 1
+        assert db_session.query(PanchangDayCache).count() == 1
+
+    def test_database_serves_after_memory_cleared(self, db_session, fake_panchang_service):
+        service = PanchangCacheService(db_session, fake_panchang_service)
+        service.get_day(date(2025, 1, 16), 12.9716, 77.5946, "Bengaluru")
+
+        clear_memory_cache()
+        data = service.get_day(date(2025, 1, 16), 12.9716, 77.5946, "Bengaluru")
+
+        assert data["date"]["gregorian"]["date"] == "2025-01-16"
+        assert fake_panchang_service.calculate_panchang.call_count == 1
+
+    def test_returned_data_is_a_copy(self, db_session, fake_panchang_service):
+        service = PanchangCacheService(db_session, fake_panchang_service)
+        data = service.get_day(date(2025, 1, 17), 12.9716, 77.5946, "Bengaluru")
+        data["moon_sign"] = "changed"
+
+        assert "moon_sign" not in service.get_day(date(2025, 1, 17), 12.9716, 77.5946, "Bengaluru")
+
+    def test_stale_version_is_recalculated(self, db_session, fake_panchang_service):
+        lat_key, lon_key = location_key(12.9716, 77.5946)
+        db_session.add(
+            PanchangDayCache(
+                panchang_date=date(2025, 1, 18),
+                lat_key=lat_key,
+                lon_key=lon_key,
+                ayanamsa="LAHIRI",
+                version=PANCHANG_CACHE_VERSION - 1,
+                data={"stale": True},
+            )
+        )
+        db_session.commit()
+
+        data = PanchangCacheService(db_session, fake_panchang_service).get_day(
+            date(2025, 1, 18), 12.9716, 77.5946, "Bengaluru"
+        )
+        assert "stale" not in data
+        assert fake_panchang_service.calculate_panchang.call_count == 1
+
+    def test_prefill_only_calculates_missing_days(self, db_session, fake_panchang_service):
+        service = PanchangCacheService(db_session, fake_panchang_service)
+        service.get_day(date(2025, 2, 2), 12.9716, 77.5946, "Bengaluru")
+
+        result = service.prefill(date(2025, 2, 1), 5, 12.9716, 77.5946, "Bengaluru")
+
+        assert result["calculated"] == 4
+        assert result["already_cached"] == 1
+        assert service.missing_days(date(2025, 2, 1), 5, 12.9716, 77.5946) == []
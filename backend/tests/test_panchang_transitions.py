@@ -0,0 +1,121 @@
+"""
+Panchang Transition Solver Tests
+Tests that tithi, nakshatra, yoga and karana boundaries are found exactly
+"""
+
+import pytest
+from datetime import date, datetime
+import swisseph as swe
+
+from app.services import panchang_transitions
+from app.services.panchang_service import PanchangService
+
+# 2025-01-15 00:00 UT
+JD = 2460690.5
+ONE_MINUTE = 1.0 / 1440.0
+
+ANGLES = [
+    (panchang_transitions.elongation, panchang_transitions.TITHI_SPAN),
+    (panchang_transitions.elongation, panchang_transitions.KARANA_SPAN),
+    (panchang_transitions.moon_longitude, panchang_transitions.NAKSHATRA_SPAN),
+    (panchang_transitions.yoga_longitude, panchang_transitions.YOGA_SPAN),
+]
+
+
+@pytest.fixture(autouse=True)
+def lahiri():
+    swe.set_sid_mode(swe.SIDM_LAHIRI)
+
+
+@pytest.mark.unit
+class TestTransitionSolver:
+    """Tests for the bracketed Newton solver"""
+
+    @pytest.mark.parametrize("angle,span", ANGLES)
+    def test_segment_bounds_hit_boundaries(self, angle, span):
+        index, start, end = panchang_transitions.segment_bounds(angle, JD, span)
+
+        assert start <= JD <= end
+        assert end - start < 1.5
+        for jd, target in [(start, index * span), (end, (index + 1) * span)]:
+            value, speed = angle(jd)
+            error_days = abs(panchang_transitions._wrap(value - target)) / speed
+            assert error_days < ONE_MINUTE / 60
+
+    def test_crossing_uses_few_evaluations(self):
+        calls = []
+
+        def counted(jd):
+            calls.append(jd)
+            return panchang_transitions.elongation(jd)
+
+        panchang_transitions.find_crossing(counted, JD, 0.0)
+        assert len(calls) <= 8
+
+    def test_backward_crossing_precedes_forward(self):
+        value, _ = panchang_transitions.moon_longitude(JD)
+        before = panchang_transitions.find_crossing(
+            panchang_transitions.moon_longitude, JD, value - 1.0, forward=False
+        )
+        after = panchang_transitions.find_crossing(
+            panchang_transitions.moon_longitude, JD, value + 1.0
+        )
+        assert before < JD < after
+        # The Moon covers 2 degrees in roughly 3-4.5 hours
+        assert 0.12 < after - before < 0.19
+
+
+@pytest.mark.unit
+class TestPanchangEndTimes:
+    """Tests for the end times exposed by PanchangService"""
+
+    def test_yoga_and_karana_have_end_times(self):
+        service = PanchangService()
+        yoga = service.get_yoga(JD)
+        karana = service.get_karana(JD)
+
+        assert yoga["start_time"] < yoga["end_time"]
+        assert yoga["end_time_formatted"]
+        assert karana["end_time"]
+        assert karana["end_time_formatted"]
+
+    def test_tithi_ends_at_karana_boundary(self):
+        service = PanchangService()
+        tithi = service.get_tithi(JD)
+        # The second karana of a tithi ends with the tithi
+        jd_second_karana = tithi["ends_at_jd"] - ONE_MINUTE
+        assert service.get_karana(jd_second_karana)["end_time"] == tithi["end_time"]
+
+
+@pytest.mark.unit
+class TestPanchangRange:
+    """Tests for the one-sweep multi-day range API"""
+
+    def test_range_matches_daily_panchang(self):
+        service = PanchangService()
+        start, end = date(2025, 3, 1), date(2025, 3, 20)
+        days = service.calculate_panchang_range(start, end)
+
+        assert days["dates"][0] == start
+        assert days["dates"][-1] == end
+        for i in range(0, 20, 3):
+            dt = datetime.combine(days["dates"][i], datetime.min.time().replace(hour=6))
+            panchang = service.calculate_panchang(dt)
+            tithi = panchang["panchang"]["tithi"]
+            number, name, paksha = service.describe_tithi(days["tithi_index"][i])
+
+            assert (number, name, paksha) == (tithi["number"], tithi["name"], tithi["paksha"])
+            assert (
+                service.NAKSHATRAS[days["nakshatra_index"][i]]
+                == panchang["panchang"]["nakshatra"]["name"]
+            )
+            assert service.YOGAS[days["yoga_index"][i]] == panchang["panchang"]["yoga"]["name"]
+            assert (
+                days["lunar_month_purnimanta"][i]
+                == panchang["date"]["hindu"]["lunar_month_purnimanta"]
+            )
+            assert days["tithi_end_jd"][i] > days["sunrise_jd"][i]
+
+    def test_single_day_range(self):
+        days = PanchangService().calculate_panchang_range(date(2025, 6, 1), date(2025, 6, 1))
+        assert len(days["dates"]) == len(days["tithi_index"]) == 1
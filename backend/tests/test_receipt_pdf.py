@@ -0,0 +1,96 @@
+"""
+Receipt PDF Tests
+Tests the per-temple receipt template cache and rendering from plain data
+"""
+
+import pytest
+from datetime import date
+
+from app.models.temple import Temple
+from app.services.receipt_pdf_service import (
+    ReceiptTemplate,
+    get_receipt_template,
+    number_to_words,
+    receipt_templates,
+    render_donation_receipt,
+    render_seva_receipt,
+)
+
+
+@pytest.fixture(autouse=True)
+def _clear_templates():
+    receipt_templates.invalidate()
+    yield
+    receipt_templates.invalidate()
+
+
+@pytest.mark.unit
+class TestReceiptTemplates:
+    """Tests for the compiled template cache"""
+
+    def test_template_is_cached_per_temple(self, db_session, test_user):
+        template = get_receipt_template(db_session, test_user.temple_id)
+        assert template.temple["name"] == "Test Temple"
+        assert get_receipt_template(db_session, test_user.temple_id) is template
+        assert get_receipt_template(db_session, None) is not template
+
+    def test_temple_update_drops_template(self, db_session, test_user):
+        template = get_receipt_template(db_session, test_user.temple_id)
+        temple = db_session.query(Temple).filter(Temple.id == test_user.temple_id).first()
+        temple.name = "Renamed Temple"
+        db_session.commit()
+
+        rebuilt = get_receipt_template(db_session, test_user.temple_id)
+        assert rebuilt is not template
+        assert rebuilt.temple["name"] == "Renamed Temple"
+
+
+@pytest.mark.unit
+class TestReceiptRendering:
+    """Tests for rendering receipts without a database session"""
+
+    TEMPLE = {
+        "id": 1,
+        "name": "Sri Test Temple",
+        "address": "1 Temple Street",
+        "certificate_80g_number": "80G/1",
+        "authorized_signatory_name": "Treasurer",
+    }
+
+    def test_donation_receipt(self):
+        pdf = render_donation_receipt(
+            ReceiptTemplate(self.TEMPLE),
+            {
+                "receipt_number": "DON-2025-00001",
+                "donation_date": date(2025, 1, 1),
+                "devotee_name": "Ravi",
+                "is_80g_eligible": True,
+                "donation_type": "cash",
+                "payment_mode": "upi",
+                "amount": 1500.0,
+            },
+        )
+        assert pdf.startswith(b"%PDF")
+
+    def test_seva_receipt(self):
+        pdf = render_seva_receipt(
+            ReceiptTemplate(None),
+            {
+                "receipt_number": "SEV000001",
+                "booking_date": date(2025, 1, 2),
+                "seva_name": "Archana",
+                "payment_method": "Cheque",
+                "cheque_number": "000123",
+                "amount_paid": 101,
+                "status": "confirmed",
+            },
+        )
+        assert pdf.startswith(b"%PDF")
+
+    def test_number_to_words(self):
+        assert number_to_words(0) == "Zero"
+        assert number_to_words(1500) == "One Thousand Five Hundred"
+        assert (
+            number_to_words(12345678)
+            == "One Crore Twenty Three Lakh Forty Five Thousand Six Hundred Seventy Eight"
+        )
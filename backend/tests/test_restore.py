@@ -0,0 +1,192 @@
+"""
+Restore Tests
+Tests loading backup archives back into the database, and dry runs
+"""
+
+import json
+import pytest
+import zipfile
+from sqlalchemy import MetaData
+
+from app.models.accounting import Account
+from app.models.devotee import Devotee
+from app.models.number_sequence import NumberSequence
+from app.services.backup_service import write_backup
+from app.services.restore_service import load_levels, restore_backup
+
+
+@pytest.fixture
+def devotee(db_session, test_user):
+    devotee = Devotee(temple_id=test_user.temple_id, name="Saraswati", phone="9845000060")
+    db_session.add(devotee)
+    db_session.commit()
+    return devotee
+
+
+@pytest.mark.unit
+class TestRestore:
+    """Tests for restore_backup"""
+
+    def test_restore_brings_back_deleted_and_changed_rows(self, db_session, devotee, tmp_path):
+        path = str(tmp_path / "full.zip")
+        write_backup(db_session, path)
+        devotee_id = devotee.id
+
+        devotee.name = "Changed"
+        db_session.add(Devotee(temple_id=devotee.temple_id, name="Extra", phone="9845000061"))
+        db_session.commit()
+
+        progress = []
+        result = restore_backup(db_session, path, on_progress=progress.append)
+        assert result["errors"] == {}
+        assert result["tables"]["devotees"] == 1
+        assert progress[-1] == result["total_records"]
+
+        db_session.expire_all()
+        assert db_session.query(Devotee).get(devotee_id).name == "Saraswati"
+        # Rows added after the backup are kept
+        assert db_session.query(Devotee).count() == 2
+
+    def test_dry_run_verifies_checksums_without_writing(self, db_session, devotee, tmp_path):
+        path = str(tmp_path / "full.zip")
+        manifest = write_backup(db_session, path)
+        assert restore_backup(db_session, path, dry_run=True)["errors"] == {}
+
+        # Same manifest, tampered devotees member
+        tampered = str(tmp_path / "tampered.zip")
+        with zipfile.ZipFile(path) as source, zipfile.ZipFile(tampered, "w") as target:
+            for name in source.namelist():
+                data = source.read(name)
+                if name == manifest["tables"]["devotees"]["file"]:
+                    data = data.replace(b"Saraswati", b"Lakshmi")
+                target.writestr(name, data)
+
+        db_session.query(Devotee).delete()
+        db_session.commit()
+        result = restore_backup(db_session, tampered, dry_run=True)
+        assert result["errors"] == {"devotees": "checksum mismatch"}
+        assert db_session.query(Devotee).count() == 0
+
+    def test_legacy_json_backup(self, db_session, devotee, tmp_path):
+        path = tmp_path / "backup.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "tables": {
+                        "devotees": {
+                            "columns": ["id", "name", "phone", "temple_id"],
+                            "rows": [
+                                {
+                                    "id": devotee.id + 100,
+                                    "name": "Legacy",
+                                    "phone": "9845000062",
+                                    "temple_id": devotee.temple_id,
+                                }
+                            ],
+                        }
+                    }
+                }
+            )
+        )
+        result = restore_backup(db_session, str(path))
+        assert result["tables"] == {"devotees": 1}
+        assert db_session.query(Devotee).filter(Devotee.name == "Legacy").count() == 1
+
+    def test_restored_entries_reach_trial_balance(
+        self, authenticated_client, db_session, test_user, tmp_path
+    ):
+        accounts = {
+            account.account_code: account.id
+            for account in db_session.query(Account).filter(
+                Account.account_code.in_(["A101", "D100"])
+            )
+        }
+        db_session.add(
+            NumberSequence(temple_id=test_user.temple_id, series="JE", period="2024", last_value=1)
+        )
+        db_session.commit()
+
+        # A legacy backup carries no snapshot rows, so the balances must be rebuilt
+        path = tmp_path / "backup.json"
+        path.write_text(
+            json.dumps(
+                {
+                    "tables": {
+                        "journal_entries": {
+                            "columns": [
+                                "id",
+                                "entry_number",
+                                "entry_date",
+                                "temple_id",
+                                "narration",
+                                "total_amount",
+                                "status",
+                                "created_by",
+                            ],
+                            "rows": [
+                                {
+                                    "id": 900,
+                                    "entry_number": "JE/2024/0900",
+                                    "entry_date": "2024-06-01T10:00:00",
+                                    "temple_id": test_user.temple_id,
+                                    "narration": "Restored donation",
+                                    "total_amount": 750.0,
+                                    "status": "POSTED",
+                                    "created_by": test_user.id,
+                                }
+                            ],
+                        },
+                        "journal_lines": {
+                            "columns": [
+                                "id",
+                                "journal_entry_id",
+                                "account_id",
+                                "debit_amount",
+                                "credit_amount",
+                            ],
+                            "rows": [
+                                {
+                                    "id": 901,
+                                    "journal_entry_id": 900,
+                                    "account_id": accounts["A101"],
+                                    "debit_amount": 750.0,
+                                    "credit_amount": 0.0,
+                                },
+                                {
+                                    "id": 902,
+                                    "journal_entry_id": 900,
+                                    "account_id": accounts["D100"],
+                                    "debit_amount": 0.0,
+                                    "credit_amount": 750.0,
+                                },
+                            ],
+                        },
+                    }
+                }
+            )
+        )
+        result = restore_backup(db_session, str(path))
+        assert result["errors"] == {}
+        assert db_session.query(NumberSequence).count() == 0
+
+        response = authenticated_client.get(
+            "/api/v1/journal-entries/reports/trial-balance",
+            params={"as_of_date": "2024-12-31"},
+        )
+        assert response.status_code == 200
+        report = response.json()
+        assert report["total_debits"] == 750.0
+        assert report["is_balanced"]
+        by_code = {item["account_code"]: item for item in report["accounts"]}
+        assert by_code["A101"]["debit_balance"] == 750.0
+        assert by_code["D100"]["credit_balance"] == 750.0
+
+    def test_load_levels(self, db_session):
+        metadata = MetaData()
+        metadata.reflect(bind=db_session.connection())
+        levels = load_levels(metadata.sorted_tables)
+        names = [[table.name for table in level] for level in levels]
+        level_of = {name: i for i, level in enumerate(names) for name in level}
+        assert level_of["temples"] < level_of["users"]
+        assert level_of["devotees"] < level_of["donations"]
+        assert level_of["donation_categories"] < level_of["donations"]
@@ -0,0 +1,102 @@
+"""
+Sacred Events Cache Tests
+Tests the incremental bulk pre-calculation and the background job that runs it
+"""
+
+import pytest
+from datetime import date
+
+from app.models.background_job import BackgroundJob, BackgroundJobStatus
+from app.models.sacred_events_cache import SacredEventsCache
+from app.services.background_job_service import create_job
+from app.services.ready_reckoner_service import (
+    ReadyReckonerService,
+    calc_key,
+    pre_calculate_sacred_events_job,
+)
+
+START = date(2025, 3, 1)
+END = date(2025, 3, 31)
+
+
+def _events(db_session, temple_id):
+    return (
+        db_session.query(SacredEventsCache).filter(SacredEventsCache.temple_id == temple_id).all()
+    )
+
+
+@pytest.mark.unit
+class TestSacredEventsPreCalculation:
+    """Tests for the diff-based bulk writer"""
+
+    def test_calculates_every_day_once(self, db_session, test_user):
+        service = ReadyReckonerService(db_session)
+        result = service.pre_calculate_dates(test_user.temple_id, START, END)
+
+        events = _events(db_session, test_user.temple_id)
+        assert result["days_calculated"] == 31
+        assert result["inserted"] == len(events) == result["events_created"]
+        assert len([e for e in events if e.event_code == "NAK"]) == 31
+        assert {e.event_code for e in events} >= {"NAK", "EK", "PR"}
+
+    def test_second_run_skips_fresh_days(self, db_session, test_user):
+        service = ReadyReckonerService(db_session)
+        service.pre_calculate_dates(test_user.temple_id, START, END)
+        count = len(_events(db_session, test_user.temple_id))
+
+        result = service.pre_calculate_dates(test_user.temple_id, START, date(2025, 4, 5))
+        assert result["days_skipped"] == 31
+        assert result["days_calculated"] == 5
+        assert result["updated"] == result["deleted"] == 0
+        assert len(_events(db_session, test_user.temple_id)) == count + result["inserted"]
+
+    def test_location_change_recalculates_in_place(self, db_session, test_user):
+        service = ReadyReckonerService(db_session)
+        service.pre_calculate_dates(test_user.temple_id, START, END)
+        ids = {e.id for e in _events(db_session, test_user.temple_id) if e.event_code == "NAK"}
+
+        # Kolkata - same events mostly, but every day has a new fingerprint
+        result = service.pre_calculate_dates(test_user.temple_id, START, END, lat=22.57, lon=88.36)
+        db_session.expire_all()
+        naks = [e for e in _events(db_session, test_user.temple_id) if e.event_code == "NAK"]
+
+        assert result["days_calculated"] == 31
+        assert result["updated"] >= 31
+        assert {e.id for e in naks} == ids
+        assert {e.calc_key for e in naks} == {calc_key(22.57, 88.36)}
+
+
+@pytest.mark.integration
+class TestSacredEventsJob:
+    """Tests for the background pre-calculation job and its API"""
+
+    def test_job_reports_progress(self, db_session, test_user, job_sessions):
+        job = create_job(db_session, "sacred_events_precalc", temple_id=test_user.temple_id)
+        pre_calculate_sacred_events_job(job.id, [test_user.temple_id], 10)
+
+        db_session.expire_all()
+        job = db_session.query(BackgroundJob).filter(BackgroundJob.id == job.id).first()
+        assert job.status == BackgroundJobStatus.COMPLETED
+        assert job.progress_current == job.progress_total == 1
+        assert job.result["days_calculated"] == 11
+
+    def test_pre_calculate_endpoint_queues_job(self, authenticated_client, job_sessions):
+        response = authenticated_client.post(
+            "/api/v1/dashboard/sacred-events/pre-calculate", params={"days_ahead": 7}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "queued"
+
+        status_response = authenticated_client.get(
+            f"/api/v1/dashboard/sacred-events/pre-calculate/{data['job_id']}"
+        )
+        assert status_response.status_code == 200
+        assert status_response.json()["status"] == "completed"
+        assert status_response.json()["progress_percent"] == 100.0
+
+    def test_all_temples_requires_superuser(self, authenticated_client):
+        response = authenticated_client.post(
+            "/api/v1/dashboard/sacred-events/pre-calculate", params={"all_temples": True}
+        )
+        assert response.status_code == 403
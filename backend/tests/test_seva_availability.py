@@ -0,0 +1,134 @@
+"""
+Seva Availability Tests
+Tests the weekday masks, grouped booking counts and calendars
+"""
+
+import pytest
+from datetime import date, timedelta
+
+from app.models.devotee import Devotee
+from app.models.seva import (
+    Seva,
+    SevaAvailability,
+    SevaBooking,
+    SevaBookingStatus,
+    SevaCategory,
+)
+from app.services.seva_availability_service import (
+    ALL_DAYS,
+    WEEKEND,
+    available_dates,
+    booking_counts,
+    compile_rule,
+    month_grid,
+    weekday_mask,
+)
+
+MONDAY = date(2025, 3, 3)
+
+
+@pytest.fixture
+def sevas(db_session):
+    daily = Seva(
+        name_english="Archana",
+        category=SevaCategory.ARCHANA,
+        amount=50,
+        max_bookings_per_day=2,
+    )
+    except_days = Seva(
+        name_english="Abhisheka",
+        category=SevaCategory.ABHISHEKA,
+        amount=500,
+        availability=SevaAvailability.EXCEPT_DAY,
+        except_days="[1, 3]",
+        except_day=5,
+    )
+    db_session.add_all([daily, except_days])
+    db_session.commit()
+    return daily, except_days
+
+
+def _book(db_session, seva, day, booking_status=SevaBookingStatus.CONFIRMED):
+    devotee = db_session.query(Devotee).first()
+    if devotee is None:
+        devotee = Devotee(name="Calendar Devotee", phone="9000000300")
+        db_session.add(devotee)
+        db_session.flush()
+    db_session.add(
+        SevaBooking(
+            seva_id=seva.id,
+            devotee_id=devotee.id,
+            booking_date=day,
+            amount_paid=seva.amount,
+            status=booking_status,
+        )
+    )
+    db_session.commit()
+
+
+@pytest.mark.unit
+class TestSevaAvailability:
+    """Tests for the seva availability engine"""
+
+    def test_weekday_masks(self, sevas):
+        daily, except_days = sevas
+        assert weekday_mask(daily) == ALL_DAYS
+        # Monday, Wednesday (JSON) and Friday (legacy except_day) excluded
+        assert weekday_mask(except_days) == ALL_DAYS & ~(1 << 1 | 1 << 3 | 1 << 5)
+        assert weekday_mask(Seva(availability=SevaAvailability.WEEKEND)) == WEEKEND
+        assert weekday_mask(Seva(availability=SevaAvailability.SPECIFIC_DAY, specific_day=2)) == 4
+
+    def test_counts_are_grouped(self, db_session, sevas):
+        daily, except_days = sevas
+        _book(db_session, daily, MONDAY)
+        _book(db_session, daily, MONDAY)
+        _book(db_session, daily, MONDAY, SevaBookingStatus.CANCELLED)
+        _book(db_session, except_days, MONDAY + timedelta(days=1))
+
+        counts = booking_counts(
+            db_session, [daily.id, except_days.id], MONDAY, MONDAY + timedelta(days=6)
+        )
+        assert counts == {(daily.id, MONDAY): 2, (except_days.id, MONDAY + timedelta(days=1)): 1}
+
+    def test_calendar_skips_excluded_days(self, db_session, sevas):
+        daily, except_days = sevas
+        _book(db_session, daily, MONDAY)
+        _book(db_session, daily, MONDAY)
+        end = MONDAY + timedelta(days=6)
+        counts = booking_counts(db_session, [daily.id, except_days.id], MONDAY, end)
+
+        week = available_dates(compile_rule(daily), counts, MONDAY, end, today=MONDAY)
+        assert len(week) == 7
+        assert week[0]["booked_slots"] == 2 and week[0]["is_available"] is False
+        assert week[1]["available_slots"] == 2
+
+        days = available_dates(compile_rule(except_days), counts, MONDAY, end, today=MONDAY)
+        assert [d["day_of_week"] for d in days] == ["Tuesday", "Thursday", "Saturday", "Sunday"]
+
+    def test_advance_booking_window(self, db_session, sevas):
+        daily, _ = sevas
+        daily.advance_booking_days = 3
+        end = MONDAY + timedelta(days=30)
+        days = available_dates(compile_rule(daily), {}, MONDAY, end, today=MONDAY)
+        assert len(days) == 4
+
+    def test_month_grid(self, db_session, sevas):
+        daily, except_days = sevas
+        _book(db_session, daily, date(2025, 3, 10))
+
+        grid = month_grid(db_session, sevas, 2025, 3, today=MONDAY)
+        assert len(grid["dates"]) == 31
+        archana, abhisheka = grid["sevas"]
+        assert archana["days"][9]["booked_slots"] == 1
+        assert archana["days"][9]["available_slots"] == 1
+        assert archana["days"][0]["is_available"] is False  # before today
+        assert abhisheka["days"][2]["is_performed"] is False  # Monday
+
+    def test_month_endpoint(self, authenticated_client, sevas):
+        response = authenticated_client.get(
+            "/api/v1/sevas/availability/month", params={"year": 2030, "month": 2}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["dates"]) == 28
+        assert len(data["sevas"]) == 2
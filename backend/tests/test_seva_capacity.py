@@ -0,0 +1,178 @@
+"""
+Seva Capacity Tests
+Tests the atomic per-(seva, date) slot counters used by seva bookings
+"""
+
+import pytest
+import threading
+from datetime import date, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models.devotee import Devotee
+from app.models.seva import Seva, SevaBooking, SevaBookingStatus, SevaCategory, SevaDayCapacity
+from app.services.seva_capacity_service import booked_slots, release_slot, reserve_slot
+
+DAY = date.today() + timedelta(days=3)
+
+
+@pytest.fixture
+def limited_seva(db_session):
+    seva = Seva(
+        name_english="Limited Seva",
+        category=SevaCategory.POOJA,
+        amount=100,
+        max_bookings_per_day=2,
+    )
+    devotee = Devotee(name="Capacity Devotee", phone="9000000400")
+    db_session.add_all([seva, devotee])
+    db_session.commit()
+    return seva, devotee
+
+
+def _booking(seva, devotee, day=DAY, booking_status=SevaBookingStatus.CONFIRMED):
+    return SevaBooking(
+        seva_id=seva.id,
+        devotee_id=devotee.id,
+        booking_date=day,
+        amount_paid=seva.amount,
+        status=booking_status,
+    )
+
+
+@pytest.mark.unit
+class TestSlotCounters:
+    """Tests for reserve_slot / release_slot"""
+
+    def test_reserve_until_full(self, db_session, limited_seva):
+        seva, _ = limited_seva
+        assert reserve_slot(db_session, seva.id, DAY, 2)
+        assert reserve_slot(db_session, seva.id, DAY, 2)
+        assert not reserve_slot(db_session, seva.id, DAY, 2)
+        assert booked_slots(db_session, seva.id, DAY) == 2
+
+        release_slot(db_session, seva.id, DAY)
+        assert reserve_slot(db_session, seva.id, DAY, 2)
+
+    def test_counter_is_seeded_from_existing_bookings(self, db_session, limited_seva):
+        seva, devotee = limited_seva
+        db_session.add(_booking(seva, devotee))
+        db_session.add(_booking(seva, devotee, booking_status=SevaBookingStatus.CANCELLED))
+        db_session.commit()
+
+        assert reserve_slot(db_session, seva.id, DAY, 2)
+        assert not reserve_slot(db_session, seva.id, DAY, 2)
+
+    def test_unlimited_seva_is_counted(self, db_session, limited_seva):
+        seva, _ = limited_seva
+        for _ in range(5):
+            assert reserve_slot(db_session, seva.id, DAY, None)
+        assert booked_slots(db_session, seva.id, DAY) == 5
+
+    def test_release_never_goes_negative(self, db_session, limited_seva):
+        seva, _ = limited_seva
+        reserve_slot(db_session, seva.id, DAY, 2)
+        release_slot(db_session, seva.id, DAY)
+        release_slot(db_session, seva.id, DAY)
+        assert booked_slots(db_session, seva.id, DAY) == 0
+
+    def test_concurrent_counters_cannot_overbook(self, tmp_path):
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'capacity.db'}",
+            connect_args={"timeout": 30, "check_same_thread": False},
+        )
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as setup:
+            seva = Seva(name_english="Rush Seva", category=SevaCategory.SEVA, amount=10)
+            setup.add(seva)
+            setup.commit()
+            seva_id = seva.id
+
+        results = []
+        barrier = threading.Barrier(8)
+
+        def counter():
+            with Session() as db:
+                barrier.wait()
+                claimed = reserve_slot(db, seva_id, DAY, 3)
+                db.commit()
+                results.append(claimed)
+
+        threads = [threading.Thread(target=counter) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        with Session() as db:
+            assert results.count(True) == 3
+            assert booked_slots(db, seva_id, DAY) == 3
+        engine.dispose()
+
+
+@pytest.mark.integration
+class TestBookingCapacity:
+    """Tests that booking endpoints claim and release slots"""
+
+    def _held_booking(self, db_session, seva, devotee):
+        """A booking made the way create_booking makes it - slot first"""
+        assert reserve_slot(db_session, seva.id, DAY, seva.max_bookings_per_day)
+        booking = _booking(seva, devotee)
+        db_session.add(booking)
+        db_session.commit()
+        return booking
+
+    def test_cancel_releases_slot(self, authenticated_client, db_session, limited_seva):
+        seva, devotee = limited_seva
+        booking = self._held_booking(db_session, seva, devotee)
+        self._held_booking(db_session, seva, devotee)
+        assert not reserve_slot(db_session, seva.id, DAY, 2)
+
+        cancel = authenticated_client.delete(f"/api/v1/sevas/bookings/{booking.id}")
+        assert cancel.status_code == 200
+        assert booked_slots(db_session, seva.id, DAY) == 1
+        assert reserve_slot(db_session, seva.id, DAY, 2)
+
+    def test_reschedule_moves_slot(self, db_session, limited_seva, authenticated_client):
+        seva, devotee = limited_seva
+        booking = self._held_booking(db_session, seva, devotee)
+        booking.reschedule_requested_date = DAY + timedelta(days=1)
+        db_session.commit()
+
+        response = authenticated_client.post(
+            f"/api/v1/sevas/bookings/{booking.id}/approve-reschedule", params={"approve": True}
+        )
+        assert response.status_code == 200
+        assert booked_slots(db_session, seva.id, DAY) == 0
+        assert booked_slots(db_session, seva.id, DAY + timedelta(days=1)) == 1
+        assert db_session.query(SevaDayCapacity).count() == 2
+
+    def test_upi_booking_claims_slot(
+        self, authenticated_client, db_session, test_user, limited_seva
+    ):
+        seva, devotee = limited_seva
+        devotee.temple_id = test_user.temple_id
+        db_session.commit()
+        today = date.today()
+        payload = {
+            "amount": 100,
+            "sender_phone": "9000000400",
+            "devotee_id": devotee.id,
+            "payment_purpose": "seva",
+            "seva_id": seva.id,
+        }
+
+        # The counter row exists, so UPI bookings must be counted on it
+        assert reserve_slot(db_session, seva.id, today, 2)
+        db_session.commit()
+
+        response = authenticated_client.post("/api/v1/upi-payments/quick-log", json=payload)
+        assert response.status_code == 200
+        assert booked_slots(db_session, seva.id, today) == 2
+        assert db_session.query(SevaBooking).filter(SevaBooking.seva_id == seva.id).count() == 1
+
+        # Full - the endpoint rolls back, so nothing is read back afterwards
+        full = authenticated_client.post("/api/v1/upi-payments/quick-log", json=payload)
+        assert full.status_code == 400